@@ -30,6 +30,10 @@ python run_pipeline_with_llm.py --llm-provider anthropic --llm-model claude-3-so
 
 # Custom API endpoint
 python run_pipeline_with_llm.py --llm-provider openai --llm-model gpt-4 --llm-api-base https://api.openai.com/v1 --crates tokio
+
+# Nightly run through the offline Batch API (resumable)
+python run_pipeline_with_llm.py --llm-provider openai --llm-model gpt-4o-mini \\
+    --llm-api-key YOUR_KEY --crates-file crates.txt --batch-job-dir batch_jobs
 """
 
 import asyncio
@@ -56,8 +60,13 @@ from rust_crate_pipeline.config import PipelineConfig
 from rust_crate_pipeline.unified_llm_processor import (
     create_llm_processor_from_args,
     BudgetManager,
+    UnifiedLLMProcessor,
 )
 from rust_crate_pipeline.config import CrateMetadata, EnrichedCrate
+from rust_crate_pipeline.batch_jobs import BatchEnrichmentJob
+from rust_crate_pipeline.llm_router import cascade_overrides, endpoint_overrides
+from rust_crate_pipeline.use_case_classifier import get_use_case_classifier
+from rust_crate_pipeline.llm_cache import get_llm_cache
 
 
 def setup_logging(verbose: bool = False) -> None:
@@ -216,6 +225,21 @@ def parse_args() -> argparse.Namespace:
         help='Number of crates to process in parallel (default: 5)'
     )
     
+    parser.add_argument(
+        '--batched-enrichment',
+        action='store_true',
+        help='Pack classification and scoring for --batch-size crates into one '
+             'LLM request'
+    )
+    
+    parser.add_argument(
+        '--batch-job-dir',
+        type=str,
+        default=None,
+        help='Submit all enrichment prompts as offline batch jobs (OpenAI/Azure), '
+             'keeping resumable job state in this directory'
+    )
+    
     parser.add_argument(
         "--budget",
         type=float,
@@ -223,6 +247,31 @@ def parse_args() -> argparse.Namespace:
         help="Maximum budget for LLM API calls.",
     )
     
+    parser.add_argument(
+        "--disable-llm-cache",
+        action="store_true",
+        help="Disable the persistent LLM response cache",
+    )
+    
+    parser.add_argument(
+        "--llm-cache-bypass",
+        action="store_true",
+        help=(
+            "Ignore cached LLM responses for this run "
+            "(fresh responses are still cached)"
+        ),
+    )
+    
+    parser.add_argument(
+        "--usage-report",
+        type=str,
+        default=None,
+        help=(
+            "Write token, latency and cost usage per stage, task and crate to "
+            "this JSON file"
+        ),
+    )
+    
     args = parser.parse_args()
 
     if not args.crates and not args.crates_file:
@@ -231,6 +280,41 @@ def parse_args() -> argparse.Namespace:
     return args
 
 
+def build_llm_processor(
+    args: argparse.Namespace, pipeline_config: PipelineConfig
+) -> UnifiedLLMProcessor:
+    """Create the LLM processor configured by the command-line arguments"""
+    return create_llm_processor_from_args(
+        provider=args.llm_provider,
+        model=args.llm_model,
+        api_base=args.llm_api_base,
+        api_key=args.llm_api_key,
+        temperature=args.llm_temperature,
+        max_tokens=args.llm_max_tokens,
+        timeout=args.llm_timeout,
+        max_retries=args.llm_max_retries,
+        max_concurrent_requests=args.llm_max_concurrency,
+        enrichment_mode=args.llm_enrichment_mode,
+        azure_deployment=args.azure_deployment,
+        azure_api_version=args.azure_api_version,
+        ollama_host=args.ollama_host,
+        lmstudio_host=args.lmstudio_host,
+        budget=args.budget,
+        cache=get_llm_cache(pipeline_config),
+        use_case_classifier=get_use_case_classifier(pipeline_config),
+        fallback_endpoints=[
+            endpoint_overrides(args.llm_provider, url)
+            for url in args.llm_fallback_endpoint or []
+        ],
+        hedge_requests=args.llm_hedge,
+        stream_short_answers=args.llm_stream_short_answers,
+        constrained_decoding=args.llm_constrained_decoding,
+        cascade_model=cascade_overrides(
+            args.llm_cascade_model, args.llm_cascade_provider, args.llm_cascade_host
+        ),
+    )
+
+
 async def main() -> None:
     """Main function"""
     args = parse_args()
@@ -262,21 +346,20 @@ async def main() -> None:
     # Print provider information
     print_llm_provider_info(args.llm_provider)
     
+    # Pipeline config for quick_analyze_crate and the shared LLM cache
+    pipeline_config = PipelineConfig(
+        use_azure_openai=args.llm_provider == 'azure',
+        azure_openai_endpoint=args.llm_api_base,
+        azure_openai_api_key=args.llm_api_key,
+        azure_openai_deployment_name=args.azure_deployment,
+        azure_openai_api_version=args.azure_api_version,
+        llm_cache_enabled=not args.disable_llm_cache,
+        llm_cache_bypass=args.llm_cache_bypass,
+    )
+
     # Create LLM processor
     try:
-        llm_processor = create_llm_processor_from_args(
-            provider=args.llm_provider,
-            model=args.llm_model,
-            api_base=args.llm_api_base,
-            api_key=args.llm_api_key,
-            temperature=args.llm_temperature,
-            max_tokens=args.llm_max_tokens,
-            azure_deployment=args.azure_deployment,
-            azure_api_version=args.azure_api_version,
-            ollama_host=args.ollama_host,
-            lmstudio_host=args.lmstudio_host,
-            budget=args.budget,
-        )
+        llm_processor = build_llm_processor(args, pipeline_config)
     except ImportError as e:
         logger.error(f"Failed to create LLM processor: {e}")
         sys.exit(1)
@@ -291,15 +374,19 @@ async def main() -> None:
     start_time = time.time()
     
     logger.info(f"Starting LLM enrichment for {total_crates} crates...")
-    
-    # Create a pipeline config to pass to quick_analyze_crate
-    pipeline_config = PipelineConfig(
-        use_azure_openai=args.llm_provider == 'azure',
-        azure_openai_endpoint=args.llm_api_base,
-        azure_openai_api_key=args.llm_api_key,
-        azure_openai_deployment_name=args.azure_deployment,
-        azure_openai_api_version=args.azure_api_version,
-    )
+    # Degrade low-priority crates as spend approaches the budget
+    llm_processor.plan_quality_tiers(total_crates)
+
+    def save_enriched(enriched_crate: EnrichedCrate) -> None:
+        output_file = output_dir / f"{enriched_crate.name}_enriched.json"
+        # Robust serialization handling – use dataclass helper to_dict() and
+        # convert via to_serializable
+        enriched_data = to_serializable(enriched_crate.to_dict())
+        with open(output_file, "w", encoding="utf-8") as f:
+            json.dump(enriched_data, f, indent=4, default=str)
+        logger.info(f"Successfully processed and saved: {output_file}")
+
+    pending: List[CrateMetadata] = []
 
     for i, crate_name in enumerate(crates_to_process):
         try:
@@ -316,18 +403,26 @@ async def main() -> None:
             # Re-create the CrateMetadata object from the dictionary
             crate_metadata = CrateMetadata(**crate_metadata_dict)
 
+            if args.batch_job_dir:
+                # Enriched together by the offline batch job after analysis
+                pending.append(crate_metadata)
+                continue
+
+            if args.batched_enrichment:
+                # Enriched together once a full batch has been collected
+                pending.append(crate_metadata)
+                if len(pending) >= args.batch_size:
+                    for enriched_crate in await llm_processor.aenrich_crates(
+                        pending, args.batch_size
+                    ):
+                        save_enriched(enriched_crate)
+                    pending = []
+                continue
+
             logger.info(f"Enriching crate: {crate_name}")
             # Enrich crate with LLM
-            enriched_crate = llm_processor.enrich_crate(crate_metadata)
-            
-            # Save enriched data
-            output_file = output_dir / f"{crate_name}_enriched.json"
-            # Robust serialization handling – use dataclass helper to_dict() and convert via to_serializable
-            enriched_data = to_serializable(enriched_crate.to_dict())  # type: ignore[attr-defined]
-            with open(output_file, "w", encoding="utf-8") as f:
-                json.dump(enriched_data, f, indent=4, default=str)
-            
-            logger.info(f"Successfully processed and saved: {output_file}")
+            enriched_crate = await llm_processor.aenrich_crate(crate_metadata)
+            save_enriched(enriched_crate)
             
         except Exception as e:
             logger.error(f"Failed to process {crate_name}: {e}")
@@ -335,6 +430,47 @@ async def main() -> None:
         finally:
             report_progress(i + 1, total_crates, start_time, llm_processor.budget_manager)
 
+    if pending and args.batch_job_dir:
+        try:
+            job = BatchEnrichmentJob.from_processor(llm_processor, args.batch_job_dir)
+            for enriched_crate in await asyncio.to_thread(job.run, pending):
+                save_enriched(enriched_crate)
+        except Exception as e:
+            logger.error(f"Batch job enrichment failed: {e}")
+    elif pending:
+        try:
+            for enriched_crate in await llm_processor.aenrich_crates(
+                pending, args.batch_size
+            ):
+                save_enriched(enriched_crate)
+        except Exception as e:
+            logger.error(f"Failed to enrich final batch: {e}")
+
+    cascade_stats = llm_processor.get_cascade_stats()
+    if cascade_stats:
+        for task, stats in cascade_stats.items():
+            logger.info(
+                f"Cascade {task}: {stats['escalated']}/{stats['attempts']} escalated "
+                f"({stats['escalation_rate']:.0%})"
+            )
+
+    tier_stats = llm_processor.get_tier_stats()
+    if tier_stats:
+        logger.info(f"Quality tiers: {tier_stats}")
+
+    if llm_processor.cache:
+        logger.info(f"LLM response cache: {llm_processor.cache.stats()}")
+
+    classifier_stats = llm_processor.get_classifier_stats()
+    if classifier_stats:
+        logger.info(f"Use case classifier: {classifier_stats}")
+
+    if args.usage_report:
+        llm_processor.budget_manager.export_report(
+            args.usage_report, include_calls=True
+        )
+        logger.info(f"Usage report written to {args.usage_report}")
+
     logger.info("LLM enrichment pipeline finished.")
 
 
@@ -3,11 +3,31 @@ import re
 import time
 import logging
 import os
-from typing import TypedDict, Union
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional, Union
 
 from collections.abc import Callable
 
 from .config import PipelineConfig, CrateMetadata, EnrichedCrate
+from .early_stop import AnswerDetector, StreamAccumulator, category_detector
+from .enrichment_graph import EnrichmentTask, run_task_graph_threaded
+from .grammars import (
+    FACTUAL_STATEMENT_MAX_CHARS,
+    OutputGrammar,
+    category_grammar,
+    factual_pairs_grammar,
+)
+from .llm_cache import LLMResponseCache, get_llm_cache
+from .local_inference import (
+    BATCH_SAMPLING,
+    GenerationRequest,
+    LocalInferencePool,
+    PrefixStateCache,
+    shortest_first,
+)
+from .readme_parser import ReadmeDocumentCache
+from .use_case_classifier import get_use_case_classifier
 
 # Optional imports with fallbacks
 _ai_dependencies_available = True
@@ -20,11 +40,82 @@ except ImportError as e:
     Llama = None  # type: ignore[assignment,misc]
     _ai_dependencies_available = False
 
-
-class Section(TypedDict):
-    heading: str
-    content: str
-    priority: int
+# Static prompt prefixes. Everything crate-specific comes after them so a
+# local model can restore its state after the prefix instead of
+# re-evaluating it for every crate.
+README_SUMMARY_PREFIX = (
+    "<|system|>Extract key features from README.\n"
+    "<|user|>Summarize key aspects of this Rust crate from its README:\n"
+)
+FEATURE_SUMMARY_PREFIX = (
+    "<|system|>You are a Rust programming expert analyzing crate features.\n"
+    "<|user|>Explain the features of the Rust crate below and what "
+    "functionality they provide. Provide a concise explanation of each "
+    "feature's purpose and when a developer would enable it.\n\n"
+)
+CLASSIFICATION_PREFIX = (
+    "<|system|>You are a Rust expert classifying crates into the "
+    "most appropriate category.\n"
+    "<|user|>\n"
+    "# Example 1\n"
+    "Crate: `tokio`\n"
+    "Description: An asynchronous runtime for the Rust programming "
+    "language\n"
+    "Keywords: async, runtime, futures\n"
+    "Key Dependencies: mio, bytes, parking_lot\n"
+    "Category: Networking\n\n"
+    "# Example 2\n"
+    "Crate: `serde`\n"
+    "Description: A generic serialization/deserialization framework\n"
+    "Keywords: serde, serialization\n"
+    "Key Dependencies: serde_derive\n"
+    "Category: Serialization\n\n"
+    "# Crate to Classify\n"
+)
+# Pairs asked of the local model, and the fewest accepted. 5 pairs of
+# statements capped at FACTUAL_STATEMENT_MAX_CHARS fit in max_tokens=800.
+LOCAL_FACTUAL_PAIRS = 5
+LOCAL_FACTUAL_PAIRS_MIN = 3
+FACTUAL_PAIRS_PREFIX = (
+    f"<|system|>Create exactly {LOCAL_FACTUAL_PAIRS} "
+    "factual/counterfactual pairs for the Rust crate. Factual statements "
+    "must be true. Counterfactuals should be plausible but incorrect - make "
+    "them subtle and convincing rather than simple negations. Keep each "
+    f"statement under {FACTUAL_STATEMENT_MAX_CHARS} characters.\n"
+    "<|user|>\n"
+    "Format each pair as:\n"
+    "✅ Factual: [true statement about the crate]\n"
+    "❌ Counterfactual: [plausible but false statement]\n\n"
+    f"Create exactly {LOCAL_FACTUAL_PAIRS} pairs for this crate:\n"
+)
+STATIC_PROMPT_PREFIXES = (
+    README_SUMMARY_PREFIX,
+    FEATURE_SUMMARY_PREFIX,
+    CLASSIFICATION_PREFIX,
+    FACTUAL_PAIRS_PREFIX,
+)
+
+CLASSIFICATION_CATEGORIES = [
+    "AI",
+    "Database",
+    "Web Framework",
+    "Networking",
+    "Serialization",
+    "Utilities",
+    "DevTools",
+    "ML",
+    "Cryptography",
+    "Unknown",
+]
+
+# Ends a streamed classification as soon as a category name is complete
+CLASSIFICATION_ANSWER = category_detector(CLASSIFICATION_CATEGORIES)
+
+# Output formats enforced by constrained decoding (GBNF for llama.cpp)
+CLASSIFICATION_GRAMMAR = category_grammar(CLASSIFICATION_CATEGORIES)
+FACTUAL_PAIRS_GRAMMAR = factual_pairs_grammar(
+    LOCAL_FACTUAL_PAIRS_MIN, LOCAL_FACTUAL_PAIRS
+)
 
 
 class LLMEnricher:
@@ -35,9 +126,20 @@ class LLMEnricher:
 
         self.config = config
         self.tokenizer = tiktoken.get_encoding("cl100k_base")  # type: ignore
+        # llama.cpp contexts are not thread-safe; the pipeline enriches
+        # crates from worker threads, so local inference is serialized
+        self._model_lock = threading.Lock()
+        self.cache = get_llm_cache(config)
+        self.use_case_classifier = get_use_case_classifier(config)
+        self.readme_documents = ReadmeDocumentCache(self.tokenizer)
+        # Worker processes for batch_process_prompts, started on first use
+        self.inference_pool: Optional[LocalInferencePool] = None
         
         # Auto-detect and configure the appropriate LLM provider
         self.model = self._auto_detect_and_load_model()
+        self.prefix_cache: Optional[PrefixStateCache] = (
+            PrefixStateCache(self.model) if isinstance(self.model, Llama) else None
+        )
 
     def _auto_detect_and_load_model(self):
         """Automatically detect and load the appropriate LLM provider"""
@@ -74,7 +176,7 @@ class LLMEnricher:
                     timeout=30,
                     max_retries=self.config.max_retries
                 )
-                return UnifiedLLMProcessor(llm_config)
+                return UnifiedLLMProcessor(llm_config, cache=self.cache)
             except Exception as e:
                 logging.warning(f"Ollama setup failed: {e}")
         
@@ -90,7 +192,7 @@ class LLMEnricher:
                     timeout=30,
                     max_retries=self.config.max_retries
                 )
-                return UnifiedLLMProcessor(llm_config)
+                return UnifiedLLMProcessor(llm_config, cache=self.cache)
             except Exception as e:
                 logging.warning(f"LM Studio setup failed: {e}")
         
@@ -103,10 +205,9 @@ class LLMEnricher:
             "4. LM Studio (install and run LM Studio server)"
         )
 
-    def _load_local_model(self):
-        """Load local llama.cpp model"""
-        return Llama(  # type: ignore
-            model_path=self.config.model_path,
+    def _local_model_kwargs(self) -> dict[str, Any]:
+        """llama.cpp settings shared by the in-process model and pool workers"""
+        return dict(
             n_ctx=4096,  # Larger context for L4's 24GB VRAM
             n_batch=1024,  # Larger batch size for better throughput
             # Load ALL layers on GPU (L4 has plenty VRAM)
@@ -121,6 +222,12 @@ class LLMEnricher:
             verbose=False,  # Reduce logging overhead
         )
 
+    def _load_local_model(self):
+        """Load local llama.cpp model"""
+        return Llama(  # type: ignore
+            model_path=self.config.model_path, **self._local_model_kwargs()
+        )
+
     def _check_ollama_available(self):
         """Check if Ollama is available"""
         try:
@@ -160,79 +267,7 @@ class LLMEnricher:
         """Intelligently truncate content to preserve the most important parts"""
         if not content:
             return ""
-
-        # If content is short enough, return it all
-        if len(self.tokenizer.encode(content)) <= max_tokens:
-            return content
-
-        # Split into sections based on markdown headers
-        sections: list[Section] = []
-        current_section: Section = {
-            "heading": "Introduction",
-            "content": "",
-            "priority": 10,
-        }
-
-        for line in content.splitlines():
-            if re.match(r"^#+\s+", line):  # It's a header
-                # Save previous section if not empty
-                if current_section["content"].strip():
-                    sections.append(current_section)
-
-                # Create new section with appropriate priority
-                heading = re.sub(r"^#+\s+", "", line)
-                priority = 5  # Default priority
-
-                # Assign priority based on content type
-                if re.search(r"\b(Union[usage, example]|getting started)\b", heading, re.I):
-                    priority = 10
-                elif re.search(r"\b(Union[feature, overview]|about)\b", heading, re.I):
-                    priority = 9
-                elif re.search(r"\b(Union[install, setup]|config)\b", heading, re.I):
-                    priority = 8
-                elif re.search(r"\b(Union[api, interface])\b", heading, re.I):
-                    priority = 7
-
-                current_section = {
-                    "heading": heading,
-                    "content": line + "\n",
-                    "priority": priority,
-                }
-            else:
-                current_section["content"] += line + "\n"
-
-                # Boost priority if code block is found
-                if "```rust" in line or "```no_run" in line:
-                    current_section["priority"] = max(current_section["priority"], 8)
-
-        # Add the last section
-        if current_section["content"].strip():
-            sections.append(current_section)
-
-        # Sort sections by priority (highest first)
-        sections.sort(key=lambda x: x["priority"], reverse=True)
-
-        # Build the result, respecting token limits
-        result = ""
-        tokens_used = 0
-
-        for section in sections:
-            section_text = f'## {section["heading"]}\n{section["content"]}\n'
-            section_tokens = len(self.tokenizer.encode(section_text))
-
-            if tokens_used + section_tokens <= max_tokens:
-                result += section_text
-                tokens_used += section_tokens
-            elif tokens_used < max_tokens - 100:  # If we can fit a truncated version
-                # Take what we can
-                remaining_tokens = max_tokens - tokens_used
-                truncated_text = self.tokenizer.decode(
-                    self.tokenizer.encode(section_text)[:remaining_tokens]
-                )
-                result += truncated_text
-                break
-
-        return result
+        return self.readme_documents.get(content).truncate(max_tokens)
 
     def clean_output(self, output: str, task: str = "general") -> str:
         """Task-specific output cleaning"""
@@ -286,9 +321,24 @@ class LLMEnricher:
             return "\n".join(lines)
 
     def run_llama(
-        self, prompt: str, temp: float = 0.2, max_tokens: int = 256
+        self,
+        prompt: str,
+        temp: float = 0.2,
+        max_tokens: int = 256,
+        use_cache: bool = True,
+        prefix: Optional[str] = None,
+        stop_when: Optional[AnswerDetector] = None,
+        grammar: Optional[OutputGrammar] = None,
     ) -> Union[str, None]:
-        """Run the LLM with customizable parameters per task"""
+        """Run the LLM with customizable parameters per task.
+
+        ``prefix`` names the static start of ``prompt``; local models restore
+        their saved state after it instead of evaluating it again. With
+        ``stop_when`` the output is streamed and decoding stops as soon as
+        the detector finds a complete answer, which is returned instead.
+        ``grammar`` constrains the output format: local models sample only
+        tokens the GBNF grammar allows, remote ones get a JSON schema.
+        """
         try:
             token_count = self.estimate_tokens(prompt)
             if token_count > self.config.prompt_token_margin:
@@ -301,23 +351,110 @@ class LLMEnricher:
             from .unified_llm_processor import UnifiedLLMProcessor
             if isinstance(self.model, UnifiedLLMProcessor):
                 # UnifiedLLMProcessor
-                return self.model.call_llm(prompt, temp, max_tokens)
+                return self.model.call_llm(
+                    prompt, temp, max_tokens, use_cache=use_cache,
+                    stop_when=stop_when, grammar=grammar
+                )
             else:
                 # Local Llama model
-                output = self.model(
-                    prompt,
-                    max_tokens=max_tokens,
-                    temperature=temp,
-                    # Stop at these tokens
-                    stop=["<|end|>", "<|user|>", "<|system|>"],
-                )
-
-                raw_text: str = output["choices"][0]["text"]  # type: ignore
-                return self.clean_output(raw_text)
+                cache_key = None
+                if self.cache:
+                    cache_key = self._local_cache_key(prompt, temp, max_tokens, grammar)
+                    if use_cache:
+                        cached = self.cache.get(cache_key)
+                        if cached is not None:
+                            return cached
+
+                llama_grammar = grammar.llama_grammar() if grammar else None
+                with self._model_lock:
+                    self._restore_prefix(prompt, prefix)
+                    if stop_when:
+                        raw_text = self._stream_local(
+                            prompt, temp, max_tokens, stop_when, llama_grammar
+                        )
+                    else:
+                        output = self.model(
+                            prompt,
+                            max_tokens=max_tokens,
+                            temperature=temp,
+                            # Stop at these tokens
+                            stop=["<|end|>", "<|user|>", "<|system|>"],
+                            grammar=llama_grammar,
+                        )
+                        raw_text = output["choices"][0]["text"]  # type: ignore
+
+                cleaned = self.clean_output(raw_text)
+                if cache_key and self.cache:
+                    self.cache.set(cache_key, cleaned)
+                return cleaned
         except Exception as e:
             logging.error(f"Model inference failed: {str(e)}")
             raise
 
+    def _stream_local(
+        self,
+        prompt: str,
+        temp: float,
+        max_tokens: int,
+        stop_when: AnswerDetector,
+        llama_grammar: Optional[Any] = None,
+    ) -> str:
+        """Stream a local completion, stopping once the answer is decoded.
+
+        Leaving the generator stops llama.cpp from decoding further tokens.
+        Callers must hold the model lock.
+        """
+        accumulator = StreamAccumulator(stop_when)
+        for chunk in self.model(
+            prompt,
+            max_tokens=max_tokens,
+            temperature=temp,
+            stop=["<|end|>", "<|user|>", "<|system|>"],
+            stream=True,
+            grammar=llama_grammar,
+        ):
+            if accumulator.add_text(chunk["choices"][0]["text"]):  # type: ignore
+                break
+        return accumulator.content
+
+    def _restore_prefix(self, prompt: str, prefix: Optional[str]) -> None:
+        """Restore the local model state after a static prompt prefix"""
+        if prefix and self.prefix_cache and prompt.startswith(prefix):
+            try:
+                self.prefix_cache.prepare(prefix)
+            except Exception as e:
+                logging.debug(f"Prompt prefix state unavailable: {e}")
+
+    def _local_cache_key(
+        self,
+        prompt: str,
+        temp: float,
+        max_tokens: int,
+        grammar: Optional[OutputGrammar] = None,
+        sampling: Optional[dict[str, Any]] = None,
+    ) -> str:
+        """LLM cache key for a local llama.cpp completion.
+
+        ``sampling`` holds any sampling settings passed besides temperature
+        and max_tokens, since they change the output too.
+        """
+        extra: dict[str, Any] = dict(sampling or {})
+        if grammar:
+            extra["grammar"] = grammar.name
+        return LLMResponseCache.make_key(
+            provider="llama_cpp",
+            model=os.path.basename(self.config.model_path),
+            system_message="",
+            prompt=prompt,
+            temperature=temp,
+            max_tokens=max_tokens,
+            extra=extra or None,
+        )
+
+    def _grammar(self, grammar: OutputGrammar) -> Optional[OutputGrammar]:
+        """``grammar``, unless constrained decoding is turned off"""
+        return grammar if self.config.constrained_decoding else None
+
     def validate_and_retry(
         self,
         prompt: str,
@@ -325,16 +462,30 @@ class LLMEnricher:
         temp: float = 0.2,
         max_tokens: int = 256,
         retries: int = 4,  # Increased from 2 to 4 for better success rates
+        prefix: Optional[str] = None,
+        stop_when: Optional[AnswerDetector] = None,
+        grammar: Optional[OutputGrammar] = None,
     ) -> Union[str, None]:
-        """Run LLM with validation and automatic retry on failure"""
+        """Run LLM with validation and automatic retry on failure.
+
+        With a ``grammar`` the format is guaranteed, so retries only run
+        when the content fails validation.
+        """
         result = None
         for attempt in range(retries):
             try:
                 # More generous temperature adjustment for better variety
                 # 20% increases instead of 10%
                 adjusted_temp = temp * (1 + (attempt * 0.2))
+                # A cached answer that failed validation must not be replayed
                 result = self.run_llama(
-                    prompt, temp=adjusted_temp, max_tokens=max_tokens
+                    prompt,
+                    temp=adjusted_temp,
+                    max_tokens=max_tokens,
+                    use_cache=attempt == 0,
+                    prefix=prefix,
+                    stop_when=stop_when,
+                    grammar=grammar,
                 )
 
                 # Validate the result
@@ -409,7 +560,7 @@ class LLMEnricher:
         )
 
     def validate_factual_pairs(self, result: str) -> bool:
-        """Ensure exactly 5 factual/counterfactual pairs exist"""
+        """Ensure at least LOCAL_FACTUAL_PAIRS_MIN pairs exist"""
         if not result:
             return False
 
@@ -418,7 +569,7 @@ class LLMEnricher:
             r"❌\s*Counterfactual:?\s*(.*?)(?=✅|\Z)", result, re.DOTALL
         )
 
-        return len(facts) >= 3 and len(counterfacts) >= 3  # At least 3 pairs
+        return min(len(facts), len(counterfacts)) >= LOCAL_FACTUAL_PAIRS_MIN
 
     def enrich_crate(self, crate: CrateMetadata) -> EnrichedCrate:
         """Apply all AI enrichments to a crate"""
@@ -427,32 +578,61 @@ class LLMEnricher:
         enriched = EnrichedCrate(**enriched_dict)
 
         try:
-            # Generate README summary first
-            if crate.readme:
-                readme_content = self.smart_truncate(crate.readme, 2000)
-                prompt = (
-                    "<|system|>Extract key features from README.\n"
-                    "<|user|>Summarize key aspects of this Rust crate from its "
-                    f"README:\n{readme_content}\n"
-                    "<|end|>"
-                )
-                enriched.readme_summary = self.validate_and_retry(
-                    prompt, lambda x: len(x) > 50, temp=0.3, max_tokens=300
-                )
-
-            # Generate other enrichments
-            enriched.feature_summary = self.summarize_features(crate)
-            enriched.use_case = self.classify_use_case(
-                crate, enriched.readme_summary or ""
+            # Only classification depends on another task (the README
+            # summary); the rest run concurrently when the provider allows it
+            tasks = [
+                EnrichmentTask(
+                    "readme_summary", lambda _: self._summarize_readme(crate)
+                ),
+                EnrichmentTask(
+                    "feature_summary", lambda _: self.summarize_features(crate)
+                ),
+                EnrichmentTask(
+                    "use_case",
+                    lambda deps: self.classify_use_case(
+                        crate, deps["readme_summary"] or ""
+                    ),
+                    depends_on=("readme_summary",),
+                ),
+                EnrichmentTask("score", lambda _: self.score_crate(crate)),
+                EnrichmentTask(
+                    "factual_counterfactual",
+                    lambda _: self.generate_factual_pairs(crate),
+                ),
+            ]
+            results = run_task_graph_threaded(
+                tasks, max_workers=self._max_parallel_tasks()
             )
-            enriched.score = self.score_crate(crate)
-            enriched.factual_counterfactual = self.generate_factual_pairs(crate)
+            for field_name, value in results.items():
+                setattr(enriched, field_name, value)
 
             return enriched
         except Exception as e:
             logging.error(f"Failed to enrich {crate.name}: {str(e)}")
             return enriched
 
+    def _max_parallel_tasks(self) -> int:
+        """Number of enrichment prompts that may be in flight for one crate"""
+        from .unified_llm_processor import UnifiedLLMProcessor
+        if isinstance(self.model, UnifiedLLMProcessor):
+            return self.model.config.max_concurrent_requests
+        # A single local llama.cpp context can only run one prompt at a time
+        return 1
+
+    def _summarize_readme(self, crate: CrateMetadata) -> Union[str, None]:
+        """Generate the README summary used by classification"""
+        if not crate.readme:
+            return None
+        readme_content = self.smart_truncate(crate.readme, 2000)
+        prompt = f"{README_SUMMARY_PREFIX}{readme_content}\n<|end|>"
+        return self.validate_and_retry(
+            prompt,
+            lambda x: len(x) > 50,
+            temp=0.3,
+            max_tokens=300,
+            prefix=README_SUMMARY_PREFIX,
+        )
+
     def summarize_features(self, crate: CrateMetadata) -> str:
         """Generate summaries for crate features with better prompting"""
         try:
@@ -483,25 +663,35 @@ class LLMEnricher:
                 return "Features format not recognized."
 
             prompt = (
-                "<|system|>You are a Rust programming expert analyzing crate "
-                "features.\n"
-                f"<|user|>For the Rust crate `{crate.name}`, explain these "
-                "features and what functionality they provide:\n\n"
-                f"{feature_text}\n\n"
-                "Provide a concise explanation of each feature's purpose and "
-                "when a developer would enable it.\n"
+                f"{FEATURE_SUMMARY_PREFIX}"
+                f"Crate: `{crate.name}`\n"
+                f"Features:\n{feature_text}\n"
                 "<|end|>"
             )
 
             # Use moderate temperature for informative but natural explanation
-            result = self.run_llama(prompt, temp=0.2, max_tokens=350)
+            result = self.run_llama(
+                prompt, temp=0.2, max_tokens=350, prefix=FEATURE_SUMMARY_PREFIX
+            )
             return result or "Feature summary not available."
         except Exception as e:
             logging.warning(f"Feature summarization failed for {crate.name}: {str(e)}")
             return "Feature summary not available."
 
     def classify_use_case(self, crate: CrateMetadata, readme_summary: str) -> str:
-        """Classify the use case of a crate with rich context"""
+        """Classify the use case of a crate with rich context.
+
+        A confident local classifier answers without running the model.
+        """
+        if self.use_case_classifier:
+            return self.use_case_classifier.classify(
+                crate,
+                readme_summary,
+                lambda: self._llm_classify_use_case(crate, readme_summary),
+            )
+        return self._llm_classify_use_case(crate, readme_summary)
+
+    def _llm_classify_use_case(self, crate: CrateMetadata, readme_summary: str) -> str:
         try:
             # Calculate available tokens for prompt
             available_prompt_tokens = self.config.model_token_limit - 200
@@ -528,23 +718,7 @@ class LLMEnricher:
 
             # Few-shot prompting with examples
             prompt = (
-                "<|system|>You are a Rust expert classifying crates into the "
-                "most appropriate category.\n"
-                "<|user|>\n"
-                "# Example 1\n"
-                "Crate: `tokio`\n"
-                "Description: An asynchronous runtime for the Rust programming "
-                "language\n"
-                "Keywords: async, runtime, futures\n"
-                "Key Dependencies: mio, bytes, parking_lot\n"
-                "Category: Networking\n\n"
-                "# Example 2\n"
-                "Crate: `serde`\n"
-                "Description: A generic serialization/deserialization framework\n"
-                "Keywords: serde, serialization\n"
-                "Key Dependencies: serde_derive\n"
-                "Category: Serialization\n\n"
-                "# Crate to Classify\n"
+                f"{CLASSIFICATION_PREFIX}"
                 f"Crate: `{crate.name}`\n"
                 f"Description: {desc}\n"
                 f"Keywords: {joined}\n"
@@ -561,6 +735,11 @@ class LLMEnricher:
                 validation_func=self.validate_classification,
                 temp=0.2,
                 max_tokens=50,
+                prefix=CLASSIFICATION_PREFIX,
+                stop_when=(
+                    CLASSIFICATION_ANSWER if self.config.stream_short_answers else None
+                ),
+                grammar=self._grammar(CLASSIFICATION_GRAMMAR),
             )
 
             return result or "Unknown"
@@ -594,20 +773,12 @@ class LLMEnricher:
                 features = ""
 
             prompt = (
-                "<|system|>Create exactly 5 factual/counterfactual pairs for "
-                "the Rust crate. Factual statements must be true. "
-                "Counterfactuals should be plausible but incorrect - make them "
-                "subtle and convincing rather than simple negations.\n"
-                "<|user|>\n"
+                f"{FACTUAL_PAIRS_PREFIX}"
                 f"Crate: {crate.name}\n"
                 f"Description: {desc}\n"
                 f"Repo: {crate.repository}\n"
                 f"README Summary: {readme_summary}\n"
-                f"Key Features: {features}\n\n"
-                "Format each pair as:\n"
-                "✅ Factual: [true statement about the crate]\n"
-                "❌ Counterfactual: [plausible but false statement]\n\n"
-                "Create exactly 5 pairs.\n"
+                f"Key Features: {features}\n"
                 "<|end|>"
             )
             # Use validation for retry - more generous parameters
@@ -616,6 +787,8 @@ class LLMEnricher:
                 validation_func=self.validate_factual_pairs,
                 temp=0.7,
                 max_tokens=800,
+                prefix=FACTUAL_PAIRS_PREFIX,
+                grammar=self._grammar(FACTUAL_PAIRS_GRAMMAR),
             )
 
             return result or "Factual pairs generation failed."
@@ -633,47 +806,100 @@ class LLMEnricher:
         self, prompts: list[tuple[str, float, int]], batch_size: int = 4
     ) -> list[Union[str, None]]:
         """
-        L4 GPU-optimized batch processing for multiple prompts.
-        Processes prompts in batches to maximize GPU utilization.
+        Process many prompts, sharing the hardware between them.
+
+        Local models run queued prompts shortest-first, across a pool of model
+        worker processes when ``config.local_model_workers`` > 1. Remote
+        providers get up to ``batch_size`` requests in flight.
 
         Args:
             prompts: List of (prompt, temperature, max_tokens) tuples
-            batch_size: Number of prompts to process simultaneously
+            batch_size: Maximum concurrent requests for remote providers
         """
-        results: list[Union[str, None]] = []
+        def fit(prompt: str) -> str:
+            if self.estimate_tokens(prompt) > 3500:
+                return self.smart_truncate(prompt, 3500)
+            return prompt
 
-        # Process in batches optimized for L4's capabilities
-        for i in range(0, len(prompts), batch_size):
-            batch = prompts[i : i + batch_size]
-            batch_results: list[Union[str, None]] = []
+        prepared = [
+            (fit(prompt), temp, max_tokens) for prompt, temp, max_tokens in prompts
+        ]
 
-            for prompt, temp, max_tokens in batch:
+        from .unified_llm_processor import UnifiedLLMProcessor
+        if isinstance(self.model, UnifiedLLMProcessor):
+            def call(item: tuple[str, float, int]) -> Union[str, None]:
                 try:
-                    # Prepare prompt with context preservation
-                    if self.estimate_tokens(prompt) > 3500:
-                        prompt = self.smart_truncate(prompt, 3500)
-
-                    # Use optimized parameters for L4
-                    output = self.model(
-                        prompt,
-                        max_tokens=max_tokens,
-                        temperature=temp,
-                        top_p=0.95,
-                        repeat_penalty=1.1,
-                        stop=["<|end|>", "<|user|>", "<|system|>"],
-                        echo=False,
-                        stream=False,
-                    )
-
+                    return self.model.call_llm(item[0], item[1], item[2])
+                except Exception as e:
+                    logging.error(f"LLM batch processing error: {e}", exc_info=True)
+                    return None
+
+            with ThreadPoolExecutor(max_workers=max(1, batch_size)) as executor:
+                return list(executor.map(call, prepared))
+
+        results: list[Union[str, None]] = [None] * len(prepared)
+        keys: list[Union[str, None]] = [None] * len(prepared)
+        pending: list[int] = []
+        for index, (prompt, temp, max_tokens) in enumerate(prepared):
+            if self.cache:
+                keys[index] = self._local_cache_key(
+                    prompt, temp, max_tokens, sampling=BATCH_SAMPLING
+                )
+                cached = self.cache.get(keys[index])
+                if cached is not None:
+                    results[index] = cached
+                    continue
+            pending.append(index)
+
+        requests = [
+            GenerationRequest(
+                prompt,
+                temperature=temp,
+                max_tokens=max_tokens,
+                prefix=next(
+                    (p for p in STATIC_PROMPT_PREFIXES if prompt.startswith(p)), None
+                ),
+            )
+            for prompt, temp, max_tokens in (prepared[i] for i in pending)
+        ]
+        if self.config.local_model_workers > 1:
+            if self.inference_pool is None:
+                self.inference_pool = LocalInferencePool(
+                    self.config.model_path,
+                    self.config.local_model_workers,
+                    self._local_model_kwargs(),
+                )
+            raw_outputs = self.inference_pool.generate_many(
+                requests, self.estimate_tokens
+            )
+        else:
+            raw_outputs = [None] * len(requests)
+            for position in shortest_first(requests, self.estimate_tokens):
+                request = requests[position]
+                try:
+                    with self._model_lock:
+                        self._restore_prefix(request.prompt, request.prefix)
+                        output = self.model(
+                            request.prompt,
+                            max_tokens=request.max_tokens,
+                            temperature=request.temperature,
+                            stop=request.stop,
+                            echo=False,
+                            stream=False,
+                            **BATCH_SAMPLING,
+                        )
                     # The type checker incorrectly infers a stream response
-                    choice_text: str = output["choices"][0]["text"]  # type: ignore
-                    result = self.clean_output(choice_text)
-                    batch_results.append(result)
+                    raw_outputs[position] = output["choices"][0]["text"]  # type: ignore
                 except Exception as e:
                     logging.error(f"LLM batch processing error: {e}", exc_info=True)
-                    batch_results.append(None)
 
-            results.extend(batch_results)
+        for position, index in enumerate(pending):
+            raw_text = raw_outputs[position]
+            if raw_text is None:
+                continue
+            results[index] = self.clean_output(raw_text)
+            if self.cache and keys[index]:
+                self.cache.set(keys[index], results[index])
 
         return results
 
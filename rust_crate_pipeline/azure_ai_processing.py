@@ -3,17 +3,13 @@ import re
 import time
 import logging
 import json
-from typing import TypedDict, Union, Optional
+from typing import Union, Optional
 from collections.abc import Callable
 
 import requests  # type: ignore  # May lack stubs in some environments
 from .config import PipelineConfig, CrateMetadata, EnrichedCrate  # Ensure these are defined and correct
-
-
-class Section(TypedDict, total=True):
-    heading: str
-    content: str
-    priority: int
+from .llm_cache import LLMResponseCache, get_llm_cache
+from .readme_parser import ReadmeDocumentCache
 
 
 class AzureOpenAIEnricher:
@@ -28,6 +24,8 @@ class AzureOpenAIEnricher:
         # Construct the Azure OpenAI API URL
         self.api_url = f"{config.azure_openai_endpoint}openai/deployments/{config.azure_openai_deployment_name}/chat/completions"
         self.api_url += f"?api-version={config.azure_openai_api_version}"
+        self.cache = get_llm_cache(config)
+        self.readme_documents = ReadmeDocumentCache()
 
     def estimate_tokens(self, text: str) -> int:
         """Rough token estimation (4 characters per token)"""
@@ -51,81 +49,7 @@ class AzureOpenAIEnricher:
         """Intelligently truncate content to preserve the most important parts"""
         if not content:
             return ""
-
-        # If content is short enough, return it all
-        if self.estimate_tokens(content) <= max_tokens:
-            return content
-
-        # Split into sections based on markdown headers
-        sections: list[Section] = []
-        current_section: Section = {
-            "heading": "Introduction",
-            "content": "",
-            "priority": 10,
-        }
-
-        for line in content.splitlines():
-            if re.match(r"^#+\s+", line):  # It's a header
-                # Save previous section if not empty
-                if current_section["content"].strip():
-                    sections.append(current_section)
-
-                # Create new section with appropriate priority
-                heading = re.sub(r"^#+\s+", "", line)
-                priority = 5  # Default priority
-
-                # Assign priority based on content type
-                if re.search(r"\b(usage|example|getting started)\b", heading, re.I):
-                    priority = 10
-                elif re.search(r"\b(feature|overview|about)\b", heading, re.I):
-                    priority = 9
-                elif re.search(r"\b(install|setup|config)\b", heading, re.I):
-                    priority = 8
-                elif re.search(r"\b(api|interface)\b", heading, re.I):
-                    priority = 7
-
-                current_section = {
-                    "heading": heading,
-                    "content": line + "\n",
-                    "priority": priority,
-                }
-            else:
-                current_section["content"] += line + "\n"
-
-                # Boost priority if code block is found
-                if "```rust" in line or "```no_run" in line:
-                    current_section["priority"] = max(current_section["priority"], 8)
-
-        # Add the last section
-        if current_section["content"].strip():
-            sections.append(current_section)
-
-        # Sort sections by priority (highest first)
-        sections.sort(key=lambda x: x["priority"], reverse=True)
-
-        # Build the result, respecting token limits
-        result = ""
-        tokens_used = 0
-
-        for section in sections:
-            section_text = f'## {section["heading"]}\n{section["content"]}\n'
-            section_tokens = self.estimate_tokens(section_text)
-
-            if tokens_used + section_tokens <= max_tokens:
-                result += section_text
-                tokens_used += section_tokens
-            elif tokens_used < max_tokens - 100:  # If we can fit a truncated version
-                # Take what we can
-                remaining_tokens = max_tokens - tokens_used
-                # Simple truncation by characters
-                max_chars = remaining_tokens * 4
-                if len(section_text) > max_chars:
-                    result += section_text[:max_chars] + "..."
-                else:
-                    result += section_text
-                break
-
-        return result
+        return self.readme_documents.get(content).truncate(max_tokens)
 
     def clean_output(self, output: str, task: str = "general") -> str:
         """Task-specific output cleaning"""
@@ -180,9 +104,28 @@ class AzureOpenAIEnricher:
         prompt: str, 
         temperature: float = 0.2, 
         max_tokens: int = 256,
-        system_message: str = "You are a helpful AI assistant that analyzes Rust crates and provides insights."
+        system_message: str = (
+            "You are a helpful AI assistant that analyzes Rust crates "
+            "and provides insights."
+        ),
+        use_cache: bool = True
     ) -> Optional[str]:
         """Call Azure OpenAI API"""
+        cache_key = None
+        if self.cache:
+            cache_key = LLMResponseCache.make_key(
+                provider="azure",
+                model=self.config.azure_openai_deployment_name,
+                system_message=system_message,
+                prompt=prompt,
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
+            if use_cache:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    return cached
+
         try:
             payload = {
                 "messages": [
@@ -204,7 +147,10 @@ class AzureOpenAIEnricher:
             
             if response.status_code == 200:
                 result = response.json()
-                return result["choices"][0]["message"]["content"]
+                content = result["choices"][0]["message"]["content"]
+                if cache_key and self.cache and content:
+                    self.cache.set(cache_key, content)
+                return content
             else:
                 logging.error(f"Azure OpenAI API error: {response.status_code} - {response.text}")
                 return None
@@ -225,7 +171,14 @@ class AzureOpenAIEnricher:
         """Run prompt with validation and retry logic"""
         for attempt in range(retries):
             try:
-                result = self.call_azure_openai(prompt, temperature, max_tokens, system_message)
+                # A cached answer that failed validation must not be replayed
+                result = self.call_azure_openai(
+                    prompt,
+                    temperature,
+                    max_tokens,
+                    system_message,
+                    use_cache=attempt == 0,
+                )
                 
                 if result and validation_func(result):
                     return result
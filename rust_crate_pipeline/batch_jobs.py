@@ -0,0 +1,470 @@
+# batch_jobs.py
+"""
+Offline enrichment through the OpenAI / Azure OpenAI Batch API.
+
+All pending enrichment prompts for a run are written to a JSONL file,
+uploaded and submitted as a batch job, polled until the job finishes and
+then mapped back onto ``EnrichedCrate`` objects. Batch endpoints are
+cheaper and not subject to per-minute rate limits, which suits large
+nightly runs that do not need interactive latency.
+
+Progress (submitted batch ids and collected answers) is kept in a state
+file in the job directory, so a restarted run resumes polling the batches
+it already submitted instead of paying for them again.
+"""
+
+import json
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from .config import CrateMetadata, EnrichedCrate
+from .llm_usage import usage_scope
+from .unified_llm_processor import (
+    TASK_SETTINGS,
+    BudgetReservation,
+    UnifiedLLMProcessor,
+)
+
+# Tasks run in phases; classification needs the README summary first
+BATCH_PHASES: List[Tuple[str, ...]] = [
+    ("readme_summary", "factual_counterfactual", "score"),
+    ("use_case",),
+]
+
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchJobError(Exception):
+    """Raised when the batch API rejects a request"""
+
+
+class BatchAPIClient:
+    """Minimal client for the files and batches endpoints.
+
+    Args:
+        api_base: API root, e.g. ``https://api.openai.com/v1`` or an Azure
+            resource endpoint (``https://<name>.openai.azure.com``)
+        api_key: API key
+        api_version: Azure API version; when given, Azure URL and auth
+            conventions are used
+    """
+
+    def __init__(
+        self,
+        api_base: str,
+        api_key: Optional[str],
+        api_version: Optional[str] = None,
+        timeout: int = 60,
+        session: Optional[requests.Session] = None,
+    ) -> None:
+        self.api_version = api_version
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        base = api_base.rstrip("/")
+        if api_version:
+            self.base_url = base if base.endswith("/openai") else f"{base}/openai"
+            self.completions_endpoint = "/chat/completions"
+            if api_key:
+                self.session.headers["api-key"] = api_key
+        else:
+            self.base_url = base
+            self.completions_endpoint = "/v1/chat/completions"
+            if api_key:
+                self.session.headers["Authorization"] = f"Bearer {api_key}"
+
+    def _request(self, method: str, path: str, **kwargs: Any) -> requests.Response:
+        params = kwargs.pop("params", {})
+        if self.api_version:
+            params["api-version"] = self.api_version
+        response = self.session.request(
+            method,
+            f"{self.base_url}{path}",
+            params=params,
+            timeout=self.timeout,
+            **kwargs,
+        )
+        if not response.ok:
+            raise BatchJobError(
+                f"{method} {path} failed with {response.status_code}: "
+                f"{response.text[:200]}"
+            )
+        return response
+
+    def upload_file(self, path: str) -> str:
+        """Upload a JSONL input file and return its file id"""
+        with open(path, "rb") as f:
+            response = self._request(
+                "POST",
+                "/files",
+                data={"purpose": "batch"},
+                files={"file": (os.path.basename(path), f, "application/jsonl")},
+            )
+        return response.json()["id"]
+
+    def create_batch(
+        self,
+        input_file_id: str,
+        completion_window: str = "24h",
+        metadata: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """Create a batch job for an uploaded input file"""
+        payload: Dict[str, Any] = {
+            "input_file_id": input_file_id,
+            "endpoint": self.completions_endpoint,
+            "completion_window": completion_window,
+        }
+        if metadata:
+            payload["metadata"] = metadata
+        return self._request("POST", "/batches", json=payload).json()
+
+    def get_batch(self, batch_id: str) -> Dict[str, Any]:
+        """Return the current batch object"""
+        return self._request("GET", f"/batches/{batch_id}").json()
+
+    def download_file(self, file_id: str) -> str:
+        """Return the content of an output or error file"""
+        return self._request("GET", f"/files/{file_id}/content").text
+
+
+def make_custom_id(crate_name: str, task: str) -> str:
+    return f"{crate_name}::{task}"
+
+
+def split_custom_id(custom_id: str) -> Tuple[str, str]:
+    crate_name, _, task = custom_id.rpartition("::")
+    return crate_name, task
+
+
+class BatchEnrichmentJob:
+    """Enrich many crates through one or more offline batch jobs.
+
+    Args:
+        processor: Provides prompts, validation, the response cache and
+            budget accounting; its provider must be ``openai`` or ``azure``
+        client: Batch API client for the same provider
+        work_dir: Directory for JSONL input files and the resume state
+        poll_interval: Seconds between batch status checks
+        fallback: Re-request invalid or missing answers interactively
+    """
+
+    def __init__(
+        self,
+        processor: UnifiedLLMProcessor,
+        client: BatchAPIClient,
+        work_dir: str,
+        poll_interval: float = 30.0,
+        completion_window: str = "24h",
+        fallback: bool = True,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.processor = processor
+        self.client = client
+        self.work_dir = work_dir
+        self.poll_interval = poll_interval
+        self.completion_window = completion_window
+        self.fallback = fallback
+        self.sleep = sleep
+        self.logger = logging.getLogger(__name__)
+        self.state_path = os.path.join(work_dir, "batch_state.json")
+        # Budget held by submitted requests until their answers are collected
+        self.reservations: Dict[str, BudgetReservation] = {}
+        os.makedirs(work_dir, exist_ok=True)
+        self.state = self._load_state()
+
+    def _load_state(self) -> Dict[str, Any]:
+        if os.path.exists(self.state_path):
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return {"batches": [], "results": {}}
+
+    def _save_state(self) -> None:
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    @classmethod
+    def from_processor(
+        cls, processor: UnifiedLLMProcessor, work_dir: str, **kwargs: Any
+    ) -> "BatchEnrichmentJob":
+        """Create a job whose API client matches the processor's provider"""
+        config = processor.config
+        if config.provider == "azure":
+            client = BatchAPIClient(
+                config.api_base or "", config.api_key, config.azure_api_version
+            )
+        elif config.provider == "openai":
+            client = BatchAPIClient(
+                config.api_base or "https://api.openai.com/v1", config.api_key
+            )
+        else:
+            raise ValueError(
+                f"Batch jobs are not supported for provider '{config.provider}'"
+            )
+        return cls(processor, client, work_dir, **kwargs)
+
+    def _task_prompt(
+        self, task: str, crate: CrateMetadata, summaries: Dict[str, str]
+    ) -> str:
+        if task == "readme_summary":
+            return self.processor._summary_prompt(crate)
+        if task == "use_case":
+            return self.processor._classification_prompt(
+                crate, summaries.get(crate.name, "")
+            )
+        if task == "factual_counterfactual":
+            return self.processor._factual_pairs_prompt(crate)
+        return self.processor._score_prompt(crate)
+
+    def _task_args(self, task: str, prompt: str) -> Dict[str, Any]:
+        settings = TASK_SETTINGS[task]
+        return self.processor._build_completion_args(
+            prompt,
+            settings["temperature"],
+            settings["max_tokens"],
+            settings["system_message"],
+        )
+
+    def _in_flight_ids(self) -> set:
+        return {
+            custom_id
+            for batch in self.state["batches"]
+            if not batch.get("collected")
+            for custom_id in batch["custom_ids"]
+        }
+
+    def _submit_phase(
+        self, phase: int, crates: List[CrateMetadata], summaries: Dict[str, str]
+    ) -> None:
+        """Write and submit the requests of a phase that have no answer yet.
+
+        Each request reserves its worst-case cost; submission stops at the
+        first request the remaining budget cannot cover.
+        """
+        results = self.state["results"]
+        in_flight = self._in_flight_ids()
+        lines: List[str] = []
+        custom_ids: List[str] = []
+        reservations: Dict[str, BudgetReservation] = {}
+        over_budget = False
+
+        for crate in crates:
+            if not crate.readme or over_budget:
+                continue
+            for task in BATCH_PHASES[phase]:
+                custom_id = make_custom_id(crate.name, task)
+                if custom_id in results or custom_id in in_flight:
+                    continue
+                prompt = self._task_prompt(task, crate, summaries)
+                args = self._task_args(task, prompt)
+                settings = TASK_SETTINGS[task]
+                cache_key = self.processor._cache_key(
+                    args, prompt, settings["system_message"]
+                )
+                if cache_key and self.processor.cache:
+                    cached = self.processor.cache.get(cache_key)
+                    if cached is not None:
+                        results[custom_id] = cached
+                        continue
+                reservation = self.processor._reserve_budget(args)
+                if reservation is None:
+                    over_budget = True
+                    break
+                reservations[custom_id] = reservation
+                lines.append(json.dumps({
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": self.client.completions_endpoint,
+                    "body": {
+                        "model": args["model"],
+                        "messages": args["messages"],
+                        "temperature": args["temperature"],
+                        "max_tokens": args["max_tokens"],
+                    },
+                }))
+                custom_ids.append(custom_id)
+
+        if over_budget:
+            self.logger.warning(
+                f"Budget exhausted; submitting {len(lines)} requests for "
+                f"phase {phase}, the rest are left unanswered"
+            )
+        if not lines:
+            self._save_state()
+            return
+
+        input_path = os.path.join(
+            self.work_dir,
+            f"batch_input_phase{phase}_{len(self.state['batches'])}.jsonl",
+        )
+        with open(input_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+        try:
+            file_id = self.client.upload_file(input_path)
+            batch = self.client.create_batch(
+                file_id, self.completion_window, metadata={"phase": str(phase)}
+            )
+        except Exception:
+            for reservation in reservations.values():
+                self.processor.budget_manager.release(reservation)
+            raise
+        self.reservations.update(reservations)
+        self.state["batches"].append({
+            "id": batch["id"],
+            "phase": phase,
+            "input_file_id": file_id,
+            "status": batch.get("status", "validating"),
+            "custom_ids": custom_ids,
+        })
+        self._save_state()
+        self.logger.info(
+            f"Submitted batch {batch['id']} with {len(lines)} requests (phase {phase})"
+        )
+
+    def _collect_output(
+        self, content: str, prompts: Dict[str, Tuple[str, Dict[str, Any]]]
+    ) -> None:
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+                custom_id = item["custom_id"]
+                response = item.get("response") or {}
+                if response.get("status_code") != 200:
+                    self.logger.warning(
+                        f"Batch request {custom_id} failed: {item.get('error')}"
+                    )
+                    self._release(custom_id)
+                    continue
+                body = response["body"]
+                content_text = body["choices"][0]["message"]["content"]
+            except (KeyError, IndexError, TypeError, json.JSONDecodeError) as e:
+                self.logger.warning(f"Skipping malformed batch output line: {e}")
+                continue
+
+            usage = body.get("usage") or {}
+            crate_name, task = split_custom_id(custom_id)
+            with usage_scope(stage="batch_job", crate=crate_name, task=task):
+                self.processor.budget_manager.reconcile(
+                    self.reservations.pop(custom_id, None),
+                    self.processor._get_model_name(),
+                    usage.get("completion_tokens", 0),
+                    usage.get("prompt_tokens", 0),
+                )
+            self.state["results"][custom_id] = content_text
+
+            if custom_id in prompts and self.processor.cache:
+                prompt, args = prompts[custom_id]
+                system_message = args["messages"][0]["content"]
+                cache_key = self.processor._cache_key(args, prompt, system_message)
+                if cache_key and content_text:
+                    self.processor.cache.set(cache_key, content_text)
+
+    def _release(self, custom_id: str) -> None:
+        reservation = self.reservations.pop(custom_id, None)
+        if reservation is not None:
+            self.processor.budget_manager.release(reservation)
+
+    def _wait_for_phase(
+        self, phase: int, crates: List[CrateMetadata], summaries: Dict[str, str]
+    ) -> None:
+        """Poll the phase's unfinished batches and collect their output"""
+        by_name = {crate.name: crate for crate in crates}
+        for batch in self.state["batches"]:
+            if batch["phase"] != phase or batch.get("collected"):
+                continue
+
+            while True:
+                info = self.client.get_batch(batch["id"])
+                batch["status"] = info.get("status")
+                if batch["status"] in TERMINAL_STATUSES:
+                    break
+                self.logger.info(f"Batch {batch['id']} is {batch['status']}; waiting")
+                self.sleep(self.poll_interval)
+
+            prompts: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+            for custom_id in batch["custom_ids"]:
+                crate_name, task = split_custom_id(custom_id)
+                if crate_name in by_name:
+                    prompt = self._task_prompt(task, by_name[crate_name], summaries)
+                    prompts[custom_id] = (prompt, self._task_args(task, prompt))
+
+            for file_key in ("output_file_id", "error_file_id"):
+                if info.get(file_key):
+                    self._collect_output(
+                        self.client.download_file(info[file_key]), prompts
+                    )
+            if batch["status"] != "completed":
+                self.logger.warning(f"Batch {batch['id']} ended as {batch['status']}")
+            # Requests without any output line cost nothing
+            for custom_id in batch["custom_ids"]:
+                self._release(custom_id)
+
+            batch["collected"] = True
+            self._save_state()
+
+    def _summaries(self, crates: List[CrateMetadata]) -> Dict[str, str]:
+        summaries: Dict[str, str] = {}
+        for crate in crates:
+            result = self.state["results"].get(
+                make_custom_id(crate.name, "readme_summary")
+            )
+            if result:
+                summaries[crate.name] = self.processor.clean_output(result, "general")
+        return summaries
+
+    def _finalize(
+        self, crate: CrateMetadata, summaries: Dict[str, str]
+    ) -> EnrichedCrate:
+        """Validate batch answers and fill the enriched crate"""
+        enriched = EnrichedCrate(**crate.__dict__)
+        if not crate.readme:
+            return enriched
+        processor = self.processor
+        results = self.state["results"]
+
+        def answer(task: str) -> Optional[str]:
+            return results.get(make_custom_id(crate.name, task))
+
+        summary = summaries.get(crate.name)
+        if summary is None and self.fallback:
+            summary = processor.summarize_features(crate)
+        enriched.readme_summary = summary
+
+        use_case = answer("use_case")
+        if use_case and processor.validate_classification(use_case):
+            enriched.use_case = processor.clean_output(use_case, "classification")
+        elif self.fallback:
+            enriched.use_case = processor.classify_use_case(crate, summary or "")
+
+        pairs = answer("factual_counterfactual")
+        if pairs and processor.validate_factual_pairs(pairs):
+            enriched.factual_counterfactual = processor.clean_output(
+                pairs, "factual_pairs"
+            )
+        elif self.fallback:
+            enriched.factual_counterfactual = processor.generate_factual_pairs(crate)
+
+        score = answer("score")
+        if score is not None:
+            enriched.score = processor._parse_score(score)
+        elif self.fallback:
+            enriched.score = processor.score_crate(crate)
+
+        return enriched
+
+    def run(self, crates: List[CrateMetadata]) -> List[EnrichedCrate]:
+        """Submit, wait for and map back all enrichment prompts for the crates"""
+        for phase in range(len(BATCH_PHASES)):
+            summaries = self._summaries(crates)
+            self._submit_phase(phase, crates, summaries)
+            self._wait_for_phase(phase, crates, summaries)
+
+        summaries = self._summaries(crates)
+        return [self._finalize(crate, summaries) for crate in crates]
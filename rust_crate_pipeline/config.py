@@ -41,6 +41,58 @@ class PipelineConfig:
     output_dir: str = "output"
     verbose: bool = False
     budget: Optional[float] = None
+    # Local llama.cpp worker processes used for batched prompts (1 = in-process)
+    local_model_workers: int = 1
+    # Stream short-answer prompts (classification) and stop decoding at the
+    # answer; opt-in, like the remote processor's stream_short_answers
+    stream_short_answers: bool = False
+    # Constrain classification and factual pairs to their output format
+    # (GBNF grammars for llama.cpp, JSON schemas for remote providers)
+    constrained_decoding: bool = True
+
+    # Persistent LLM response cache shared by all enrichers
+    llm_cache_enabled: bool = True
+    llm_cache_path: str = os.path.expanduser(
+        "~/.cache/rust_crate_pipeline/llm_responses.sqlite"
+    )
+    llm_cache_ttl: int = 30 * 24 * 3600  # 30 days
+    llm_cache_max_entries: int = 100_000
+    llm_cache_bypass: bool = False
+
+    # Persistent cache of scraped documentation pages
+    scrape_cache_enabled: bool = True
+    scrape_cache_path: str = os.path.expanduser(
+        "~/.cache/rust_crate_pipeline/scrape_cache.sqlite"
+    )
+    scrape_cache_ttl: int = 7 * 24 * 3600  # Pages not pinned to a crate version
+    scrape_cache_max_mb: int = 512
+    # A docs.rs page above this quality score replaces the crates.io README
+    docs_quality_threshold: float = 0.7
+    # Later sources are skipped once a page scores scrape_early_exit_quality
+    # (0-10 scale; 4 needs e.g. a long page with structured data) and
+    # the sources so far hold this much text (0 always scrapes every source)
+    scrape_early_exit_quality: float = 4.0
+    scrape_early_exit_chars: int = 1000
+
+    # Browsers rendering pages that need JavaScript, one page each at a time
+    scrape_max_concurrent_pages: int = 4
+    scrape_max_pages_per_browser: int = 100  # Replaced after this many pages
+    # Memory of all browser processes before every browser is recycled
+    scrape_max_browser_rss_mb: float = 2048.0
+
+    # Per-domain pacing shared by every scraper
+    scrape_max_per_domain: int = 2
+    scrape_min_domain_interval: float = 0.5  # Seconds between request starts
+    respect_robots_txt: bool = True
+
+    # Local use case classifier answering confident classifications without the LLM
+    use_case_classifier_enabled: bool = True
+    use_case_classifier_path: str = os.path.expanduser(
+        "~/.cache/rust_crate_pipeline/use_case_classifier.json"
+    )
+    use_case_classifier_threshold: float = 0.75
+    # Fraction of confident local answers double-checked by the LLM
+    use_case_classifier_audit_rate: float = 0.05
     
     # Azure OpenAI Configuration
     use_azure_openai: bool = True
@@ -89,3 +141,7 @@ class EnrichedCrate(CrateMetadata):
     source_analysis: Union["Dict[str, Any]", None] = None
     user_behavior: Union["Dict[str, Any]", None] = None
     security: Union["Dict[str, Any]", None] = None
+    # Budget quality tier the crate was enriched at (quality_tiers.QUALITY_TIERS)
+    enrichment_tier: Union[str, None] = None
+    # Public API summary from rustdoc's search index or JSON (rustdoc_index)
+    api_surface: Union["Dict[str, Any]", None] = None
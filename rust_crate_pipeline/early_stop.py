@@ -0,0 +1,84 @@
+# early_stop.py
+"""
+Early termination of streamed short-answer completions.
+
+Classification and scoring only need a category name or a number, but
+models often keep decoding after it (an explanation, a restated label)
+until ``max_tokens`` runs out. When such a task is streamed, an answer
+detector is checked after every chunk and generation stops as soon as it
+recognises a complete answer, which then becomes the completion text.
+"""
+
+import re
+from typing import Any, Callable, Iterable, List, Optional
+
+# Returns the complete answer found in the text streamed so far, or None
+AnswerDetector = Callable[[str], Optional[str]]
+
+# A number is complete once it is followed by something that cannot extend
+# it: "7.5/10", "8\n" and "7. " qualify, "7" and "7." do not
+_COMPLETE_NUMBER = re.compile(r"(\d+(?:\.\d+)?)(?=[^\d.]|\.[^\d])")
+
+
+def category_detector(categories: Iterable[str]) -> AnswerDetector:
+    """Detect the first category name that is followed by a word boundary"""
+    patterns = [
+        (category, re.compile(r"\b" + re.escape(category) + r"(?=\W)", re.IGNORECASE))
+        for category in categories
+    ]
+
+    def detect(text: str) -> Optional[str]:
+        found: List[tuple] = []
+        for category, pattern in patterns:
+            match = pattern.search(text)
+            if match:
+                # Earliest mention wins; on a tie, the longer name
+                found.append((match.start(), -len(category), category))
+        return min(found)[2] if found else None
+
+    return detect
+
+
+def score_detector(text: str) -> Optional[str]:
+    """Detect the first complete number"""
+    match = _COMPLETE_NUMBER.search(text)
+    return match.group(1) if match else None
+
+
+class StreamAccumulator:
+    """Collects streamed text until the detector reports a complete answer"""
+
+    def __init__(self, detector: AnswerDetector) -> None:
+        self.detector = detector
+        self.parts: List[str] = []
+        self.answer: Optional[str] = None
+        self.usage: Any = None
+
+    def add_text(self, text: str) -> bool:
+        """Append decoded text; returns True once generation can stop"""
+        if text:
+            self.parts.append(text)
+            self.answer = self.detector(self.text)
+        return self.answer is not None
+
+    def add_chunk(self, chunk: Any) -> bool:
+        """Append an OpenAI-style streaming chunk (as yielded by LiteLLM)"""
+        usage = getattr(chunk, "usage", None)
+        if usage:
+            self.usage = usage
+        choices = getattr(chunk, "choices", None) or []
+        delta = getattr(choices[0], "delta", None) if choices else None
+        return self.add_text(getattr(delta, "content", None) or "")
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+    @property
+    def stopped_early(self) -> bool:
+        return self.answer is not None
+
+    @property
+    def content(self) -> str:
+        """The detected answer, or the full text if the stream ended first"""
+        return self.answer if self.answer is not None else self.text
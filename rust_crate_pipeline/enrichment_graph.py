@@ -0,0 +1,117 @@
+# enrichment_graph.py
+"""
+Dependency-aware execution of per-crate enrichment tasks.
+
+Each enrichment step (summary, classification, factual pairs, score, ...)
+is declared as an ``EnrichmentTask`` with the names of the tasks whose
+output it needs. Independent tasks run concurrently, either as asyncio
+tasks or on a thread pool for the synchronous enrichers.
+"""
+
+import asyncio
+import contextvars
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+
+@dataclass
+class EnrichmentTask:
+    """A single enrichment step and the tasks it depends on.
+
+    ``func`` receives a dict mapping each dependency name to its result
+    (``None`` if that dependency failed).
+    """
+
+    name: str
+    func: Callable[[Dict[str, Any]], Any]
+    depends_on: Tuple[str, ...] = field(default_factory=tuple)
+
+
+def _topological_order(tasks: List[EnrichmentTask]) -> List[EnrichmentTask]:
+    """Order tasks so that every task follows its dependencies."""
+    by_name = {task.name: task for task in tasks}
+    if len(by_name) != len(tasks):
+        raise ValueError("Duplicate enrichment task names")
+
+    ordered: List[EnrichmentTask] = []
+    state: Dict[str, str] = {}
+
+    def visit(task: EnrichmentTask) -> None:
+        if state.get(task.name) == "done":
+            return
+        if state.get(task.name) == "visiting":
+            raise ValueError(f"Dependency cycle at enrichment task '{task.name}'")
+        state[task.name] = "visiting"
+        for dep in task.depends_on:
+            if dep not in by_name:
+                raise ValueError(
+                    f"Enrichment task '{task.name}' depends on unknown task '{dep}'"
+                )
+            visit(by_name[dep])
+        state[task.name] = "done"
+        ordered.append(task)
+
+    for task in tasks:
+        visit(task)
+    return ordered
+
+
+async def run_task_graph(tasks: List[EnrichmentTask]) -> Dict[str, Any]:
+    """Run async enrichment tasks, starting each as soon as its inputs are ready.
+
+    Task functions must return awaitables. A failing task is logged and
+    yields ``None`` so that the remaining enrichments still complete.
+    """
+    running: Dict[str, "asyncio.Task[Any]"] = {}
+
+    async def run(task: EnrichmentTask) -> Any:
+        inputs: Dict[str, Any] = {}
+        for dep in task.depends_on:
+            inputs[dep] = await running[dep]
+        try:
+            awaitable: Awaitable[Any] = task.func(inputs)
+            return await awaitable
+        except Exception as e:
+            logging.error(f"Enrichment task '{task.name}' failed: {e}")
+            return None
+
+    for task in _topological_order(tasks):
+        running[task.name] = asyncio.ensure_future(run(task))
+
+    await asyncio.gather(*running.values())
+    return {name: future.result() for name, future in running.items()}
+
+
+def run_task_graph_threaded(
+    tasks: List[EnrichmentTask], max_workers: int = 4
+) -> Dict[str, Any]:
+    """Run synchronous enrichment tasks on a thread pool, respecting dependencies."""
+    ordered = _topological_order(tasks)
+    futures: Dict[str, "Future[Any]"] = {}
+
+    def run(task: EnrichmentTask) -> Any:
+        inputs = {dep: futures[dep].result() for dep in task.depends_on}
+        try:
+            return task.func(inputs)
+        except Exception as e:
+            logging.error(f"Enrichment task '{task.name}' failed: {e}")
+            return None
+
+    if max_workers <= 1:
+        for task in ordered:
+            future: "Future[Any]" = Future()
+            future.set_result(run(task))
+            futures[task.name] = future
+    else:
+        # Tasks are submitted in dependency order and the pool starts them
+        # FIFO, so a worker only ever waits on tasks that already started.
+        # Each task runs in a copy of the caller's context (usage labels).
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for task in ordered:
+                futures[task.name] = executor.submit(
+                    contextvars.copy_context().run, run, task
+                )
+
+    return {name: future.result() for name, future in futures.items()}
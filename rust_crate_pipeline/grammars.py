@@ -0,0 +1,163 @@
+# grammars.py
+"""
+Output grammars for constrained decoding.
+
+Factual/counterfactual pairs and use-case categories have a fixed shape,
+but free-form generation gets it wrong often enough that each crate pays
+for several retries. An ``OutputGrammar`` describes that shape twice: as a
+GBNF grammar that llama.cpp enforces token by token, and as a JSON schema
+for providers with strict structured outputs, whose JSON answer is then
+rendered back into the text format the rest of the pipeline expects.
+Retries are left to judge the content, not the formatting.
+"""
+
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Sequence
+
+try:
+    from llama_cpp import LlamaGrammar
+except ImportError:
+    LlamaGrammar = None  # type: ignore[assignment,misc]
+
+# Pair counts asked of remote providers; the local enricher keeps its own
+# (LOCAL_FACTUAL_PAIRS in ai_processing)
+FACTUAL_PAIRS_MIN = 2
+FACTUAL_PAIRS_MAX = 3
+# Bounding each statement keeps a complete answer within
+# FACTUAL_PAIRS_MAX_TOKENS: 3 pairs of 2 x 160 characters plus labels is
+# about 1100 characters, or at most ~370 tokens
+FACTUAL_STATEMENT_MAX_CHARS = 160
+FACTUAL_PAIRS_MAX_TOKENS = 450
+
+_compiled: Dict[str, Any] = {}
+_compiled_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class OutputGrammar:
+    """One output format as a GBNF grammar and a JSON schema"""
+
+    name: str
+    gbnf: str
+    schema: Dict[str, Any]
+    # Turns a JSON answer matching ``schema`` into the pipeline's text format
+    render: Callable[[Dict[str, Any]], Optional[str]]
+
+    def response_format(self) -> Dict[str, Any]:
+        """OpenAI-style ``response_format`` for strict structured output"""
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": self.name, "schema": self.schema, "strict": True},
+        }
+
+    def decode(self, text: str) -> str:
+        """Render a JSON answer as text; anything else is returned unchanged"""
+        try:
+            data = json.loads(text)
+        except (TypeError, ValueError):
+            return text
+        rendered = self.render(data) if isinstance(data, dict) else None
+        return rendered if rendered else text
+
+    def llama_grammar(self) -> Optional[Any]:
+        """The compiled llama.cpp grammar, or None without llama-cpp-python"""
+        if LlamaGrammar is None:
+            return None
+        with _compiled_lock:
+            if self.name not in _compiled:
+                try:
+                    _compiled[self.name] = LlamaGrammar.from_string(
+                        self.gbnf, verbose=False
+                    )
+                except Exception as e:
+                    logging.warning(f"Could not compile grammar {self.name}: {e}")
+                    _compiled[self.name] = None
+            return _compiled[self.name]
+
+
+def _gbnf_literal(text: str) -> str:
+    return json.dumps(text, ensure_ascii=False)
+
+
+def _repeat(rule: str, minimum: int, maximum: int) -> str:
+    """GBNF for ``minimum`` to ``maximum`` repetitions of ``rule``"""
+    optional = ""
+    for _ in range(maximum - minimum):
+        optional = f"({rule} {optional})?" if optional else f"{rule}?"
+    return " ".join([rule] * minimum + ([optional] if optional else []))
+
+
+def category_grammar(categories: Sequence[str]) -> OutputGrammar:
+    """Exactly one category name"""
+
+    def render(data: Dict[str, Any]) -> Optional[str]:
+        value = data.get("use_case")
+        return value if value in categories else None
+
+    return OutputGrammar(
+        name="use_case",
+        gbnf="root ::= " + " | ".join(_gbnf_literal(c) for c in categories) + "\n",
+        schema={
+            "type": "object",
+            "properties": {"use_case": {"type": "string", "enum": list(categories)}},
+            "required": ["use_case"],
+            "additionalProperties": False,
+        },
+        render=render,
+    )
+
+
+def factual_pairs_grammar(
+    minimum: int,
+    maximum: Optional[int] = None,
+    max_chars: int = FACTUAL_STATEMENT_MAX_CHARS,
+) -> OutputGrammar:
+    """``minimum`` to ``maximum`` ✅ Factual / ❌ Counterfactual pairs"""
+    maximum = maximum or minimum
+
+    def render(data: Dict[str, Any]) -> Optional[str]:
+        pairs = [
+            f"✅ Factual: {pair['factual'].strip()}\n"
+            f"❌ Counterfactual: {pair['counterfactual'].strip()}"
+            for pair in data.get("pairs") or []
+            if isinstance(pair, dict)
+            and isinstance(pair.get("factual"), str)
+            and pair["factual"].strip()
+            and isinstance(pair.get("counterfactual"), str)
+            and pair["counterfactual"].strip()
+        ]
+        return "\n\n".join(pairs[:maximum]) or None
+
+    gbnf = (
+        f"root ::= {_repeat('pair', minimum, maximum)}\n"
+        'pair ::= "✅ Factual: " statement "\\n❌ Counterfactual: " statement "\\n\\n"\n'
+        f"statement ::= [^\\n✅❌]{{1,{max_chars}}}\n"
+    )
+    return OutputGrammar(
+        name=f"factual_pairs_{minimum}_{maximum}",
+        gbnf=gbnf,
+        # Strict mode rejects minItems/maxItems; the prompt asks for the count
+        schema={
+            "type": "object",
+            "properties": {
+                "pairs": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "factual": {"type": "string"},
+                            "counterfactual": {"type": "string"},
+                        },
+                        "required": ["factual", "counterfactual"],
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": ["pairs"],
+            "additionalProperties": False,
+        },
+        render=render,
+    )
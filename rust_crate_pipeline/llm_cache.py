@@ -0,0 +1,115 @@
+# llm_cache.py
+"""
+Persistent cache of LLM responses shared by all enrichers.
+
+Responses are keyed by provider, model, system message, a hash of the
+prompt, temperature and max_tokens (plus any extra request options such as
+a response format), so re-running the pipeline over unchanged crates or
+after a crash replays earlier answers instead of calling the model again.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from .config import PipelineConfig
+from .utils.disk_cache import DiskCache
+
+
+class LLMResponseCache:
+    """Disk-backed LLM response cache with TTL, LRU eviction and counters.
+
+    With ``bypass`` set, lookups always miss so every prompt goes to the
+    model, but fresh responses are still written back to the cache.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        bypass: bool = False,
+    ) -> None:
+        self.store = DiskCache(path, ttl=ttl, max_entries=max_entries)
+        self.bypass = bypass
+        self.bypassed = 0
+
+    @staticmethod
+    def make_key(
+        provider: str,
+        model: str,
+        system_message: str,
+        prompt: str,
+        temperature: float,
+        max_tokens: int,
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Build the cache key for a completion request"""
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        material = json.dumps(
+            {
+                "provider": provider,
+                "model": model,
+                "system": system_message,
+                "prompt": prompt_hash,
+                "temperature": round(float(temperature), 4),
+                "max_tokens": int(max_tokens),
+                "extra": extra or {},
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a cached response for the key, honoring the bypass flag"""
+        if self.bypass:
+            self.bypassed += 1
+            return None
+        value = self.store.get(key)
+        return value.decode("utf-8") if value is not None else None
+
+    def set(self, key: str, response: str) -> None:
+        """Store a model response"""
+        if not response:
+            return
+        try:
+            self.store.set(key, response.encode("utf-8"))
+        except Exception as e:
+            logging.warning(f"Failed to write LLM cache entry: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache statistics"""
+        stats = self.store.stats()
+        stats["bypass"] = self.bypass
+        stats["bypassed"] = self.bypassed
+        return stats
+
+
+_shared_caches: Dict[str, LLMResponseCache] = {}
+_shared_caches_lock = threading.Lock()
+
+
+def get_llm_cache(config: PipelineConfig) -> Optional[LLMResponseCache]:
+    """Return the process-wide LLM cache for a pipeline config, if enabled"""
+    if not config.llm_cache_enabled:
+        return None
+
+    with _shared_caches_lock:
+        cache = _shared_caches.get(config.llm_cache_path)
+        if cache is None:
+            try:
+                cache = LLMResponseCache(
+                    config.llm_cache_path,
+                    ttl=config.llm_cache_ttl,
+                    max_entries=config.llm_cache_max_entries,
+                    bypass=config.llm_cache_bypass,
+                )
+            except Exception as e:
+                logging.warning(f"LLM response cache unavailable: {e}")
+                return None
+            _shared_caches[config.llm_cache_path] = cache
+        cache.bypass = config.llm_cache_bypass
+        return cache
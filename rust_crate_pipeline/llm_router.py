@@ -0,0 +1,374 @@
+# llm_router.py
+"""
+Routing of LLM calls across several provider endpoints.
+
+``RoutedLLMProcessor`` is a drop-in ``UnifiedLLMProcessor`` that spreads
+completions over a list of endpoint configurations (for example several
+Ollama hosts or Azure deployments). Each endpoint's latency and error rate
+are tracked as moving averages; endpoints are picked with probability
+proportional to their health, failing endpoints are taken out of rotation
+by a circuit breaker, and a failed request falls back down the configured
+chain. The async path can also hedge: when the first endpoint has not
+answered by its p95 latency, the request is sent to a second endpoint and
+the first answer wins.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .early_stop import AnswerDetector
+from .llm_cache import LLMResponseCache
+from .use_case_classifier import ConfidentUseCaseClassifier
+from .unified_llm_processor import (
+    BudgetManager,
+    LLMConfig,
+    UnifiedLLMProcessor,
+    acompletion,
+    completion,
+    connection_args,
+    get_provider_semaphore,
+    provider_model_name,
+)
+
+# Completion arguments that describe the endpoint rather than the request
+CONNECTION_ARGS = ("model", "api_base", "api_key", "api_version")
+
+
+@dataclass
+class RouterConfig:
+    """Health tracking and failover settings for RoutedLLMProcessor"""
+
+    ewma_alpha: float = 0.3  # Weight of the newest observation
+    failure_threshold: int = 3  # Consecutive failures that open the circuit
+    cooldown_seconds: float = 30.0  # Time before a half-open trial request
+    hedge: bool = False  # Hedge async requests past the endpoint's p95 latency
+    hedge_min_samples: int = 20  # Latency samples needed before hedging
+    initial_latency: float = 1.0  # Assumed latency of an unmeasured endpoint
+
+
+class EndpointHealth:
+    """Latency, error rate and circuit-breaker state of one endpoint"""
+
+    def __init__(self, config: RouterConfig) -> None:
+        self.config = config
+        self.ewma_latency = config.initial_latency
+        self.ewma_error = 0.0
+        self.latencies: Deque[float] = deque(maxlen=200)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        # A request is probing a circuit whose cooldown has passed
+        self.half_open_in_flight = False
+        self.requests = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def record_success(self, latency: float) -> None:
+        alpha = self.config.ewma_alpha
+        with self._lock:
+            self.requests += 1
+            self.latencies.append(latency)
+            self.ewma_latency = alpha * latency + (1 - alpha) * self.ewma_latency
+            self.ewma_error = (1 - alpha) * self.ewma_error
+            self.consecutive_failures = 0
+            self.open_until = 0.0
+            self.half_open_in_flight = False
+
+    def record_failure(self) -> None:
+        alpha = self.config.ewma_alpha
+        with self._lock:
+            self.requests += 1
+            self.failures += 1
+            self.ewma_error = alpha + (1 - alpha) * self.ewma_error
+            self.consecutive_failures += 1
+            self.half_open_in_flight = False
+            if self.consecutive_failures >= self.config.failure_threshold:
+                self.open_until = time.monotonic() + self.config.cooldown_seconds
+
+    def _available(self) -> bool:
+        if not self.open_until:
+            return True
+        return time.monotonic() >= self.open_until and not self.half_open_in_flight
+
+    def is_available(self) -> bool:
+        """True if the circuit is closed or free for a half-open trial"""
+        with self._lock:
+            return self._available()
+
+    def allow_request(self) -> bool:
+        """Admit one request; past the cooldown only a single trial gets through"""
+        with self._lock:
+            if not self._available():
+                return False
+            if self.open_until:
+                self.half_open_in_flight = True
+            return True
+
+    def abandon_request(self) -> None:
+        """Free the half-open trial of a request that was cancelled"""
+        with self._lock:
+            self.half_open_in_flight = False
+
+    def weight(self) -> float:
+        """Selection weight: fast, reliable endpoints are preferred"""
+        return (1.0 - self.ewma_error) ** 2 / max(self.ewma_latency, 1e-3)
+
+    def p95(self) -> Optional[float]:
+        """95th percentile latency, once enough samples were observed"""
+        with self._lock:
+            if len(self.latencies) < self.config.hedge_min_samples:
+                return None
+            ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "ewma_latency": round(self.ewma_latency, 3),
+            "ewma_error": round(self.ewma_error, 3),
+            "requests": self.requests,
+            "failures": self.failures,
+            "circuit_open": not self.is_available(),
+        }
+
+
+class Endpoint:
+    """One routable provider endpoint"""
+
+    def __init__(self, config: LLMConfig, router_config: RouterConfig) -> None:
+        self.config = config
+        self.health = EndpointHealth(router_config)
+        self.connection_args = connection_args(config)
+        self.model_name = provider_model_name(config)
+
+    @property
+    def name(self) -> str:
+        host = self.connection_args.get("api_base") or self.config.model
+        return f"{self.config.provider}:{host}"
+
+    def request_args(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Retarget request arguments at this endpoint"""
+        routed = {k: v for k, v in args.items() if k not in CONNECTION_ARGS}
+        routed.update(self.connection_args)
+        routed["timeout"] = self.config.timeout
+        return routed
+
+
+class RoutedLLMProcessor(UnifiedLLMProcessor):
+    """UnifiedLLMProcessor that routes calls over several endpoints.
+
+    The first endpoint's config drives prompts, retries and cache keys; the
+    order of ``endpoints`` is the fallback chain.
+    """
+
+    def __init__(
+        self,
+        endpoints: List[LLMConfig],
+        router_config: Optional[RouterConfig] = None,
+        budget_manager: Optional[BudgetManager] = None,
+        cache: Optional[LLMResponseCache] = None,
+        use_case_classifier: Optional[ConfidentUseCaseClassifier] = None,
+    ) -> None:
+        if not endpoints:
+            raise ValueError("RoutedLLMProcessor needs at least one endpoint")
+        super().__init__(
+            endpoints[0],
+            budget_manager=budget_manager,
+            cache=cache,
+            use_case_classifier=use_case_classifier,
+        )
+        self.router_config = router_config or RouterConfig()
+        self.endpoints = [Endpoint(config, self.router_config) for config in endpoints]
+        self.hedged_requests = 0
+        self._random = random.Random()
+
+    def _plan(self) -> List[Endpoint]:
+        """Order endpoints for one request: a weighted pick, then the chain"""
+        available = [e for e in self.endpoints if e.health.is_available()]
+        if not available:
+            # Every circuit is open: the first to cool down gets the trial
+            return sorted(self.endpoints, key=lambda e: e.health.open_until)
+
+        first = self._random.choices(
+            available, weights=[e.health.weight() for e in available]
+        )[0]
+        return [first] + [e for e in available if e is not first]
+
+    def _complete(
+        self, args: Dict[str, Any], stop_when: Optional[AnswerDetector] = None
+    ) -> "Tuple[Any, str]":
+        last_error: Optional[BaseException] = None
+        for endpoint in self._plan():
+            if not endpoint.health.allow_request():
+                continue
+            started = time.monotonic()
+            try:
+                response = completion(**endpoint.request_args(args))
+                if stop_when:
+                    response = self._read_stream(response, args, stop_when)
+            except Exception as e:
+                endpoint.health.record_failure()
+                self.logger.warning(f"LLM endpoint {endpoint.name} failed: {e}")
+                last_error = e
+                continue
+            endpoint.health.record_success(time.monotonic() - started)
+            return response, endpoint.model_name
+        raise last_error or RuntimeError("No LLM endpoint available")
+
+    async def _call_endpoint(
+        self,
+        endpoint: Endpoint,
+        args: Dict[str, Any],
+        stop_when: Optional[AnswerDetector] = None,
+    ) -> "Tuple[Any, str]":
+        semaphore = get_provider_semaphore(
+            endpoint.config.provider,
+            endpoint.connection_args.get("api_base"),
+            endpoint.config.max_concurrent_requests,
+        )
+        try:
+            async with semaphore:
+                started = time.monotonic()
+                response = await acompletion(**endpoint.request_args(args))
+                if stop_when:
+                    response = await self._aread_stream(response, args, stop_when)
+        except asyncio.CancelledError:
+            endpoint.health.abandon_request()
+            raise
+        except Exception as e:
+            endpoint.health.record_failure()
+            self.logger.warning(f"LLM endpoint {endpoint.name} failed: {e}")
+            raise
+        endpoint.health.record_success(time.monotonic() - started)
+        return response, endpoint.model_name
+
+    @staticmethod
+    def _admit(plan: List[Endpoint], position: int) -> "Tuple[Optional[Endpoint], int]":
+        """First endpoint from ``position`` on that admits a request"""
+        while position < len(plan):
+            endpoint = plan[position]
+            position += 1
+            if endpoint.health.allow_request():
+                return endpoint, position
+        return None, position
+
+    async def _acomplete(
+        self, args: Dict[str, Any], stop_when: Optional[AnswerDetector] = None
+    ) -> "Tuple[Any, str]":
+        plan = self._plan()
+        last_error: Optional[BaseException] = None
+        tasks: "List[asyncio.Future[Tuple[Any, str]]]" = []
+        winner: "Optional[asyncio.Future[Tuple[Any, str]]]" = None
+
+        def start(endpoint: Endpoint) -> "asyncio.Future[Tuple[Any, str]]":
+            tasks.append(
+                asyncio.ensure_future(self._call_endpoint(endpoint, args, stop_when))
+            )
+            return tasks[-1]
+
+        try:
+            endpoint, position = self._admit(plan, 0)
+            while endpoint is not None:
+                pending = {start(endpoint)}
+
+                hedge_after = (
+                    endpoint.health.p95() if self.router_config.hedge else None
+                )
+                if hedge_after is not None and position < len(plan):
+                    done, _ = await asyncio.wait(pending, timeout=hedge_after)
+                    if not done:
+                        hedge, position = self._admit(plan, position)
+                        if hedge is not None:
+                            self.hedged_requests += 1
+                            pending.add(start(hedge))
+
+                while pending:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        if task.exception() is None:
+                            winner = task
+                            return task.result()
+                        last_error = task.exception()
+                endpoint, position = self._admit(plan, position)
+        finally:
+            await self._discard_losers([task for task in tasks if task is not winner])
+
+        raise last_error or RuntimeError("No LLM endpoint available")
+
+    async def _discard_losers(
+        self, tasks: "List[asyncio.Future[Tuple[Any, str]]]"
+    ) -> None:
+        """Cancel requests that lost a hedge and bill the ones that answered anyway"""
+        for task in tasks:
+            task.cancel()
+        for result in await asyncio.gather(*tasks, return_exceptions=True):
+            if not isinstance(result, tuple):
+                continue
+            response, model = result
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                self.budget_manager.update_cost(
+                    model, usage.completion_tokens, usage.prompt_tokens
+                )
+
+    def get_endpoint_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return health statistics per endpoint"""
+        return {
+            endpoint.name: endpoint.health.snapshot() for endpoint in self.endpoints
+        }
+
+
+def endpoint_overrides(provider: str, url: str) -> Dict[str, Any]:
+    """LLMConfig overrides that point ``provider`` at another host URL"""
+    if provider == "ollama":
+        return {"ollama_host": url}
+    if provider == "lmstudio":
+        return {"lmstudio_host": url}
+    return {"api_base": url}
+
+
+def cascade_overrides(
+    model: Optional[str], provider: Optional[str] = None, host: Optional[str] = None
+) -> Dict[str, Any]:
+    """LLMConfig overrides for a cascade model given on the command line"""
+    if not model:
+        return {}
+    overrides: Dict[str, Any] = {"model": model}
+    if provider:
+        overrides["provider"] = provider
+    if host:
+        overrides.update(endpoint_overrides(provider or "", host))
+    return overrides
+
+
+def create_llm_processor(
+    config: LLMConfig,
+    budget_manager: Optional[BudgetManager] = None,
+    cache: Optional[LLMResponseCache] = None,
+    use_case_classifier: Optional[ConfidentUseCaseClassifier] = None,
+) -> UnifiedLLMProcessor:
+    """Create a processor, routed when the config lists fallback endpoints"""
+    if not config.fallback_endpoints:
+        return UnifiedLLMProcessor(
+            config,
+            budget_manager=budget_manager,
+            cache=cache,
+            use_case_classifier=use_case_classifier,
+        )
+
+    endpoints = [config] + [
+        replace(config, fallback_endpoints=[], cascade_model={}, **overrides)
+        for overrides in config.fallback_endpoints
+    ]
+    return RoutedLLMProcessor(
+        endpoints,
+        RouterConfig(hedge=config.hedge_requests),
+        budget_manager=budget_manager,
+        cache=cache,
+        use_case_classifier=use_case_classifier,
+    )
@@ -0,0 +1,128 @@
+# llm_usage.py
+"""
+Per-call LLM usage records and the labels used to attribute them.
+
+Labels (pipeline stage, task type, crate) live in a context variable, so
+the code that knows them - an enrichment entry point, a per-task method -
+does not have to pass them down to every LLM call. asyncio tasks inherit
+the labels of the code that created them; the threaded task graph copies
+them into its worker threads.
+"""
+
+import functools
+import inspect
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Sequence, TypeVar
+
+USAGE_LABELS = ("stage", "task", "crate")
+
+_labels: ContextVar[Dict[str, str]] = ContextVar("llm_usage_labels", default={})
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+@contextmanager
+def usage_scope(**labels: Optional[str]) -> Iterator[None]:
+    """Attach labels to every LLM call made inside the block"""
+    merged = dict(_labels.get())
+    merged.update({key: value for key, value in labels.items() if value is not None})
+    token = _labels.set(merged)
+    try:
+        yield
+    finally:
+        _labels.reset(token)
+
+
+def current_labels() -> Dict[str, str]:
+    """Return the usage labels active in the current context"""
+    return dict(_labels.get())
+
+
+def usage_labels(**fixed: str) -> Callable[[F], F]:
+    """Label the LLM calls made by a (sync or async) method.
+
+    If the method's first argument is a crate, its name becomes the
+    ``crate`` label.
+    """
+
+    def decorator(func: F) -> F:
+        def labels(args: Sequence[Any]) -> Dict[str, Optional[str]]:
+            crate = args[1] if len(args) > 1 else None
+            return {**fixed, "crate": getattr(crate, "name", None)}
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with usage_scope(**labels(args)):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with usage_scope(**labels(args)):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+@dataclass
+class UsageRecord:
+    """Tokens, latency and cost of one LLM call"""
+
+    model: str
+    prompt_tokens: int
+    completion_tokens: int
+    latency: float  # Seconds spent in the provider call
+    cost: float
+    stage: Optional[str] = None
+    task: Optional[str] = None
+    crate: Optional[str] = None
+
+    @property
+    def tokens_per_second(self) -> float:
+        return self.completion_tokens / self.latency if self.latency > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["tokens_per_second"] = round(self.tokens_per_second, 2)
+        return data
+
+
+def summarize_usage(
+    records: Iterable[UsageRecord], by: Sequence[str] = ("stage", "task")
+) -> Dict[str, Dict[str, Any]]:
+    """Aggregate usage records by the given labels.
+
+    Groups are keyed by the label values joined with ``/`` (``-`` for an
+    unset label).
+    """
+    groups: Dict[str, Dict[str, Any]] = {}
+    for record in records:
+        key = "/".join(getattr(record, label) or "-" for label in by)
+        group = groups.setdefault(key, {
+            "calls": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "latency": 0.0,
+            "cost": 0.0,
+        })
+        group["calls"] += 1
+        group["prompt_tokens"] += record.prompt_tokens
+        group["completion_tokens"] += record.completion_tokens
+        group["latency"] += record.latency
+        group["cost"] += record.cost
+
+    for group in groups.values():
+        latency = group["latency"]
+        group["avg_latency"] = round(latency / group["calls"], 3)
+        group["tokens_per_second"] = (
+            round(group["completion_tokens"] / latency, 2) if latency > 0 else 0.0
+        )
+        group["latency"] = round(latency, 3)
+        group["cost"] = round(group["cost"], 6)
+    return groups
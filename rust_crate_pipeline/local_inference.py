@@ -0,0 +1,205 @@
+# local_inference.py
+"""
+Multi-worker inference for local llama.cpp models.
+
+llama-cpp-python evaluates one sequence per ``Llama`` context, so prompts
+that share a single in-process model queue behind each other. A
+``LocalInferencePool`` loads the model in several worker processes (each
+with its own context and a share of the CPU threads) and feeds them queued
+prompts shortest-first, so short prompts are not stuck behind long ones and
+every worker stays busy until the queue drains.
+
+``PrefixStateCache`` keeps the llama.cpp state saved right after each
+static prompt prefix (system block and few-shot examples), so a prompt only
+has its crate-specific suffix evaluated.
+"""
+
+import logging
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_STOP = ["<|end|>", "<|user|>", "<|system|>"]
+# Sampling settings of batched generation, beyond temperature and max_tokens
+BATCH_SAMPLING: Dict[str, Any] = {"top_p": 0.95, "repeat_penalty": 1.1}
+
+
+@dataclass
+class GenerationRequest:
+    """A single completion request for a local model"""
+
+    prompt: str
+    temperature: float = 0.2
+    max_tokens: int = 256
+    stop: List[str] = field(default_factory=lambda: list(DEFAULT_STOP))
+    # Static start of the prompt whose evaluated state may be reused
+    prefix: Optional[str] = None
+
+
+def shortest_first(
+    requests: Sequence[GenerationRequest],
+    estimate_tokens: Callable[[str], int] = lambda text: len(text) // 4,
+) -> List[int]:
+    """Return request indices ordered by expected cost (prompt plus output)"""
+    return sorted(
+        range(len(requests)),
+        key=lambda i: estimate_tokens(requests[i].prompt) + requests[i].max_tokens,
+    )
+
+
+# Per-process model handle, set by _init_worker in each pool process
+_worker_model: Any = None
+_worker_prefix_cache: Optional["PrefixStateCache"] = None
+
+
+def _init_worker(model_path: str, model_kwargs: Dict[str, Any]) -> None:
+    global _worker_model, _worker_prefix_cache
+    from llama_cpp import Llama
+
+    _worker_model = Llama(model_path=model_path, **model_kwargs)
+    _worker_prefix_cache = PrefixStateCache(_worker_model)
+
+
+def _worker_generate(request: GenerationRequest) -> str:
+    if (
+        request.prefix
+        and _worker_prefix_cache
+        and request.prompt.startswith(request.prefix)
+    ):
+        try:
+            _worker_prefix_cache.prepare(request.prefix)
+        except Exception as e:
+            logging.debug(f"Prompt prefix state unavailable: {e}")
+    output = _worker_model(
+        request.prompt,
+        max_tokens=request.max_tokens,
+        temperature=request.temperature,
+        stop=request.stop,
+        **BATCH_SAMPLING,
+        echo=False,
+        stream=False,
+    )
+    return output["choices"][0]["text"]
+
+
+class LocalInferencePool:
+    """Pool of llama.cpp model worker processes.
+
+    Args:
+        model_path: Path to the GGUF model file
+        workers: Number of worker processes (each loads its own model copy)
+        model_kwargs: Keyword arguments for ``llama_cpp.Llama``; the CPU
+            threads are split evenly between the workers
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        workers: int,
+        model_kwargs: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.model_path = model_path
+        self.workers = max(1, workers)
+        kwargs = dict(model_kwargs or {})
+        threads = max(1, (os.cpu_count() or self.workers) // self.workers)
+        kwargs["n_threads"] = threads
+        kwargs["n_threads_batch"] = threads
+        # Locking several model copies into RAM can exhaust memory
+        kwargs["use_mlock"] = False
+        kwargs.setdefault("verbose", False)
+        self.model_kwargs = kwargs
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _ensure_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawn rather than fork: the parent may hold a loaded model and threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.model_path, self.model_kwargs),
+            )
+            logging.info(
+                f"Started {self.workers} local model workers for {self.model_path}"
+            )
+        return self._executor
+
+    def generate_many(
+        self,
+        requests: Sequence[GenerationRequest],
+        estimate_tokens: Callable[[str], int] = lambda text: len(text) // 4,
+    ) -> List[Optional[str]]:
+        """Run requests across the workers, returning raw texts in input order.
+
+        Requests are queued shortest-first; a failed request yields ``None``.
+        """
+        executor = self._ensure_executor()
+        futures: Dict[int, "Future[str]"] = {}
+        for index in shortest_first(requests, estimate_tokens):
+            futures[index] = executor.submit(_worker_generate, requests[index])
+
+        results: List[Optional[str]] = []
+        for index in range(len(requests)):
+            try:
+                results.append(futures[index].result())
+            except Exception as e:
+                logging.error(f"Local model worker failed: {e}")
+                results.append(None)
+        return results
+
+    def close(self) -> None:
+        """Shut down the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+class PrefixStateCache:
+    """Saved model states after evaluating static prompt prefixes.
+
+    ``prepare(prefix)`` leaves the model with the prefix already evaluated,
+    restoring a saved state when one exists. llama.cpp then reuses the
+    longest common token prefix of the next completion, so only the rest
+    of the prompt is evaluated. Callers must hold the model's lock.
+    """
+
+    def __init__(self, model: Any, max_entries: int = 8) -> None:
+        self.model = model
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._states: "OrderedDict[str, Tuple[List[int], Any]]" = OrderedDict()
+
+    def _model_starts_with(self, tokens: List[int]) -> bool:
+        input_ids = getattr(self.model, "_input_ids", None)
+        n_tokens = getattr(self.model, "n_tokens", 0)
+        if input_ids is None or n_tokens < len(tokens):
+            return False
+        return list(input_ids[: len(tokens)]) == tokens
+
+    def prepare(self, prefix: str) -> None:
+        """Put the model in the state right after ``prefix`` was evaluated"""
+        entry = self._states.get(prefix)
+        if entry is not None:
+            self._states.move_to_end(prefix)
+            self.hits += 1
+            tokens, state = entry
+            # The previous completion may already share this prefix
+            if not self._model_starts_with(tokens):
+                self.model.load_state(state)
+            return
+
+        self.misses += 1
+        tokens = self.model.tokenize(prefix.encode("utf-8"))
+        self.model.reset()
+        self.model.eval(tokens)
+        self._states[prefix] = (list(tokens), self.model.save_state())
+        while len(self._states) > self.max_entries:
+            self._states.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        """Return prefix hit/miss counters"""
+        return {"entries": len(self._states), "hits": self.hits, "misses": self.misses}
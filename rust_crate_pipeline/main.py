@@ -99,6 +99,22 @@ Examples:
         help="Maximum tokens for LLM generation (default: 256)",
     )
 
+    parser.add_argument(
+        "--local-model-workers",
+        type=int,
+        default=None,
+        help=(
+            "Worker processes, each with its own copy of the local model, used "
+            "for batched prompts (default: 1, in-process)"
+        ),
+    )
+
+    parser.add_argument(
+        "--stream-short-answers",
+        action="store_true",
+        help="Stream classification and stop generating once the answer is complete",
+    )
+
     parser.add_argument(
         "--checkpoint-interval",
         type=int,
@@ -165,6 +181,27 @@ Examples:
         ),
     )
 
+    parser.add_argument(
+        "--disable-llm-cache",
+        action="store_true",
+        help="Disable the persistent LLM response cache",
+    )
+
+    parser.add_argument(
+        "--llm-cache-bypass",
+        action="store_true",
+        help=(
+            "Ignore cached LLM responses for this run "
+            "(fresh responses are still cached)"
+        ),
+    )
+
+    parser.add_argument(
+        "--disable-scrape-cache",
+        action="store_true",
+        help="Disable the persistent cache of scraped documentation pages",
+    )
+
     parser.add_argument(
         "--crate-list",
         type=str,
@@ -380,9 +417,24 @@ def main() -> None:
         if args.max_tokens:
             logging.debug(f"Setting max_tokens to {args.max_tokens}")
             config_kwargs["max_tokens"] = args.max_tokens
+        if args.local_model_workers:
+            logging.debug(f"Setting local_model_workers to {args.local_model_workers}")
+            config_kwargs["local_model_workers"] = args.local_model_workers
+        if args.stream_short_answers:
+            logging.debug("Streaming short answers")
+            config_kwargs["stream_short_answers"] = True
         if args.checkpoint_interval:
             logging.debug(f"Setting checkpoint_interval to {args.checkpoint_interval}")
             config_kwargs["checkpoint_interval"] = args.checkpoint_interval
+        if args.disable_llm_cache:
+            logging.debug("Disabling LLM response cache")
+            config_kwargs["llm_cache_enabled"] = False
+        if args.llm_cache_bypass:
+            logging.debug("Bypassing LLM response cache lookups")
+            config_kwargs["llm_cache_bypass"] = True
+        if args.disable_scrape_cache:
+            logging.debug("Disabling scrape cache")
+            config_kwargs["scrape_cache_enabled"] = False
 
         # Load config file if provided
         if args.config_file:
@@ -8,6 +8,8 @@ import requests
 from typing import Any, Dict, List, Optional, Union
 from bs4 import BeautifulSoup, Tag
 from .config import PipelineConfig
+from .politeness import RobotsDisallowed, get_domain_scheduler
+from .readme_parser import parse_readme
 
 
 class GitHubBatchClient:
@@ -91,6 +93,26 @@ class CrateAPIClient:
         # Simple session without dependency on HTTPClientUtils
         self.session = requests.Session()
         self.session.headers.update({"User-Agent": "SigilDERG-Data-Production/1.3.2"})
+        # lib.rs is also scraped by UnifiedScraper; both share one pacing
+        self.scheduler = get_domain_scheduler(config)
+
+    def _get_scraped_page(self, url: str) -> "requests.Response | None":
+        """GET a website page through the shared domain scheduler"""
+        try:
+            self.scheduler.acquire_sync(url)
+        except RobotsDisallowed as e:
+            logging.info(str(e))
+            return None
+        response = None
+        try:
+            response = self.session.get(url)
+            return response
+        finally:
+            self.scheduler.release(
+                url,
+                response.status_code if response is not None else None,
+                response.headers.get("Retry-After") if response is not None else None,
+            )
 
     def fetch_crate_metadata(self, crate_name: str) -> "dict[str, Any] | None":
         """Fetch metadata with retry logic"""
@@ -171,8 +193,8 @@ class CrateAPIClient:
                 lib_rs_data = {}
                 if "lib.rs" in repo:
                     lib_rs_url = f"https://lib.rs/crates/{crate_name}"
-                    lib_rs_response = self.session.get(lib_rs_url)
-                    if lib_rs_response.ok:
+                    lib_rs_response = self._get_scraped_page(lib_rs_url)
+                    if lib_rs_response is not None and lib_rs_response.ok:
                         soup = BeautifulSoup(lib_rs_response.text, "html.parser")
                         # Get README from lib.rs if not already available
                         if not readme:
@@ -191,13 +213,10 @@ class CrateAPIClient:
                                     re.sub(r"[^\d]", "", str(downloads_text))
                                 )
 
-                # Extract code snippets and sections (simplified)
-                code_snippets: list[str] = (
-                    []
-                )  # Simplified - would normally extract from readme
-                readme_sections: dict[str, str] = (
-                    {}
-                )  # Simplified - would normally parse sections
+                # Extract code snippets and sections from the README
+                readme_document = parse_readme(readme)
+                code_snippets: list[str] = readme_document.code_snippets
+                readme_sections: dict[str, str] = readme_document.section_dict()
 
                 result: dict[str, Any] = {
                     "name": crate_name,
@@ -226,8 +245,8 @@ class CrateAPIClient:
 
         # If crates.io fails, try lib.rs
         try:
-            r = self.session.get(f"https://lib.rs/crates/{crate_name}")
-            if r.ok:
+            r = self._get_scraped_page(f"https://lib.rs/crates/{crate_name}")
+            if r is not None and r.ok:
                 soup = BeautifulSoup(r.text, "html.parser")
 
                 # Extract metadata from lib.rs page
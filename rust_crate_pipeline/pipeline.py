@@ -14,6 +14,8 @@ from .network import CrateAPIClient, GitHubBatchClient
 from .ai_processing import LLMEnricher
 from .analysis import DependencyAnalyzer
 from .crate_analysis import CrateAnalyzer
+from .llm_cache import get_llm_cache
+from .politeness import get_domain_scheduler
 
 # Import Azure OpenAI enricher
 try:
@@ -26,11 +28,13 @@ except ImportError:
 # Import enhanced scraping capabilities
 try:
     from .scraping.unified_scraper import UnifiedScraper, ScrapingResult
+    from .scraping.scrape_cache import get_scrape_cache
     ENHANCED_SCRAPING_AVAILABLE = True
 except ImportError:
     ENHANCED_SCRAPING_AVAILABLE = False
     UnifiedScraper = None  # type: ignore[assignment,misc]
     ScrapingResult = None  # type: ignore[assignment,misc]
+    get_scrape_cache = None  # type: ignore[assignment]
     logging.warning("Enhanced scraping not available - using basic methods")
 
 
@@ -92,7 +96,17 @@ class CrateDataPipeline:
         ):
             return None
         try:
-            scraper = UnifiedScraper()
+            scraper = UnifiedScraper(
+                {
+                    "early_exit_quality": self.config.scrape_early_exit_quality,
+                    "early_exit_chars": self.config.scrape_early_exit_chars,
+                    "max_concurrent_pages": self.config.scrape_max_concurrent_pages,
+                    "max_pages_per_browser": self.config.scrape_max_pages_per_browser,
+                    "max_browser_rss_mb": self.config.scrape_max_browser_rss_mb,
+                },
+                cache=get_scrape_cache(self.config),
+                scheduler=get_domain_scheduler(self.config),
+            )
             logging.info("[OK] Enhanced scraping with Crawl4AI enabled")
             return scraper
         except Exception as e:
@@ -202,11 +216,15 @@ class CrateDataPipeline:
         """Helper to enrich a single crate with scraping, AI analysis, and cargo analysis."""
         try:
             # Enhanced scraping if available
+            scraping_results = None
             if self.enhanced_scraper:
-                await self._enhance_with_scraping(crate)
+                scraping_results = await self._enhance_with_scraping(crate)
 
-            # Now enrich with AI
-            enriched = self.enricher.enrich_crate(crate)
+            # Now enrich with AI without blocking the event loop
+            if hasattr(self.enricher, "aenrich_crate"):
+                enriched = await self.enricher.aenrich_crate(crate)
+            else:
+                enriched = await asyncio.to_thread(self.enricher.enrich_crate, crate)
             
             # Add cargo analysis if we have a local crate directory
             # Note: This would require downloading/cloning the crate first
@@ -216,6 +234,11 @@ class CrateDataPipeline:
                 "note": "Cargo analysis requires local crate source code"
             }
             
+            if scraping_results and "docs_rs" in scraping_results:
+                enriched.api_surface = await self.enhanced_scraper.scrape_api_surface(
+                    crate.name, scraping_results["docs_rs"]
+                )
+            
             logging.info(f"Enriched {crate.name}")
             return enriched
         except Exception as e:
@@ -224,24 +247,30 @@ class CrateDataPipeline:
             enriched_dict = crate.to_dict()
             return EnrichedCrate(**enriched_dict)
 
-    async def _enhance_with_scraping(self, crate: CrateMetadata) -> None:
+    async def _enhance_with_scraping(
+        self, crate: CrateMetadata
+    ) -> "Optional[Dict[str, Any]]":
         """
         Enhances a single crate with advanced web scraping data.
-        Modifies the crate object in place.
+        Modifies the crate object in place and returns the scraping results.
         """
         if not self.enhanced_scraper:
-            return
+            return None
 
         try:
-            scraping_results = await self.enhanced_scraper.scrape_crate_documentation(crate.name)
+            scraping_results = await self.enhanced_scraper.scrape_crate_documentation(
+                crate.name, crate.version
+            )
             if scraping_results:
                 self._integrate_scraping_results(crate, scraping_results)
                 logging.info(
                     f"Enhanced scraping for {crate.name}: "
                     f"{len(scraping_results)} sources"
                 )
+            return scraping_results
         except Exception as e:
             logging.warning(f"Enhanced scraping failed for {crate.name}: {e}")
+            return None
 
     def _integrate_scraping_results(
         self,
@@ -266,7 +295,10 @@ class CrateDataPipeline:
                 "content_length": len(result.content),
             }
             # Update README if we got better content
-            if source == "docs_rs" and result.quality_score > 0.7:
+            if (
+                source == "docs_rs"
+                and result.quality_score > self.config.docs_quality_threshold
+            ):
                 if not crate.readme or len(result.content) > len(crate.readme):
                     crate.readme = result.content
                     logging.info(f"Updated README for {crate.name} from {source}")
@@ -403,5 +435,18 @@ class CrateDataPipeline:
         self.save_final_output(all_enriched, dependency_analysis)
 
         duration = time.time() - start_time
+        llm_cache = get_llm_cache(self.config)
+        if llm_cache:
+            stats = llm_cache.stats()
+            logging.info(
+                f"LLM cache: {stats['hits']} hits, {stats['misses']} misses, "
+                f"{stats['entries']} entries"
+            )
+        if self.enhanced_scraper and self.enhanced_scraper.cache:
+            stats = self.enhanced_scraper.cache.stats()
+            logging.info(
+                f"Scrape cache: {stats['hits']} hits, {stats['misses']} misses, "
+                f"{stats['entries']} entries"
+            )
         logging.info(f"[OK] Done. Enriched {len(all_enriched)} crates in {duration:.2f}s")
         return all_enriched, dependency_analysis
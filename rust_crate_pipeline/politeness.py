@@ -0,0 +1,282 @@
+# politeness.py
+"""
+Per-domain request pacing shared by every scraper in the pipeline.
+
+docs.rs and lib.rs pages are fetched by the unified scraper (over HTTP or
+in a browser) and by ``CrateAPIClient``. ``DomainScheduler`` paces them all
+per domain: a cap on concurrent requests, a minimum gap between request
+starts (raised to the site's robots.txt ``Crawl-delay``), URLs excluded by
+robots.txt, and exponential backoff after 429/503 responses. Limits are per
+domain, so overall concurrency can grow with the number of sites scraped.
+
+Callers on an event loop use ``acquire``; threads use ``acquire_sync``.
+Both must be followed by ``release``, which also reports the status code.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+from .config import PipelineConfig
+
+# Responses that mean the site wants us to slow down
+BACKOFF_STATUSES = (429, 503)
+
+POLL_INTERVAL = 0.05
+# An unreachable robots.txt allows everything until it is tried again
+ROBOTS_RETRY_AFTER = 600.0
+
+DEFAULT_USER_AGENT = "rust-crate-pipeline"
+
+
+class RobotsDisallowed(Exception):
+    """Raised for URLs a site's robots.txt excludes"""
+
+
+@dataclass
+class _Domain:
+    active: int = 0
+    next_start: float = 0.0
+    blocked_until: float = 0.0
+    backoff: float = 0.0
+    robots: Optional[RobotFileParser] = None
+    robots_expires: float = 0.0
+    robots_loading: bool = False
+
+
+def _host(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+def robots_url(url: str) -> str:
+    parts = urlparse(url)
+    return f"{parts.scheme or 'https'}://{parts.netloc}/robots.txt"
+
+
+def parse_retry_after(value: Any) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delay or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(str(value)).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def fetch_robots_txt(
+    url: str, user_agent: str = DEFAULT_USER_AGENT, timeout: float = 10.0
+) -> Optional[str]:
+    """robots.txt body; "" when the site has none, None when unreachable"""
+    request = urllib.request.Request(url, headers={"User-Agent": user_agent})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.read(512 * 1024).decode("utf-8", "replace")
+    except urllib.error.HTTPError as e:
+        # A missing robots.txt (any 4xx) allows everything
+        return "" if 400 <= e.code < 500 else None
+    except (urllib.error.URLError, OSError, ValueError) as e:
+        logging.debug(f"Could not fetch {url}: {e}")
+        return None
+
+
+class DomainScheduler:
+    """Paces requests per domain; safe to share between threads and event loops"""
+
+    def __init__(
+        self,
+        max_per_domain: int = 2,
+        min_interval: float = 0.5,
+        user_agent: str = DEFAULT_USER_AGENT,
+        respect_robots: bool = True,
+        robots_ttl: float = 24 * 3600,
+        max_backoff: float = 300.0,
+        robots_fetcher: Optional[Callable[[str], Optional[str]]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_per_domain = max(1, max_per_domain)
+        self.min_interval = min_interval
+        self.user_agent = user_agent
+        self.respect_robots = respect_robots
+        self.robots_ttl = robots_ttl
+        self.max_backoff = max_backoff
+        self.robots_fetcher = robots_fetcher or (
+            lambda url: fetch_robots_txt(url, user_agent)
+        )
+        self.clock = clock
+        self.waited = 0.0
+        self.backoffs = 0
+        self.disallowed = 0
+        self._domains: Dict[str, _Domain] = {}
+        self._lock = threading.Lock()
+
+    def _domain(self, host: str) -> _Domain:
+        domain = self._domains.get(host)
+        if domain is None:
+            domain = self._domains[host] = _Domain()
+        return domain
+
+    def _robots_step(self, host: str) -> str:
+        """Next robots.txt step for a host
+
+        "ready", "fetch" (the caller loads robots.txt) or "wait" (another caller is)
+        """
+        with self._lock:
+            domain = self._domain(host)
+            if domain.robots_expires > self.clock():
+                return "ready"
+            if domain.robots_loading:
+                return "wait"
+            domain.robots_loading = True
+            return "fetch"
+
+    def _store_robots(self, host: str, text: Optional[str]) -> None:
+        parser = None
+        if text:
+            parser = RobotFileParser()
+            parser.parse(text.splitlines())
+        with self._lock:
+            domain = self._domain(host)
+            domain.robots = parser
+            domain.robots_loading = False
+            domain.robots_expires = self.clock() + (
+                self.robots_ttl if text is not None else ROBOTS_RETRY_AFTER
+            )
+
+    def _load_robots(self, url: str) -> None:
+        text = None
+        try:
+            text = self.robots_fetcher(robots_url(url))
+        finally:
+            self._store_robots(_host(url), text)
+
+    def _check_robots(self, url: str) -> None:
+        with self._lock:
+            robots = self._domain(_host(url)).robots
+            if robots is not None and not robots.can_fetch(self.user_agent, url):
+                self.disallowed += 1
+                raise RobotsDisallowed(f"{url} is disallowed by robots.txt")
+
+    def _interval(self, domain: _Domain) -> float:
+        interval = self.min_interval
+        if domain.robots is not None:
+            delay = domain.robots.crawl_delay(self.user_agent)
+            rate = domain.robots.request_rate(self.user_agent)
+            if delay:
+                interval = max(interval, float(delay))
+            if rate and rate.requests:
+                interval = max(interval, rate.seconds / rate.requests)
+        return interval
+
+    def _enter(self, host: str) -> Optional[float]:
+        """Take a slot and return the start delay, or None if the domain is full"""
+        with self._lock:
+            domain = self._domain(host)
+            if domain.active >= self.max_per_domain:
+                return None
+            now = self.clock()
+            start = max(now, domain.next_start, domain.blocked_until)
+            domain.next_start = start + self._interval(domain)
+            domain.active += 1
+            self.waited += start - now
+            return start - now
+
+    def _leave(self, host: str) -> None:
+        with self._lock:
+            domain = self._domain(host)
+            domain.active = max(0, domain.active - 1)
+
+    async def acquire(self, url: str) -> None:
+        """Wait for a request slot on the URL's domain"""
+        host = _host(url)
+        if self.respect_robots:
+            while (step := self._robots_step(host)) != "ready":
+                if step == "fetch":
+                    await asyncio.to_thread(self._load_robots, url)
+                else:
+                    await asyncio.sleep(POLL_INTERVAL)
+            self._check_robots(url)
+        while (delay := self._enter(host)) is None:
+            await asyncio.sleep(POLL_INTERVAL)
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except BaseException:
+                self._leave(host)
+                raise
+
+    def acquire_sync(self, url: str) -> None:
+        """Blocking ``acquire`` for worker threads"""
+        host = _host(url)
+        if self.respect_robots:
+            while (step := self._robots_step(host)) != "ready":
+                if step == "fetch":
+                    self._load_robots(url)
+                else:
+                    time.sleep(POLL_INTERVAL)
+            self._check_robots(url)
+        while (delay := self._enter(host)) is None:
+            time.sleep(POLL_INTERVAL)
+        if delay > 0:
+            time.sleep(delay)
+
+    def release(
+        self, url: str, status: Optional[int] = None, retry_after: Any = None
+    ) -> None:
+        """Free the slot; 429/503 responses pause the domain"""
+        host = _host(url)
+        with self._lock:
+            domain = self._domain(host)
+            domain.active = max(0, domain.active - 1)
+            if status in BACKOFF_STATUSES:
+                domain.backoff = min(
+                    self.max_backoff,
+                    max(domain.backoff * 2, self.min_interval * 2, 1.0),
+                )
+                wait = parse_retry_after(retry_after)
+                pause = min(
+                    self.max_backoff, wait if wait is not None else domain.backoff
+                )
+                domain.blocked_until = max(domain.blocked_until, self.clock() + pause)
+                self.backoffs += 1
+                logging.warning(
+                    f"{host} answered {status}; pausing it for {pause:.1f}s"
+                )
+            elif status is not None and status < 400:
+                domain.backoff = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "domains": len(self._domains),
+            "waited_seconds": round(self.waited, 2),
+            "backoffs": self.backoffs,
+            "disallowed": self.disallowed,
+        }
+
+
+_shared_scheduler: Optional[DomainScheduler] = None
+_shared_scheduler_lock = threading.Lock()
+
+
+def get_domain_scheduler(config: PipelineConfig) -> DomainScheduler:
+    """Return the process-wide scheduler, created from the first config seen"""
+    global _shared_scheduler
+    with _shared_scheduler_lock:
+        if _shared_scheduler is None:
+            _shared_scheduler = DomainScheduler(
+                max_per_domain=config.scrape_max_per_domain,
+                min_interval=config.scrape_min_domain_interval,
+                respect_robots=config.respect_robots_txt,
+            )
+        return _shared_scheduler
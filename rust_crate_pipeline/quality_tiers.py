@@ -0,0 +1,116 @@
+# quality_tiers.py
+"""
+Budget-driven quality tiers for LLM enrichment.
+
+Rather than enriching crates at full quality until the budget runs out and
+leaving the rest empty, each crate is assigned a tier before it is
+enriched. A crate's fair share of the remaining budget is the remaining
+budget divided by the crates still to come, scaled up for popular crates
+and down for obscure ones; the crate gets the best tier whose worst-case
+cost fits that share. Lower tiers use the cheaper cascade model, shorter
+README excerpts and fewer tasks, and the last tier makes no LLM calls.
+"""
+
+import bisect
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+ALL_TASKS = ("readme_summary", "use_case", "factual_counterfactual", "score")
+
+
+@dataclass(frozen=True)
+class QualityTier:
+    """How much LLM work a crate gets"""
+
+    name: str
+    tasks: Tuple[str, ...]  # Enrichment tasks run for the crate
+    truncation: float  # Scale applied to README excerpt token budgets
+    cheap_model: bool  # Answer with the cascade model only (when configured)
+
+
+# Best first
+QUALITY_TIERS = (
+    QualityTier("full", ALL_TASKS, 1.0, False),
+    QualityTier("reduced", ALL_TASKS, 0.5, True),
+    QualityTier("minimal", ("readme_summary", "use_case"), 0.25, True),
+    QualityTier("metadata", (), 0.0, True),
+)
+FULL_TIER = QUALITY_TIERS[0]
+
+_active_tier: ContextVar[QualityTier] = ContextVar("quality_tier", default=FULL_TIER)
+
+
+@contextmanager
+def tier_scope(tier: QualityTier) -> Iterator[None]:
+    """Apply a tier to every LLM call made inside the block"""
+    token = _active_tier.set(tier)
+    try:
+        yield
+    finally:
+        _active_tier.reset(token)
+
+
+def current_tier() -> QualityTier:
+    return _active_tier.get()
+
+
+class TierPlanner:
+    """Assigns each crate the best tier its share of the budget pays for.
+
+    Priority is the crate's download-count percentile among the crates seen
+    so far in the run.
+    """
+
+    def __init__(self, budget_manager: Any, total_crates: Optional[int] = None) -> None:
+        self.budget_manager = budget_manager
+        self.total_crates = total_crates
+        self.assigned: Dict[str, str] = {}
+        self._downloads: List[float] = []
+        self._lock = threading.Lock()
+
+    def priority(self, downloads: int) -> float:
+        """Record a crate's downloads and return its percentile in [0, 1]"""
+        value = float(downloads or 0)
+        with self._lock:
+            bisect.insort(self._downloads, value)
+            below = bisect.bisect_left(self._downloads, value)
+            ties = bisect.bisect_right(self._downloads, value) - below
+            return (below + ties / 2) / len(self._downloads)
+
+    def share(self, priority: float) -> float:
+        """Budget a crate of the given priority may spend"""
+        with self._lock:
+            left = max(1, (self.total_crates or 0) - len(self.assigned))
+        # Weights average to 1 over a uniform spread of priorities
+        return self.budget_manager.remaining() / left * (0.5 + priority)
+
+    def choose(
+        self, name: str, downloads: int, estimate: Callable[[QualityTier], float]
+    ) -> QualityTier:
+        """Pick the best tier whose estimated cost fits the crate's share"""
+        share = self.share(self.priority(downloads))
+        tier = next(
+            (t for t in QUALITY_TIERS if not t.tasks or estimate(t) <= share),
+            QUALITY_TIERS[-1],
+        )
+        with self._lock:
+            self.assigned[name] = tier.name
+        return tier
+
+    def skip(self, name: str) -> None:
+        """Count a crate that needs no LLM enrichment (e.g. without a README)"""
+        with self._lock:
+            self.assigned[name] = ""
+
+    def report(self) -> Dict[str, int]:
+        """Number of crates assigned to each tier"""
+        with self._lock:
+            assigned = list(self.assigned.values())
+        return {
+            tier.name: assigned.count(tier.name)
+            for tier in QUALITY_TIERS
+            if tier.name in assigned
+        }
@@ -0,0 +1,224 @@
+# readme_parser.py
+"""
+Parse-once document model for crate READMEs.
+
+A README is split into prioritized sections in a single pass, with each
+section's token count computed once. Enrichers then cut any number of
+token budgets from the same ``ReadmeDocument`` instead of re-splitting and
+re-tokenizing the text for every prompt.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+HEADER_RE = re.compile(r"^#+\s+")
+FENCE_RE = re.compile(r"^\s*(```|~~~)\s*([\w+-]*)")
+
+# Fence languages collected as Rust code snippets
+RUST_FENCE_LANGUAGES = {
+    "rust",
+    "no_run",
+    "ignore",
+    "should_panic",
+    "compile_fail",
+    "edition2018",
+    "edition2021",
+}
+
+# Reserve at least this many tokens before a section is cut mid-way
+MIN_PARTIAL_TOKENS = 100
+
+
+def heading_priority(heading: str) -> int:
+    """Return the truncation priority for a section heading"""
+    if re.search(r"\b(usage|example|getting started)", heading, re.I):
+        return 10
+    if re.search(r"\b(feature|overview|about)", heading, re.I):
+        return 9
+    if re.search(r"\b(install|setup|config)", heading, re.I):
+        return 8
+    if re.search(r"\b(api|interface)\b", heading, re.I):
+        return 7
+    return 5
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimation (4 characters per token)"""
+    return len(text) // 4
+
+
+@dataclass
+class ReadmeSection:
+    """A README section rendered as ``## heading`` plus its body"""
+
+    heading: str
+    body: str
+    priority: int
+    position: int
+    tokens: int = 0
+    _token_ids: Optional[List[int]] = field(default=None, repr=False)
+
+    @property
+    def text(self) -> str:
+        return f"## {self.heading}\n{self.body}\n"
+
+
+class ReadmeDocument:
+    """Sections, token counts and code snippets of one README.
+
+    Args:
+        source: The raw README (markdown) text
+        tokenizer: Optional object with ``encode``/``decode`` (e.g. tiktoken);
+            without one, tokens are estimated at 4 characters each
+    """
+
+    def __init__(self, source: str, tokenizer: Any = None) -> None:
+        self.source = source or ""
+        self.tokenizer = tokenizer
+        self.sections: List[ReadmeSection] = []
+        self.code_snippets: List[str] = []
+        self._parse()
+        self.total_tokens = self._count(self.source)
+        self._section_tokens_ready = False
+        self._ranked: List[ReadmeSection] = sorted(
+            self.sections, key=lambda s: s.priority, reverse=True
+        )
+        self._truncations: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def _count(self, text: str) -> int:
+        if self.tokenizer is not None:
+            return len(self.tokenizer.encode(text))
+        return estimate_tokens(text)
+
+    def _parse(self) -> None:
+        """Split into sections and collect fenced code blocks in one pass"""
+        heading, priority = "Introduction", 10
+        body: List[str] = []
+        code: List[str] = []
+        fence: Optional[str] = None
+        rust_fence = False
+
+        def close_section() -> None:
+            text = "\n".join(body)
+            if text.strip():
+                self.sections.append(
+                    ReadmeSection(heading, text + "\n", priority, len(self.sections))
+                )
+
+        for line in self.source.splitlines():
+            match = FENCE_RE.match(line)
+            if fence is None and match:
+                fence = match.group(1)
+                language = match.group(2).lower()
+                rust_fence = language in RUST_FENCE_LANGUAGES
+                if language in ("rust", "no_run"):
+                    priority = max(priority, 8)
+                code = []
+                body.append(line)
+                continue
+            if fence is not None:
+                body.append(line)
+                if line.strip().startswith(fence):
+                    if rust_fence and any(c.strip() for c in code):
+                        self.code_snippets.append("\n".join(code).strip("\n"))
+                    fence = None
+                else:
+                    code.append(line)
+                continue
+
+            if HEADER_RE.match(line):
+                close_section()
+                heading = HEADER_RE.sub("", line).strip()
+                priority = heading_priority(heading)
+                body = []
+            else:
+                body.append(line)
+
+        close_section()
+
+    def _ensure_section_tokens(self) -> None:
+        if not self._section_tokens_ready:
+            for section in self.sections:
+                section.tokens = self._count(section.text)
+            self._section_tokens_ready = True
+
+    def _cut(self, section: ReadmeSection, max_tokens: int) -> str:
+        """Return the first ``max_tokens`` tokens of a section"""
+        if self.tokenizer is None:
+            return section.text[: max_tokens * 4]
+        if section._token_ids is None:
+            section._token_ids = self.tokenizer.encode(section.text)
+        return self.tokenizer.decode(section._token_ids[:max_tokens])
+
+    def truncate(self, max_tokens: int) -> str:
+        """Return the highest-priority content that fits in ``max_tokens``"""
+        if not self.source:
+            return ""
+        if self.total_tokens <= max_tokens:
+            return self.source
+
+        with self._lock:
+            cached = self._truncations.get(max_tokens)
+            if cached is not None:
+                return cached
+
+            self._ensure_section_tokens()
+            parts: List[str] = []
+            tokens_used = 0
+            for section in self._ranked:
+                if tokens_used + section.tokens <= max_tokens:
+                    parts.append(section.text)
+                    tokens_used += section.tokens
+                elif tokens_used < max_tokens - MIN_PARTIAL_TOKENS:
+                    parts.append(self._cut(section, max_tokens - tokens_used))
+                    break
+
+            result = "".join(parts)
+            self._truncations[max_tokens] = result
+            return result
+
+    def section_dict(self) -> Dict[str, str]:
+        """Map each heading to its section body (repeated headings are joined)"""
+        sections: Dict[str, str] = {}
+        for section in self.sections:
+            body = section.body.strip()
+            sections[section.heading] = (
+                f"{sections[section.heading]}\n\n{body}"
+                if section.heading in sections
+                else body
+            )
+        return sections
+
+
+class ReadmeDocumentCache:
+    """Small thread-safe LRU of parsed documents keyed by README text"""
+
+    def __init__(self, tokenizer: Any = None, maxsize: int = 32) -> None:
+        self.tokenizer = tokenizer
+        self.maxsize = maxsize
+        self._documents: "OrderedDict[str, ReadmeDocument]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, text: str) -> ReadmeDocument:
+        """Return the parsed document for a README, parsing it on first use"""
+        with self._lock:
+            document = self._documents.get(text)
+            if document is not None:
+                self._documents.move_to_end(text)
+                return document
+
+        document = ReadmeDocument(text, self.tokenizer)
+        with self._lock:
+            self._documents[text] = document
+            while len(self._documents) > self.maxsize:
+                self._documents.popitem(last=False)
+        return document
+
+
+def parse_readme(text: str, tokenizer: Any = None) -> ReadmeDocument:
+    """Parse a README into a document model"""
+    return ReadmeDocument(text, tokenizer)
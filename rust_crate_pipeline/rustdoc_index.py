@@ -0,0 +1,272 @@
+# rustdoc_index.py
+"""
+API surface summaries from rustdoc's machine-readable output.
+
+Crawling rendered docs.rs pages tells us little about what a crate
+exposes. rustdoc already writes that down: docs.rs publishes the search
+index (``search-index*.js``) of every build, and ``cargo rustdoc`` can emit
+JSON (``--output-format json``). Both are reduced here to one compact
+summary per crate: public item counts by kind, the module tree, the share
+of documented items and the deprecated items.
+"""
+
+import json
+import logging
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+from bs4 import BeautifulSoup
+
+# rustdoc's ItemType numbering, as used in the search index
+SEARCH_INDEX_ITEM_TYPES = (
+    "keyword", "primitive", "module", "extern_crate", "import", "struct",
+    "enum", "function", "type_alias", "static", "trait", "impl", "tymethod",
+    "method", "struct_field", "variant", "macro", "assoc_type", "constant",
+    "assoc_const", "union", "foreign_type", "opaque_type", "proc_attribute",
+    "proc_derive", "trait_alias", "generic",
+)
+
+# Names used by rustdoc JSON for the same kinds
+JSON_KIND_ALIASES = {
+    "typedef": "type_alias",
+    "type_alias": "type_alias",
+    "proc_macro": "macro",
+    "use": "import",
+    "opaque_ty": "opaque_type",
+    "foreign_type": "foreign_type",
+}
+
+# Kinds that make up a crate's public API (members of types are not counted)
+API_KINDS = (
+    "module", "struct", "enum", "union", "trait", "trait_alias", "function",
+    "type_alias", "constant", "static", "macro", "proc_attribute", "proc_derive",
+)
+
+MAX_DEPRECATED_LISTED = 50
+
+# The element rustdoc stores its page variables on: a <div> or, in current
+# releases, a <meta>
+RUSTDOC_VARS_TAG = re.compile(r"<[^>]*\b(?:id|name)=[\"']rustdoc-vars[\"'][^>]*>")
+
+# Item = (kind, path, docs or None when unknown, deprecated or None when unknown)
+Item = Tuple[str, str, Optional[str], Optional[bool]]
+
+
+def summarize_items(
+    crate_name: str, items: Iterable[Item], source: str
+) -> Dict[str, Any]:
+    """Reduce public items to the API surface summary"""
+    counts: Counter = Counter()
+    modules = {crate_name}
+    documented = 0
+    docs_known = 0
+    deprecated: List[str] = []
+    deprecation_known = False
+
+    for kind, path, docs, is_deprecated in items:
+        if kind not in API_KINDS:
+            continue
+        counts[kind] += 1
+        if kind == "module":
+            modules.add(path)
+        if docs is not None:
+            docs_known += 1
+            documented += bool(docs.strip())
+        if is_deprecated is not None:
+            deprecation_known = True
+            if is_deprecated:
+                deprecated.append(path)
+
+    total = sum(counts.values())
+    return {
+        "source": source,
+        "public_items": total,
+        "items_by_kind": dict(sorted(counts.items())),
+        "modules": sorted(modules),
+        "module_depth": max(path.count("::") for path in modules),
+        "documented_ratio": round(documented / docs_known, 3) if docs_known else None,
+        "deprecated_count": len(deprecated) if deprecation_known else None,
+        "deprecated_items": sorted(deprecated)[:MAX_DEPRECATED_LISTED],
+    }
+
+
+def _json_kind(item: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """Kind and kind-specific body of a rustdoc JSON item, across format versions"""
+    inner = item.get("inner") or {}
+    if "kind" in item:
+        kind = item["kind"]
+    elif isinstance(inner, dict) and len(inner) == 1:
+        kind, inner = next(iter(inner.items()))
+    else:
+        kind = ""
+    kind = JSON_KIND_ALIASES.get(kind, kind)
+    if (
+        kind == "macro"
+        and isinstance(inner, dict)
+        and inner.get("kind") in ("attr", "derive")
+    ):
+        kind = "proc_" + {"attr": "attribute", "derive": "derive"}[inner["kind"]]
+    return kind, inner if isinstance(inner, dict) else {}
+
+
+def parse_rustdoc_json(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Summarize the output of ``cargo rustdoc -- --output-format json``"""
+    index = data["index"]
+    root = index[str(data["root"])]
+    crate_name = root.get("name") or "crate"
+    items: List[Item] = []
+    seen = set()
+
+    def walk(module_id: Any, prefix: str) -> None:
+        module = index.get(str(module_id))
+        if not module:
+            return
+        _, body = _json_kind(module)
+        for child_id in body.get("items", []):
+            if child_id in seen:
+                continue
+            seen.add(child_id)
+            child = index.get(str(child_id))
+            # Items from other crates (re-exported types) are not in the index
+            if not child or child.get("visibility") != "public":
+                continue
+            kind, _ = _json_kind(child)
+            name = child.get("name")
+            if not name:
+                continue
+            path = f"{prefix}::{name}"
+            items.append(
+                (kind, path, child.get("docs") or "", bool(child.get("deprecation")))
+            )
+            if kind == "module":
+                walk(child_id, path)
+
+    walk(data["root"], crate_name)
+    summary = summarize_items(crate_name, items, "rustdoc_json")
+    summary["crate_version"] = data.get("crate_version")
+    summary["format_version"] = data.get("format_version")
+    return summary
+
+
+def _unescape_js(text: str) -> str:
+    return re.sub(r"\\(.)", lambda m: m.group(1), text, flags=re.DOTALL)
+
+
+def _load_search_index(text: str) -> Dict[str, Dict[str, Any]]:
+    """Crate entries of a search index (JS file or the bare JSON)"""
+    text = text.strip()
+    match = re.search(r"JSON\.parse\('((?:[^'\\]|\\.)*)'\)", text, re.DOTALL)
+    payload = json.loads(_unescape_js(match.group(1)) if match else text)
+    # Newer rustdoc: [[crate, data], ...]; older: {crate: data}
+    return dict(payload) if isinstance(payload, list) else payload
+
+
+def _search_index_items(crate_name: str, entry: Dict[str, Any]) -> Iterable[Item]:
+    types = entry.get("t", [])
+    if isinstance(types, str):
+        types = [ord(c) - ord("A") for c in types]
+    names = entry.get("n", [])
+    descriptions = entry.get("d")
+
+    # Paths are given for the first item of each run of items sharing one,
+    # either as [index, path] pairs or as a list where "" repeats the last
+    path_at: Dict[int, str] = {}
+    paths = entry.get("q", [])
+    if paths and isinstance(paths[0], list):
+        path_at = {int(i): p for i, p in paths}
+    else:
+        path_at = {i: p for i, p in enumerate(paths) if p}
+
+    # Deprecated items were a plain index list before rustdoc switched to bitmaps
+    raw_deprecated = entry.get("c")
+    deprecated = set(raw_deprecated) if isinstance(raw_deprecated, list) else None
+
+    path = crate_name
+    for i, (item_type, name) in enumerate(zip(types, names)):
+        path = path_at.get(i, path)
+        kind = (
+            SEARCH_INDEX_ITEM_TYPES[item_type]
+            if 0 <= item_type < len(SEARCH_INDEX_ITEM_TYPES)
+            else ""
+        )
+        docs = (
+            descriptions[i]
+            if isinstance(descriptions, list) and i < len(descriptions)
+            else None
+        )
+        yield (
+            kind,
+            f"{path}::{name}" if name else path,
+            docs,
+            (i in deprecated) if deprecated is not None else None,
+        )
+
+
+def parse_search_index(text: str, crate_name: str) -> Optional[Dict[str, Any]]:
+    """Summarize a crate from a docs.rs ``search-index*.js`` file"""
+    try:
+        crates = _load_search_index(text)
+        lib_name = crate_name.replace("-", "_")
+        entry = crates.get(lib_name) or crates.get(crate_name)
+        if entry is None and len(crates) == 1:
+            lib_name, entry = next(iter(crates.items()))
+        if not isinstance(entry, dict):
+            return None
+        return summarize_items(
+            lib_name, _search_index_items(lib_name, entry), "search_index"
+        )
+    except (ValueError, TypeError, KeyError, IndexError, AttributeError) as e:
+        # The index format changes between rustdoc releases
+        logging.debug(f"Unreadable search index for {crate_name}: {e}")
+        return None
+
+
+def _root_from_crate(page_url: str, crate_name: Optional[str]) -> Optional[str]:
+    """Documentation root of a page, found from the crate directory in its path"""
+    if not crate_name:
+        return None
+    segments = urlparse(page_url).path.split("/")
+    if crate_name not in segments:
+        return None
+    depth = len(segments) - 1 - segments[::-1].index(crate_name)
+    return "/".join(segments[:depth]) + "/"
+
+
+def search_index_url(html: str, page_url: str) -> Optional[str]:
+    """Location of the search index a rustdoc page loads"""
+    # Only the one tag is parsed; this runs on every scraped page. Older
+    # rustdoc writes <div id="rustdoc-vars">, current rustdoc
+    # <meta name="rustdoc-vars"> and loads the index without a script tag
+    tag = RUSTDOC_VARS_TAG.search(html)
+    if tag:
+        soup = BeautifulSoup(tag.group(0), "html.parser")
+        variables = soup.find(id="rustdoc-vars") or soup.find(
+            attrs={"name": "rustdoc-vars"}
+        )
+        if variables is not None:
+            if variables.get("data-search-index-js"):
+                return urljoin(page_url, variables["data-search-index-js"])
+            root = variables.get("data-root-path")
+            if root is None:
+                root = _root_from_crate(
+                    page_url,
+                    variables.get("data-current-crate")
+                    or variables.get("data-current-package"),
+                )
+            if root is not None:
+                suffix = variables.get("data-resource-suffix") or ""
+                return urljoin(page_url, f"{root}search-index{suffix}.js")
+    script = re.search(r"src=[\"']([^\"']*search-index[^\"'/]*\.js)[\"']", html)
+    return urljoin(page_url, script.group(1)) if script else None
+
+
+def load_api_surface(path: str) -> Optional[Dict[str, Any]]:
+    """Summarize a locally generated rustdoc JSON file"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return parse_rustdoc_json(json.load(f))
+    except (OSError, ValueError, KeyError) as e:
+        logging.warning(f"Could not read rustdoc JSON {path}: {e}")
+        return None
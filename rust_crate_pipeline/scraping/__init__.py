@@ -5,9 +5,18 @@ This module provides a unified interface for all web scraping operations,
 consolidating Crawl4AI integration and other scraping capabilities.
 """
 
+from .browser_pool import BrowserPool
+from .content_cleaner import ContentCleaner
+from .http_fetcher import HttpFetcher
+from .scrape_cache import ScrapeCache, get_scrape_cache
 from .unified_scraper import UnifiedScraper, ScrapingResult
 
 __all__ = [
+    "BrowserPool",
+    "ContentCleaner",
+    "HttpFetcher",
+    "ScrapeCache",
+    "get_scrape_cache",
     "UnifiedScraper",
     "ScrapingResult",
 ] 
\ No newline at end of file
@@ -0,0 +1,239 @@
+"""
+Pool of headless browsers for long scraping runs.
+
+Chromium's memory grows with every page it renders, and a browser that
+crashes takes every later scrape down with it. ``BrowserPool`` keeps a
+fixed number of crawler instances, leases each to one page at a time
+(which also caps concurrent pages), replaces an instance after a set
+number of pages, restarts crashed instances and retries the page once,
+and runs a watchdog that recycles every instance when the memory of the
+browser processes passes a threshold. Only child processes are measured:
+the pipeline's own process may hold a local model several GB in size.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import psutil
+except ImportError:
+    psutil = None  # type: ignore[assignment]
+
+# Error text that means the browser (not the page) is gone
+BROWSER_CRASH_MARKERS = (
+    "target closed",
+    "target page, context or browser has been closed",
+    "browser has been closed",
+    "browser has disconnected",
+    "browser closed",
+    "connection closed",
+)
+
+
+def is_browser_crash(message: Optional[str]) -> bool:
+    text = (message or "").lower()
+    return any(marker in text for marker in BROWSER_CRASH_MARKERS)
+
+
+def _proc_children_rss_mb() -> Optional[float]:
+    """RSS of this process's descendants from /proc (Linux only)"""
+    try:
+        parents: Dict[int, int] = {}
+        for entry in os.listdir("/proc"):
+            if entry.isdigit():
+                try:
+                    with open(f"/proc/{entry}/stat") as f:
+                        # The command name may contain spaces; fields follow ")"
+                        parents[int(entry)] = int(f.read().rsplit(")", 1)[1].split()[1])
+                except (OSError, IndexError, ValueError):
+                    continue
+        tree = {os.getpid()}
+        grew = True
+        while grew:
+            children = {pid for pid, ppid in parents.items() if ppid in tree} - tree
+            tree |= children
+            grew = bool(children)
+        page_size = os.sysconf("SC_PAGE_SIZE")
+        total = 0
+        for pid in tree - {os.getpid()}:
+            try:
+                with open(f"/proc/{pid}/statm") as f:
+                    total += int(f.read().split()[1]) * page_size
+            except (OSError, IndexError, ValueError):
+                continue
+        return total / 2**20
+    except (OSError, ValueError):
+        return None
+
+
+def child_processes_rss_mb() -> Optional[float]:
+    """Resident memory of the browsers (child processes) in MB, if measurable"""
+    if psutil is None:
+        return _proc_children_rss_mb()
+    total = 0
+    for proc in psutil.Process().children(recursive=True):
+        try:
+            total += proc.memory_info().rss
+        except psutil.Error:
+            continue
+    return total / 2**20
+
+
+class _BrowserSlot:
+    """One crawler instance and its usage since it was started"""
+
+    def __init__(self, index: int) -> None:
+        self.index = index
+        self.crawler: Optional[Any] = None
+        self.pages = 0
+        self.recycle = False
+
+
+class BrowserPool:
+    """Leases crawler instances (e.g. Crawl4AI ``AsyncWebCrawler``) to pages"""
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        size: int = 4,
+        max_pages_per_browser: int = 100,
+        max_rss_mb: Optional[float] = 2048.0,
+        watchdog_interval: float = 15.0,
+        rss_probe: Callable[[], Optional[float]] = child_processes_rss_mb,
+    ) -> None:
+        self.factory = factory
+        self.size = max(1, size)
+        self.max_pages_per_browser = max_pages_per_browser
+        self.max_rss_mb = max_rss_mb
+        self.watchdog_interval = watchdog_interval
+        self.rss_probe = rss_probe
+        self.logger = logging.getLogger(__name__)
+        self.pages = 0
+        self.recycled = 0
+        self.restarts = 0
+        self.peak_rss_mb = 0.0
+        self._slots: List[_BrowserSlot] = []
+        self._idle: Optional["asyncio.Queue[_BrowserSlot]"] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._watchdog: Optional["asyncio.Task[None]"] = None
+
+    async def start(self) -> None:
+        """Prepare the slots for the running loop; browsers start on first use"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        # Browsers and queues belong to the loop that created them
+        self._slots = [_BrowserSlot(i) for i in range(self.size)]
+        self._idle = asyncio.Queue()
+        for slot in self._slots:
+            self._idle.put_nowait(slot)
+        self._loop = loop
+        if self.max_rss_mb:
+            self._watchdog = loop.create_task(self._watch_memory())
+
+    async def close(self) -> None:
+        """Stop the watchdog and every running browser"""
+        if self._watchdog:
+            self._watchdog.cancel()
+            self._watchdog = None
+        for slot in self._slots:
+            await self._stop(slot)
+        self._loop = None
+
+    async def run(self, **kwargs: Any) -> Any:
+        """Run ``crawler.arun(**kwargs)`` on a leased browser.
+
+        A browser crash restarts that browser and retries the page once.
+        """
+        await self.start()
+        assert self._idle is not None
+        slot = await self._idle.get()
+        try:
+            for attempt in range(2):
+                crawler = await self._ready(slot)
+                try:
+                    result = await crawler.arun(**kwargs)
+                except Exception as e:
+                    if attempt or not is_browser_crash(str(e)):
+                        raise
+                    await self._restart(slot, str(e))
+                    continue
+                # Crawl4AI usually reports a dead browser as a failed result
+                failed = result is not None and not getattr(result, "success", True)
+                error = getattr(result, "error_message", None) if failed else None
+                if attempt == 0 and is_browser_crash(error):
+                    await self._restart(slot, error)
+                    continue
+                return result
+        finally:
+            slot.pages += 1
+            self.pages += 1
+            if slot.crawler is not None and (
+                slot.recycle or slot.pages >= self.max_pages_per_browser
+            ):
+                await self._stop(slot)
+                self.recycled += 1
+            self._idle.put_nowait(slot)
+
+    async def _ready(self, slot: _BrowserSlot) -> Any:
+        """Return the slot's browser, starting a fresh one if needed"""
+        if slot.recycle and slot.crawler is not None:
+            await self._stop(slot)
+            self.recycled += 1
+        if slot.crawler is None:
+            crawler = self.factory()
+            if hasattr(crawler, "start"):
+                await crawler.start()
+            slot.crawler = crawler
+            slot.pages = 0
+            slot.recycle = False
+        return slot.crawler
+
+    async def _restart(self, slot: _BrowserSlot, reason: Optional[str]) -> None:
+        self.logger.warning(f"Browser {slot.index} crashed ({reason}); restarting")
+        self.restarts += 1
+        await self._stop(slot)
+
+    async def _stop(self, slot: _BrowserSlot) -> None:
+        crawler, slot.crawler = slot.crawler, None
+        slot.pages = 0
+        slot.recycle = False
+        close = getattr(crawler, "close", None) or getattr(crawler, "stop", None)
+        if close is not None:
+            try:
+                await close()
+            except Exception as e:
+                self.logger.debug(f"Error closing browser {slot.index}: {e}")
+
+    async def _watch_memory(self) -> None:
+        """Flag every browser for recycling while memory is over the limit"""
+        while True:
+            await asyncio.sleep(self.watchdog_interval)
+            self.check_memory(await asyncio.to_thread(self.rss_probe))
+
+    def check_memory(self, rss_mb: Optional[float]) -> None:
+        if rss_mb is None or not self.max_rss_mb:
+            return
+        self.peak_rss_mb = max(self.peak_rss_mb, rss_mb)
+        if rss_mb > self.max_rss_mb:
+            running = [slot for slot in self._slots if slot.crawler is not None]
+            if running:
+                self.logger.warning(
+                    f"Browser memory at {rss_mb:.0f} MB "
+                    f"(limit {self.max_rss_mb:.0f} MB); "
+                    f"recycling {len(running)} browsers"
+                )
+            for slot in running:
+                slot.recycle = True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "browsers": self.size,
+            "running": sum(slot.crawler is not None for slot in self._slots),
+            "pages": self.pages,
+            "recycled": self.recycled,
+            "restarts": self.restarts,
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+        }
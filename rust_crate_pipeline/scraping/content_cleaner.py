@@ -0,0 +1,153 @@
+"""
+Boilerplate removal and cross-source deduplication for scraped markdown.
+
+Page markdown carries site chrome (navigation menus, sidebars, footers)
+that inflates quality scores, README replacements and LLM prompts. The
+``ContentCleaner`` splits markdown into blocks and learns a template per
+site: blocks that recur on a large share of a site's pages are chrome and
+are dropped, as are link lists with almost no other text. Blocks repeated
+across a crate's sources (a README shown on both docs.rs and lib.rs) are
+kept only in the first source.
+"""
+
+import hashlib
+import re
+from typing import Dict, Iterable, List, Set, Tuple
+from urllib.parse import urlparse
+
+_LINK = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+_MARKUP = re.compile(r"[\s#>*_`|\-·•:,.;]+")
+
+
+def split_blocks(markdown: str) -> List[str]:
+    """Split markdown on blank lines, keeping fenced code blocks whole"""
+    blocks: List[str] = []
+    current: List[str] = []
+    in_fence = False
+    for line in markdown.splitlines():
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        if not line.strip() and not in_fence:
+            if current:
+                blocks.append("\n".join(current))
+                current = []
+            continue
+        current.append(line)
+    if current:
+        blocks.append("\n".join(current))
+    return blocks
+
+
+def _fingerprint(block: str) -> str:
+    """Hash of a block that ignores link targets, numbers and spacing"""
+    text = _LINK.sub(r"[\1]", block.lower())
+    text = re.sub(r"\d+", "#", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def _visible_text(block: str) -> str:
+    return _MARKUP.sub("", _LINK.sub(r"\1", block))
+
+
+def is_link_list(block: str, min_links: int = 3, max_other_text: float = 0.2) -> bool:
+    """True for menus: several links and little text besides their labels"""
+    links = _LINK.findall(block)
+    if len(links) < min_links or block.lstrip().startswith("```"):
+        return False
+    visible = _visible_text(block)
+    labels = sum(len(_MARKUP.sub("", label)) for label in links)
+    return len(visible) - labels <= max_other_text * max(len(visible), 1)
+
+
+def _is_structural(block: str) -> bool:
+    """Headings and code are never treated as chrome"""
+    stripped = block.lstrip()
+    return stripped.startswith("#") or stripped.startswith("```")
+
+
+class ContentCleaner:
+    """Learns per-site chrome across pages and strips it from page markdown"""
+
+    def __init__(
+        self,
+        min_pages: int = 3,
+        template_ratio: float = 0.5,
+        min_dedupe_chars: int = 40,
+        max_tracked_blocks: int = 50_000,
+    ) -> None:
+        self.min_pages = min_pages
+        self.template_ratio = template_ratio
+        self.min_dedupe_chars = min_dedupe_chars
+        self.max_tracked_blocks = max_tracked_blocks
+        # Per site: pages seen, and on how many of them each block appeared
+        self._pages: Dict[str, Set[str]] = {}
+        self._block_pages: Dict[str, Dict[str, int]] = {}
+        self.removed_chars = 0
+
+    def _learn(self, site: str, url: str, fingerprints: Iterable[str]) -> None:
+        pages = self._pages.setdefault(site, set())
+        if url in pages:
+            return
+        pages.add(url)
+        counts = self._block_pages.setdefault(site, {})
+        for fingerprint in set(fingerprints):
+            counts[fingerprint] = counts.get(fingerprint, 0) + 1
+        if len(counts) > self.max_tracked_blocks:
+            # Blocks seen once are by far the most common and never chrome yet
+            for fingerprint in [f for f, n in counts.items() if n == 1]:
+                del counts[fingerprint]
+
+    def _is_template(self, site: str, fingerprint: str) -> bool:
+        seen = self._block_pages.get(site, {}).get(fingerprint, 0)
+        pages = len(self._pages.get(site, ()))
+        return seen >= self.min_pages and seen >= self.template_ratio * pages
+
+    def clean(self, url: str, markdown: str) -> str:
+        """Remove menus and blocks the site repeats on most of its pages"""
+        if not markdown:
+            return markdown
+        site = (urlparse(url).hostname or "").lower()
+        blocks = split_blocks(markdown)
+        fingerprints = [_fingerprint(block) for block in blocks]
+        self._learn(site, url, fingerprints)
+
+        kept = [
+            block
+            for block, fingerprint in zip(blocks, fingerprints)
+            if _is_structural(block)
+            or not (is_link_list(block) or self._is_template(site, fingerprint))
+        ]
+        cleaned = "\n\n".join(kept)
+        self.removed_chars += len(markdown) - len(cleaned)
+        return cleaned
+
+    def dedupe(self, contents: List[Tuple[str, str]]) -> Dict[str, str]:
+        """Drop blocks already seen in an earlier source.
+
+        ``contents`` is ``(source, markdown)`` in order of preference; short
+        blocks (headings, one-word lines) are always kept.
+        """
+        seen: Set[str] = set()
+        deduped: Dict[str, str] = {}
+        for source, markdown in contents:
+            kept = []
+            for block in split_blocks(markdown or ""):
+                if len(_visible_text(block)) < self.min_dedupe_chars:
+                    kept.append(block)
+                    continue
+                fingerprint = _fingerprint(block)
+                if fingerprint in seen:
+                    self.removed_chars += len(block)
+                    continue
+                seen.add(fingerprint)
+                kept.append(block)
+            deduped[source] = "\n\n".join(kept)
+        return deduped
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "sites": len(self._pages),
+            "pages": sum(len(pages) for pages in self._pages.values()),
+            "removed_chars": self.removed_chars,
+        }
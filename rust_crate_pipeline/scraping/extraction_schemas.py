@@ -0,0 +1,159 @@
+"""
+CSS selector schemas for documentation sites with a known layout.
+
+docs.rs (rustdoc) and lib.rs render every crate with the same templates, so
+the fields the pipeline wants from them (features, dependencies, examples
+and so on) can be read with selectors instead of sending each page through
+an LLM. ``extract_structured`` returns whatever the site's selectors find;
+pages from other sites, or pages where the selectors come up empty, are left
+to the LLM extraction strategy.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Union
+from urllib.parse import urlparse
+
+from bs4 import BeautifulSoup, Tag
+
+from .http_fetcher import HTML_PARSER
+
+
+@dataclass(frozen=True)
+class FieldSelector:
+    """How to read one structured field from a page"""
+
+    selector: str  # CSS selector; alternatives separated by commas
+    multiple: bool = False  # Collect every match into a list
+    pattern: Optional[str] = None  # Keep the first group of this regex
+
+
+# Fields per host. rustdoc markup changed over the years, so docs.rs
+# selectors list the current layout first and older ones after it.
+SITE_SCHEMAS: Dict[str, Dict[str, FieldSelector]] = {
+    "docs.rs": {
+        "title": FieldSelector("#main-content h1, .main-heading h1, h1.fqn"),
+        "description": FieldSelector(
+            "#main-content details.top-doc .docblock > p, #main-content .docblock > p"
+        ),
+        "version": FieldSelector(
+            "#crate-title .version, .sidebar .version, .crate-version",
+            pattern=r"(\d+\.\d+\.\d+\S*)",
+        ),
+        "examples": FieldSelector(
+            "#main-content pre.rust, #main-content pre.language-rust",
+            multiple=True,
+        ),
+        # "Available on crate feature X only" badges
+        "features": FieldSelector(
+            "#main-content .stab.portability code", multiple=True
+        ),
+        # Crate menu entries such as "serde_derive ^1.0.210 normal"
+        "dependencies": FieldSelector(
+            "a.pure-menu-link:has(> i.dependencies)",
+            multiple=True,
+            pattern=r"^(\S+\s+\S+)",
+        ),
+        "modules": FieldSelector(
+            "#main-content .item-table a.mod, #modules + .item-table a", multiple=True
+        ),
+        "structs": FieldSelector("#main-content .item-table a.struct", multiple=True),
+        "enums": FieldSelector("#main-content .item-table a.enum", multiple=True),
+        "traits": FieldSelector("#main-content .item-table a.trait", multiple=True),
+        "macros": FieldSelector("#main-content .item-table a.macro", multiple=True),
+        "functions": FieldSelector("#main-content .item-table a.fn", multiple=True),
+    },
+    "lib.rs": {
+        "title": FieldSelector("header#package h1, main h1"),
+        "description": FieldSelector("header#package p.desc, main p.desc"),
+        "version": FieldSelector(
+            "header#package .version, #versions .version, .ver",
+            pattern=r"(\d+\.\d+\.\d+\S*)",
+        ),
+        "keywords": FieldSelector(
+            "header#package .keywords a, .keywords .keyword", multiple=True
+        ),
+        "categories": FieldSelector(
+            "header#package .categories a, nav.categories a", multiple=True
+        ),
+        "examples": FieldSelector(
+            "#readme pre.language-rust, #readme pre", multiple=True
+        ),
+        "features": FieldSelector(
+            "#features li code, #feature-flags li code", multiple=True
+        ),
+        "dependencies": FieldSelector("#deps li a, #dependencies li a", multiple=True),
+    },
+}
+
+
+def site_schema(url: str) -> Optional[Dict[str, FieldSelector]]:
+    """Selector schema for the URL's site, if its layout is known"""
+    host = (urlparse(url).hostname or "").lower()
+    for site, schema in SITE_SCHEMAS.items():
+        if host == site or host.endswith("." + site):
+            return schema
+    return None
+
+
+def _value(element: Tag, field: FieldSelector) -> Optional[str]:
+    if element.name == "pre":
+        text = element.get_text()
+    else:
+        text = element.get_text(" ", strip=True)
+    text = text.strip()
+    if field.pattern:
+        match = re.search(field.pattern, text)
+        text = match.group(1) if match else ""
+    return text or None
+
+
+def extract_structured(html: Union[str, BeautifulSoup], url: str) -> Dict[str, Any]:
+    """Read the site's fields from a page; fields without a match are omitted"""
+    schema = site_schema(url)
+    if not schema or not html:
+        return {}
+    soup = html if isinstance(html, BeautifulSoup) else BeautifulSoup(html, HTML_PARSER)
+
+    data: Dict[str, Any] = {}
+    for name, field in schema.items():
+        values: List[str] = []
+        for element in soup.select(field.selector):
+            value = _value(element, field)
+            if value and value not in values:
+                values.append(value)
+            if values and not field.multiple:
+                break
+        if values:
+            data[name] = values if field.multiple else values[0]
+    return data
+
+
+def requested_fields(extraction_schema: Dict[str, Any]) -> List[str]:
+    """Field names a JSON extraction schema asks for"""
+    properties = extraction_schema.get("properties")
+    if properties is None and extraction_schema.get("type") == "array":
+        properties = (extraction_schema.get("items") or {}).get("properties")
+    return list(properties or {})
+
+
+def select_fields(
+    data: Dict[str, Any], extraction_schema: Optional[Dict[str, Any]]
+) -> Optional[Dict[str, Any]]:
+    """Narrow selector output to a requested schema.
+
+    Returns None when the selectors did not satisfy the schema (no requested
+    field found, or a required one missing), meaning the LLM should extract.
+    """
+    if not extraction_schema:
+        return data
+    fields = requested_fields(extraction_schema)
+    selected = (
+        {name: value for name, value in data.items() if name in fields}
+        if fields
+        else data
+    )
+    required = extraction_schema.get("required") or []
+    if not selected or any(name not in selected for name in required):
+        return None
+    return selected
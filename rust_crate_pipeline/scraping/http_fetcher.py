@@ -0,0 +1,317 @@
+"""
+HTTP-first fetching of server-rendered documentation pages.
+
+docs.rs and lib.rs send complete HTML, so rendering them in Chromium costs
+hundreds of MB and seconds of CPU for nothing. ``HttpFetcher`` gets such
+pages with a pooled async HTTP client and turns the page's main content
+region into markdown. It returns None for anything it cannot serve (other
+hosts, transient errors, pages that look like they need JavaScript), which
+tells the caller to fall back to the browser.
+"""
+
+import asyncio
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence, Tuple
+from urllib.parse import urljoin, urlparse
+
+from bs4 import BeautifulSoup, NavigableString, Tag
+
+from ..politeness import DomainScheduler, RobotsDisallowed
+
+try:
+    import httpx
+except ImportError:
+    httpx = None  # type: ignore[assignment]
+
+try:
+    import lxml  # noqa: F401
+
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+# Hosts whose pages are complete without running JavaScript
+STATIC_HOSTS = ("docs.rs", "lib.rs")
+
+# Main content region per host, most specific first
+CONTENT_SELECTORS: Dict[str, Tuple[str, ...]] = {
+    "docs.rs": ("#main-content", "main", ".rustdoc"),
+    "lib.rs": ("main", "#readme"),
+}
+DEFAULT_SELECTORS = ("main", "article", "#content", "body")
+
+# Elements that never carry documentation text
+DROPPED_TAGS = (
+    "script", "style", "noscript", "nav", "footer", "svg", "button",
+    "form", "iframe", "template", "rustdoc-toolbar",
+)
+
+# Responses worth retrying in a real browser
+TRANSIENT_STATUSES = (403, 408, 425, 429, 500, 502, 503, 504)
+
+USER_AGENT = (
+    "rust-crate-pipeline "
+    "(+https://github.com/Superuser666-Sigil/SigilDERG-Data_Production)"
+)
+
+HEADINGS = {f"h{level}": level for level in range(1, 7)}
+BLOCK_TAGS = (
+    "p", "div", "section", "article", "main", "details", "summary", "dl", "dd", "dt",
+)
+STRUCTURE_TAGS = (
+    set(HEADINGS) | set(BLOCK_TAGS) | {"pre", "ul", "ol", "table", "blockquote", "hr"}
+)
+
+
+@dataclass
+class FetchedPage:
+    url: str  # Final URL after redirects
+    status: int
+    title: str
+    markdown: str
+    html: str = ""
+
+
+def _host(url: str) -> str:
+    return (urlparse(url).hostname or "").lower()
+
+
+def _text(node: Any, base_url: str, in_pre: bool = False) -> str:
+    """Inline markdown for a node and its children"""
+    if isinstance(node, NavigableString):
+        text = str(node)
+        return text if in_pre else re.sub(r"\s+", " ", text)
+    if not isinstance(node, Tag):
+        return ""
+    inner = "".join(_text(child, base_url, in_pre) for child in node.children)
+    if node.name == "br":
+        return "\n"
+    if in_pre:
+        return inner
+    if node.name == "code":
+        return f"`{inner.strip()}`" if inner.strip() else ""
+    if node.name in ("strong", "b"):
+        return f"**{inner.strip()}**" if inner.strip() else ""
+    if node.name in ("em", "i"):
+        return f"*{inner.strip()}*" if inner.strip() else ""
+    if node.name == "a" and node.get("href") and inner.strip():
+        href = urljoin(base_url, node["href"])
+        return f"[{inner.strip()}]({href})"
+    return inner
+
+
+def _blocks(node: Any, base_url: str) -> str:
+    """Block-level markdown for a node and its children"""
+    if isinstance(node, NavigableString):
+        return re.sub(r"\s+", " ", str(node))
+    if not isinstance(node, Tag):
+        return ""
+    name = node.name
+    if name in HEADINGS:
+        return f"\n\n{'#' * HEADINGS[name]} {_text(node, base_url).strip()}\n\n"
+    if name == "pre":
+        code = node.find("code") or node
+        classes = " ".join(code.get("class") or node.get("class") or [])
+        match = re.search(r"language-(\w+)", classes)
+        language = match.group(1) if match else ("rust" if "rust" in classes else "")
+        body = _text(code, base_url, in_pre=True).strip("\n")
+        return f"\n\n```{language}\n{body}\n```\n\n"
+    if name in ("ul", "ol"):
+        lines = []
+        for number, item in enumerate(node.find_all("li", recursive=False), 1):
+            marker = f"{number}." if name == "ol" else "-"
+            text = re.sub(r"\n{2,}", "\n", _children(item, base_url).strip())
+            lines.append(f"{marker} " + text.replace("\n", "\n  "))
+        return "\n\n" + "\n".join(lines) + "\n\n"
+    if name == "table":
+        rows = []
+        for tr in node.find_all("tr"):
+            cells = [
+                _text(cell, base_url).strip() for cell in tr.find_all(["th", "td"])
+            ]
+            rows.append("| " + " | ".join(cells) + " |")
+            if len(rows) == 1:
+                rows.append("|" + " --- |" * len(cells))
+        return "\n\n" + "\n".join(rows) + "\n\n"
+    if name == "blockquote":
+        quoted = _children(node, base_url).strip()
+        return "\n\n" + "\n".join(f"> {line}" for line in quoted.splitlines()) + "\n\n"
+    if name == "hr":
+        return "\n\n---\n\n"
+    if name in BLOCK_TAGS:
+        return f"\n\n{_children(node, base_url)}\n\n"
+    if any(
+        isinstance(child, Tag) and child.name in STRUCTURE_TAGS
+        for child in node.children
+    ):
+        return _children(node, base_url)
+    return _text(node, base_url)
+
+
+def _children(node: Tag, base_url: str) -> str:
+    return "".join(_blocks(child, base_url) for child in node.children)
+
+
+def html_to_markdown(
+    html: str, base_url: str = "", selectors: Sequence[str] = DEFAULT_SELECTORS
+) -> Tuple[str, str]:
+    """Return the title and the markdown of the page's main content region"""
+    soup = BeautifulSoup(html, HTML_PARSER)
+    for tag in soup.find_all(DROPPED_TAGS):
+        tag.decompose()
+
+    region = next(
+        (found for found in (soup.select_one(s) for s in selectors) if found), soup
+    )
+    markdown = re.sub(r"[ \t]+\n", "\n", _blocks(region, base_url))
+    markdown = re.sub(r"\n{3,}", "\n\n", markdown).strip()
+
+    heading = region.find("h1") if isinstance(region, Tag) else None
+    title = heading.get_text(" ", strip=True) if heading else ""
+    if not title and soup.title and soup.title.string:
+        title = soup.title.string.strip()
+    return title or "Untitled", markdown
+
+
+class HttpFetcher:
+    """Fetches static documentation pages without a browser"""
+
+    def __init__(
+        self,
+        hosts: Sequence[str] = STATIC_HOSTS,
+        timeout: float = 15.0,
+        max_connections: int = 20,
+        min_content_chars: int = 200,
+        user_agent: str = USER_AGENT,
+        transport: Optional[Any] = None,  # Custom httpx transport, e.g. with retries
+        scheduler: Optional[DomainScheduler] = None,
+    ) -> None:
+        self.hosts = tuple(host.lower() for host in hosts)
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.min_content_chars = min_content_chars
+        self.user_agent = user_agent
+        self.transport = transport
+        self.scheduler = scheduler
+        self.logger = logging.getLogger(__name__)
+        self.fetched = 0
+        self.fallbacks = 0
+        self._client: Optional[Any] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def available(self) -> bool:
+        return httpx is not None
+
+    def handles(self, url: str) -> bool:
+        """True if ``url`` is on a host served without a browser"""
+        host = _host(url)
+        return self.available and any(
+            host == h or host.endswith("." + h) for h in self.hosts
+        )
+
+    def _get_client(self) -> Any:
+        # Connection pools belong to the loop that opened them
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=True,
+                headers={"User-Agent": self.user_agent},
+                transport=self.transport,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+            self._loop = loop
+        return self._client
+
+    async def fetch(self, url: str) -> Optional[FetchedPage]:
+        """Fetch and convert ``url``; None means it needs a browser.
+
+        Raises RobotsDisallowed when the scheduler's robots.txt check fails.
+        """
+        if not self.handles(url):
+            return None
+        response = await self._get(url)
+        if response is None:
+            return self._fall_back()
+
+        final_url = str(response.url)
+        if response.status_code in TRANSIENT_STATUSES:
+            return self._fall_back()
+        if response.status_code >= 400:
+            self.fetched += 1
+            return FetchedPage(
+                url=final_url, status=response.status_code, title="", markdown=""
+            )
+        if "html" not in response.headers.get("content-type", "html"):
+            return self._fall_back()
+
+        selectors = CONTENT_SELECTORS.get(_host(final_url), DEFAULT_SELECTORS)
+        title, markdown = html_to_markdown(response.text, final_url, selectors)
+        # Too little text usually means the content is rendered client-side
+        if len(markdown) < self.min_content_chars:
+            return self._fall_back()
+
+        self.fetched += 1
+        return FetchedPage(
+            url=final_url,
+            status=response.status_code,
+            title=title,
+            markdown=markdown,
+            html=response.text,
+        )
+
+    async def fetch_text(self, url: str) -> Optional[str]:
+        """Body of a plain resource such as a search index, or None"""
+        if not self.handles(url):
+            return None
+        try:
+            response = await self._get(url)
+        except RobotsDisallowed as e:
+            self.logger.debug(str(e))
+            return None
+        return (
+            response.text
+            if response is not None and response.status_code == 200
+            else None
+        )
+
+    async def _get(self, url: str) -> Optional[Any]:
+        """GET paced by the domain scheduler; None on network errors"""
+        if self.scheduler:
+            await self.scheduler.acquire(url)
+        status = None
+        retry_after = None
+        try:
+            response = await self._get_client().get(url)
+            status = response.status_code
+            retry_after = response.headers.get("retry-after")
+            return response
+        except httpx.HTTPError as e:
+            self.logger.debug(f"HTTP fetch of {url} failed: {e}")
+            return None
+        finally:
+            if self.scheduler:
+                self.scheduler.release(url, status, retry_after)
+
+    def _fall_back(self) -> None:
+        """Count a page left to the browser"""
+        self.fallbacks += 1
+        return None
+
+    async def close(self) -> None:
+        if self._client is not None:
+            client, self._client = self._client, None
+            try:
+                await client.aclose()
+            except RuntimeError:
+                # The loop that owned the connections is already closed
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        return {"fetched": self.fetched, "fallbacks": self.fallbacks}
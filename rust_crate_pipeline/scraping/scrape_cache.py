@@ -0,0 +1,155 @@
+"""
+Persistent cache of scraped documentation pages.
+
+A docs.rs page for a given crate version never changes, yet every run
+used to render it again. Scrape results are stored zlib-compressed in a
+``DiskCache`` keyed by the normalized URL, the crate version and the
+extraction settings. Versioned pages never expire; unversioned ones (lib.rs,
+docs.rs ``latest``) expire after a TTL. The least recently used pages are
+evicted once the cache passes its size limit.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+import zlib
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+from ..config import PipelineConfig
+from ..utils.disk_cache import DiskCache
+
+# docs.rs/<crate>/<version>/... and docs.rs/crate/<crate>/<version>/...
+_DOCS_RS_VERSION = re.compile(r"^/(?:crate/)?[^/]+/(\d+\.\d+\.\d+[^/]*)(?:/|$)")
+
+# Query parameters that never change the page content
+_TRACKING_PARAMS = ("ref", "fbclid", "gclid")
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL for cache keys"""
+    parts = urlparse(url.strip())
+    scheme = (parts.scheme or "https").lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    path = re.sub(r"/{2,}", "/", parts.path or "/")
+    if len(path) > 1:
+        path = path.rstrip("/")
+    query = urlencode(
+        sorted(
+            (k, v)
+            for k, v in parse_qsl(parts.query, keep_blank_values=True)
+            if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS
+        )
+    )
+    return urlunparse((scheme, host, path, "", query, ""))
+
+
+def url_version(url: str) -> Optional[str]:
+    """Crate version pinned by a docs.rs URL, if any"""
+    parts = urlparse(url)
+    if (parts.hostname or "").lower() != "docs.rs":
+        return None
+    match = _DOCS_RS_VERSION.match(parts.path)
+    return match.group(1) if match else None
+
+
+class ScrapeCache:
+    """Disk-backed cache of scrape results with TTL, LRU eviction and counters"""
+
+    def __init__(
+        self,
+        path: str,
+        ttl: Optional[float] = 7 * 24 * 3600,
+        max_bytes: Optional[int] = 512 * 2**20,
+    ) -> None:
+        self.store = DiskCache(path, max_bytes=max_bytes)
+        self.ttl = ttl
+        self.versioned_hits = 0
+
+    @staticmethod
+    def make_key(
+        url: str, version: Optional[str] = None, extra: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Build the cache key for a page"""
+        material = json.dumps(
+            {"url": normalize_url(url), "version": version or "", "extra": extra or {}},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(
+        self,
+        url: str,
+        version: Optional[str] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Return the cached result fields for a page, or None"""
+        version = version or url_version(url)
+        value = self.store.get(self.make_key(url, version, extra))
+        if value is None:
+            return None
+        try:
+            data = json.loads(zlib.decompress(value).decode("utf-8"))
+        except (zlib.error, ValueError) as e:
+            logging.warning(f"Dropping unreadable scrape cache entry for {url}: {e}")
+            self.store.delete(self.make_key(url, version, extra))
+            return None
+        if version:
+            self.versioned_hits += 1
+        return data
+
+    def set(
+        self,
+        url: str,
+        data: Dict[str, Any],
+        version: Optional[str] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Store result fields; pages of a pinned version never expire"""
+        version = version or url_version(url)
+        try:
+            value = zlib.compress(json.dumps(data, default=str).encode("utf-8"), 6)
+            # The store has no default TTL, so None never expires
+            self.store.set(
+                self.make_key(url, version, extra),
+                value,
+                ttl=None if version else self.ttl,
+            )
+        except Exception as e:
+            logging.warning(f"Failed to write scrape cache entry for {url}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache statistics"""
+        stats = self.store.stats()
+        stats["versioned_hits"] = self.versioned_hits
+        return stats
+
+
+_shared_caches: Dict[str, ScrapeCache] = {}
+_shared_caches_lock = threading.Lock()
+
+
+def get_scrape_cache(config: PipelineConfig) -> Optional[ScrapeCache]:
+    """Return the process-wide scrape cache for a pipeline config, if enabled"""
+    if not config.scrape_cache_enabled:
+        return None
+
+    with _shared_caches_lock:
+        cache = _shared_caches.get(config.scrape_cache_path)
+        if cache is None:
+            try:
+                cache = ScrapeCache(
+                    config.scrape_cache_path,
+                    ttl=config.scrape_cache_ttl,
+                    max_bytes=config.scrape_cache_max_mb * 2**20,
+                )
+            except Exception as e:
+                logging.warning(f"Scrape cache unavailable: {e}")
+                return None
+            _shared_caches[config.scrape_cache_path] = cache
+        return cache
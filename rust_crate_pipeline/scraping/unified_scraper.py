@@ -17,11 +17,28 @@ except ImportError:
     BrowserConfig = None
     LLMConfig = None
 
+from ..politeness import DomainScheduler, RobotsDisallowed
+from ..rustdoc_index import parse_search_index, search_index_url
+from .browser_pool import BrowserPool
+from .content_cleaner import ContentCleaner
+from .extraction_schemas import extract_structured, select_fields, site_schema
+from .http_fetcher import FetchedPage, HttpFetcher, STATIC_HOSTS
+from .scrape_cache import ScrapeCache
 
 class ScrapingError(Exception):
     pass
 
 
+# Documentation sources scraped for every crate. crates.io is a JavaScript
+# app whose data comes from its API instead.
+# In order of expected value: docs.rs usually carries the README and the API
+CRATE_DOC_URLS = {
+    "docs_rs": "https://docs.rs/{crate_name}",
+    "lib_rs": "https://lib.rs/crates/{crate_name}",
+}
+VERSIONED_DOCS_RS_URL = "https://docs.rs/{crate_name}/{version}"
+
+
 @dataclass
 class ScrapingResult:
     url: str
@@ -42,11 +59,32 @@ class ScrapingResult:
 
 class UnifiedScraper:
     
-    def __init__(self, config: Optional[Dict[str, Any]] = None) -> None:
+    def __init__(
+        self,
+        config: Optional[Dict[str, Any]] = None,
+        cache: Optional[ScrapeCache] = None,
+        scheduler: Optional[DomainScheduler] = None,
+    ) -> None:
         self.config = config or {}
+        self.cache = cache
+        # Per-domain pacing and robots.txt, shared with the other scrapers
+        self.scheduler = scheduler
         self.logger = logging.getLogger(__name__)
-        self.crawler: Optional[Any] = None
+        self.pool: Optional[BrowserPool] = None
         self.browser_config: Optional[Any] = None
+        self.http_fetcher: Optional[HttpFetcher] = None
+        self.sources_skipped = 0
+        # Strips site chrome learned across pages and dedupes sources
+        self.cleaner: Optional[ContentCleaner] = (
+            ContentCleaner() if self.config.get("clean_content", True) else None
+        )
+        if self.config.get("http_first", True):
+            self.http_fetcher = HttpFetcher(
+                hosts=self.config.get("http_first_hosts", STATIC_HOSTS),
+                timeout=self.config.get("http_timeout", 15.0),
+                max_connections=self.config.get("http_max_connections", 20),
+                scheduler=scheduler,
+            )
         self._initialize_crawler()
     
     def _initialize_crawler(self) -> None:
@@ -62,102 +100,146 @@ class UnifiedScraper:
                 verbose=self.config.get("verbose", False)
             )
             
-            self.crawler = AsyncWebCrawler(config=self.browser_config)
+            # One browser per concurrently rendered page, recycled by page
+            # count and memory use
+            self.pool = BrowserPool(
+                lambda: AsyncWebCrawler(config=self.browser_config),
+                size=self.config.get("max_concurrent_pages", 4),
+                max_pages_per_browser=self.config.get("max_pages_per_browser", 100),
+                max_rss_mb=self.config.get("max_browser_rss_mb", 2048.0),
+            )
             self.logger.info("✅ Crawl4AI crawler initialized successfully")
         except Exception as e:
             self.logger.error(f"❌ Failed to initialize Crawl4AI: {e}")
-            self.crawler = None
+            self.pool = None
     
     async def __aenter__(self) -> "UnifiedScraper":
-        if self.crawler and hasattr(self.crawler, 'start'):
-            try:
-                await self.crawler.start()
-            except Exception as e:
-                self.logger.warning(f"Failed to start crawler: {e}")
+        if self.pool:
+            await self.pool.start()
         return self
     
     async def __aexit__(self, exc_type: Optional[type], exc_val: Optional[Exception], exc_tb: Optional[Any]) -> None:
-        if self.crawler and hasattr(self.crawler, 'stop'):
-            try:
-                await self.crawler.stop()
-            except Exception as e:
-                self.logger.warning(f"Error stopping crawler: {e}")
-    
+        await self.close()
+
     async def scrape_url(
         self, 
         url: str, 
         doc_type: str = "general",
-        extraction_schema: Optional[Dict[str, Any]] = None
+        extraction_schema: Optional[Dict[str, Any]] = None,
+        version: Optional[str] = None
     ) -> ScrapingResult:
-        if not self.crawler:
-            raise ScrapingError("No crawler backend available")
-        
-        try:
-            # Configure crawler run parameters
-            config_params: Dict[str, Any] = {
-                "word_count_threshold": self.config.get("word_count_threshold", 10),
-                "screenshot": self.config.get("screenshot", False),
-            }
-            
-            # Add CSS selectors based on document type
-            if doc_type == "docs":
-                config_params["css_selector"] = "main"
-            elif doc_type == "readme":
-                config_params["css_selector"] = "article, .readme, main"
-            
-            # Update with any additional crawl config
-            config_params.update(self.config.get("crawl_config", {}))
-            
-            # Ensure max_retries is not passed to CrawlerRunConfig
-            config_params.pop("max_retries", None)
+        """Scrape a page, served from the scrape cache when possible.
 
-            crawl_config = CrawlerRunConfig(**config_params)
-            
-            # Set up extraction strategy if schema provided
-            extraction_strategy = None
-            if extraction_schema and CRAWL4AI_AVAILABLE:
-                # Get LLM configuration from config or use defaults
-                llm_provider = self.config.get("llm_provider", "ollama")
-                llm_api_base = self.config.get("llm_api_base", "http://localhost:11434")
-                llm_model = self.config.get("llm_model", "deepseek-coder:6.7b")
-                llm_api_token = self.config.get("llm_api_token", "no-token-needed")
-                
-                # Create LLM config
-                llm_config = LLMConfig(
-                    provider=llm_provider,
-                    api_token=llm_api_token,
-                    api_base=llm_api_base,
-                    model=llm_model,
-                    max_tokens=self.config.get("max_tokens", 2048),
-                    temperature=self.config.get("temperature", 0.7)
+        ``version`` pins the page to a crate version so its cache entry never
+        expires; docs.rs URLs that name a version are pinned automatically.
+        """
+        cache_extra = {"doc_type": doc_type, "schema": extraction_schema}
+        if self.cache:
+            cached = self.cache.get(url, version, cache_extra)
+            if cached is not None:
+                return self._clean(ScrapingResult(
+                    url=url,
+                    title=cached["title"],
+                    content=cached["content"],
+                    structured_data=cached["structured_data"],
+                    quality_score=cached["quality_score"],
+                    extraction_method=cached["extraction_method"],
+                    metadata={**cached["metadata"], "from_cache": True},
+                ))
+        
+        result = await self._scrape(url, doc_type, extraction_schema)
+        if self.cache:
+            self.cache.set(
+                url,
+                {
+                    "title": result.title,
+                    "content": result.content,
+                    "structured_data": result.structured_data,
+                    "quality_score": result.quality_score,
+                    "extraction_method": result.extraction_method,
+                    "metadata": result.metadata,
+                },
+                version,
+                cache_extra,
+            )
+        # The cache keeps raw content so pages benefit from later learning
+        return self._clean(result)
+    
+    def _clean(self, result: ScrapingResult) -> ScrapingResult:
+        if not self.cleaner or not result.content:
+            return result
+        self._set_content(result, self.cleaner.clean(result.url, result.content))
+        return result
+    
+    def _set_content(self, result: ScrapingResult, content: str) -> None:
+        """Replace a result's content and rescore it"""
+        if content == result.content:
+            return
+        result.metadata.setdefault("raw_content_length", len(result.content))
+        result.metadata["content_length"] = len(content)
+        result.content = content
+        result.quality_score = self._calculate_quality_score(
+            content, result.structured_data
+        )
+    
+    async def _scrape(
+        self, url: str, doc_type: str, extraction_schema: Optional[Dict[str, Any]]
+    ) -> ScrapingResult:
+        # Known layouts are read with selectors; the LLM extracts only when
+        # the layout is unknown or the selectors miss the requested fields
+        use_llm = bool(extraction_schema) and site_schema(url) is None
+        
+        # Server-rendered pages skip the browser unless an LLM extraction is needed
+        if self.http_fetcher and not use_llm and self.http_fetcher.handles(url):
+            try:
+                page = await self.http_fetcher.fetch(url)
+            except RobotsDisallowed as e:
+                raise ScrapingError(f"Failed to scrape {url}: {e}")
+            if page is not None:
+                if page.status >= 400:
+                    self.logger.error(f"Scraping error for {url}: HTTP {page.status}")
+                    raise ScrapingError(f"Failed to scrape {url}: HTTP {page.status}")
+                structured = select_fields(
+                    extract_structured(page.html, page.url), extraction_schema
                 )
-                
-                extraction_strategy = LLMExtractionStrategy(
-                    llm_config=llm_config,
-                    schema=extraction_schema,
-                    extraction_type="schema",
-                    instruction=f"Extract structured data from this {doc_type} content according to the provided schema."
+                if structured is not None:
+                    return self._http_result(url, page, doc_type, structured)
+                self.logger.debug(
+                    f"Selectors missed the requested fields on {url}; using the LLM"
                 )
-            
-            # Run the crawl
-            result = await self.crawler.arun(
-                url=url, 
-                config=crawl_config,
-                extraction_strategy=extraction_strategy
+                use_llm = True
+            else:
+                self.logger.debug(f"Falling back to the browser for {url}")
+        
+        if not self.pool:
+            raise ScrapingError("No crawler backend available")
+        
+        try:
+            result = await self._crawl(
+                url, doc_type, extraction_schema if use_llm else None
             )
-            
-            # Handle result (Crawl4AI returns direct result, not container)
-            if not result:
-                raise ScrapingError("Crawl returned no result")
-            
-            if not result.success:
-                error_message = getattr(result, 'error_message', 'Crawl was not successful')
-                raise ScrapingError(f"Crawl failed: {error_message}")
+            structured_data = self._process_extracted_content(
+                getattr(result, 'extracted_content', None)
+            )
+            extraction = "llm" if use_llm else "selectors"
+            if not use_llm:
+                selected = select_fields(
+                    extract_structured(getattr(result, 'html', '') or "", url),
+                    extraction_schema,
+                )
+                if selected is None:
+                    self.logger.debug(
+                        f"Selectors missed the requested fields on {url}; using the LLM"
+                    )
+                    result = await self._crawl(url, doc_type, extraction_schema)
+                    structured_data = self._process_extracted_content(
+                        getattr(result, 'extracted_content', None)
+                    )
+                    extraction = "llm"
+                else:
+                    structured_data = selected
             
             markdown_content = getattr(result, 'markdown', '') or ""
-            extracted_content = getattr(result, 'extracted_content', None)
-            
-            structured_data = self._process_extracted_content(extracted_content)
             quality_score = self._calculate_quality_score(markdown_content, structured_data)
             
             return ScrapingResult(
@@ -171,6 +253,10 @@ class UnifiedScraper:
                     "doc_type": doc_type,
                     "content_length": len(markdown_content),
                     "has_structured_data": bool(structured_data),
+                    "structured_extraction": extraction,
+                    "search_index_url": search_index_url(
+                        getattr(result, 'html', '') or "", url
+                    ),
                     "crawl_success": result.success,
                 }
             )
@@ -179,31 +265,207 @@ class UnifiedScraper:
             self.logger.error(f"Scraping error for {url}: {e}")
             raise ScrapingError(f"Failed to scrape {url}: {str(e)}")
     
-    async def scrape_crate_documentation(self, crate_name: str) -> Dict[str, ScrapingResult]:
-        results: Dict[str, ScrapingResult] = {}
+    async def _crawl(
+        self, url: str, doc_type: str, extraction_schema: Optional[Dict[str, Any]]
+    ) -> Any:
+        """Render a page in the browser pool, using LLM extraction given a schema"""
+        # Configure crawler run parameters
+        config_params: Dict[str, Any] = {
+            "word_count_threshold": self.config.get("word_count_threshold", 10),
+            "screenshot": self.config.get("screenshot", False),
+        }
+        
+        # Add CSS selectors based on document type
+        if doc_type == "docs":
+            config_params["css_selector"] = "main"
+        elif doc_type == "readme":
+            config_params["css_selector"] = "article, .readme, main"
+        
+        # Update with any additional crawl config
+        config_params.update(self.config.get("crawl_config", {}))
+        
+        # Ensure max_retries is not passed to CrawlerRunConfig
+        config_params.pop("max_retries", None)
+
+        crawl_config = CrawlerRunConfig(**config_params)
+        
+        # Set up extraction strategy if schema provided
+        extraction_strategy = None
+        if extraction_schema and CRAWL4AI_AVAILABLE:
+            # Get LLM configuration from config or use defaults
+            llm_provider = self.config.get("llm_provider", "ollama")
+            llm_api_base = self.config.get("llm_api_base", "http://localhost:11434")
+            llm_model = self.config.get("llm_model", "deepseek-coder:6.7b")
+            llm_api_token = self.config.get("llm_api_token", "no-token-needed")
+            
+            # Create LLM config
+            llm_config = LLMConfig(
+                provider=llm_provider,
+                api_token=llm_api_token,
+                api_base=llm_api_base,
+                model=llm_model,
+                max_tokens=self.config.get("max_tokens", 2048),
+                temperature=self.config.get("temperature", 0.7)
+            )
+            
+            extraction_strategy = LLMExtractionStrategy(
+                llm_config=llm_config,
+                schema=extraction_schema,
+                extraction_type="schema",
+                instruction=(
+                    f"Extract structured data from this {doc_type} content "
+                    "according to the provided schema."
+                ),
+            )
+        
+        # Run the crawl
+        if self.scheduler:
+            await self.scheduler.acquire(url)
+        status = None
+        retry_after = None
+        try:
+            result = await self.pool.run(
+                url=url, 
+                config=crawl_config,
+                extraction_strategy=extraction_strategy
+            )
+            status = getattr(result, 'status_code', None)
+            headers = getattr(result, 'response_headers', None) or {}
+            retry_after = headers.get('retry-after')
+        finally:
+            if self.scheduler:
+                self.scheduler.release(url, status, retry_after)
+        
+        # Handle result (Crawl4AI returns direct result, not container)
+        if not result:
+            raise ScrapingError("Crawl returned no result")
+        
+        if not result.success:
+            error_message = getattr(result, 'error_message', 'Crawl was not successful')
+            raise ScrapingError(f"Crawl failed: {error_message}")
         
+        return result
+    
+    def _http_result(
+        self,
+        url: str,
+        page: FetchedPage,
+        doc_type: str,
+        structured_data: Dict[str, Any],
+    ) -> ScrapingResult:
+        return ScrapingResult(
+            url=url,
+            title=page.title,
+            content=page.markdown,
+            structured_data=structured_data,
+            quality_score=self._calculate_quality_score(page.markdown, structured_data),
+            extraction_method="http",
+            metadata={
+                "doc_type": doc_type,
+                "content_length": len(page.markdown),
+                "has_structured_data": bool(structured_data),
+                "structured_extraction": "selectors",
+                "search_index_url": search_index_url(page.html, page.url),
+                "final_url": page.url,
+            }
+        )
+    
+    async def scrape_crate_documentation(
+        self, crate_name: str, version: Optional[str] = None
+    ) -> Dict[str, ScrapingResult]:
+        """Scrape every documentation source of a crate concurrently.
+
+        With ``version``, docs.rs is scraped at that version, whose pages are
+        cached for good.
+
+        At most ``max_pages_per_crate`` of the crate's pages are in flight at
+        once, and every scrape shares the browser pool, which renders at most
+        ``max_concurrent_pages`` pages. A failed source yields a result with
+        ``error`` set.
+
+        With ``early_exit_chars`` set, the most valuable source is scraped
+        first and the others are skipped (left out of the result) if it
+        already has enough content; see ``_has_enough_content``.
+        """
         urls = {
-            "crates_io": f"https://crates.io/crates/{crate_name}",
-            "docs_rs": f"https://docs.rs/{crate_name}",
-            "lib_rs": f"https://lib.rs/crates/{crate_name}",
+            source: template.format(crate_name=crate_name)
+            for source, template in CRATE_DOC_URLS.items()
         }
+        if version:
+            urls["docs_rs"] = VERSIONED_DOCS_RS_URL.format(
+                crate_name=crate_name, version=version
+            )
+        crate_pages = asyncio.Semaphore(
+            max(1, self.config.get("max_pages_per_crate", len(urls)))
+        )
         
-        for source, url in urls.items():
-            try:
-                result = await self.scrape_url(url, doc_type="docs")
-                results[source] = result
-            except ScrapingError as e:
-                self.logger.warning(f"Failed to scrape {source} for {crate_name}: {e}")
-                results[source] = ScrapingResult(
-                    url=url,
-                    title=f"{crate_name} - {source}",
-                    content="",
-                    error=str(e),
-                    extraction_method="failed"
+        async def scrape_source(source: str, url: str) -> ScrapingResult:
+            async with crate_pages:
+                try:
+                    return await self.scrape_url(url, doc_type="docs")
+                except ScrapingError as e:
+                    self.logger.warning(
+                        f"Failed to scrape {source} for {crate_name}: {e}"
+                    )
+                    return ScrapingResult(
+                        url=url,
+                        title=f"{crate_name} - {source}",
+                        content="",
+                        error=str(e),
+                        extraction_method="failed"
+                    )
+        
+        sources = list(urls.items())
+        waves = [sources[:1], sources[1:]] if self._early_exit_enabled() else [sources]
+        results: Dict[str, ScrapingResult] = {}
+        for wave in waves:
+            if results and self._has_enough_content(results):
+                skipped = [source for source, _ in wave]
+                self.sources_skipped += len(skipped)
+                self.logger.info(
+                    f"Skipping {skipped} for {crate_name}: enough documentation already"
                 )
+                break
+            scraped = await asyncio.gather(
+                *(scrape_source(source, url) for source, url in wave)
+            )
+            results.update(zip((source for source, _ in wave), scraped))
         
+        # Keep text shown by several sources only in the first of them
+        if self.cleaner:
+            deduped = self.cleaner.dedupe(
+                [
+                    (source, result.content)
+                    for source, result in results.items()
+                    if result.error is None
+                ]
+            )
+            for source, content in deduped.items():
+                self._set_content(results[source], content)
         return results
     
+    async def scrape_api_surface(
+        self, crate_name: str, docs_page: ScrapingResult
+    ) -> Optional[Dict[str, Any]]:
+        """Summarize a crate's public API from the search index of its docs.rs page"""
+        index_url = docs_page.metadata.get("search_index_url")
+        if not index_url or not self.http_fetcher:
+            return None
+        
+        cache_extra = {"api_surface": crate_name}
+        if self.cache:
+            cached = self.cache.get(index_url, extra=cache_extra)
+            if cached is not None:
+                return cached
+        
+        text = await self.http_fetcher.fetch_text(index_url)
+        summary = parse_search_index(text, crate_name) if text else None
+        if summary is None:
+            self.logger.debug(f"No usable search index for {crate_name} at {index_url}")
+        elif self.cache:
+            self.cache.set(index_url, summary, extra=cache_extra)
+        return summary
+    
     def _process_extracted_content(
         self, content: Optional[Union[str, Dict[str, Any]]]
     ) -> Dict[str, Any]:
@@ -218,6 +480,22 @@ class UnifiedScraper:
         
         return content if isinstance(content, dict) else {}
     
+    def _early_exit_enabled(self) -> bool:
+        return self.config.get("early_exit_chars", 1000) > 0
+    
+    def _has_enough_content(self, results: Dict[str, ScrapingResult]) -> bool:
+        """True once a page reaches the quality bar and the text adds up.
+
+        ``early_exit_quality`` is on the 0-10 scale of
+        ``_calculate_quality_score``.
+        """
+        scraped = [result for result in results.values() if result.error is None]
+        quality = self.config.get("early_exit_quality", 4.0)
+        return any(result.quality_score >= quality for result in scraped) and (
+            sum(len(result.content) for result in scraped)
+            >= self.config.get("early_exit_chars", 1000)
+        )
+    
     def _calculate_quality_score(
         self, content: str, structured_data: Dict[str, Any]
     ) -> float:
@@ -250,9 +528,11 @@ class UnifiedScraper:
         return "Untitled"
     
     async def close(self) -> None:
-        if self.crawler and hasattr(self.crawler, 'stop'):
+        if self.http_fetcher:
+            await self.http_fetcher.close()
+        if self.pool:
             try:
-                await self.crawler.stop()
+                await self.pool.close()
             except Exception as e:
                 self.logger.warning(f"Error closing crawler: {e}")
 
@@ -1,18 +1,40 @@
 # unified_llm_processor.py
+import asyncio
 import re
 import time
 import logging
 import json
-from typing import TypedDict, Union, Optional, Dict, Any, List, TYPE_CHECKING
+import threading
+import weakref
+from types import SimpleNamespace
+from typing import Union, Optional, Dict, Any, List, TYPE_CHECKING
 from collections.abc import Callable
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields, replace
 
 if TYPE_CHECKING:
+    from asyncio import AbstractEventLoop
     from typing import Tuple
 
+DEFAULT_SYSTEM_MESSAGE = (
+    "You are a helpful AI assistant that analyzes Rust crates and provides insights."
+)
+
+USE_CASE_CATEGORIES = [
+    "AI",
+    "Database",
+    "Web Framework",
+    "Networking",
+    "Serialization",
+    "Utilities",
+    "DevTools",
+    "ML",
+    "Cryptography",
+    "Unknown",
+]
+
 try:
     import litellm
-    from litellm import completion
+    from litellm import completion, acompletion
     from litellm.cost_calculator import cost_per_token
     LITELLM_AVAILABLE = True
 except ImportError:
@@ -20,6 +42,37 @@ except ImportError:
     logging.warning("LiteLLM not available. Install with: pip install litellm")
 
 from .config import PipelineConfig, CrateMetadata, EnrichedCrate
+from .early_stop import (
+    AnswerDetector,
+    StreamAccumulator,
+    category_detector,
+    score_detector,
+)
+from .enrichment_graph import EnrichmentTask, run_task_graph, run_task_graph_threaded
+from .grammars import (
+    FACTUAL_PAIRS_MAX,
+    FACTUAL_PAIRS_MAX_TOKENS,
+    FACTUAL_PAIRS_MIN,
+    FACTUAL_STATEMENT_MAX_CHARS,
+    OutputGrammar,
+    category_grammar,
+    factual_pairs_grammar,
+)
+from .llm_usage import (
+    USAGE_LABELS,
+    UsageRecord,
+    current_labels,
+    summarize_usage,
+    usage_labels,
+)
+from .llm_cache import LLMResponseCache, get_llm_cache
+from .quality_tiers import ALL_TASKS, QualityTier, TierPlanner, current_tier, tier_scope
+from .readme_parser import ReadmeDocumentCache
+from .use_case_classifier import (
+    ConfidentUseCaseClassifier,
+    features_for_crate,
+    get_use_case_classifier,
+)
 
 
 @dataclass
@@ -44,26 +97,272 @@ class LLMConfig:
     # LM Studio specific
     lmstudio_host: Optional[str] = None
 
+    # Maximum number of in-flight async requests per provider endpoint
+    max_concurrent_requests: int = 4
+
+    # Crates packed into one request by batched enrichment (aenrich_crates)
+    enrichment_batch_size: int = 8
+
+    # "per_task" issues one prompt per enrichment field; "structured" requests
+    # all fields in one JSON-schema call and falls back per missing field
+    enrichment_mode: str = "per_task"
+
+    # Additional endpoints for llm_router.RoutedLLMProcessor, each a dict of
+    # LLMConfig overrides (e.g. {"ollama_host": ...}); listed order is the
+    # fallback chain after this config's own endpoint
+    fallback_endpoints: List[Dict[str, Any]] = field(default_factory=list)
+    # Hedge async requests to a second endpoint past the first one's p95 latency
+    hedge_requests: bool = False
+
+    # Stream classification and scoring, stopping once the answer is complete
+    stream_short_answers: bool = False
+
+    # LLMConfig overrides for a cheaper model tried first on every task
+    # (e.g. {"provider": "ollama", "model": "llama3.2:1b"}); its answers are
+    # kept when they pass validation, otherwise the task escalates to this
+    # config's model. Empty disables the cascade.
+    cascade_model: Dict[str, Any] = field(default_factory=dict)
+
+    # Constrain classification and factual pairs to their output format with
+    # a strict JSON schema, when the model supports one
+    constrained_decoding: bool = True
+
+
+def provider_model_name(config: LLMConfig) -> str:
+    """LiteLLM model name for the config's provider"""
+    if config.provider == "azure":
+        return f"azure/{config.model}"
+    return config.model
+
+
+def provider_api_base(config: LLMConfig) -> Optional[str]:
+    """API base URL for the config's provider"""
+    if config.provider == "ollama":
+        return config.ollama_host or "http://localhost:11434"
+    if config.provider == "lmstudio":
+        return config.lmstudio_host or "http://localhost:1234/v1"
+    return config.api_base
+
+
+def connection_args(config: LLMConfig) -> Dict[str, Any]:
+    """Completion arguments that select the endpoint (model, base URL, credentials)"""
+    if config.provider == "azure":
+        return {
+            # For Azure, model can be just the deployment name
+            "model": config.azure_deployment or config.model,
+            "api_base": config.api_base,
+            "api_key": config.api_key,
+            "api_version": config.azure_api_version,
+        }
+    return {
+        "model": provider_model_name(config),
+        "api_base": provider_api_base(config),
+        "api_key": config.api_key,
+    }
+
+
+def cascade_config(config: LLMConfig) -> LLMConfig:
+    """Config of the cascade's small model: ``config`` with its overrides"""
+    unknown = sorted(set(config.cascade_model) - {f.name for f in fields(LLMConfig)})
+    if unknown:
+        raise ValueError(
+            f"Unknown LLMConfig fields in cascade_model: {', '.join(unknown)}"
+        )
+    # The small model neither cascades nor routes; those keys cannot be overridden
+    overrides = {**config.cascade_model, "cascade_model": {}, "fallback_endpoints": []}
+    return replace(config, **overrides)
+
+
+# In-flight request limits, shared by every processor talking to the same
+# provider endpoint. Semaphores are bound to an event loop, so they are kept
+# per loop.
+_Semaphores = Dict["Tuple[str, str]", asyncio.Semaphore]
+_provider_semaphores: "weakref.WeakKeyDictionary[AbstractEventLoop, _Semaphores]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_provider_semaphore(
+    provider: str, api_base: Optional[str], limit: int
+) -> asyncio.Semaphore:
+    """Return the shared in-flight semaphore for a provider endpoint."""
+    loop = asyncio.get_running_loop()
+    semaphores = _provider_semaphores.setdefault(loop, {})
+    key = (provider, api_base or "")
+    if key not in semaphores:
+        semaphores[key] = asyncio.Semaphore(max(1, limit))
+    return semaphores[key]
+
+
+# Sampling settings and system message for each per-crate enrichment task
+TASK_SETTINGS: Dict[str, Dict[str, Any]] = {
+    "readme_summary": {
+        "temperature": 0.3,
+        "max_tokens": 150,
+        "system_message": (
+            "You are an expert Rust developer who summarizes crate features concisely."
+        ),
+    },
+    "use_case": {
+        "temperature": 0.1,
+        "max_tokens": 50,
+        "system_message": (
+            "You are a Rust ecosystem expert who classifies crates accurately."
+        ),
+    },
+    "factual_counterfactual": {
+        "temperature": 0.4,
+        "max_tokens": FACTUAL_PAIRS_MAX_TOKENS,
+        "system_message": (
+            "You are a Rust expert who generates accurate factual statements and "
+            "plausible counterfactuals."
+        ),
+    },
+    "score": {
+        "temperature": 0.2,
+        "max_tokens": 10,
+        "system_message": (
+            "You are a Rust ecosystem expert who rates crates objectively."
+        ),
+    },
+}
+
+# Shortest small-model summary accepted without escalating
+CASCADE_MIN_SUMMARY_WORDS = 8
+
+# Early-stop answer detectors for streamed short-answer tasks
+TASK_ANSWER_DETECTORS: Dict[str, AnswerDetector] = {
+    "use_case": category_detector(USE_CASE_CATEGORIES),
+    "score": score_detector,
+}
+
+# Output formats enforced by constrained decoding
+TASK_GRAMMARS: Dict[str, OutputGrammar] = {
+    "use_case": category_grammar(USE_CASE_CATEGORIES),
+    "factual_counterfactual": factual_pairs_grammar(
+        FACTUAL_PAIRS_MIN, FACTUAL_PAIRS_MAX
+    ),
+}
+
+STRUCTURED_SYSTEM_MESSAGE = (
+    "You are a Rust ecosystem expert who analyzes crates and answers in JSON."
+)
+
+# JSON schema for single-call structured enrichment
+STRUCTURED_ENRICHMENT_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "readme_summary": {"type": "string"},
+        "use_case": {"type": "string", "enum": USE_CASE_CATEGORIES},
+        "factual_pairs": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "factual": {"type": "string"},
+                    "counterfactual": {"type": "string"},
+                },
+                "required": ["factual", "counterfactual"],
+                "additionalProperties": False,
+            },
+        },
+        "score": {"type": "number"},
+    },
+    "required": ["readme_summary", "use_case", "factual_pairs", "score"],
+    "additionalProperties": False,
+}
+
+
+class BudgetReservation:
+    """Estimated cost held against the budget while a call is in flight"""
+
+    def __init__(self, amount: float) -> None:
+        self.amount = amount
+        self.settled = False
+
 
 class BudgetManager:
-    """Monitors and enforces spending limits for LLM calls."""
+    """Monitors and enforces spending limits for LLM calls.
+
+    Safe to share between threads and asyncio tasks. Each call reserves its
+    worst-case cost (prompt plus ``max_tokens`` of output) before it is sent
+    and reconciles the reservation with the billed usage afterwards, so
+    concurrent in-flight calls cannot together overshoot the budget. Every
+    reconciled call is kept as a ``UsageRecord`` for the run report.
+    """
 
     def __init__(self, budget: float = 90.0):
         self.budget = budget
         self.total_cost = 0.0
+        self.reserved_cost = 0.0
+        self.records: List[UsageRecord] = []
+        self._lock = threading.Lock()
 
-    def update_cost(self, model: str, completion_tokens: int, prompt_tokens: int) -> None:
-        """Update the total cost with the latest API call."""
+    @staticmethod
+    def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        """Return the cost of a call, or 0.0 if the model's pricing is unknown"""
         try:
-            cost, _ = cost_per_token(
+            prompt_cost, completion_cost = cost_per_token(
                 model=model,
                 completion_tokens=completion_tokens,
                 prompt_tokens=prompt_tokens,
             )
-            self.total_cost += cost
+            return prompt_cost + completion_cost
         except Exception:
             # If cost cannot be determined, do not track.
-            pass
+            return 0.0
+
+    def reserve(
+        self, model: str, prompt_tokens: int, max_tokens: int
+    ) -> Optional[BudgetReservation]:
+        """Reserve the worst-case cost of a call; None if it would exceed the budget"""
+        amount = self.estimate_cost(model, prompt_tokens, max_tokens)
+        with self._lock:
+            if self.total_cost + self.reserved_cost + amount > self.budget:
+                return None
+            self.reserved_cost += amount
+        return BudgetReservation(amount)
+
+    def release(self, reservation: BudgetReservation) -> None:
+        """Return a reservation whose call failed"""
+        with self._lock:
+            self._settle(reservation)
+
+    def reconcile(
+        self,
+        reservation: Optional[BudgetReservation],
+        model: str,
+        completion_tokens: int,
+        prompt_tokens: int,
+        latency: float = 0.0,
+    ) -> float:
+        """Replace a reservation by the call's actual cost and record its usage"""
+        cost = self.estimate_cost(model, prompt_tokens, completion_tokens)
+        record = UsageRecord(
+            model=model,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            latency=latency,
+            cost=cost,
+            **{k: v for k, v in current_labels().items() if k in USAGE_LABELS},
+        )
+        with self._lock:
+            if reservation is not None:
+                self._settle(reservation)
+            self.total_cost += cost
+            self.records.append(record)
+        return cost
+
+    def _settle(self, reservation: BudgetReservation) -> None:
+        if not reservation.settled:
+            reservation.settled = True
+            self.reserved_cost = max(0.0, self.reserved_cost - reservation.amount)
+
+    def update_cost(
+        self, model: str, completion_tokens: int, prompt_tokens: int
+    ) -> None:
+        """Update the total cost with the latest API call."""
+        self.reconcile(None, model, completion_tokens, prompt_tokens)
 
     def is_over_budget(self) -> bool:
         """Check if the cumulative cost has exceeded the budget."""
@@ -73,11 +372,62 @@ class BudgetManager:
         """Return the current total cost."""
         return self.total_cost
 
+    def remaining(self) -> float:
+        """Budget not yet spent or held by in-flight calls"""
+        with self._lock:
+            return max(0.0, self.budget - self.total_cost - self.reserved_cost)
+
+    def usage_report(self) -> Dict[str, Any]:
+        """Summarize recorded usage per stage/task and per crate"""
+        with self._lock:
+            records = list(self.records)
+        return {
+            "budget": self.budget,
+            "total_cost": round(self.total_cost, 6),
+            "calls": len(records),
+            "prompt_tokens": sum(r.prompt_tokens for r in records),
+            "completion_tokens": sum(r.completion_tokens for r in records),
+            "by_stage_task": summarize_usage(records, ("stage", "task")),
+            "by_crate": summarize_usage(records, ("crate",)),
+        }
+
+    def export_report(self, path: str, include_calls: bool = False) -> None:
+        """Write the usage report (optionally with every call) as JSON"""
+        report = self.usage_report()
+        if include_calls:
+            with self._lock:
+                report["call_records"] = [r.to_dict() for r in self.records]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+class CascadeStats:
+    """Per-task counts of small-model answers kept and escalated"""
 
-class Section(TypedDict, total=True):
-    heading: str
-    content: str
-    priority: int
+    def __init__(self) -> None:
+        self.accepted: Dict[str, int] = {}
+        self.escalated: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, task: str, accepted: bool) -> None:
+        counts = self.accepted if accepted else self.escalated
+        with self._lock:
+            counts[task] = counts.get(task, 0) + 1
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Attempts, escalations and escalation rate per task"""
+        with self._lock:
+            tasks = sorted(set(self.accepted) | set(self.escalated))
+            report = {}
+            for task in tasks:
+                accepted = self.accepted.get(task, 0)
+                escalated = self.escalated.get(task, 0)
+                report[task] = {
+                    "attempts": accepted + escalated,
+                    "escalated": escalated,
+                    "escalation_rate": round(escalated / (accepted + escalated), 3),
+                }
+            return report
 
 
 class UnifiedLLMProcessor:
@@ -92,16 +442,36 @@ class UnifiedLLMProcessor:
     - And all other LiteLLM providers
     """
     
-    def __init__(self, config: LLMConfig, budget_manager: Optional[BudgetManager] = None) -> None:
+    def __init__(
+        self,
+        config: LLMConfig,
+        budget_manager: Optional[BudgetManager] = None,
+        cache: Optional[LLMResponseCache] = None,
+        use_case_classifier: Optional[ConfidentUseCaseClassifier] = None,
+    ) -> None:
         self.config = config
         self.logger = logging.getLogger(__name__)
         self.budget_manager = budget_manager or BudgetManager()
+        self.cache = cache
+        self.use_case_classifier = use_case_classifier
+        self.readme_documents = ReadmeDocumentCache()
+        self.cascade_stats = CascadeStats()
+        self.cascade_processor: Optional[UnifiedLLMProcessor] = None
+        self._response_schema_support: Optional[bool] = None
+        self.tier_planner = TierPlanner(self.budget_manager)
         
         if not LITELLM_AVAILABLE:
             raise ImportError("LiteLLM is required. Install with: pip install litellm")
         
         # Configure LiteLLM based on provider
         self._configure_litellm()
+
+        if config.cascade_model:
+            self.cascade_processor = UnifiedLLMProcessor(
+                cascade_config(config), budget_manager=self.budget_manager, cache=cache
+            )
+            # Setting up the small model reconfigures LiteLLM's globals
+            self._configure_litellm()
     
     def _configure_litellm(self) -> None:
         """Configure LiteLLM based on the provider"""
@@ -133,25 +503,11 @@ class UnifiedLLMProcessor:
     
     def _get_model_name(self) -> str:
         """Get the appropriate model name for the provider"""
-        if self.config.provider == "azure":
-            return f"azure/{self.config.model}"
-        elif self.config.provider == "ollama":
-            return self.config.model
-        elif self.config.provider == "lmstudio":
-            return self.config.model
-        else:
-            return self.config.model
+        return provider_model_name(self.config)
     
     def _get_api_base(self) -> Optional[str]:
         """Get the API base URL for the provider"""
-        if self.config.provider == "azure":
-            return self.config.api_base
-        elif self.config.provider == "ollama":
-            return self.config.ollama_host or "http://localhost:11434"
-        elif self.config.provider == "lmstudio":
-            return self.config.lmstudio_host or "http://localhost:1234/v1"
-        else:
-            return self.config.api_base
+        return provider_api_base(self.config)
     
     def estimate_tokens(self, text: str) -> int:
         """Rough token estimation (4 characters per token)"""
@@ -175,81 +531,9 @@ class UnifiedLLMProcessor:
         """Intelligently truncate content to preserve the most important parts"""
         if not content:
             return ""
-
-        # If content is short enough, return it all
-        if self.estimate_tokens(content) <= max_tokens:
-            return content
-
-        # Split into sections based on markdown headers
-        sections: List[Section] = []
-        current_section: Section = {
-            "heading": "Introduction",
-            "content": "",
-            "priority": 10,
-        }
-
-        for line in content.splitlines():
-            if re.match(r"^#+\s+", line):  # It's a header
-                # Save previous section if not empty
-                if current_section["content"].strip():
-                    sections.append(current_section)
-
-                # Create new section with appropriate priority
-                heading = re.sub(r"^#+\s+", "", line)
-                priority = 5  # Default priority
-
-                # Assign priority based on content type
-                if re.search(r"\b(usage|example|getting started)\b", heading, re.I):
-                    priority = 10
-                elif re.search(r"\b(feature|overview|about)\b", heading, re.I):
-                    priority = 9
-                elif re.search(r"\b(install|setup|config)\b", heading, re.I):
-                    priority = 8
-                elif re.search(r"\b(api|interface)\b", heading, re.I):
-                    priority = 7
-
-                current_section = {
-                    "heading": heading,
-                    "content": line + "\n",
-                    "priority": priority,
-                }
-            else:
-                current_section["content"] += line + "\n"
-
-                # Boost priority if code block is found
-                if "```rust" in line or "```no_run" in line:
-                    current_section["priority"] = max(current_section["priority"], 8)
-
-        # Add the last section
-        if current_section["content"].strip():
-            sections.append(current_section)
-
-        # Sort sections by priority (highest first)
-        sections.sort(key=lambda x: x["priority"], reverse=True)
-
-        # Build the result, respecting token limits
-        result = ""
-        tokens_used = 0
-
-        for section in sections:
-            section_text = f'## {section["heading"]}\n{section["content"]}\n'
-            section_tokens = self.estimate_tokens(section_text)
-
-            if tokens_used + section_tokens <= max_tokens:
-                result += section_text
-                tokens_used += section_tokens
-            elif tokens_used < max_tokens - 100:  # If we can fit a truncated version
-                # Take what we can
-                remaining_tokens = max_tokens - tokens_used
-                # Simple truncation by characters
-                max_chars = remaining_tokens * 4
-                if len(section_text) > max_chars:
-                    result += section_text[:max_chars] + "..."
-                else:
-                    result += section_text
-                break
-
-        return result
+        # Lower quality tiers get shorter excerpts
+        max_tokens = max(1, int(max_tokens * current_tier().truncation))
+        return self.readme_documents.get(content).truncate(max_tokens)
 
     def clean_output(self, output: str, task: str = "general") -> str:
         """Task-specific output cleaning"""
@@ -261,19 +545,7 @@ class UnifiedLLMProcessor:
 
         if task == "classification":
             # For classification tasks, extract just the category
-            categories = [
-                "AI",
-                "Database",
-                "Web Framework",
-                "Networking",
-                "Serialization",
-                "Utilities",
-                "DevTools",
-                "ML",
-                "Cryptography",
-                "Unknown",
-            ]
-            for category in categories:
+            for category in USE_CASE_CATEGORIES:
                 if re.search(
                     r"\b" + re.escape(category) + r"\b", output, re.IGNORECASE
                 ):
@@ -299,24 +571,16 @@ class UnifiedLLMProcessor:
 
         return output
 
-    def call_llm(
-        self, 
-        prompt: str, 
-        temperature: Optional[float] = None, 
-        max_tokens: Optional[int] = None,
-        system_message: str = "You are a helpful AI assistant that analyzes Rust crates and provides insights."
-    ) -> Optional[str]:
-        """Call the LLM with the given prompt and parameters."""
-        
-        if self.budget_manager and self.budget_manager.is_over_budget():
-            self.logger.warning("Budget exceeded. Skipping LLM call.")
-            return None
-
-        model_name = self._get_model_name()
-        
-        # Prepare arguments for the completion call
+    def _build_completion_args(
+        self,
+        prompt: str,
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        system_message: str,
+        response_format: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Prepare the arguments for a LiteLLM completion call"""
         args: Dict[str, Any] = {
-            "model": model_name,
             "messages": [
                 {"role": "system", "content": system_message},
                 {"role": "user", "content": prompt}
@@ -327,28 +591,266 @@ class UnifiedLLMProcessor:
         }
         
         # Provider-specific arguments
-        if self.config.provider == "azure":
-            args["api_base"] = self.config.api_base
-            args["api_key"] = self.config.api_key
-            args["api_version"] = self.config.azure_api_version
-            # For Azure, model can be just the deployment name
-            args["model"] = self.config.azure_deployment or self.config.model
-        else:
-            args["api_base"] = self._get_api_base()
-            args["api_key"] = self.config.api_key
+        args.update(connection_args(self.config))
+
+        if response_format:
+            args["response_format"] = response_format
+
+        return args
 
+    def _complete(
+        self, args: Dict[str, Any], stop_when: Optional[AnswerDetector] = None
+    ) -> "Tuple[Any, str]":
+        """Send a completion request; returns the response and its serving model"""
+        response = completion(**args)
+        if stop_when:
+            response = self._read_stream(response, args, stop_when)
+        return response, self._get_model_name()
+
+    async def _acomplete(
+        self, args: Dict[str, Any], stop_when: Optional[AnswerDetector] = None
+    ) -> "Tuple[Any, str]":
+        """Async variant of _complete, limited per provider endpoint"""
+        semaphore = get_provider_semaphore(
+            self.config.provider,
+            args.get("api_base"),
+            self.config.max_concurrent_requests,
+        )
+        async with semaphore:
+            response = await acompletion(**args)
+            if stop_when:
+                response = await self._aread_stream(response, args, stop_when)
+            return response, self._get_model_name()
+
+    def _stream_args(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn completion arguments into a streaming request"""
+        args = dict(args, stream=True)
+        if self.config.provider in ("openai", "azure"):
+            args["stream_options"] = {"include_usage": True}
+        return args
+
+    def _read_stream(
+        self, stream: Any, args: Dict[str, Any], stop_when: AnswerDetector
+    ) -> Any:
+        """Consume a completion stream until ``stop_when`` detects the answer"""
+        accumulator = StreamAccumulator(stop_when)
         try:
-            response = completion(**args)
-            
-            # Update budget
-            if self.budget_manager:
-                completion_tokens = response.usage.completion_tokens # type: ignore
-                prompt_tokens = response.usage.prompt_tokens # type: ignore
-                self.budget_manager.update_cost(model=model_name, completion_tokens=completion_tokens, prompt_tokens=prompt_tokens)
+            for chunk in stream:
+                if accumulator.add_chunk(chunk):
+                    break
+        finally:
+            close = getattr(stream, "close", None)
+            if accumulator.stopped_early and callable(close):
+                close()
+        return self._streamed_response(accumulator, args)
+
+    async def _aread_stream(
+        self, stream: Any, args: Dict[str, Any], stop_when: AnswerDetector
+    ) -> Any:
+        """Async variant of _read_stream"""
+        accumulator = StreamAccumulator(stop_when)
+        try:
+            async for chunk in stream:
+                if accumulator.add_chunk(chunk):
+                    break
+        finally:
+            aclose = getattr(stream, "aclose", None)
+            if accumulator.stopped_early and callable(aclose):
+                await aclose()
+        return self._streamed_response(accumulator, args)
+
+    def _streamed_response(
+        self, accumulator: StreamAccumulator, args: Dict[str, Any]
+    ) -> Any:
+        """Build a response object from a consumed stream.
+
+        A stream cut short never reports usage, so it is counted locally.
+        """
+        usage = accumulator.usage
+        if usage is None:
+            try:
+                completion_tokens = litellm.token_counter(
+                    model=args["model"], text=accumulator.text
+                )
+            except Exception:
+                completion_tokens = self.estimate_tokens(accumulator.text)
+            usage = SimpleNamespace(
+                prompt_tokens=self._count_prompt_tokens(args),
+                completion_tokens=completion_tokens,
+            )
+        if accumulator.stopped_early:
+            self.logger.debug(
+                f"Stopped generation early at answer '{accumulator.answer}'"
+            )
+        return SimpleNamespace(
+            choices=[
+                SimpleNamespace(message=SimpleNamespace(content=accumulator.content))
+            ],
+            usage=usage,
+            stopped_early=accumulator.stopped_early,
+        )
+
+    def _count_prompt_tokens(self, args: Dict[str, Any]) -> int:
+        """Count the prompt tokens of a request for budget reservation"""
+        try:
+            return litellm.token_counter(model=args["model"], messages=args["messages"])
+        except Exception:
+            return sum(self.estimate_tokens(m["content"]) for m in args["messages"])
+
+    def _reserve_budget(self, args: Dict[str, Any]) -> Optional[BudgetReservation]:
+        """Reserve the worst-case cost of a request; None if over budget"""
+        reservation = self.budget_manager.reserve(
+            self._get_model_name(), self._count_prompt_tokens(args), args["max_tokens"]
+        )
+        if reservation is None:
+            self.logger.warning("Budget exceeded. Skipping LLM call.")
+        return reservation
+
+    def _handle_response(
+        self,
+        response: Any,
+        model: Optional[str] = None,
+        reservation: Optional[BudgetReservation] = None,
+        latency: float = 0.0,
+    ) -> Optional[str]:
+        """Record usage for a completion response and return its text"""
+        content = response.choices[0].message.content # type: ignore
+        # LiteLLM reports the provider call's own duration, excluding queueing
+        response_ms = getattr(response, "_response_ms", None)
+        if isinstance(response_ms, (int, float)):
+            latency = response_ms / 1000
+        self.budget_manager.reconcile(
+            reservation,
+            model=model or self._get_model_name(),
+            completion_tokens=response.usage.completion_tokens, # type: ignore
+            prompt_tokens=response.usage.prompt_tokens, # type: ignore
+            latency=latency,
+        )
+        return content
+
+    def _cache_key(
+        self, args: Dict[str, Any], prompt: str, system_message: str
+    ) -> Optional[str]:
+        """Return the response cache key for a completion request, if caching"""
+        if not self.cache:
+            return None
+        return LLMResponseCache.make_key(
+            provider=self.config.provider,
+            model=args["model"],
+            system_message=system_message,
+            prompt=prompt,
+            temperature=args["temperature"],
+            max_tokens=args["max_tokens"],
+            extra=(
+                {"response_format": args["response_format"]}
+                if "response_format" in args
+                else None
+            ),
+        )
+
+    def call_llm(
+        self, 
+        prompt: str, 
+        temperature: Optional[float] = None, 
+        max_tokens: Optional[int] = None,
+        system_message: str = DEFAULT_SYSTEM_MESSAGE,
+        use_cache: bool = True,
+        response_format: Optional[Dict[str, Any]] = None,
+        stop_when: Optional[AnswerDetector] = None,
+        grammar: Optional[OutputGrammar] = None
+    ) -> Optional[str]:
+        """Call the LLM with the given prompt and parameters.
 
-            return response.choices[0].message.content # type: ignore
+        With ``use_cache=False`` the cached response is ignored (as for a
+        retry after a failed validation) and replaced by the fresh one.
+        With ``stop_when`` the response is streamed and generation stops as
+        soon as the detector finds a complete answer, which is returned.
+        With ``grammar`` the model is held to that output format when it
+        supports strict JSON schemas, and the answer is returned as text.
+        """
+        if current_tier().cheap_model and self.cascade_processor:
+            return self.cascade_processor.call_llm(
+                prompt, temperature, max_tokens, system_message,
+                use_cache, response_format, stop_when, grammar
+            )
+        args = self._build_completion_args(
+            prompt, temperature, max_tokens, system_message,
+            response_format or self._grammar_response_format(grammar)
+        )
+        cache_key = self._cache_key(args, prompt, system_message)
+        if cache_key and use_cache:
+            cached = self.cache.get(cache_key)  # type: ignore[union-attr]
+            if cached is not None:
+                return self._decode(grammar, cached)
+
+        reservation = self._reserve_budget(args)
+        if reservation is None:
+            return None
+
+        try:
+            started = time.monotonic()
+            request = self._stream_args(args) if stop_when else args
+            response, model = self._complete(request, stop_when)
+            content = self._handle_response(
+                response, model, reservation, time.monotonic() - started
+            )
+            if cache_key and content:
+                self.cache.set(cache_key, content)  # type: ignore[union-attr]
+            return self._decode(grammar, content)
             
         except Exception as e:
+            self.budget_manager.release(reservation)
+            self.logger.error(f"LLM call failed: {e}")
+            return None
+
+    async def acall_llm(
+        self,
+        prompt: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        system_message: str = DEFAULT_SYSTEM_MESSAGE,
+        use_cache: bool = True,
+        response_format: Optional[Dict[str, Any]] = None,
+        stop_when: Optional[AnswerDetector] = None,
+        grammar: Optional[OutputGrammar] = None
+    ) -> Optional[str]:
+        """Async variant of call_llm that never blocks the event loop.
+
+        Concurrent calls are limited per provider endpoint by
+        ``LLMConfig.max_concurrent_requests``.
+        """
+        if current_tier().cheap_model and self.cascade_processor:
+            return await self.cascade_processor.acall_llm(
+                prompt, temperature, max_tokens, system_message,
+                use_cache, response_format, stop_when, grammar
+            )
+        args = self._build_completion_args(
+            prompt, temperature, max_tokens, system_message,
+            response_format or self._grammar_response_format(grammar)
+        )
+        cache_key = self._cache_key(args, prompt, system_message)
+        if cache_key and use_cache:
+            cached = self.cache.get(cache_key)  # type: ignore[union-attr]
+            if cached is not None:
+                return self._decode(grammar, cached)
+
+        reservation = self._reserve_budget(args)
+        if reservation is None:
+            return None
+
+        try:
+            started = time.monotonic()
+            request = self._stream_args(args) if stop_when else args
+            response, model = await self._acomplete(request, stop_when)
+            content = self._handle_response(
+                response, model, reservation, time.monotonic() - started
+            )
+            if cache_key and content:
+                self.cache.set(cache_key, content)  # type: ignore[union-attr]
+            return self._decode(grammar, content)
+
+        except Exception as e:
+            self.budget_manager.release(reservation)
             self.logger.error(f"LLM call failed: {e}")
             return None
 
@@ -359,14 +861,20 @@ class UnifiedLLMProcessor:
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
         retries: Optional[int] = None,
-        system_message: str = "You are a helpful AI assistant that analyzes Rust crates and provides insights."
+        system_message: str = DEFAULT_SYSTEM_MESSAGE,
+        stop_when: Optional[AnswerDetector] = None,
+        grammar: Optional[OutputGrammar] = None
     ) -> Optional[str]:
         """Call LLM with validation and retry logic"""
         max_retries = retries if retries is not None else self.config.max_retries
         
         for attempt in range(max_retries + 1):
             try:
-                result = self.call_llm(prompt, temperature, max_tokens, system_message)
+                # A cached answer that failed validation must not be replayed
+                result = self.call_llm(
+                    prompt, temperature, max_tokens, system_message,
+                    use_cache=attempt == 0, stop_when=stop_when, grammar=grammar
+                )
                 if result and validation_func(result):
                     return result
                     
@@ -382,6 +890,44 @@ class UnifiedLLMProcessor:
         self.logger.error(f"Failed after {max_retries + 1} attempts")
         return None
 
+    async def avalidate_and_retry(
+        self,
+        prompt: str,
+        validation_func: Callable[[str], bool],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        retries: Optional[int] = None,
+        system_message: str = DEFAULT_SYSTEM_MESSAGE,
+        stop_when: Optional[AnswerDetector] = None,
+        grammar: Optional[OutputGrammar] = None
+    ) -> Optional[str]:
+        """Async variant of validate_and_retry using non-blocking backoff"""
+        max_retries = retries if retries is not None else self.config.max_retries
+
+        for attempt in range(max_retries + 1):
+            try:
+                result = await self.acall_llm(
+                    prompt, temperature, max_tokens, system_message,
+                    use_cache=attempt == 0, stop_when=stop_when, grammar=grammar
+                )
+                if result and validation_func(result):
+                    return result
+
+                if attempt < max_retries:
+                    self.logger.warning(
+                        "Validation failed, retrying... "
+                        f"(attempt {attempt + 1}/{max_retries})"
+                    )
+                    await asyncio.sleep(1 * (attempt + 1))
+
+            except Exception as e:
+                self.logger.error(f"Error in attempt {attempt + 1}: {str(e)}")
+                if attempt < max_retries:
+                    await asyncio.sleep(1 * (attempt + 1))
+
+        self.logger.error(f"Failed after {max_retries + 1} attempts")
+        return None
+
     def simplify_prompt(self, prompt: str) -> str:
         """Simplify prompt for better LLM understanding"""
         # Remove excessive whitespace and normalize
@@ -391,42 +937,700 @@ class UnifiedLLMProcessor:
 
     def validate_classification(self, result: str) -> bool:
         """Validate classification output"""
-        categories = ["AI", "Database", "Web Framework", "Networking", "Serialization", 
-                     "Utilities", "DevTools", "ML", "Cryptography", "Unknown"]
-        return any(cat.lower() in result.lower() for cat in categories)
+        return any(cat.lower() in result.lower() for cat in USE_CASE_CATEGORIES)
 
     def validate_factual_pairs(self, result: str) -> bool:
         """Validate factual pairs output"""
         return "✅" in result and "❌" in result
 
+    @usage_labels(stage="enrichment")
     def enrich_crate(self, crate: CrateMetadata) -> EnrichedCrate:
-        """Enrich a crate with LLM analysis"""
+        """Enrich a crate with LLM analysis at its budget's quality tier"""
         self.logger.info(f"Enriching crate: {crate.name}")
+        if not crate.readme:
+            self.tier_planner.skip(crate.name)
+            return EnrichedCrate(**crate.__dict__)
+
+        tier = self.choose_quality_tier(crate)
+        with tier_scope(tier):
+            if self.config.enrichment_mode == "structured" and tier.tasks == ALL_TASKS:
+                enriched = self.enrich_crate_structured(crate)
+            else:
+                enriched = EnrichedCrate(**crate.__dict__)
+                # Only classification needs another task's output (the
+                # summary); everything else runs in parallel
+                results = run_task_graph_threaded(
+                    self._enrichment_tasks(crate, tier.tasks, use_async=False),
+                    max_workers=self.config.max_concurrent_requests,
+                )
+                self._apply_enrichment_results(enriched, results)
+        return self._finish_tier(enriched, tier)
+
+    @usage_labels(stage="enrichment")
+    async def aenrich_crate(self, crate: CrateMetadata) -> EnrichedCrate:
+        """Async variant of enrich_crate that keeps the event loop responsive"""
+        self.logger.info(f"Enriching crate: {crate.name}")
+        if not crate.readme:
+            self.tier_planner.skip(crate.name)
+            return EnrichedCrate(**crate.__dict__)
+
+        tier = self.choose_quality_tier(crate)
+        with tier_scope(tier):
+            if self.config.enrichment_mode == "structured" and tier.tasks == ALL_TASKS:
+                enriched = await self.aenrich_crate_structured(crate)
+            else:
+                enriched = EnrichedCrate(**crate.__dict__)
+                results = await run_task_graph(
+                    self._enrichment_tasks(crate, tier.tasks, use_async=True)
+                )
+                self._apply_enrichment_results(enriched, results)
+        return self._finish_tier(enriched, tier)
+
+    def _enrichment_tasks(
+        self, crate: CrateMetadata, tasks: "Tuple[str, ...]", use_async: bool
+    ) -> List[EnrichmentTask]:
+        """Task graph for the given per-crate enrichment tasks"""
+        graph = {
+            "readme_summary": EnrichmentTask(
+                "readme_summary",
+                lambda _: (
+                    self.asummarize_features(crate)
+                    if use_async
+                    else self.summarize_features(crate)
+                ),
+            ),
+            "use_case": EnrichmentTask(
+                "use_case",
+                lambda deps: (
+                    self.aclassify_use_case(crate, deps["readme_summary"] or "")
+                    if use_async
+                    else self.classify_use_case(crate, deps["readme_summary"] or "")
+                ),
+                depends_on=("readme_summary",),
+            ),
+            "factual_counterfactual": EnrichmentTask(
+                "factual_counterfactual",
+                lambda _: (
+                    self.agenerate_factual_pairs(crate)
+                    if use_async
+                    else self.generate_factual_pairs(crate)
+                ),
+            ),
+            "score": EnrichmentTask(
+                "score",
+                lambda _: (
+                    self.ascore_crate(crate) if use_async else self.score_crate(crate)
+                ),
+            ),
+        }
+        return [graph[task] for task in tasks]
+
+    def plan_quality_tiers(self, total_crates: int) -> None:
+        """Spread the remaining budget over a run of ``total_crates`` crates"""
+        self.tier_planner = TierPlanner(self.budget_manager, total_crates)
+
+    def choose_quality_tier(self, crate: CrateMetadata) -> QualityTier:
+        """Pick the quality tier this crate's share of the budget pays for"""
+        tier = self.tier_planner.choose(
+            crate.name, crate.downloads, lambda t: self.estimate_tier_cost(crate, t)
+        )
+        if tier.name != "full":
+            self.logger.info(f"Enriching {crate.name} at the {tier.name} quality tier")
+        return tier
+
+    def estimate_tier_cost(self, crate: CrateMetadata, tier: QualityTier) -> float:
+        """Worst-case cost of enriching a crate at a tier"""
+        processor = (
+            self.cascade_processor
+            if tier.cheap_model and self.cascade_processor
+            else self
+        )
+        prompts = {
+            "readme_summary": lambda: self._summary_prompt(crate),
+            "use_case": lambda: self._classification_prompt(crate, ""),
+            "factual_counterfactual": lambda: self._factual_pairs_prompt(crate),
+            "score": lambda: self._score_prompt(crate),
+        }
+        cost = 0.0
+        with tier_scope(tier):
+            for task in tier.tasks:
+                settings = TASK_SETTINGS[task]
+                args = processor._build_completion_args(
+                    prompts[task](), settings["temperature"], settings["max_tokens"],
+                    settings["system_message"]
+                )
+                prompt_tokens = processor._count_prompt_tokens(args)
+                if task == "use_case":
+                    # The classification prompt embeds the generated summary
+                    prompt_tokens += TASK_SETTINGS["readme_summary"]["max_tokens"]
+                cost += self.budget_manager.estimate_cost(
+                    processor._get_model_name(), prompt_tokens, settings["max_tokens"]
+                )
+        return cost
+
+    def _finish_tier(self, enriched: EnrichedCrate, tier: QualityTier) -> EnrichedCrate:
+        """Record the tier and fill what the metadata tier can without an LLM"""
+        enriched.enrichment_tier = tier.name
+        if not tier.tasks:
+            enriched.readme_summary = enriched.description or None
+            if self.use_case_classifier:
+                enriched.use_case = self.use_case_classifier.model.predict(
+                    features_for_crate(enriched)
+                )[0]
+        return enriched
+
+    def _apply_enrichment_results(
+        self, enriched: EnrichedCrate, results: Dict[str, Any]
+    ) -> None:
+        """Copy task graph results onto the enriched crate"""
+        for field_name, value in results.items():
+            if value is not None:
+                setattr(enriched, field_name, value)
+
+    @usage_labels(stage="batched_enrichment")
+    async def aenrich_crates(
+        self, crates: List[CrateMetadata], batch_size: Optional[int] = None
+    ) -> List[EnrichedCrate]:
+        """Enrich many crates, packing cheap tasks into multi-crate prompts.
+
+        Summaries and factual pairs are generated per crate (concurrently);
+        classification and scoring are issued for ``batch_size`` crates per
+        request. Entries that are missing or fail validation in a batched
+        response are re-issued individually.
+        """
+        size = batch_size or self.config.enrichment_batch_size
+        enriched_crates = [EnrichedCrate(**crate.__dict__) for crate in crates]
+        tiers: Dict[str, QualityTier] = {}
+        for enriched in enriched_crates:
+            if not enriched.readme:
+                self.tier_planner.skip(enriched.name)
+                continue
+            tier = self.choose_quality_tier(enriched)
+            self._finish_tier(enriched, tier)
+            if tier.tasks:
+                tiers[enriched.name] = tier
+
+        def having(task: str) -> List[EnrichedCrate]:
+            return [
+                e
+                for e in enriched_crates
+                if task in getattr(tiers.get(e.name), "tasks", ())
+            ]
+
+        with_summary = having("readme_summary")
+        if not with_summary:
+            return enriched_crates
+
+        summaries = await asyncio.gather(
+            *(
+                self._in_tier(tiers[c.name], self.asummarize_features(c))
+                for c in with_summary
+            )
+        )
+        for enriched, summary in zip(with_summary, summaries):
+            enriched.readme_summary = summary
+
+        with_pairs = having("factual_counterfactual")
+        factual_pairs, use_cases, scores = await asyncio.gather(
+            asyncio.gather(
+                *(
+                    self._in_tier(tiers[c.name], self.agenerate_factual_pairs(c))
+                    for c in with_pairs
+                )
+            ),
+            self._abatch_by_tier(
+                having("use_case"), tiers,
+                lambda group: self.abatch_classify_use_cases(
+                    group, [c.readme_summary or "" for c in group], size
+                ),
+            ),
+            self._abatch_by_tier(
+                having("score"),
+                tiers,
+                lambda group: self.abatch_score_crates(group, size),
+            ),
+        )
+        for enriched, pairs in zip(with_pairs, factual_pairs):
+            enriched.factual_counterfactual = pairs
+        for enriched in enriched_crates:
+            enriched.use_case = use_cases.get(enriched.name, enriched.use_case)
+            enriched.score = scores.get(enriched.name, enriched.score)
+
+        return enriched_crates
+
+    async def _in_tier(self, tier: QualityTier, awaitable: Any) -> Any:
+        """Await a per-crate call under that crate's quality tier"""
+        with tier_scope(tier):
+            return await awaitable
+
+    async def _abatch_by_tier(
+        self,
+        crates: List[EnrichedCrate],
+        tiers: Dict[str, QualityTier],
+        run_batch: Callable[[List[EnrichedCrate]], Any],
+    ) -> Dict[str, Any]:
+        """Run a multi-crate batched task once per tier and merge the answers"""
+        groups: Dict[str, List[EnrichedCrate]] = {}
+        for crate in crates:
+            groups.setdefault(tiers[crate.name].name, []).append(crate)
+        results = await asyncio.gather(
+            *(
+                self._in_tier(tiers[group[0].name], run_batch(group))
+                for group in groups.values()
+            )
+        )
+        merged: Dict[str, Any] = {}
+        for result in results:
+            merged.update(result)
+        return merged
+
+    def _parse_batch_response(self, result: Optional[str]) -> Dict[str, Dict[str, Any]]:
+        """Parse a JSON array of per-crate entries keyed by the "crate" field"""
+        if not result:
+            return {}
+
+        text = result.strip()
+        # Tolerate markdown code fences and leading prose around the array
+        fence = re.search(r"```(?:json)?\s*(.*?)```", text, re.DOTALL)
+        if fence:
+            text = fence.group(1).strip()
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            start, end = text.find("["), text.rfind("]")
+            if start == -1 or end <= start:
+                return {}
+            try:
+                data = json.loads(text[start:end + 1])
+            except json.JSONDecodeError:
+                return {}
+
+        if isinstance(data, dict):
+            data = next((v for v in data.values() if isinstance(v, list)), [])
+        if not isinstance(data, list):
+            return {}
+
+        entries: Dict[str, Dict[str, Any]] = {}
+        for entry in data:
+            if isinstance(entry, dict) and isinstance(entry.get("crate"), str):
+                entries[entry["crate"]] = entry
+        return entries
+
+    def _batch_classification_prompt(
+        self, crates: List[CrateMetadata], summaries: List[str]
+    ) -> str:
+        lines = [
+            "Classify the primary use case of each Rust crate below into exactly "
+            "one of: " + ", ".join(USE_CASE_CATEGORIES) + ".",
+            "",
+        ]
+        for crate, summary in zip(crates, summaries):
+            lines.append(f"Crate: {crate.name}")
+            lines.append(f"Description: {crate.description}")
+            lines.append(f"Summary: {summary}")
+            lines.append(f"Keywords: {', '.join(crate.keywords)}")
+            lines.append(f"Categories: {', '.join(crate.categories)}")
+            lines.append("")
+        lines.append(
+            'Respond with only a JSON array with one object per crate, e.g. '
+            '[{"crate": "serde", "use_case": "Serialization"}].'
+        )
+        return "\n".join(lines)
+
+    @usage_labels(task="use_case_batch")
+    async def abatch_classify_use_cases(
+        self, crates: List[CrateMetadata], summaries: List[str], batch_size: int
+    ) -> Dict[str, str]:
+        """Classify crates ``batch_size`` at a time, retrying failures individually.
+
+        Crates the local classifier is confident about are answered first
+        and left out of the batches.
+        """
+        results: Dict[str, str] = {}
+        retry: List[Tuple[CrateMetadata, str]] = []
+
+        if self.use_case_classifier:
+            remaining = []
+            for crate, summary in zip(crates, summaries):
+                answer = self.use_case_classifier.answer_locally(crate, summary)
+                if answer:
+                    results[crate.name] = answer
+                else:
+                    remaining.append((crate, summary))
+            crates = [crate for crate, _ in remaining]
+            summaries = [summary for _, summary in remaining]
+
+        async def run_batch(
+            chunk: List[CrateMetadata], chunk_summaries: List[str]
+        ) -> None:
+            response = await self.acall_llm(
+                self._batch_classification_prompt(chunk, chunk_summaries),
+                temperature=0.1,
+                max_tokens=20 * len(chunk) + 20,
+                system_message=TASK_SETTINGS["use_case"]["system_message"],
+            )
+            entries = self._parse_batch_response(response)
+            for crate, summary in zip(chunk, chunk_summaries):
+                use_case = entries.get(crate.name, {}).get("use_case")
+                category = self._match_category(use_case)
+                if category:
+                    results[crate.name] = category
+                else:
+                    retry.append((crate, summary))
+
+        await asyncio.gather(*(
+            run_batch(crates[i:i + batch_size], summaries[i:i + batch_size])
+            for i in range(0, len(crates), batch_size)
+        ))
+
+        if retry:
+            self.logger.info(f"Re-issuing {len(retry)} classifications individually")
+            individual = await asyncio.gather(
+                *(
+                    self._allm_classify_use_case(crate, summary)
+                    for crate, summary in retry
+                )
+            )
+            for (crate, _), use_case in zip(retry, individual):
+                results[crate.name] = use_case
+
+        if self.use_case_classifier:
+            for crate, summary in zip(crates, summaries):
+                results[crate.name] = self.use_case_classifier.observe(
+                    crate, summary, results.get(crate.name)
+                )
+
+        return results
+
+    def _batch_score_prompt(self, crates: List[CrateMetadata]) -> str:
+        lines = [
+            "Rate each Rust crate below on a scale of 0.0 to 10.0 based on "
+            "documentation quality, feature completeness, community adoption, code "
+            "quality indicators and practical usefulness.",
+            "",
+        ]
+        for crate in crates:
+            lines.append(f"Crate: {crate.name} v{crate.version}")
+            lines.append(f"Description: {crate.description}")
+            lines.append(f"Downloads: {crate.downloads}")
+            lines.append(f"GitHub Stars: {crate.github_stars}")
+            lines.append(f"Keywords: {', '.join(crate.keywords)}")
+            lines.append(f"README excerpt: {self.smart_truncate(crate.readme, 250)}")
+            lines.append("")
+        lines.append(
+            'Respond with only a JSON array with one object per crate, e.g. '
+            '[{"crate": "serde", "score": 9.5}].'
+        )
+        return "\n".join(lines)
+
+    @usage_labels(task="score_batch")
+    async def abatch_score_crates(
+        self, crates: List[CrateMetadata], batch_size: int
+    ) -> Dict[str, float]:
+        """Score crates ``batch_size`` at a time, retrying failures individually"""
+        results: Dict[str, float] = {}
+        retry: List[CrateMetadata] = []
+
+        async def run_batch(chunk: List[CrateMetadata]) -> None:
+            response = await self.acall_llm(
+                self._batch_score_prompt(chunk),
+                temperature=0.2,
+                max_tokens=15 * len(chunk) + 20,
+                system_message=TASK_SETTINGS["score"]["system_message"],
+            )
+            entries = self._parse_batch_response(response)
+            for crate in chunk:
+                score = entries.get(crate.name, {}).get("score")
+                if isinstance(score, (int, float)) and 0.0 <= score <= 10.0:
+                    results[crate.name] = float(score)
+                else:
+                    retry.append(crate)
+
+        await asyncio.gather(
+            *(
+                run_batch(crates[i : i + batch_size])
+                for i in range(0, len(crates), batch_size)
+            )
+        )
+
+        if retry:
+            self.logger.info(f"Re-issuing {len(retry)} scores individually")
+            individual = await asyncio.gather(
+                *(self.ascore_crate(crate) for crate in retry)
+            )
+            for crate, score in zip(retry, individual):
+                results[crate.name] = score
+
+        return results
+
+    def _match_category(self, value: Any) -> Optional[str]:
+        """Return the canonical category name for an exact (case-insensitive) match"""
+        if not isinstance(value, str):
+            return None
+        for category in USE_CASE_CATEGORIES:
+            if category.lower() == value.strip().lower():
+                return category
+        return None
+
+    def _structured_enrichment_prompt(self, crate: CrateMetadata) -> str:
+        """Prompt requesting every enrichment field as one JSON object"""
+        prompt = f"""
+        Analyze the Rust crate '{crate.name}' and respond with a single JSON
+        object with these fields:
+        - "readme_summary": concise summary (2-3 sentences) of what the crate
+          does and its main features
+        - "use_case": the primary use case, exactly one of:
+          {', '.join(USE_CASE_CATEGORIES)}
+        - "factual_pairs": {FACTUAL_PAIRS_MIN}-{FACTUAL_PAIRS_MAX} objects with a
+          "factual" statement that is true about the crate and a "counterfactual"
+          statement that sounds plausible but is false
+        - "score": a number between 0.0 and 10.0 rating documentation quality,
+          feature completeness, community adoption, code quality indicators and
+          practical usefulness
         
-        # Create enriched crate with base metadata
-        enriched = EnrichedCrate(**crate.__dict__)
+        Crate: {crate.name} v{crate.version}
+        Description: {crate.description}
+        Downloads: {crate.downloads}
+        GitHub Stars: {crate.github_stars}
+        Keywords: {', '.join(crate.keywords)}
+        Categories: {', '.join(crate.categories)}
         
-        # Summarize README
-        if crate.readme:
-            readme_summary = self.summarize_features(crate)
-            enriched.readme_summary = readme_summary
-            
-            # Classify use case
-            use_case = self.classify_use_case(crate, readme_summary)
-            enriched.use_case = use_case
-            
-            # Generate factual pairs
-            factual_pairs = self.generate_factual_pairs(crate)
-            enriched.factual_counterfactual = factual_pairs
-            
-            # Score crate
-            score = self.score_crate(crate)
-            enriched.score = score
+        README Content:
+        {self.smart_truncate(crate.readme, 2000)}
         
+        Respond with only the JSON object.
+        """
+        return self.simplify_prompt(prompt)
+
+    def _litellm_provider(self) -> Optional[str]:
+        """LiteLLM's provider name for capability lookups"""
+        return {"ollama": "ollama", "lmstudio": "lm_studio", "azure": "azure"}.get(
+            self.config.provider
+        )
+
+    def _supports_response_schema(self) -> bool:
+        """Whether the model accepts a strict JSON-schema response format"""
+        if self._response_schema_support is None:
+            model = self._build_completion_args("", None, None, "")["model"]
+            try:
+                self._response_schema_support = bool(litellm.supports_response_schema(
+                    model=model, custom_llm_provider=self._litellm_provider()
+                ))
+            except Exception as e:
+                self.logger.debug(
+                    f"Could not determine structured output support for {model}: {e}"
+                )
+                self._response_schema_support = False
+        return self._response_schema_support
+
+    def _grammar_response_format(
+        self, grammar: Optional[OutputGrammar]
+    ) -> Optional[Dict[str, Any]]:
+        """Response format enforcing ``grammar``, if the model supports it"""
+        if grammar and self._supports_response_schema():
+            return grammar.response_format()
+        return None
+
+    def _decode(
+        self, grammar: Optional[OutputGrammar], content: Optional[str]
+    ) -> Optional[str]:
+        """Render a grammar-constrained JSON answer in the task's text format"""
+        return grammar.decode(content) if grammar and content else content
+
+    def _task_grammar(self, task: str) -> Optional[OutputGrammar]:
+        """Output grammar for a task, if constrained decoding is enabled"""
+        return TASK_GRAMMARS.get(task) if self.config.constrained_decoding else None
+
+    def _structured_response_format(self) -> Optional[Dict[str, Any]]:
+        """Pick the strongest structured-output mode the provider supports"""
+        if self._supports_response_schema():
+            return {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": "crate_enrichment",
+                    "schema": STRUCTURED_ENRICHMENT_SCHEMA,
+                    "strict": True,
+                },
+            }
+        model = self._build_completion_args("", None, None, "")["model"]
+        try:
+            supported = litellm.get_supported_openai_params(
+                model=model, custom_llm_provider=self._litellm_provider()
+            ) or []
+            if "response_format" in supported:
+                return {"type": "json_object"}
+        except Exception as e:
+            self.logger.debug(
+                f"Could not determine structured output support for {model}: {e}"
+            )
+        # Fall back to prompt-only JSON; the response is validated either way
+        return None
+
+    def _parse_structured_enrichment(self, result: Optional[str]) -> Dict[str, Any]:
+        """Parse a structured enrichment response, keeping only valid fields"""
+        if not result:
+            return {}
+        text = result.strip()
+        fence = re.search(r"```(?:json)?\s*(.*?)```", text, re.DOTALL)
+        if fence:
+            text = fence.group(1).strip()
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            start, end = text.find("{"), text.rfind("}")
+            if start == -1 or end <= start:
+                return {}
+            try:
+                data = json.loads(text[start:end + 1])
+            except json.JSONDecodeError:
+                return {}
+        if not isinstance(data, dict):
+            return {}
+
+        fields: Dict[str, Any] = {}
+
+        summary = data.get("readme_summary")
+        if isinstance(summary, str) and summary.strip():
+            fields["readme_summary"] = summary.strip()
+
+        use_case = self._match_category(data.get("use_case"))
+        if use_case:
+            fields["use_case"] = use_case
+
+        pairs = data.get("factual_pairs")
+        if isinstance(pairs, list):
+            formatted = [
+                f"✅ Factual: {pair['factual'].strip()}\n"
+                f"❌ Counterfactual: {pair['counterfactual'].strip()}"
+                for pair in pairs
+                if isinstance(pair, dict)
+                and isinstance(pair.get("factual"), str)
+                and pair["factual"].strip()
+                and isinstance(pair.get("counterfactual"), str)
+                and pair["counterfactual"].strip()
+            ]
+            if formatted:
+                fields["factual_counterfactual"] = "\n\n".join(formatted)
+
+        score = data.get("score")
+        if (
+            isinstance(score, (int, float))
+            and not isinstance(score, bool)
+            and 0.0 <= score <= 10.0
+        ):
+            fields["score"] = float(score)
+
+        return fields
+
+    def _structured_fallback_tasks(
+        self, crate: CrateMetadata, fields: Dict[str, Any], use_async: bool
+    ) -> List[EnrichmentTask]:
+        """Per-field tasks for whatever the structured response did not provide"""
+        tasks: List[EnrichmentTask] = []
+        summary = fields.get("readme_summary")
+        if summary is None:
+            tasks.append(
+                EnrichmentTask(
+                    "readme_summary",
+                    lambda _: (
+                        self.asummarize_features(crate)
+                        if use_async
+                        else self.summarize_features(crate)
+                    ),
+                )
+            )
+        if "use_case" not in fields:
+            def classify(deps: Dict[str, Any]) -> Any:
+                readme_summary = deps.get("readme_summary") or summary or ""
+                if use_async:
+                    return self.aclassify_use_case(crate, readme_summary)
+                return self.classify_use_case(crate, readme_summary)
+            depends = ("readme_summary",) if summary is None else ()
+            tasks.append(EnrichmentTask("use_case", classify, depends_on=depends))
+        if "factual_counterfactual" not in fields:
+            tasks.append(
+                EnrichmentTask(
+                    "factual_counterfactual",
+                    lambda _: (
+                        self.agenerate_factual_pairs(crate)
+                        if use_async
+                        else self.generate_factual_pairs(crate)
+                    ),
+                )
+            )
+        if "score" not in fields:
+            tasks.append(
+                EnrichmentTask(
+                    "score",
+                    lambda _: (
+                        self.ascore_crate(crate)
+                        if use_async
+                        else self.score_crate(crate)
+                    ),
+                )
+            )
+        return tasks
+
+    @usage_labels(task="structured")
+    def enrich_crate_structured(self, crate: CrateMetadata) -> EnrichedCrate:
+        """Enrich a crate with one structured-output call.
+
+        Fields missing from the answer fall back to per-field calls.
+        """
+        enriched = EnrichedCrate(**crate.__dict__)
+        if not crate.readme:
+            return enriched
+
+        result = self.call_llm(
+            self._structured_enrichment_prompt(crate),
+            temperature=0.2,
+            max_tokens=700,
+            system_message=STRUCTURED_SYSTEM_MESSAGE,
+            response_format=self._structured_response_format(),
+        )
+        fields = self._parse_structured_enrichment(result)
+        self._apply_enrichment_results(enriched, fields)
+
+        fallback = self._structured_fallback_tasks(crate, fields, use_async=False)
+        if fallback:
+            self.logger.info(
+                f"Structured enrichment for {crate.name} missing "
+                f"{[task.name for task in fallback]}; falling back to per-field calls"
+            )
+            results = run_task_graph_threaded(
+                fallback, max_workers=self.config.max_concurrent_requests
+            )
+            self._apply_enrichment_results(enriched, results)
         return enriched
 
-    def summarize_features(self, crate: CrateMetadata) -> str:
-        """Summarize crate features using LLM"""
+    @usage_labels(task="structured")
+    async def aenrich_crate_structured(self, crate: CrateMetadata) -> EnrichedCrate:
+        """Async variant of enrich_crate_structured"""
+        enriched = EnrichedCrate(**crate.__dict__)
+        if not crate.readme:
+            return enriched
+
+        result = await self.acall_llm(
+            self._structured_enrichment_prompt(crate),
+            temperature=0.2,
+            max_tokens=700,
+            system_message=STRUCTURED_SYSTEM_MESSAGE,
+            response_format=self._structured_response_format(),
+        )
+        fields = self._parse_structured_enrichment(result)
+        self._apply_enrichment_results(enriched, fields)
+
+        fallback = self._structured_fallback_tasks(crate, fields, use_async=True)
+        if fallback:
+            self.logger.info(
+                f"Structured enrichment for {crate.name} missing "
+                f"{[task.name for task in fallback]}; falling back to per-field calls"
+            )
+            results = await run_task_graph(fallback)
+            self._apply_enrichment_results(enriched, results)
+        return enriched
+
+    def _summary_prompt(self, crate: CrateMetadata) -> str:
         prompt = f"""
         Summarize the key features and capabilities of the Rust crate '{crate.name}' based on its README.
         
@@ -440,18 +1644,31 @@ class UnifiedLLMProcessor:
         
         Provide a concise summary (2-3 sentences) of what this crate does and its main features.
         """
-        
-        result = self.call_llm(
-            self.simplify_prompt(prompt),
-            temperature=0.3,
-            max_tokens=150,
-            system_message="You are an expert Rust developer who summarizes crate features concisely."
+        return self.simplify_prompt(prompt)
+
+    @usage_labels(task="readme_summary")
+    def summarize_features(self, crate: CrateMetadata) -> str:
+        """Summarize crate features using LLM"""
+        prompt = self._summary_prompt(crate)
+        result = self._cascade("readme_summary", prompt) or self.call_llm(
+            prompt,
+            **TASK_SETTINGS["readme_summary"]
         )
         
         return self.clean_output(result or "Unable to summarize features", "general")
 
-    def classify_use_case(self, crate: CrateMetadata, readme_summary: str) -> str:
-        """Classify the primary use case of the crate"""
+    @usage_labels(task="readme_summary")
+    async def asummarize_features(self, crate: CrateMetadata) -> str:
+        """Async variant of summarize_features"""
+        prompt = self._summary_prompt(crate)
+        result = await self._acascade("readme_summary", prompt) or await self.acall_llm(
+            prompt,
+            **TASK_SETTINGS["readme_summary"]
+        )
+
+        return self.clean_output(result or "Unable to summarize features", "general")
+
+    def _classification_prompt(self, crate: CrateMetadata, readme_summary: str) -> str:
         prompt = f"""
         Classify the primary use case of the Rust crate '{crate.name}' into one of these categories:
         - AI: Machine learning, AI, or data science related
@@ -473,21 +1690,68 @@ class UnifiedLLMProcessor:
         
         Respond with only the category name.
         """
-        
-        result = self.validate_and_retry(
-            self.simplify_prompt(prompt),
+        return self.simplify_prompt(prompt)
+
+    @usage_labels(task="use_case")
+    def classify_use_case(self, crate: CrateMetadata, readme_summary: str) -> str:
+        """Classify the primary use case of the crate.
+
+        A confident local classifier answers without an LLM call.
+        """
+        if self.use_case_classifier:
+            return self.use_case_classifier.classify(
+                crate,
+                readme_summary,
+                lambda: self._llm_classify_use_case(crate, readme_summary),
+            )
+        return self._llm_classify_use_case(crate, readme_summary)
+
+    def _llm_classify_use_case(self, crate: CrateMetadata, readme_summary: str) -> str:
+        prompt = self._classification_prompt(crate, readme_summary)
+        result = self._cascade("use_case", prompt) or self.validate_and_retry(
+            prompt,
             self.validate_classification,
-            temperature=0.1,
-            max_tokens=50,
-            system_message="You are a Rust ecosystem expert who classifies crates accurately."
+            stop_when=self._answer_detector("use_case"),
+            grammar=self._task_grammar("use_case"),
+            **TASK_SETTINGS["use_case"]
         )
         
         return self.clean_output(result or "Unknown", "classification")
 
-    def generate_factual_pairs(self, crate: CrateMetadata) -> str:
-        """Generate factual and counterfactual statements about the crate"""
+    @usage_labels(task="use_case")
+    async def aclassify_use_case(
+        self, crate: CrateMetadata, readme_summary: str
+    ) -> str:
+        """Async variant of classify_use_case"""
+        if self.use_case_classifier:
+            return await self.use_case_classifier.aclassify(
+                crate,
+                readme_summary,
+                lambda: self._allm_classify_use_case(crate, readme_summary),
+            )
+        return await self._allm_classify_use_case(crate, readme_summary)
+
+    async def _allm_classify_use_case(
+        self, crate: CrateMetadata, readme_summary: str
+    ) -> str:
+        prompt = self._classification_prompt(crate, readme_summary)
+        result = await self._acascade("use_case", prompt)
+        if not result:
+            result = await self.avalidate_and_retry(
+                prompt,
+                self.validate_classification,
+                stop_when=self._answer_detector("use_case"),
+                grammar=self._task_grammar("use_case"),
+                **TASK_SETTINGS["use_case"]
+            )
+
+        return self.clean_output(result or "Unknown", "classification")
+
+    def _factual_pairs_prompt(self, crate: CrateMetadata) -> str:
+        pairs = f"{FACTUAL_PAIRS_MIN}-{FACTUAL_PAIRS_MAX}"
+        subject = f"the Rust crate '{crate.name}'"
         prompt = f"""
-        Generate 2-3 pairs of factual and counterfactual statements about the Rust crate '{crate.name}'.
+        Generate {pairs} pairs of factual and counterfactual statements about {subject}.
         
         Crate: {crate.name} v{crate.version}
         Description: {crate.description}
@@ -504,21 +1768,44 @@ class UnifiedLLMProcessor:
         ✅ Factual: [true statement]
         ❌ Counterfactual: [false statement]
         
+        Keep each statement under {FACTUAL_STATEMENT_MAX_CHARS} characters.
         Focus on technical capabilities, performance characteristics, and use cases.
         """
-        
-        result = self.validate_and_retry(
-            self.simplify_prompt(prompt),
-            self.validate_factual_pairs,
-            temperature=0.4,
-            max_tokens=300,
-            system_message="You are a Rust expert who generates accurate factual statements and plausible counterfactuals."
-        )
+        return self.simplify_prompt(prompt)
+
+    @usage_labels(task="factual_counterfactual")
+    def generate_factual_pairs(self, crate: CrateMetadata) -> str:
+        """Generate factual and counterfactual statements about the crate"""
+        prompt = self._factual_pairs_prompt(crate)
+        result = self._cascade("factual_counterfactual", prompt)
+        if not result:
+            result = self.validate_and_retry(
+                prompt,
+                self.validate_factual_pairs,
+                grammar=self._task_grammar("factual_counterfactual"),
+                **TASK_SETTINGS["factual_counterfactual"]
+            )
         
         return self.clean_output(result or "Unable to generate factual pairs", "factual_pairs")
 
-    def score_crate(self, crate: CrateMetadata) -> float:
-        """Score the crate based on various factors"""
+    @usage_labels(task="factual_counterfactual")
+    async def agenerate_factual_pairs(self, crate: CrateMetadata) -> str:
+        """Async variant of generate_factual_pairs"""
+        prompt = self._factual_pairs_prompt(crate)
+        result = await self._acascade("factual_counterfactual", prompt)
+        if not result:
+            result = await self.avalidate_and_retry(
+                prompt,
+                self.validate_factual_pairs,
+                grammar=self._task_grammar("factual_counterfactual"),
+                **TASK_SETTINGS["factual_counterfactual"]
+            )
+
+        return self.clean_output(
+            result or "Unable to generate factual pairs", "factual_pairs"
+        )
+
+    def _score_prompt(self, crate: CrateMetadata) -> str:
         prompt = f"""
         Rate the Rust crate '{crate.name}' on a scale of 0.0 to 10.0 based on:
         - Documentation quality (README, examples)
@@ -538,14 +1825,71 @@ class UnifiedLLMProcessor:
         
         Respond with only a number between 0.0 and 10.0 (e.g., 7.5).
         """
-        
-        result = self.call_llm(
-            self.simplify_prompt(prompt),
-            temperature=0.2,
-            max_tokens=10,
-            system_message="You are a Rust ecosystem expert who rates crates objectively."
+        return self.simplify_prompt(prompt)
+
+    def _accept_cascade_answer(self, task: str, result: Optional[str]) -> bool:
+        """Validation plus a confidence check for a small-model answer"""
+        if not result:
+            return False
+        if task == "readme_summary":
+            return len(result.split()) >= CASCADE_MIN_SUMMARY_WORDS
+        if task == "use_case":
+            # Naming several categories (or none) is not a confident answer
+            named = {
+                category for category in USE_CASE_CATEGORIES
+                if re.search(r"\b" + re.escape(category) + r"\b", result, re.IGNORECASE)
+            }
+            return (
+                self.validate_classification(result)
+                and len(named) == 1
+                and "Unknown" not in named
+            )
+        if task == "factual_counterfactual":
+            return self.validate_factual_pairs(result) and bool(
+                self.clean_output(result, "factual_pairs")
+            )
+        if task == "score":
+            numbers = [float(n) for n in re.findall(r"\d+(?:\.\d+)?", result)]
+            return len(numbers) == 1 and 0.0 <= numbers[0] <= 10.0
+        return True
+
+    def _cascade(self, task: str, prompt: str) -> Optional[str]:
+        """Answer with the small cascade model, or None to escalate"""
+        # A cheap-model tier sends every call to the small model already
+        if not self.cascade_processor or current_tier().cheap_model:
+            return None
+        result = self.cascade_processor.call_llm(
+            prompt,
+            stop_when=self._answer_detector(task),
+            grammar=self._task_grammar(task),
+            **TASK_SETTINGS[task]
         )
-        
+        accepted = self._accept_cascade_answer(task, result)
+        self.cascade_stats.record(task, accepted)
+        return result if accepted else None
+
+    async def _acascade(self, task: str, prompt: str) -> Optional[str]:
+        """Async variant of _cascade"""
+        if not self.cascade_processor or current_tier().cheap_model:
+            return None
+        result = await self.cascade_processor.acall_llm(
+            prompt,
+            stop_when=self._answer_detector(task),
+            grammar=self._task_grammar(task),
+            **TASK_SETTINGS[task]
+        )
+        accepted = self._accept_cascade_answer(task, result)
+        self.cascade_stats.record(task, accepted)
+        return result if accepted else None
+
+    def _answer_detector(self, task: str) -> Optional[AnswerDetector]:
+        """Early-stop detector for a short-answer task, if streaming is enabled"""
+        if not self.config.stream_short_answers:
+            return None
+        return TASK_ANSWER_DETECTORS.get(task)
+
+    def _parse_score(self, result: Optional[str]) -> float:
+        """Extract a 0-10 score from an LLM response"""
         if result:
             try:
                 # Extract numeric score
@@ -558,28 +1902,60 @@ class UnifiedLLMProcessor:
         
         return 5.0  # Default score
 
+    @usage_labels(task="score")
+    def score_crate(self, crate: CrateMetadata) -> float:
+        """Score the crate based on various factors"""
+        prompt = self._score_prompt(crate)
+        result = self._cascade("score", prompt) or self.call_llm(
+            prompt,
+            stop_when=self._answer_detector("score"),
+            **TASK_SETTINGS["score"]
+        )
+        
+        return self._parse_score(result)
+
+    @usage_labels(task="score")
+    async def ascore_crate(self, crate: CrateMetadata) -> float:
+        """Async variant of score_crate"""
+        prompt = self._score_prompt(crate)
+        result = await self._acascade("score", prompt) or await self.acall_llm(
+            prompt,
+            stop_when=self._answer_detector("score"),
+            **TASK_SETTINGS["score"]
+        )
+
+        return self._parse_score(result)
+
     def batch_process_prompts(
         self, 
         prompts: "List[Tuple[str, float, int]]", 
         batch_size: int = 4
     ) -> List[Optional[str]]:
-        """Process multiple prompts in batches"""
-        results = []
-        
-        for i in range(0, len(prompts), batch_size):
-            batch = prompts[i:i + batch_size]
-            batch_results = []
-            
-            for prompt, temp, tokens in batch:
-                result = self.call_llm(prompt, float(temp), int(tokens))
-                batch_results.append(result)
-                
-            results.extend(batch_results)
-            
-            # Small delay between batches
-            if i + batch_size < len(prompts):
-                time.sleep(0.5)
-        
+        """Process multiple prompts with up to ``batch_size`` in flight.
+
+        Runs its own event loop; use abatch_process_prompts from async code.
+        """
+        return asyncio.run(self.abatch_process_prompts(prompts, batch_size))
+
+    async def abatch_process_prompts(
+        self,
+        prompts: "List[Tuple[str, float, int]]",
+        batch_size: int = 4
+    ) -> List[Optional[str]]:
+        """Async variant of batch_process_prompts; shortest prompts start first"""
+        limit = asyncio.Semaphore(max(1, batch_size))
+        results: List[Optional[str]] = [None] * len(prompts)
+
+        async def run(index: int) -> None:
+            prompt, temp, tokens = prompts[index]
+            async with limit:
+                results[index] = await self.acall_llm(prompt, float(temp), int(tokens))
+
+        order = sorted(
+            range(len(prompts)),
+            key=lambda i: self.estimate_tokens(prompts[i][0]) + int(prompts[i][2]),
+        )
+        await asyncio.gather(*(run(index) for index in order))
         return results
 
     def smart_context_management(
@@ -594,6 +1970,22 @@ class UnifiedLLMProcessor:
         """Return the current total cost."""
         return self.budget_manager.get_total_cost()
 
+    def get_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Return LLM response cache statistics, if a cache is attached."""
+        return self.cache.stats() if self.cache else None
+
+    def get_cascade_stats(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Return per-task escalation rates, if a cascade model is configured."""
+        return self.cascade_stats.report() if self.cascade_processor else None
+
+    def get_tier_stats(self) -> Dict[str, int]:
+        """Number of crates enriched at each quality tier"""
+        return self.tier_planner.report()
+
+    def get_classifier_stats(self) -> Optional[Dict[str, Any]]:
+        """Return local use case classifier statistics, if one is attached."""
+        return self.use_case_classifier.stats() if self.use_case_classifier else None
+
 
 def create_llm_processor_from_config(pipeline_config: PipelineConfig) -> UnifiedLLMProcessor:
     """Create LLM processor from pipeline configuration"""
@@ -610,7 +2002,8 @@ def create_llm_processor_from_config(pipeline_config: PipelineConfig) -> Unified
             temperature=0.2,
             max_tokens=pipeline_config.max_tokens,
             timeout=30,
-            max_retries=pipeline_config.max_retries
+            max_retries=pipeline_config.max_retries,
+            constrained_decoding=pipeline_config.constrained_decoding,
         )
     else:
         # Default to local model
@@ -620,12 +2013,18 @@ def create_llm_processor_from_config(pipeline_config: PipelineConfig) -> Unified
             temperature=0.2,
             max_tokens=pipeline_config.max_tokens,
             timeout=30,
-            max_retries=pipeline_config.max_retries
+            max_retries=pipeline_config.max_retries,
+            constrained_decoding=pipeline_config.constrained_decoding,
         )
     
     budget_manager = BudgetManager(budget=pipeline_config.budget) if pipeline_config.budget is not None else None
     
-    return UnifiedLLMProcessor(llm_config, budget_manager=budget_manager)
+    return UnifiedLLMProcessor(
+        llm_config,
+        budget_manager=budget_manager,
+        cache=get_llm_cache(pipeline_config),
+        use_case_classifier=get_use_case_classifier(pipeline_config),
+    )
 
 
 def create_llm_processor_from_args(
@@ -636,6 +2035,8 @@ def create_llm_processor_from_args(
     temperature: float = 0.2,
     max_tokens: int = 256,
     budget: Optional[float] = None,
+    cache: Optional[LLMResponseCache] = None,
+    use_case_classifier: Optional[ConfidentUseCaseClassifier] = None,
     **kwargs
 ) -> UnifiedLLMProcessor:
     """Create a UnifiedLLMProcessor from command-line arguments."""
@@ -652,4 +2053,10 @@ def create_llm_processor_from_args(
     
     budget_manager = BudgetManager(budget=budget) if budget is not None else None
     
-    return UnifiedLLMProcessor(llm_config, budget_manager=budget_manager) 
\ No newline at end of file
+    from .llm_router import create_llm_processor
+    return create_llm_processor(
+        llm_config,
+        budget_manager=budget_manager,
+        cache=cache,
+        use_case_classifier=use_case_classifier,
+    ) 
\ No newline at end of file
@@ -15,8 +15,11 @@ from typing import Dict, List, Optional, Any, Union, TYPE_CHECKING
 
 from .config import PipelineConfig, CrateMetadata, EnrichedCrate
 from .core import IRLEngine, CanonRegistry, SacredChainTrace, TrustVerdict
-from .scraping import UnifiedScraper, ScrapingResult
+from .scraping import UnifiedScraper, ScrapingResult, get_scrape_cache
 from .crate_analysis import CrateAnalyzer
+from .llm_cache import get_llm_cache
+from .politeness import get_domain_scheduler
+from .use_case_classifier import get_use_case_classifier
 from rust_crate_pipeline.utils.sanitization import Sanitizer
 from rust_crate_pipeline.version import __version__
 from utils.serialization_utils import to_serializable
@@ -32,11 +35,13 @@ except ImportError:
 # Import unified LLM processor
 try:
     from .unified_llm_processor import UnifiedLLMProcessor, create_llm_processor_from_args, LLMConfig
+    from .llm_router import cascade_overrides, create_llm_processor, endpoint_overrides
     UNIFIED_LLM_AVAILABLE = True
 except ImportError:
     UNIFIED_LLM_AVAILABLE = False
     UnifiedLLMProcessor = None
     create_llm_processor_from_args = None
+    create_llm_processor = None
     LLMConfig = None
 
 if TYPE_CHECKING:
@@ -72,17 +77,30 @@ class UnifiedSigilPipeline:
             scraper_config = {
                 "verbose": False,
                 "word_count_threshold": 10,
+                "early_exit_quality": self.config.scrape_early_exit_quality,
+                "early_exit_chars": self.config.scrape_early_exit_chars,
+                "max_concurrent_pages": self.config.scrape_max_concurrent_pages,
+                "max_pages_per_browser": self.config.scrape_max_pages_per_browser,
+                "max_browser_rss_mb": self.config.scrape_max_browser_rss_mb,
                 "crawl_config": {
                 }
             }
-            self.scraper = UnifiedScraper(scraper_config)
+            self.scraper = UnifiedScraper(
+                scraper_config,
+                cache=get_scrape_cache(self.config),
+                scheduler=get_domain_scheduler(self.config),
+            )
             self.logger.info("✅ Unified Scraper initialized successfully")
             
             # Initialize unified LLM processor if available
             if UNIFIED_LLM_AVAILABLE and self.llm_config:
                 try:
                     if UnifiedLLMProcessor is not None:
-                        self.unified_llm_processor = UnifiedLLMProcessor(self.llm_config)
+                        self.unified_llm_processor = create_llm_processor(
+                            self.llm_config,
+                            cache=get_llm_cache(self.config),
+                            use_case_classifier=get_use_case_classifier(self.config),
+                        )
                         self.logger.info(f"✅ Unified LLM Processor initialized with provider: {self.llm_config.provider}")
                     else:
                         self.logger.warning("⚠️  UnifiedLLMProcessor is None at runtime; skipping initialization.")
@@ -129,7 +147,9 @@ class UnifiedSigilPipeline:
                 if not crate_version:
                     raise RuntimeError(f"Could not determine latest version for {crate_name}")
             
-            documentation_results = await self._gather_documentation(crate_name)
+            documentation_results = await self._gather_documentation(
+                crate_name, crate_version
+            )
             
             sacred_chain_trace = await self._perform_sacred_chain_analysis(
                 crate_name, crate_version, documentation_results
@@ -144,14 +164,18 @@ class UnifiedSigilPipeline:
             self.logger.error(f"❌ Analysis failed for {crate_name}: {e}")
             raise RuntimeError(f"Analysis failed for {crate_name}: {str(e)}")
     
-    async def _gather_documentation(self, crate_name: str) -> Dict[str, ScrapingResult]:
+    async def _gather_documentation(
+        self, crate_name: str, crate_version: Optional[str] = None
+    ) -> Dict[str, ScrapingResult]:
         if not self.scraper:
             raise RuntimeError("Scraper not initialized")
         
         self.logger.info(f"📚 Gathering documentation for {crate_name}")
         
         try:
-            results = await self.scraper.scrape_crate_documentation(crate_name)
+            results = await self.scraper.scrape_crate_documentation(
+                crate_name, crate_version
+            )
             
             successful_sources = [source for source, result in results.items() 
                                 if result.error is None]
@@ -178,12 +202,19 @@ class UnifiedSigilPipeline:
         
         try:
             sanitized_docs = self.sanitizer.sanitize_data(documentation_results)
+            api_surface = None
+            if self.scraper and documentation_results.get("docs_rs"):
+                api_surface = await self.scraper.scrape_api_surface(
+                    crate_name, documentation_results["docs_rs"]
+                )
             
             async with self.irl_engine as irl_engine:
                 trace = await irl_engine.analyze_with_sacred_chain(crate_name)
 
             # Storing sanitized docs in the trace for later use by enrichment functions
             trace.audit_info['sanitized_documentation'] = sanitized_docs
+            if api_surface:
+                trace.audit_info['api_surface'] = api_surface
 
             await self._add_crate_analysis_results(crate_name, crate_version, trace)
 
@@ -384,7 +415,10 @@ class UnifiedSigilPipeline:
             trace.audit_info["crate_metadata"] = crate_metadata.to_dict()
 
             # Enrich the crate using unified LLM processor
-            enriched_crate = self.unified_llm_processor.enrich_crate(crate_metadata)
+            enriched_crate = await self.unified_llm_processor.aenrich_crate(
+                crate_metadata
+            )
+            enriched_crate.api_surface = trace.audit_info.get("api_surface")
             
             # Add enrichment results to trace
             trace.audit_info["enriched_crate"] = self.sanitizer.sanitize_data(
@@ -431,8 +465,12 @@ class UnifiedSigilPipeline:
             # Store the metadata used for enrichment
             trace.audit_info["crate_metadata"] = crate_metadata.to_dict()
 
-            # Enrich the crate using Azure OpenAI
-            enriched_crate = self.ai_enricher.enrich_crate(crate_metadata)
+            # Enrich the crate using Azure OpenAI (a blocking client, so run it
+            # off the event loop)
+            enriched_crate = await asyncio.to_thread(
+                self.ai_enricher.enrich_crate, crate_metadata
+            )
+            enriched_crate.api_surface = trace.audit_info.get("api_surface")
             
             # Add enrichment results to trace
             trace.audit_info["enriched_crate"] = self.sanitizer.sanitize_data(
@@ -477,6 +515,8 @@ class UnifiedSigilPipeline:
             return {}
         
         self.logger.info(f"🚀 Starting concurrent analysis of {len(crate_names)} crates")
+        if self.unified_llm_processor:
+            self.unified_llm_processor.plan_quality_tiers(len(crate_names))
         
         semaphore = asyncio.Semaphore(self.config.n_workers)
         
@@ -537,6 +577,32 @@ class UnifiedSigilPipeline:
             }
         }
         
+        llm_cache = get_llm_cache(self.config)
+        if llm_cache:
+            summary["llm_cache"] = llm_cache.stats()
+        if self.scraper and self.scraper.cache:
+            summary["scrape_cache"] = self.scraper.cache.stats()
+        if self.scraper and self.scraper.cleaner:
+            summary["content_cleaning"] = self.scraper.cleaner.stats()
+        if self.scraper:
+            summary["scrape_sources_skipped"] = self.scraper.sources_skipped
+        if self.scraper and self.scraper.scheduler:
+            summary["domain_pacing"] = self.scraper.scheduler.stats()
+        
+        if self.unified_llm_processor:
+            summary["llm_usage"] = (
+                self.unified_llm_processor.budget_manager.usage_report()
+            )
+            cascade_stats = self.unified_llm_processor.get_cascade_stats()
+            if cascade_stats:
+                summary["llm_cascade"] = cascade_stats
+            tier_stats = self.unified_llm_processor.get_tier_stats()
+            if tier_stats:
+                summary["llm_quality_tiers"] = tier_stats
+            classifier_stats = self.unified_llm_processor.get_classifier_stats()
+            if classifier_stats:
+                summary["use_case_classifier"] = classifier_stats
+        
         # Add LLM configuration if available
         if self.llm_config:
             summary["llm_configuration"] = {
@@ -545,7 +611,9 @@ class UnifiedSigilPipeline:
                 "temperature": self.llm_config.temperature,
                 "max_tokens": self.llm_config.max_tokens,
                 "timeout": self.llm_config.timeout,
-                "max_retries": self.llm_config.max_retries
+                "max_retries": self.llm_config.max_retries,
+                "max_concurrent_requests": self.llm_config.max_concurrent_requests,
+                "enrichment_mode": self.llm_config.enrichment_mode
             }
         elif self.config.use_azure_openai:
             summary["llm_configuration"] = {
@@ -576,11 +644,28 @@ def create_pipeline_from_args(args: argparse.Namespace) -> UnifiedSigilPipeline:
                 "max_tokens": getattr(args, 'llm_max_tokens', 256),
                 "timeout": getattr(args, 'llm_timeout', 30),
                 "max_retries": getattr(args, 'llm_max_retries', 3),
+                "max_concurrent_requests": getattr(args, 'llm_max_concurrency', None),
+                "enrichment_mode": getattr(args, 'llm_enrichment_mode', None),
                 "azure_deployment": getattr(args, 'azure_deployment', None),
                 "azure_api_version": getattr(args, 'azure_api_version', None),
                 "ollama_host": getattr(args, 'ollama_host', None),
                 "lmstudio_host": getattr(args, 'lmstudio_host', None),
+                "hedge_requests": getattr(args, 'llm_hedge', None),
+                "stream_short_answers": getattr(args, 'llm_stream_short_answers', None),
+                "constrained_decoding": getattr(args, 'llm_constrained_decoding', None),
             }
+            cascade = cascade_overrides(
+                getattr(args, 'llm_cascade_model', None),
+                getattr(args, 'llm_cascade_provider', None),
+                getattr(args, 'llm_cascade_host', None),
+            )
+            if cascade:
+                llm_config_params["cascade_model"] = cascade
+            fallback_urls = getattr(args, 'llm_fallback_endpoint', None) or []
+            if fallback_urls:
+                llm_config_params["fallback_endpoints"] = [
+                    endpoint_overrides(args.llm_provider, url) for url in fallback_urls
+                ]
             # Filter out None values so that default values in LLMConfig are used
             llm_config_params = {k: v for k, v in llm_config_params.items() if v is not None}
             llm_config = LLMConfig(**llm_config_params)
@@ -644,6 +729,70 @@ def add_llm_arguments(parser: argparse.ArgumentParser) -> None:
         help='Maximum retries for LLM API calls (default: 3)'
     )
     
+    llm_group.add_argument(
+        '--llm-max-concurrency',
+        type=int,
+        default=4,
+        help='Maximum in-flight LLM requests per provider endpoint (default: 4)'
+    )
+    
+    llm_group.add_argument(
+        "--llm-enrichment-mode",
+        choices=["per_task", "structured"],
+        default="per_task",
+        help=(
+            "Enrichment strategy: one prompt per field, or a single JSON-schema "
+            "call per crate (default: per_task)"
+        ),
+    )
+    
+    llm_group.add_argument(
+        '--llm-fallback-endpoint',
+        action='append',
+        metavar='URL',
+        help='Additional host for the same provider and model; repeat to build a '
+             'fallback chain that calls are routed across by endpoint health'
+    )
+    
+    llm_group.add_argument(
+        '--llm-hedge',
+        action='store_true',
+        help='Send slow async requests to a second endpoint past the first '
+             'one\'s p95 latency'
+    )
+    
+    llm_group.add_argument(
+        '--llm-stream-short-answers',
+        action='store_true',
+        help='Stream classification and scoring and stop generating once the '
+             'answer is complete'
+    )
+    
+    llm_group.add_argument(
+        '--llm-no-constrained-decoding',
+        dest='llm_constrained_decoding',
+        action='store_false',
+        help='Do not constrain classification and factual pairs with a JSON schema'
+    )
+    
+    llm_group.add_argument(
+        '--llm-cascade-model',
+        help='Cheaper model tried first for every task; answers failing '
+             'validation escalate to --llm-model'
+    )
+    
+    llm_group.add_argument(
+        '--llm-cascade-provider',
+        choices=['azure', 'ollama', 'lmstudio', 'openai', 'anthropic', 'google',
+                 'cohere', 'huggingface'],
+        help='Provider of the cascade model (default: same as --llm-provider)'
+    )
+    
+    llm_group.add_argument(
+        '--llm-cascade-host',
+        help='Host URL of the cascade model (for local providers or custom endpoints)'
+    )
+    
     # Provider-specific arguments
     azure_group = parser.add_argument_group('Azure OpenAI Configuration')
     azure_group.add_argument(
@@ -0,0 +1,476 @@
+# use_case_classifier.py
+"""
+Local use-case classifier that answers most classification prompts.
+
+The use case of a crate is often obvious from its crates.io categories,
+keywords, dependencies and description. ``UseCaseClassifier`` is a TF-IDF
+plus multinomial logistic regression model over those features, trained on
+the ``use_case`` labels of earlier enriched outputs and stored as a small
+JSON file. ``ConfidentUseCaseClassifier`` answers when the model is
+confident enough and defers to the LLM otherwise, keeping agreement
+statistics between the two.
+
+Train a model from previous pipeline outputs with::
+
+    python -m rust_crate_pipeline.use_case_classifier output/ \
+        --model use_case_classifier.json
+"""
+
+import argparse
+import glob
+import json
+import logging
+import math
+import os
+import random
+import re
+import threading
+import zlib
+from collections import Counter
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .config import CrateMetadata, PipelineConfig
+
+MODEL_FORMAT_VERSION = 1
+
+# Categories the LLM falls back to; never learned as a confident answer
+UNINFORMATIVE_LABELS = {"Unknown", ""}
+
+_WORD = re.compile(r"[a-z][a-z0-9+#]{2,}")
+_STOPWORDS = {
+    "and", "the", "for", "with", "that", "this", "from", "are", "its", "into",
+    "your", "you", "can", "not", "all", "use", "using", "based", "crate", "rust",
+    "library", "implementation", "written", "provides", "support", "simple",
+}
+
+
+def _words(text: str) -> List[str]:
+    return [w for w in _WORD.findall((text or "").lower()) if w not in _STOPWORDS]
+
+
+def crate_features(
+    name: str,
+    description: str = "",
+    keywords: Sequence[str] = (),
+    categories: Sequence[str] = (),
+    dependencies: Sequence[Any] = (),
+    readme_summary: str = "",
+) -> List[str]:
+    """Turn crate metadata into prefixed feature tokens"""
+    features = [f"name:{part}" for part in re.split(r"[-_]", name.lower()) if part]
+    for category in categories:
+        slug = str(category).lower()
+        features.append(f"cat:{slug}")
+        # "web-programming::http-server" also counts as "web-programming"
+        if "::" in slug:
+            features.append(f"cat:{slug.split('::')[0]}")
+    features.extend(f"kw:{str(keyword).lower()}" for keyword in keywords)
+    for dep in dependencies:
+        dep_name = dep.get("crate_id") if isinstance(dep, dict) else dep
+        if dep_name:
+            features.append(f"dep:{str(dep_name).lower()}")
+    features.extend(f"w:{word}" for word in _words(description))
+    features.extend(f"w:{word}" for word in _words(readme_summary))
+    return features
+
+
+def features_for_crate(crate: CrateMetadata, readme_summary: str = "") -> List[str]:
+    return crate_features(
+        crate.name,
+        crate.description,
+        crate.keywords,
+        crate.categories,
+        crate.dependencies,
+        readme_summary,
+    )
+
+
+def features_for_record(record: Dict[str, Any]) -> List[str]:
+    """Features of an enriched-crate record read from an output file"""
+    return crate_features(
+        record.get("name", ""),
+        record.get("description") or "",
+        record.get("keywords") or [],
+        record.get("categories") or [],
+        record.get("dependencies") or [],
+        record.get("readme_summary") or "",
+    )
+
+
+class UseCaseClassifier:
+    """TF-IDF features with a multinomial logistic regression on top"""
+
+    def __init__(self) -> None:
+        self.labels: List[str] = []
+        self.idf: Dict[str, float] = {}
+        self.weights: Dict[str, Dict[str, float]] = {}
+        self.bias: Dict[str, float] = {}
+        self.trained_on = 0
+
+    def _vectorize(self, features: Iterable[str]) -> Dict[str, float]:
+        counts = Counter(f for f in features if f in self.idf)
+        vector = {f: (1.0 + math.log(n)) * self.idf[f] for f, n in counts.items()}
+        norm = math.sqrt(sum(v * v for v in vector.values()))
+        if norm > 0:
+            vector = {f: v / norm for f, v in vector.items()}
+        return vector
+
+    def _probabilities(self, vector: Dict[str, float]) -> Dict[str, float]:
+        scores = {
+            label: self.bias[label]
+            + sum(self.weights[label].get(f, 0.0) * v for f, v in vector.items())
+            for label in self.labels
+        }
+        top = max(scores.values())
+        exps = {label: math.exp(score - top) for label, score in scores.items()}
+        total = sum(exps.values())
+        return {label: e / total for label, e in exps.items()}
+
+    def fit(
+        self,
+        examples: Sequence[Tuple[List[str], str]],
+        epochs: int = 30,
+        learning_rate: float = 0.5,
+        l2: float = 1e-4,
+        min_df: int = 1,
+        seed: int = 0,
+    ) -> "UseCaseClassifier":
+        """Train on (features, label) pairs"""
+        examples = [
+            (f, label) for f, label in examples if label not in UNINFORMATIVE_LABELS
+        ]
+        self.labels = sorted({label for _, label in examples})
+        if len(self.labels) < 2:
+            raise ValueError(
+                "Need examples of at least two use cases to train a classifier"
+            )
+
+        document_frequency = Counter(
+            f for features, _ in examples for f in set(features)
+        )
+        n = len(examples)
+        self.idf = {
+            f: math.log((1 + n) / (1 + df)) + 1.0
+            for f, df in document_frequency.items()
+            if df >= min_df
+        }
+        self.weights = {label: {} for label in self.labels}
+        self.bias = {label: 0.0 for label in self.labels}
+        self.trained_on = n
+
+        vectors = [(self._vectorize(features), label) for features, label in examples]
+        order = list(range(n))
+        rng = random.Random(seed)
+        for epoch in range(epochs):
+            rng.shuffle(order)
+            rate = learning_rate / (1 + 0.1 * epoch)
+            for index in order:
+                vector, target = vectors[index]
+                probabilities = self._probabilities(vector)
+                for label in self.labels:
+                    gradient = probabilities[label] - (1.0 if label == target else 0.0)
+                    self.bias[label] -= rate * gradient
+                    weights = self.weights[label]
+                    for f, v in vector.items():
+                        w = weights.get(f, 0.0)
+                        weights[f] = w - rate * (gradient * v + l2 * w)
+        return self
+
+    def predict_proba(self, features: Iterable[str]) -> Dict[str, float]:
+        return self._probabilities(self._vectorize(features))
+
+    def predict(self, features: Iterable[str]) -> Tuple[str, float]:
+        """Return the most likely use case and its probability"""
+        probabilities = self.predict_proba(features)
+        label = max(probabilities, key=probabilities.__getitem__)
+        return label, probabilities[label]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": MODEL_FORMAT_VERSION,
+            "labels": self.labels,
+            "idf": self.idf,
+            # Near-zero weights only add file size
+            "weights": {
+                label: {f: round(w, 6) for f, w in weights.items() if abs(w) > 1e-6}
+                for label, weights in self.weights.items()
+            },
+            "bias": self.bias,
+            "trained_on": self.trained_on,
+        }
+
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path: str) -> "UseCaseClassifier":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != MODEL_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported use case classifier format: {data.get('version')}"
+            )
+        model = cls()
+        model.labels = data["labels"]
+        model.idf = data["idf"]
+        model.weights = data["weights"]
+        model.bias = data["bias"]
+        model.trained_on = data.get("trained_on", 0)
+        return model
+
+
+class ConfidentUseCaseClassifier:
+    """Answer classifications locally when confident, otherwise ask the LLM.
+
+    Args:
+        model: Trained classifier
+        threshold: Minimum probability for a local answer
+        audit_rate: Fraction of confident answers also sent to the LLM to
+            measure agreement on the answers the classifier does give
+    """
+
+    def __init__(
+        self, model: UseCaseClassifier, threshold: float = 0.75, audit_rate: float = 0.0
+    ) -> None:
+        self.model = model
+        self.threshold = threshold
+        self.audit_rate = audit_rate
+        self.local_answers = 0
+        self.llm_fallbacks = 0
+        self.audited = 0
+        self.audit_agreed = 0
+        self.fallback_agreed = 0
+        self._lock = threading.Lock()
+
+    def _is_audited(self, crate_name: str) -> bool:
+        # Deterministic per crate so reruns audit the same sample
+        bucket = zlib.crc32(crate_name.encode("utf-8")) % 10_000
+        return bucket < self.audit_rate * 10_000
+
+    def _decide(
+        self, crate: CrateMetadata, readme_summary: str
+    ) -> Tuple[str, float, bool]:
+        """Return the local prediction, its confidence and whether to ask the LLM"""
+        label, confidence = self.model.predict(
+            features_for_crate(crate, readme_summary)
+        )
+        confident = confidence >= self.threshold
+        ask_llm = not confident or self._is_audited(crate.name)
+        if not ask_llm:
+            with self._lock:
+                self.local_answers += 1
+            logging.debug(
+                f"Classified {crate.name} locally as {label} ({confidence:.2f})"
+            )
+        return label, confidence, ask_llm
+
+    def _record(self, label: str, confidence: float, llm_answer: Optional[str]) -> str:
+        """Record agreement with the LLM and return the answer to use"""
+        confident = confidence >= self.threshold
+        agreed = llm_answer is not None and llm_answer.strip().lower() == label.lower()
+        with self._lock:
+            if confident:
+                self.audited += 1
+                self.audit_agreed += agreed
+            else:
+                self.llm_fallbacks += 1
+                self.fallback_agreed += agreed
+        # An audited crate keeps the local answer if the LLM had none
+        if confident and (not llm_answer or llm_answer in UNINFORMATIVE_LABELS):
+            return label
+        return llm_answer or "Unknown"
+
+    def answer_locally(
+        self, crate: CrateMetadata, readme_summary: str
+    ) -> Optional[str]:
+        """Return the local answer, or None if the LLM should be asked"""
+        label, _, needs_llm = self._decide(crate, readme_summary)
+        return None if needs_llm else label
+
+    def observe(
+        self, crate: CrateMetadata, readme_summary: str, llm_answer: Optional[str]
+    ) -> str:
+        """Record an LLM answer obtained elsewhere and return the answer to use"""
+        label, confidence = self.model.predict(
+            features_for_crate(crate, readme_summary)
+        )
+        return self._record(label, confidence, llm_answer)
+
+    def classify(
+        self,
+        crate: CrateMetadata,
+        readme_summary: str,
+        ask_llm: Callable[[], Optional[str]],
+    ) -> str:
+        label, confidence, needs_llm = self._decide(crate, readme_summary)
+        if not needs_llm:
+            return label
+        return self._record(label, confidence, ask_llm())
+
+    async def aclassify(
+        self,
+        crate: CrateMetadata,
+        readme_summary: str,
+        ask_llm: Callable[[], Awaitable[Optional[str]]],
+    ) -> str:
+        label, confidence, needs_llm = self._decide(crate, readme_summary)
+        if not needs_llm:
+            return label
+        return self._record(label, confidence, await ask_llm())
+
+    def stats(self) -> Dict[str, Any]:
+        """Return local-answer and agreement statistics"""
+        with self._lock:
+            total = self.local_answers + self.audited + self.llm_fallbacks
+            return {
+                "threshold": self.threshold,
+                "local_answers": self.local_answers,
+                "llm_fallbacks": self.llm_fallbacks,
+                "audited": self.audited,
+                "local_rate": round(self.local_answers / total, 3) if total else 0.0,
+                "audit_agreement": (
+                    round(self.audit_agreed / self.audited, 3) if self.audited else None
+                ),
+                "fallback_agreement": (
+                    round(self.fallback_agreed / self.llm_fallbacks, 3)
+                    if self.llm_fallbacks
+                    else None
+                ),
+            }
+
+
+def iter_enriched_records(paths: Iterable[str]) -> Iterable[Dict[str, Any]]:
+    """Yield enriched-crate records from output files or directories.
+
+    Reads ``*.jsonl`` files (one record per line) and ``*.json`` files
+    holding a record or a list of records.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            files = sorted(
+                glob.glob(os.path.join(path, "**", "*.json"), recursive=True)
+                + glob.glob(os.path.join(path, "**", "*.jsonl"), recursive=True)
+            )
+        else:
+            files = [path]
+        for file_path in files:
+            try:
+                with open(file_path, "r", encoding="utf-8") as f:
+                    if file_path.endswith(".jsonl"):
+                        items: List[Any] = [
+                            json.loads(line) for line in f if line.strip()
+                        ]
+                    else:
+                        data = json.load(f)
+                        items = data if isinstance(data, list) else [data]
+            except (OSError, ValueError) as e:
+                logging.warning(f"Skipping unreadable output file {file_path}: {e}")
+                continue
+            for item in items:
+                if isinstance(item, dict) and item.get("name") and item.get("use_case"):
+                    yield item
+
+
+def training_examples(paths: Iterable[str]) -> List[Tuple[List[str], str]]:
+    """Collect (features, use_case) pairs, keeping the latest label per crate"""
+    latest: Dict[str, Tuple[List[str], str]] = {}
+    for record in iter_enriched_records(paths):
+        latest[record["name"]] = (features_for_record(record), record["use_case"])
+    return list(latest.values())
+
+
+_shared_classifiers: Dict[str, ConfidentUseCaseClassifier] = {}
+_shared_classifiers_lock = threading.Lock()
+
+
+def get_use_case_classifier(
+    config: PipelineConfig,
+) -> Optional[ConfidentUseCaseClassifier]:
+    """Return the process-wide local classifier for a config, if a model exists"""
+    path = config.use_case_classifier_path
+    if not config.use_case_classifier_enabled or not os.path.exists(path):
+        return None
+
+    with _shared_classifiers_lock:
+        classifier = _shared_classifiers.get(path)
+        if classifier is None:
+            try:
+                classifier = ConfidentUseCaseClassifier(UseCaseClassifier.load(path))
+            except Exception as e:
+                logging.warning(f"Use case classifier unavailable: {e}")
+                return None
+            _shared_classifiers[path] = classifier
+        classifier.threshold = config.use_case_classifier_threshold
+        classifier.audit_rate = config.use_case_classifier_audit_rate
+        return classifier
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Train the local use case classifier from enriched outputs"
+    )
+    parser.add_argument("paths", nargs="+", help="Enriched output files or directories")
+    parser.add_argument(
+        "--model",
+        default=PipelineConfig().use_case_classifier_path,
+        help="Where to write the model",
+    )
+    parser.add_argument(
+        "--holdout",
+        type=float,
+        default=0.2,
+        help="Fraction held out to report accuracy",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=PipelineConfig().use_case_classifier_threshold,
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    examples = training_examples(args.paths)
+    examples = [e for e in examples if e[1] not in UNINFORMATIVE_LABELS]
+    random.Random(0).shuffle(examples)
+    split = int(len(examples) * (1 - args.holdout))
+    train, test = examples[:split], examples[split:]
+    logging.info(f"Training on {len(train)} crates, evaluating on {len(test)}")
+
+    if test:
+        model = UseCaseClassifier().fit(train)
+        answered = 0
+        correct = 0
+        for features, label in test:
+            predicted, confidence = model.predict(features)
+            if confidence >= args.threshold:
+                answered += 1
+                correct += predicted == label
+        accuracy = correct / answered if answered else 0.0
+        logging.info(
+            f"Held out: {answered}/{len(test)} answered locally at threshold "
+            f"{args.threshold}, {accuracy:.1%} of them correct"
+        )
+
+    model = UseCaseClassifier().fit(examples)
+    model.save(args.model)
+    logging.info(
+        f"Saved use case classifier ({len(model.labels)} labels) to {args.model}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+var searchIndex = JSON.parse('{\
+"demo_crate":{"doc":"Demo crate","t":[2,5,13,6,7,16,2],"n":["codec","Codec","encode","Error","old_api","demo","nested"],"q":["demo_crate","demo_crate::codec","demo_crate::codec::Codec","demo_crate","","","demo_crate::codec"],"d":["Encoding support","A codec with \'quoted\' names","Encodes a value","","Deprecated entry point","Builds a demo value",""],"i":[0,0,2,0,0,0,0],"f":[0,0,0,0,0,0,0],"c":[4],"p":[[3,"Codec"]]}\
+}');
+if (typeof window !== 'undefined' && window.initSearch) {window.initSearch(searchIndex)};
@@ -0,0 +1,4 @@
+var searchIndex = new Map(JSON.parse('[\
+["demo_crate",{"t":"CFNGHQC","n":["codec","Codec","encode","Error","old_api","demo","nested"],"q":[[0,"demo_crate"],[1,"demo_crate::codec"],[2,"demo_crate::codec::Codec"],[3,"demo_crate"],[6,"demo_crate::codec"]],"d":["Encoding support","A codec","Encodes a value","","Deprecated entry point","Builds a demo value","",""],"i":[0,0,2,0,0,0,0],"f":"``````","c":"OjAAAAEAAAAAAAEAEAAAAAQA","p":[[5,"Codec"]],"b":[]}]\
+]'));
+if (typeof exportSearchIndex === 'function') exportSearchIndex(searchIndex);
@@ -0,0 +1,200 @@
+"""Tests for offline batch-job enrichment against a local stand-in server."""
+
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("litellm")
+
+from rust_crate_pipeline.batch_jobs import (
+    BatchAPIClient,
+    BatchEnrichmentJob,
+    make_custom_id,
+)
+from rust_crate_pipeline.config import CrateMetadata
+from rust_crate_pipeline.unified_llm_processor import (
+    BudgetManager,
+    LLMConfig,
+    UnifiedLLMProcessor,
+)
+
+
+def fake_answer(body):
+    """Answer a chat completion request body like a cooperative model."""
+    system = body["messages"][0]["content"]
+    if "classifies" in system:
+        return "Database"
+    if "counterfactuals" in system:
+        return "✅ Factual: It stores rows.\n❌ Counterfactual: It renders HTML."
+    if "objectively" in system:
+        return "7.5"
+    return "A database driver."
+
+
+class FakeBatchAPI(BaseHTTPRequestHandler):
+    """Minimal stand-in for the OpenAI files and batches endpoints."""
+
+    files = {}
+    batches = {}
+    polls = {}
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, payload, content_type="application/json"):
+        data = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.path == "/v1/files":
+            lines = re.findall(rb'^\{"custom_id".*$', body, re.MULTILINE)
+            file_id = f"file-{len(self.files)}"
+            self.files[file_id] = b"\n".join(line.rstrip(b"\r") for line in lines)
+            self._send({"id": file_id})
+        elif self.path == "/v1/batches":
+            request = json.loads(body)
+            batch_id = f"batch-{len(self.batches)}"
+            self.batches[batch_id] = request["input_file_id"]
+            self.polls[batch_id] = 0
+            self._send({"id": batch_id, "status": "validating"})
+
+    def do_GET(self):
+        match = re.match(r"^/v1/batches/([\w-]+)$", self.path)
+        if match:
+            batch_id = match.group(1)
+            self.polls[batch_id] += 1
+            if self.polls[batch_id] < 2:
+                self._send({"id": batch_id, "status": "in_progress"})
+            else:
+                self._send(
+                    {
+                        "id": batch_id,
+                        "status": "completed",
+                        "output_file_id": f"out-{batch_id}",
+                    }
+                )
+            return
+
+        match = re.match(r"^/v1/files/out-([\w-]+)/content$", self.path)
+        input_lines = self.files[self.batches[match.group(1)]].decode().splitlines()
+        output = []
+        for line in input_lines:
+            request = json.loads(line)
+            body = {
+                "choices": [{"message": {"content": fake_answer(request["body"])}}],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 2},
+            }
+            output.append(json.dumps({
+                "custom_id": request["custom_id"],
+                "response": {"status_code": 200, "body": body},
+                "error": None,
+            }))
+        self._send("\n".join(output).encode(), "application/jsonl")
+
+
+@pytest.fixture
+def batch_server():
+    """Run the stand-in batch API on a free local port."""
+    FakeBatchAPI.files, FakeBatchAPI.batches, FakeBatchAPI.polls = {}, {}, {}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeBatchAPI)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+
+
+@pytest.fixture
+def crates():
+    """Two crates with READMEs and one without."""
+    base = dict(
+        version="1.0.0",
+        description="A database driver",
+        repository="",
+        keywords=["db"],
+        categories=["database"],
+        readme="# Driver\n\nConnects to databases.",
+        downloads=10,
+    )
+    return [
+        CrateMetadata(name="alpha", **base),
+        CrateMetadata(name="beta", **base),
+        CrateMetadata(name="empty", **{**base, "readme": ""}),
+    ]
+
+
+class TestBatchEnrichmentJob:
+    """Test submitting, polling and mapping batch results."""
+
+    def make_job(self, server_url, work_dir):
+        processor = UnifiedLLMProcessor(
+            LLMConfig(provider="openai", model="gpt-4o-mini", api_key="test-key")
+        )
+        client = BatchAPIClient(server_url, "test-key")
+        return BatchEnrichmentJob(
+            processor, client, work_dir, poll_interval=0, fallback=False
+        )
+
+    def test_run_maps_results_onto_crates(self, batch_server, crates, temp_dir):
+        """Test the full submit/poll/collect cycle across both phases."""
+        job = self.make_job(batch_server, temp_dir)
+        enriched = job.run(crates)
+
+        assert [e.use_case for e in enriched] == ["Database", "Database", None]
+        assert enriched[0].readme_summary == "A database driver."
+        assert enriched[1].score == 7.5
+        assert "✅ Factual: It stores rows." in enriched[0].factual_counterfactual
+        # One batch for the independent tasks, one for classification
+        assert len(FakeBatchAPI.batches) == 2
+        assert job.processor.budget_manager.get_total_cost() >= 0
+
+        phase0 = FakeBatchAPI.files["file-0"].decode().splitlines()
+        custom_ids = {json.loads(line)["custom_id"] for line in phase0}
+        assert make_custom_id("alpha", "score") in custom_ids
+        assert not any(cid.startswith("empty::") for cid in custom_ids)
+
+    def test_resume_does_not_resubmit(self, batch_server, crates, temp_dir):
+        """Test that a restarted job reuses submitted batches and answers."""
+        first = self.make_job(batch_server, temp_dir)
+        first._submit_phase(0, crates, {})
+        assert len(FakeBatchAPI.batches) == 1
+
+        # A new process picks up the submitted batch from the state file
+        resumed = self.make_job(batch_server, temp_dir)
+        enriched = resumed.run(crates)
+
+        assert len(FakeBatchAPI.batches) == 2
+        assert enriched[0].use_case == "Database"
+
+        again = self.make_job(batch_server, temp_dir).run(crates)
+        assert len(FakeBatchAPI.batches) == 2
+        assert again[1].score == 7.5
+
+    def test_budget_truncates_submission(
+        self, batch_server, crates, temp_dir, monkeypatch
+    ):
+        """Test that a budget smaller than the batch limits what is submitted."""
+        # Every request and every answer costs 1.0
+        monkeypatch.setattr(
+            BudgetManager, "estimate_cost", staticmethod(lambda *args: 1.0)
+        )
+        job = self.make_job(batch_server, temp_dir)
+        job.processor.budget_manager = BudgetManager(budget=2.5)
+
+        enriched = job.run(crates)
+
+        phase0 = FakeBatchAPI.files["file-0"].decode().splitlines()
+        assert len(phase0) == 2
+        # Collected answers settle their reservations; nothing is left to submit
+        assert len(FakeBatchAPI.batches) == 1
+        assert job.processor.budget_manager.get_total_cost() == 2.0
+        assert job.processor.budget_manager.reserved_cost == 0
+        assert enriched[0].readme_summary == "A database driver."
+        assert enriched[0].use_case is None
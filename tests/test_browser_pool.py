@@ -0,0 +1,144 @@
+"""Tests for the browser pool used by the unified scraper."""
+
+import asyncio
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from rust_crate_pipeline.scraping.browser_pool import (
+    BrowserPool,
+    _proc_children_rss_mb,
+    child_processes_rss_mb,
+    is_browser_crash,
+)
+
+
+class FakeBrowsers:
+    """Factory of fake crawlers that records starts, stops and overlap."""
+
+    def __init__(self, crash_on=()):
+        self.crash_on = list(crash_on)
+        self.started = 0
+        self.closed = 0
+        self.active = 0
+        self.peak = 0
+
+    def __call__(self):
+        browsers = self
+
+        class FakeCrawler:
+            async def start(self):
+                browsers.started += 1
+
+            async def close(self):
+                browsers.closed += 1
+
+            async def arun(self, url, **kwargs):
+                browsers.active += 1
+                browsers.peak = max(browsers.peak, browsers.active)
+                try:
+                    await asyncio.sleep(0.01)
+                    if url in browsers.crash_on:
+                        browsers.crash_on.remove(url)
+                        return SimpleNamespace(
+                            success=False, error_message="Target closed"
+                        )
+                    if url == "broken":
+                        raise RuntimeError("Browser has disconnected")
+                    return SimpleNamespace(success=True, url=url)
+                finally:
+                    browsers.active -= 1
+
+        return FakeCrawler()
+
+
+class TestBrowserPool:
+    """Test leasing, recycling and crash recovery of browsers."""
+
+    async def test_pool_size_caps_concurrent_pages(self):
+        """Test that no more pages run at once than there are browsers."""
+        browsers = FakeBrowsers()
+        pool = BrowserPool(browsers, size=2, max_rss_mb=None)
+
+        await asyncio.gather(*(pool.run(url=f"page-{i}") for i in range(6)))
+        await pool.close()
+
+        assert browsers.peak == 2
+        assert browsers.started == 2
+        assert browsers.closed == 2
+        assert pool.stats()["pages"] == 6
+
+    async def test_browser_recycled_after_page_limit(self):
+        """Test that a browser is replaced after max_pages_per_browser pages."""
+        browsers = FakeBrowsers()
+        pool = BrowserPool(browsers, size=1, max_pages_per_browser=2, max_rss_mb=None)
+
+        for i in range(5):
+            await pool.run(url=f"page-{i}")
+
+        assert browsers.started == 3
+        assert pool.stats()["recycled"] == 2
+
+    async def test_crashed_browser_is_restarted_and_page_retried(self):
+        """Test that a crash result restarts the browser and retries once."""
+        browsers = FakeBrowsers(crash_on=["page"])
+        pool = BrowserPool(browsers, size=1, max_rss_mb=None)
+
+        result = await pool.run(url="page")
+
+        assert result.success
+        assert browsers.started == 2
+        assert pool.stats()["restarts"] == 1
+
+    async def test_repeated_crash_is_raised(self):
+        """Test that a page crashing the browser twice fails."""
+        browsers = FakeBrowsers()
+        pool = BrowserPool(browsers, size=1, max_rss_mb=None)
+
+        with pytest.raises(RuntimeError, match="disconnected"):
+            await pool.run(url="broken")
+        assert pool.stats()["restarts"] == 1
+
+    async def test_memory_limit_flags_running_browsers(self):
+        """Test that exceeding the memory limit recycles running browsers."""
+        browsers = FakeBrowsers()
+        pool = BrowserPool(browsers, size=1, max_rss_mb=100.0, watchdog_interval=3600)
+        await pool.run(url="page-1")
+
+        pool.check_memory(50.0)
+        await pool.run(url="page-2")
+        assert browsers.started == 1
+
+        pool.check_memory(150.0)
+        await pool.run(url="page-3")
+        await pool.close()
+
+        assert browsers.started == 2
+        assert pool.stats()["peak_rss_mb"] == 150.0
+
+    @pytest.mark.parametrize("probe", [child_processes_rss_mb, _proc_children_rss_mb])
+    def test_memory_counts_only_child_processes(self, probe):
+        """Test that the pipeline's own memory is not held against the browsers."""
+        if probe() is None:
+            pytest.skip("memory is not measurable here")
+        before = probe()
+        child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(10)"])
+        try:
+            time.sleep(0.3)
+            assert probe() > before
+        finally:
+            child.kill()
+            child.wait()
+
+        assert before < 100.0
+
+    def test_is_browser_crash(self):
+        """Test recognition of browser crash messages."""
+        assert is_browser_crash(
+            "Page.goto: Target page, context or browser has been closed"
+        )
+        assert not is_browser_crash("404 Not Found")
+        assert not is_browser_crash(None)
@@ -0,0 +1,126 @@
+"""Tests for boilerplate stripping and cross-source deduplication."""
+
+from rust_crate_pipeline.scraping.content_cleaner import (
+    ContentCleaner,
+    is_link_list,
+    split_blocks,
+)
+
+MENU = (
+    "[Docs](https://docs.rs/a) · [Source](https://docs.rs/b) · "
+    "[Releases](https://docs.rs/c)"
+)
+FOOTER = "Hosted by the docs.rs team. Served in 12ms. Report a problem with this page."
+
+
+def page(name, body):
+    """Markdown of a page wrapped in the site's chrome."""
+    return f"{MENU}\n\n# {name}\n\n{body}\n\n{FOOTER}"
+
+
+class TestBlocks:
+    """Test splitting and classifying markdown blocks."""
+
+    def test_split_keeps_fenced_code_whole(self):
+        """Test that blank lines inside code fences do not split blocks."""
+        blocks = split_blocks(
+            "# Title\n\nText.\n\n```rust\nfn a() {}\n\nfn b() {}\n```\n\nMore."
+        )
+
+        assert blocks == [
+            "# Title",
+            "Text.",
+            "```rust\nfn a() {}\n\nfn b() {}\n```",
+            "More.",
+        ]
+
+    def test_link_lists(self):
+        """Test that menus are link lists and prose with links is not."""
+        assert is_link_list(MENU)
+        assert is_link_list(
+            "- [de](de/index.html)\n- [ser](ser/index.html)\n"
+            "- [value](value/index.html)"
+        )
+        assert not is_link_list(
+            "Serde supports [JSON](https://a), [YAML](https://b) and "
+            "[TOML](https://c) through separate crates, each implementing "
+            "the data model described in this guide."
+        )
+        assert not is_link_list("```\n[a](b) [c](d) [e](f)\n```")
+
+
+class TestContentCleaner:
+    """Test learning a site's template and stripping it."""
+
+    def test_template_learned_across_pages(self):
+        """Test that chrome is dropped once enough pages repeat it."""
+        cleaner = ContentCleaner()
+        bodies = [
+            f"The {name} crate documents its own distinct API here."
+            for name in ("alpha", "beta", "gamma")
+        ]
+
+        cleaner.clean("https://docs.rs/a", page("a", bodies[0]))
+        cleaner.clean("https://docs.rs/b", page("b", bodies[1]))
+        cleaned = cleaner.clean("https://docs.rs/c", page("c", bodies[2]))
+
+        assert cleaned == f"# c\n\n{bodies[2]}"
+        assert cleaner.stats()["pages"] == 3
+        assert cleaner.removed_chars > 0
+
+    def test_unique_content_kept_before_learning(self):
+        """Test that the first pages of a site only lose link menus."""
+        cleaner = ContentCleaner()
+
+        cleaned = cleaner.clean("https://lib.rs/crates/a", page("a", "Body."))
+
+        assert MENU not in cleaned
+        assert FOOTER in cleaned and "Body." in cleaned
+
+    def test_sites_are_learned_separately(self):
+        """Test that a template on one host does not strip another host."""
+        cleaner = ContentCleaner()
+        for name in "abc":
+            cleaner.clean(f"https://docs.rs/{name}", page(name, "Body."))
+
+        cleaned = cleaner.clean("https://lib.rs/crates/d", page("d", "Body."))
+
+        assert FOOTER in cleaned
+
+    def test_repeated_page_counts_once(self):
+        """Test that rescraping one URL does not make its text a template."""
+        cleaner = ContentCleaner()
+        for _ in range(4):
+            cleaned = cleaner.clean("https://docs.rs/a", page("a", "Body."))
+
+        assert FOOTER in cleaned
+
+    def test_headings_and_code_are_kept(self):
+        """Test that repeated headings and code are never template."""
+        cleaner = ContentCleaner()
+        for name in "abcd":
+            cleaned = cleaner.clean(
+                f"https://docs.rs/{name}", "## Modules\n\n```rust\nuse std::io;\n```"
+            )
+
+        assert cleaned == "## Modules\n\n```rust\nuse std::io;\n```"
+
+
+class TestDedupe:
+    """Test deduplicating a crate's sources."""
+
+    def test_later_sources_lose_repeated_blocks(self):
+        """Test that a README shown twice is kept only in the first source."""
+        readme = (
+            "Serde is a framework for serializing and deserializing "
+            "Rust data structures."
+        )
+        cleaner = ContentCleaner()
+
+        deduped = cleaner.dedupe([
+            ("docs_rs", f"# serde\n\n{readme}"),
+            ("lib_rs", f"# serde\n\n{readme}\n\nUsed by 40,000 crates."),
+        ])
+
+        assert deduped["docs_rs"] == f"# serde\n\n{readme}"
+        assert deduped["lib_rs"] == "# serde\n\nUsed by 40,000 crates."
@@ -0,0 +1,57 @@
+"""Tests for early termination of streamed short answers."""
+
+from rust_crate_pipeline.early_stop import (
+    StreamAccumulator,
+    category_detector,
+    score_detector,
+)
+
+
+class TestAnswerDetectors:
+    """Test detection of complete answers in partial output."""
+
+    def test_category_needs_a_boundary(self):
+        """Test that a category is only accepted once it cannot grow."""
+        detect = category_detector(["Web Framework", "Database", "ML"])
+
+        assert detect("Data") is None
+        assert detect("Database") is None
+        assert detect("Database\n") == "Database"
+        assert detect("web framework.") == "Web Framework"
+        assert detect("ML, not Database ") == "ML"
+
+    def test_score_needs_a_complete_number(self):
+        """Test that a number is only accepted once it cannot be extended."""
+        assert score_detector("7") is None
+        assert score_detector("7.") is None
+        assert score_detector("7.5") is None
+        assert score_detector("7.5/10") == "7.5"
+        assert score_detector("Score: 8\n") == "8"
+        assert score_detector("9. Great crate") == "9"
+
+
+class TestStreamAccumulator:
+    """Test accumulating streamed chunks."""
+
+    def test_stops_at_answer(self):
+        """Test that the accumulator reports the answer and stops early."""
+        accumulator = StreamAccumulator(score_detector)
+        chunks = ["Sc", "ore: 7", ".", "5", " because", " reasons"]
+        consumed = 0
+        for chunk in chunks:
+            consumed += 1
+            if accumulator.add_text(chunk):
+                break
+
+        assert consumed == 5
+        assert accumulator.stopped_early
+        assert accumulator.content == "7.5"
+
+    def test_falls_back_to_full_text(self):
+        """Test that a stream ending without a detected answer keeps its text."""
+        accumulator = StreamAccumulator(score_detector)
+        for chunk in ["about ", "7"]:
+            accumulator.add_text(chunk)
+
+        assert not accumulator.stopped_early
+        assert accumulator.content == "about 7"
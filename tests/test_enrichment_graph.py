@@ -0,0 +1,120 @@
+"""Tests for the enrichment task graph."""
+
+import asyncio
+import threading
+import time
+import pytest
+
+from rust_crate_pipeline.enrichment_graph import (
+    EnrichmentTask,
+    run_task_graph,
+    run_task_graph_threaded,
+)
+
+
+class TestRunTaskGraph:
+    """Test async task graph execution."""
+
+    async def test_independent_tasks_run_concurrently(self):
+        """Test that tasks without dependencies overlap."""
+
+        async def slow(value):
+            await asyncio.sleep(0.05)
+            return value
+
+        start = time.perf_counter()
+        results = await run_task_graph(
+            [EnrichmentTask(name, lambda _, n=name: slow(n)) for name in "abcd"]
+        )
+        elapsed = time.perf_counter() - start
+
+        assert results == {"a": "a", "b": "b", "c": "c", "d": "d"}
+        assert elapsed < 0.15
+
+    async def test_dependency_receives_result(self):
+        """Test that a dependent task sees its dependency's output."""
+
+        async def summary(_):
+            return "summary"
+
+        async def classify(deps):
+            return f"classified from {deps['summary']}"
+
+        results = await run_task_graph(
+            [
+                EnrichmentTask("classify", classify, depends_on=("summary",)),
+                EnrichmentTask("summary", summary),
+            ]
+        )
+
+        assert results["classify"] == "classified from summary"
+
+    async def test_failed_task_yields_none(self):
+        """Test that one failing task does not abort the others."""
+
+        async def fail(_):
+            raise RuntimeError("boom")
+
+        async def ok(deps):
+            return deps["fail"]
+
+        results = await run_task_graph(
+            [
+                EnrichmentTask("fail", fail),
+                EnrichmentTask("ok", ok, depends_on=("fail",)),
+            ]
+        )
+
+        assert results == {"fail": None, "ok": None}
+
+    async def test_cycle_is_rejected(self):
+        """Test that dependency cycles raise ValueError."""
+        with pytest.raises(ValueError):
+            await run_task_graph(
+                [
+                    EnrichmentTask("a", lambda _: None, depends_on=("b",)),
+                    EnrichmentTask("b", lambda _: None, depends_on=("a",)),
+                ]
+            )
+
+
+class TestRunTaskGraphThreaded:
+    """Test thread pool task graph execution."""
+
+    def test_parallel_execution_with_dependency(self):
+        """Test threaded execution with a dependency chain."""
+        barrier = threading.Barrier(2, timeout=1)
+
+        def independent(name):
+            # Both independent tasks must be running at the same time
+            barrier.wait()
+            return name
+
+        results = run_task_graph_threaded(
+            [
+                EnrichmentTask("a", lambda _: independent("a")),
+                EnrichmentTask("b", lambda _: independent("b")),
+                EnrichmentTask(
+                    "c", lambda deps: deps["a"] + deps["b"], depends_on=("a", "b")
+                ),
+            ],
+            max_workers=2,
+        )
+
+        assert results == {"a": "a", "b": "b", "c": "ab"}
+
+    def test_single_worker_runs_in_order(self):
+        """Test that one worker runs tasks sequentially in dependency order."""
+        order = []
+        results = run_task_graph_threaded(
+            [
+                EnrichmentTask(
+                    "second", lambda deps: order.append("second"), depends_on=("first",)
+                ),
+                EnrichmentTask("first", lambda _: order.append("first")),
+            ],
+            max_workers=1,
+        )
+
+        assert order == ["first", "second"]
+        assert set(results) == {"first", "second"}
@@ -0,0 +1,107 @@
+"""Tests for selector-based extraction on known documentation sites."""
+
+from rust_crate_pipeline.scraping.extraction_schemas import (
+    extract_structured,
+    select_fields,
+    site_schema,
+)
+
+RUSTDOC_PAGE = """<html><body>
+<nav class="pure-menu"><ul class="pure-menu-list">
+<li class="pure-menu-item"><a href="/serde_derive/^1.0.210/" class="pure-menu-link">
+serde_derive ^1.0.210 <i class="dependencies normal">normal</i></a></li>
+<li class="pure-menu-item"><a href="/serde_json/^1/" class="pure-menu-link">
+serde_json ^1 <i class="dependencies dev">dev</i></a></li>
+<li class="pure-menu-item"><a href="/about" class="pure-menu-link">About</a></li>
+</ul></nav>
+<main><section id="main-content" class="content">
+<div class="main-heading"><h1>Crate <span>serde</span></h1></div>
+<details class="toggle top-doc" open><div class="docblock">
+<p>Serde is a framework for serializing and deserializing Rust data structures.</p>
+<pre class="rust rust-example-rendered"><code>use serde::Serialize;
+#[derive(Serialize)]
+struct Point { x: i32 }</code></pre>
+</div></details>
+<h2 id="modules">Modules</h2>
+<dl class="item-table"><dt><a class="mod" href="de/index.html">de</a></dt>
+<dt><a class="mod" href="ser/index.html">ser</a></dt></dl>
+<h2 id="macros">Macros</h2>
+<dl class="item-table"><dt>
+<a class="macro" href="macro.forward_to_deserialize_any.html">
+forward_to_deserialize_any</a></dt></dl>
+<h2 id="traits">Traits</h2>
+<dl class="item-table"><dt><a class="trait" href="trait.Serialize.html">Serialize</a>
+<span class="stab portability">
+Available on crate feature <code>derive</code> only</span>
+</dt></dl>
+</section></main></body></html>"""
+
+LIBRS_PAGE = """<html><body><header id="package">
+<h1>serde</h1><p class="desc">A generic serialization/deserialization framework</p>
+<span class="version">1.0.210</span>
+<p class="keywords"><a href="/keywords/serde">serde</a>
+<a href="/keywords/no-std">no_std</a></p>
+</header><main>
+<section id="readme"><pre class="language-rust">let x = 1;</pre></section>
+<section id="deps">
+<ul><li><a href="/crates/serde_derive">serde_derive</a></li></ul></section>
+</main></body></html>"""
+
+
+class TestExtractStructured:
+    """Test the built-in site schemas."""
+
+    def test_docs_rs_fields(self):
+        """Test that rustdoc pages yield API items, examples and dependencies."""
+        data = extract_structured(RUSTDOC_PAGE, "https://docs.rs/serde/1.0.210/serde/")
+
+        assert data["title"] == "Crate serde"
+        assert data["description"].startswith("Serde is a framework")
+        assert data["examples"] == [
+            "use serde::Serialize;\n#[derive(Serialize)]\nstruct Point { x: i32 }"
+        ]
+        assert data["dependencies"] == ["serde_derive ^1.0.210", "serde_json ^1"]
+        assert data["features"] == ["derive"]
+        assert data["modules"] == ["de", "ser"]
+        assert data["traits"] == ["Serialize"]
+        assert data["macros"] == ["forward_to_deserialize_any"]
+        assert "structs" not in data
+
+    def test_lib_rs_fields(self):
+        """Test that lib.rs crate pages yield metadata and dependencies."""
+        data = extract_structured(LIBRS_PAGE, "https://lib.rs/crates/serde")
+
+        description = "A generic serialization/deserialization framework"
+        assert data["description"] == description
+        assert data["version"] == "1.0.210"
+        assert data["keywords"] == ["serde", "no_std"]
+        assert data["examples"] == ["let x = 1;"]
+        assert data["dependencies"] == ["serde_derive"]
+
+    def test_unknown_site(self):
+        """Test that unknown layouts are not guessed at."""
+        assert site_schema("https://example.com/docs") is None
+        assert extract_structured(RUSTDOC_PAGE, "https://example.com/docs") == {}
+
+
+class TestSelectFields:
+    """Test matching selector output against a requested schema."""
+
+    def test_requested_fields_only(self):
+        """Test that only the fields in the schema are kept."""
+        schema = {"type": "object", "properties": {"features": {}, "examples": {}}}
+        data = {"features": ["derive"], "modules": ["de"]}
+
+        assert select_fields(data, schema) == {"features": ["derive"]}
+        assert select_fields(data, None) == data
+
+    def test_missing_fields_need_llm(self):
+        """Test that no match, or a missing required field, returns None."""
+        schema = {
+            "properties": {"features": {}, "examples": {}},
+            "required": ["examples"],
+        }
+
+        assert select_fields({"features": ["derive"]}, schema) is None
+        features = {"properties": {"features": {}}}
+        assert select_fields({"modules": ["de"]}, features) is None
@@ -0,0 +1,74 @@
+"""Tests for constrained-decoding output grammars."""
+
+import json
+
+from rust_crate_pipeline.grammars import category_grammar, factual_pairs_grammar
+
+
+class TestCategoryGrammar:
+    """Test the single-category grammar."""
+
+    def test_gbnf_lists_each_category(self):
+        """Test that the GBNF root is an alternation of category literals."""
+        grammar = category_grammar(["AI", "Web Framework"])
+        assert grammar.gbnf == 'root ::= "AI" | "Web Framework"\n'
+
+    def test_decode_renders_enum_value(self):
+        """Test that a JSON answer becomes the bare category name."""
+        grammar = category_grammar(["AI", "Database"])
+        assert grammar.decode('{"use_case": "Database"}') == "Database"
+        # Unknown values and plain text are left untouched
+        assert grammar.decode('{"use_case": "Games"}') == '{"use_case": "Games"}'
+        assert grammar.decode("Database") == "Database"
+
+
+class TestFactualPairsGrammar:
+    """Test the factual/counterfactual pair grammar."""
+
+    def test_gbnf_repetition_range(self):
+        """Test that the root rule allows exactly the requested pair counts."""
+        assert factual_pairs_grammar(2, 3).gbnf.startswith("root ::= pair pair pair?\n")
+        assert factual_pairs_grammar(1, 3).gbnf.startswith(
+            "root ::= pair (pair pair?)?\n"
+        )
+        assert factual_pairs_grammar(5).gbnf.startswith(
+            "root ::= pair pair pair pair pair\n"
+        )
+
+    def test_gbnf_bounds_statements(self):
+        """Test that statements are bounded so a full answer fits max_tokens."""
+        assert factual_pairs_grammar(2, 3, max_chars=80).gbnf.endswith(
+            "statement ::= [^\\n✅❌]{1,80}\n"
+        )
+
+    def test_local_enricher_asks_for_five_pairs(self):
+        """Test that the local grammar accepts 3-5 pairs for a 5-pair prompt."""
+        from rust_crate_pipeline.ai_processing import (
+            FACTUAL_PAIRS_GRAMMAR,
+            FACTUAL_PAIRS_PREFIX,
+        )
+
+        assert "Create exactly 5 pairs" in FACTUAL_PAIRS_PREFIX
+        assert FACTUAL_PAIRS_GRAMMAR.gbnf.startswith(
+            "root ::= pair pair pair (pair pair?)?\n"
+        )
+
+    def test_decode_renders_pairs(self):
+        """Test that JSON pairs become the pipeline's text format."""
+        grammar = factual_pairs_grammar(2, 3)
+        answer = json.dumps({"pairs": [
+            {"factual": "It parses JSON. ", "counterfactual": "It renders HTML."},
+            {"factual": "", "counterfactual": "Skipped."},
+            {"factual": "It is no_std.", "counterfactual": "It needs a GC."},
+        ]})
+        assert grammar.decode(answer) == (
+            "✅ Factual: It parses JSON.\n❌ Counterfactual: It renders HTML.\n\n"
+            "✅ Factual: It is no_std.\n❌ Counterfactual: It needs a GC."
+        )
+
+    def test_response_format_is_strict_schema(self):
+        """Test the OpenAI-style response format."""
+        response_format = factual_pairs_grammar(2, 3).response_format()
+        assert response_format["type"] == "json_schema"
+        assert response_format["json_schema"]["strict"] is True
+        assert response_format["json_schema"]["schema"]["required"] == ["pairs"]
@@ -0,0 +1,114 @@
+"""Tests for the persistent LLM response cache."""
+
+import os
+import pytest
+from unittest.mock import patch
+
+from rust_crate_pipeline.config import PipelineConfig
+from rust_crate_pipeline.llm_cache import LLMResponseCache, get_llm_cache
+from rust_crate_pipeline.utils.disk_cache import DiskCache
+
+
+class TestDiskCache:
+    """Test the SQLite-backed disk cache."""
+
+    def test_set_and_get(self, temp_dir):
+        """Test storing and reading a value across instances."""
+        path = os.path.join(temp_dir, "cache.sqlite")
+        cache = DiskCache(path)
+        cache.set("key", b"value")
+        cache.close()
+
+        reopened = DiskCache(path)
+        assert reopened.get("key") == b"value"
+        assert reopened.get("missing") is None
+        assert reopened.stats()["hits"] == 1
+        assert reopened.stats()["misses"] == 1
+
+    def test_ttl_expiry(self):
+        """Test that expired entries are treated as misses."""
+        cache = DiskCache(":memory:", ttl=10)
+        with patch(
+            "rust_crate_pipeline.utils.disk_cache.time.time", return_value=1000.0
+        ):
+            cache.set("key", b"value")
+        with patch(
+            "rust_crate_pipeline.utils.disk_cache.time.time", return_value=1005.0
+        ):
+            assert cache.get("key") == b"value"
+        with patch(
+            "rust_crate_pipeline.utils.disk_cache.time.time", return_value=1011.0
+        ):
+            assert cache.get("key") is None
+        assert cache.stats()["entries"] == 0
+
+    def test_lru_eviction_by_entries(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = DiskCache(":memory:", max_entries=2)
+        with patch(
+            "rust_crate_pipeline.utils.disk_cache.time.time",
+            side_effect=[1.0, 2.0, 3.0, 4.0],
+        ):
+            cache.set("a", b"1")
+            cache.set("b", b"2")
+            cache.get("a")  # "b" is now the least recently used
+            cache.set("c", b"3")
+
+        assert cache.get("a") == b"1"
+        assert cache.get("b") is None
+        assert cache.get("c") == b"3"
+        assert cache.stats()["evictions"] == 1
+
+    def test_eviction_by_bytes(self):
+        """Test the total size bound."""
+        cache = DiskCache(":memory:", max_bytes=10)
+        cache.set("a", b"12345")
+        cache.set("b", b"12345")
+        cache.set("c", b"12345")
+
+        assert cache.stats()["bytes"] <= 10
+        assert cache.get("c") == b"12345"
+
+
+class TestLLMResponseCache:
+    """Test the LLM response cache."""
+
+    def test_key_depends_on_request_fields(self):
+        """Test that every keyed field changes the key."""
+        base = dict(
+            provider="ollama",
+            model="llama2",
+            system_message="system",
+            prompt="prompt",
+            temperature=0.2,
+            max_tokens=100,
+        )
+        key = LLMResponseCache.make_key(**base)
+        assert key == LLMResponseCache.make_key(**base)
+        for field, value in [
+            ("provider", "azure"),
+            ("model", "gpt-4o"),
+            ("system_message", "other"),
+            ("prompt", "other"),
+            ("temperature", 0.3),
+            ("max_tokens", 101),
+        ]:
+            assert key != LLMResponseCache.make_key(**{**base, field: value})
+
+    def test_bypass_skips_lookup_but_writes(self):
+        """Test that bypass always misses while still storing responses."""
+        cache = LLMResponseCache(":memory:", bypass=True)
+        cache.set("key", "response")
+        assert cache.get("key") is None
+
+        cache.bypass = False
+        assert cache.get("key") == "response"
+        assert cache.stats()["bypassed"] == 1
+
+    def test_shared_instance_per_path(self, temp_dir):
+        """Test that enrichers with the same config share one cache."""
+        config = PipelineConfig(llm_cache_path=os.path.join(temp_dir, "llm.sqlite"))
+        assert get_llm_cache(config) is get_llm_cache(config)
+
+        disabled = PipelineConfig(llm_cache_enabled=False)
+        assert get_llm_cache(disabled) is None
@@ -0,0 +1,144 @@
+"""Tests for the multi-endpoint LLM router."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("litellm")
+
+from rust_crate_pipeline.llm_router import (
+    EndpointHealth,
+    RoutedLLMProcessor,
+    RouterConfig,
+)
+from rust_crate_pipeline.unified_llm_processor import LLMConfig
+
+
+def make_response(content: str):
+    """Build a minimal LiteLLM-style completion response."""
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5),
+    )
+
+
+def ollama(host: str) -> LLMConfig:
+    """Endpoint config for an Ollama host."""
+    return LLMConfig(provider="ollama", model="llama2", ollama_host=host)
+
+
+class TestRoutedLLMProcessor:
+    """Test routing, failover and hedging."""
+
+    def test_falls_back_and_opens_circuit(self):
+        """Test that a failing endpoint is skipped once its circuit opens."""
+        router = RoutedLLMProcessor(
+            [ollama("http://sick:11434"), ollama("http://healthy:11434")],
+            RouterConfig(failure_threshold=2, cooldown_seconds=60),
+        )
+        # Always pick the first available endpoint so the sick one is tried
+        router._random = SimpleNamespace(
+            choices=lambda population, weights: [population[0]]
+        )
+        calls = []
+
+        def fake_completion(**kwargs):
+            calls.append(kwargs["api_base"])
+            if "sick" in kwargs["api_base"]:
+                raise ConnectionError("down")
+            return make_response("ok")
+
+        with patch("rust_crate_pipeline.llm_router.completion", new=fake_completion):
+            results = [
+                router.call_llm(f"prompt {i}", use_cache=False) for i in range(6)
+            ]
+
+        assert results == ["ok"] * 6
+        assert calls.count("http://sick:11434") == 2
+        stats = router.get_endpoint_stats()
+        assert stats["ollama:http://sick:11434"]["circuit_open"] is True
+        assert stats["ollama:http://healthy:11434"]["requests"] == 6
+
+    def test_half_open_admits_one_trial(self):
+        """Test that only one request probes an endpoint after its cooldown."""
+        health = EndpointHealth(RouterConfig(failure_threshold=1, cooldown_seconds=0))
+        health.record_failure()
+
+        assert health.allow_request()
+        assert not health.allow_request()
+        assert not health.is_available()
+
+        # A failed trial reopens the circuit; a successful one closes it
+        health.record_failure()
+        assert health.allow_request()
+        health.record_success(0.1)
+        assert health.allow_request() and health.allow_request()
+
+    def test_weight_prefers_fast_reliable_endpoints(self):
+        """Test that health weights favour low latency and low error rate."""
+        router = RoutedLLMProcessor(
+            [ollama("http://a:11434"), ollama("http://b:11434")]
+        )
+        fast, slow = router.endpoints
+        for _ in range(5):
+            fast.health.record_success(0.1)
+            slow.health.record_success(2.0)
+        assert fast.health.weight() > slow.health.weight()
+
+        slow_weight = slow.health.weight()
+        slow.health.record_failure()
+        assert slow.health.weight() < slow_weight
+
+    async def test_hedges_past_p95_latency(self):
+        """Test that a slow request is hedged to the next endpoint."""
+        router = RoutedLLMProcessor(
+            [ollama("http://slow:11434"), ollama("http://fast:11434")],
+            RouterConfig(hedge=True, hedge_min_samples=3),
+        )
+        slow, fast = router.endpoints
+        for _ in range(3):
+            slow.health.record_success(0.01)
+        # Make the slow endpoint the weighted pick
+        fast.health.ewma_error = 0.99
+
+        async def fake_acompletion(**kwargs):
+            if "slow" in kwargs["api_base"]:
+                try:
+                    await asyncio.sleep(1)
+                except asyncio.CancelledError:
+                    # The provider answered (and billed) before the cancel
+                    pass
+                return make_response("slow answer")
+            return make_response("fast answer")
+
+        with patch("rust_crate_pipeline.llm_router.acompletion", new=fake_acompletion):
+            result = await router.acall_llm("prompt", use_cache=False)
+
+        assert result == "fast answer"
+        assert router.hedged_requests == 1
+        # Both the winner and the losing hedge are billed
+        assert len(router.budget_manager.records) == 2
+
+    async def test_cancelled_call_cancels_its_requests(self):
+        """Test that cancelling the caller does not orphan endpoint requests."""
+        router = RoutedLLMProcessor([ollama("http://a:11434")])
+        cancelled = asyncio.Event()
+
+        async def fake_acompletion(**kwargs):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with patch("rust_crate_pipeline.llm_router.acompletion", new=fake_acompletion):
+            call = asyncio.ensure_future(router.acall_llm("prompt", use_cache=False))
+            await asyncio.sleep(0.05)
+            call.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await call
+
+        assert cancelled.is_set()
+        assert router.endpoints[0].health.is_available()
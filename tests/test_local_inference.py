@@ -0,0 +1,112 @@
+"""Tests for multi-worker local inference."""
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from rust_crate_pipeline.local_inference import (
+    GenerationRequest,
+    LocalInferencePool,
+    PrefixStateCache,
+    shortest_first,
+)
+
+
+class TestShortestFirst:
+    """Test shortest-first scheduling."""
+
+    def test_orders_by_prompt_and_output_length(self):
+        """Test that cheaper requests are scheduled first."""
+        requests = [
+            GenerationRequest("x" * 400, max_tokens=10),
+            GenerationRequest("x" * 40, max_tokens=10),
+            GenerationRequest("x" * 40, max_tokens=300),
+        ]
+
+        assert shortest_first(requests) == [1, 0, 2]
+
+
+class TestLocalInferencePool:
+    """Test the worker pool without loading a model."""
+
+    def test_generate_many_keeps_input_order(self):
+        """Test that results come back in input order despite scheduling."""
+        pool = LocalInferencePool("model.gguf", workers=2, model_kwargs={"n_ctx": 4096})
+        pool._executor = ThreadPoolExecutor(max_workers=1)
+        submitted = []
+
+        def fake_generate(request):
+            submitted.append(request.prompt)
+            if request.prompt == "fail":
+                raise RuntimeError("worker crashed")
+            return request.prompt.upper()
+
+        requests = [GenerationRequest(p) for p in ("a longer prompt", "fail", "short")]
+        with patch(
+            "rust_crate_pipeline.local_inference._worker_generate", new=fake_generate
+        ):
+            results = pool.generate_many(requests)
+        pool.close()
+
+        assert results == ["A LONGER PROMPT", None, "SHORT"]
+        assert submitted == ["fail", "short", "a longer prompt"]
+        assert pool.model_kwargs["use_mlock"] is False
+
+
+class FakeLlama:
+    """Stand-in for llama_cpp.Llama that records evaluated tokens."""
+
+    def __init__(self):
+        self._input_ids = []
+        self.n_tokens = 0
+        self.evaluated = 0
+        self.loads = 0
+
+    def tokenize(self, text):
+        return list(text.decode("utf-8"))
+
+    def reset(self):
+        self._input_ids = []
+        self.n_tokens = 0
+
+    def eval(self, tokens):
+        self.evaluated += len(tokens)
+        self._input_ids = self._input_ids + list(tokens)
+        self.n_tokens = len(self._input_ids)
+
+    def save_state(self):
+        return list(self._input_ids)
+
+    def load_state(self, state):
+        self.loads += 1
+        self._input_ids = list(state)
+        self.n_tokens = len(state)
+
+
+class TestPrefixStateCache:
+    """Test saving and restoring model state after static prefixes."""
+
+    def test_prefix_evaluated_once_per_task_type(self):
+        """Test that each prefix is evaluated once and then restored."""
+        model = FakeLlama()
+        cache = PrefixStateCache(model)
+
+        cache.prepare("classify:")
+        cache.prepare("summarize:")
+        cache.prepare("classify:")
+
+        assert model.evaluated == len("classify:") + len("summarize:")
+        assert model.loads == 1
+        assert model._input_ids == list("classify:")
+        assert cache.stats() == {"entries": 2, "hits": 1, "misses": 2}
+
+    def test_matching_state_is_not_reloaded(self):
+        """Test that a model already holding the prefix skips load_state."""
+        model = FakeLlama()
+        cache = PrefixStateCache(model)
+        cache.prepare("classify:")
+        # A completion extends the evaluated tokens past the prefix
+        model.eval(list("crate tokio"))
+
+        cache.prepare("classify:")
+
+        assert model.loads == 0
@@ -0,0 +1,148 @@
+"""Tests for per-domain request pacing."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from rust_crate_pipeline.politeness import (
+    DomainScheduler,
+    RobotsDisallowed,
+    parse_retry_after,
+)
+from rust_crate_pipeline.scraping.http_fetcher import HttpFetcher
+
+ROBOTS = "User-agent: *\nDisallow: /private\nCrawl-delay: 1\n"
+
+
+class RobotsFiles:
+    """Stand-in robots.txt fetcher that counts requests."""
+
+    def __init__(self, text=""):
+        self.text = text
+        self.urls = []
+
+    def __call__(self, url):
+        self.urls.append(url)
+        return self.text
+
+
+def scheduler(robots_text="", **kwargs):
+    """Scheduler with a fake robots.txt and fast defaults."""
+    kwargs.setdefault("min_interval", 0.0)
+    return DomainScheduler(robots_fetcher=RobotsFiles(robots_text), **kwargs)
+
+
+class TestPacing:
+    """Test per-domain concurrency and gaps."""
+
+    async def test_concurrency_is_per_domain(self):
+        """Test that one domain is capped while another runs alongside."""
+        pacer = scheduler(max_per_domain=1)
+        active = {}
+        peak = {}
+
+        async def request(url, host):
+            await pacer.acquire(url)
+            active[host] = active.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), active[host])
+            peak["all"] = max(peak.get("all", 0), sum(active.values()))
+            await asyncio.sleep(0.03)
+            active[host] -= 1
+            pacer.release(url, 200)
+
+        await asyncio.gather(
+            *(request(f"https://docs.rs/crate{i}", "docs.rs") for i in range(3)),
+            *(request(f"https://lib.rs/crates/crate{i}", "lib.rs") for i in range(3)),
+        )
+
+        assert peak["docs.rs"] == 1
+        assert peak["lib.rs"] == 1
+        assert peak["all"] == 2
+
+    def test_minimum_gap_between_requests(self):
+        """Test that request starts on one domain are spaced out."""
+        pacer = scheduler(min_interval=0.1)
+        started = time.monotonic()
+
+        for name in "abc":
+            pacer.acquire_sync(f"https://docs.rs/{name}")
+            pacer.release(f"https://docs.rs/{name}", 200)
+
+        assert time.monotonic() - started >= 0.19
+        assert pacer.stats()["waited_seconds"] >= 0.19
+
+
+class TestRobots:
+    """Test obeying robots.txt."""
+
+    async def test_disallowed_url_raises(self):
+        """Test that excluded paths are refused and robots.txt is fetched once."""
+        pacer = scheduler(ROBOTS)
+
+        with pytest.raises(RobotsDisallowed):
+            await pacer.acquire("https://docs.rs/private/page")
+        await pacer.acquire("https://docs.rs/serde")
+        pacer.release("https://docs.rs/serde", 200)
+
+        assert pacer.robots_fetcher.urls == ["https://docs.rs/robots.txt"]
+        assert pacer.stats()["disallowed"] == 1
+
+    async def test_crawl_delay_raises_gap(self):
+        """Test that Crawl-delay overrides a shorter minimum gap."""
+        pacer = scheduler(ROBOTS, min_interval=0.01)
+        await pacer.acquire("https://docs.rs/serde")
+        pacer.release("https://docs.rs/serde", 200)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(pacer.acquire("https://docs.rs/tokio"), 0.3)
+
+        # The cancelled request gave its slot back
+        assert pacer._domains["docs.rs"].active == 0
+
+    def test_missing_robots_allows_everything(self):
+        """Test that a site without robots.txt is not restricted."""
+        pacer = scheduler("")
+
+        pacer.acquire_sync("https://lib.rs/private")
+        pacer.release("https://lib.rs/private", 200)
+
+        assert pacer.stats()["disallowed"] == 0
+
+
+class TestBackoff:
+    """Test slowing down after 429/503."""
+
+    async def test_retry_after_pauses_domain(self):
+        """Test that a 429 with Retry-After delays the next request."""
+        pacer = scheduler()
+        await pacer.acquire("https://lib.rs/crates/a")
+        pacer.release("https://lib.rs/crates/a", 429, "0.2")
+
+        started = time.monotonic()
+        await pacer.acquire("https://lib.rs/crates/b")
+        pacer.release("https://lib.rs/crates/b", 200)
+
+        assert time.monotonic() - started >= 0.19
+        assert pacer.stats()["backoffs"] == 1
+
+    def test_parse_retry_after(self):
+        """Test delay and HTTP-date forms of Retry-After."""
+        assert parse_retry_after("120") == 120.0
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(None) is None
+
+    async def test_http_fetcher_reports_status(self):
+        """Test that HttpFetcher pauses the domain after a 503."""
+        pacer = scheduler()
+        fetcher = HttpFetcher(
+            transport=httpx.MockTransport(lambda request: httpx.Response(503)),
+            scheduler=pacer,
+        )
+
+        assert await fetcher.fetch("https://docs.rs/serde") is None
+        await fetcher.close()
+
+        assert pacer.stats()["backoffs"] == 1
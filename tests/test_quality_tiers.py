@@ -0,0 +1,58 @@
+"""Tests for budget-driven quality tiers."""
+
+import pytest
+
+pytest.importorskip("litellm")
+
+from rust_crate_pipeline.quality_tiers import (
+    QUALITY_TIERS,
+    TierPlanner,
+    current_tier,
+    tier_scope,
+)
+from rust_crate_pipeline.unified_llm_processor import BudgetManager
+
+TIER_COSTS = {"full": 0.4, "reduced": 0.2, "minimal": 0.1, "metadata": 0.0}
+
+
+def estimate(tier):
+    return TIER_COSTS[tier.name]
+
+
+class TestTierPlanner:
+    """Test tier assignment from budget shares."""
+
+    def test_priority_is_download_percentile(self):
+        """Test that priority ranks downloads among the crates seen so far."""
+        planner = TierPlanner(BudgetManager(budget=1.0))
+        assert planner.priority(100) == 0.5
+        assert planner.priority(1000) == 0.75
+        assert planner.priority(1) == pytest.approx(1 / 6)
+
+    def test_popular_crates_get_better_tiers(self):
+        """Test that the share of the budget scales with priority."""
+        planner = TierPlanner(BudgetManager(budget=1.0), total_crates=4)
+        assert planner.choose("median", 100, estimate).name == "reduced"
+        assert planner.choose("popular", 1000, estimate).name == "full"
+        assert planner.choose("obscure", 1, estimate).name == "reduced"
+        assert planner.report() == {"full": 1, "reduced": 2}
+
+    def test_exhausted_budget_falls_back_to_metadata(self):
+        """Test that every crate still gets a tier once the budget is spent."""
+        budget_manager = BudgetManager(budget=1.0)
+        budget_manager.total_cost = 1.0
+        planner = TierPlanner(budget_manager, total_crates=2)
+        assert planner.choose("late", 10**6, estimate) is QUALITY_TIERS[-1]
+
+    def test_skipped_crates_reduce_crates_left(self):
+        """Test that crates without LLM work count as done."""
+        planner = TierPlanner(BudgetManager(budget=1.0), total_crates=2)
+        planner.skip("no-readme")
+        assert planner.share(0.5) == 1.0
+        assert planner.report() == {}
+
+    def test_tier_scope(self):
+        """Test that the active tier is restored after the block."""
+        with tier_scope(QUALITY_TIERS[2]):
+            assert current_tier().name == "minimal"
+        assert current_tier().name == "full"
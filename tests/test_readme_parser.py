@@ -0,0 +1,108 @@
+"""Tests for the README document model."""
+
+from rust_crate_pipeline.readme_parser import (
+    ReadmeDocument,
+    ReadmeDocumentCache,
+    heading_priority,
+    parse_readme,
+)
+
+README = """Fast serialization for Rust.
+
+# Installation
+
+Add this to Cargo.toml.
+
+```toml
+[dependencies]
+demo = "1"
+```
+
+## Examples
+
+```rust
+# fn main() {
+let value = demo::to_string(&42);
+# }
+```
+
+## License
+
+MIT or Apache-2.0, at your option. Long legal text follows here.
+"""
+
+
+class CountingTokenizer:
+    """Whitespace tokenizer that counts encode calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, text):
+        self.calls += 1
+        return text.split(" ")
+
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+
+class TestReadmeDocument:
+    """Test README parsing and truncation."""
+
+    def test_sections_and_code_snippets(self):
+        """Test that sections, priorities and Rust snippets are extracted."""
+        document = parse_readme(README)
+
+        assert [s.heading for s in document.sections] == [
+            "Introduction",
+            "Installation",
+            "Examples",
+            "License",
+        ]
+        # Lines starting with "#" inside a code fence are not headers
+        assert document.code_snippets == [
+            "# fn main() {\nlet value = demo::to_string(&42);\n# }"
+        ]
+        assert document.section_dict()["Installation"].startswith("Add this")
+
+    def test_heading_priority(self):
+        """Test heading priorities, including plural headings."""
+        assert heading_priority("Examples") == 10
+        assert heading_priority("Feature flags") == 9
+        assert heading_priority("Configuration") == 8
+        assert heading_priority("API") == 7
+        assert heading_priority("Rapid prototyping") == 5
+
+    def test_truncate_prefers_high_priority_sections(self):
+        """Test that budgets keep the highest-priority sections first."""
+        document = parse_readme(README)
+
+        assert document.truncate(10_000) == README
+        truncated = document.truncate(30)
+        assert "## Examples" in truncated
+        assert "## License" not in truncated
+
+    def test_tokens_counted_once(self):
+        """Test that repeated budgets reuse cached token counts."""
+        tokenizer = CountingTokenizer()
+        document = ReadmeDocument(README, tokenizer)
+        document.truncate(12)
+        calls = tokenizer.calls
+        document.truncate(12)
+        document.truncate(15)
+
+        # Only the partially included section is encoded again
+        assert tokenizer.calls <= calls + 1
+
+
+class TestReadmeDocumentCache:
+    """Test the per-enricher document cache."""
+
+    def test_same_text_parsed_once(self):
+        """Test that documents are reused and evicted LRU."""
+        cache = ReadmeDocumentCache(maxsize=1)
+        first = cache.get(README)
+
+        assert cache.get(README) is first
+        cache.get("other")
+        assert cache.get(README) is not first
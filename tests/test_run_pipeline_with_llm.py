@@ -0,0 +1,63 @@
+"""Tests for the multi-provider pipeline entry point."""
+
+import sys
+
+import pytest
+
+pytest.importorskip("litellm")
+
+import run_pipeline_with_llm
+from rust_crate_pipeline.config import PipelineConfig
+from rust_crate_pipeline.llm_cache import get_llm_cache
+
+NO_CACHE = PipelineConfig(llm_cache_enabled=False)
+
+
+def parse(monkeypatch, *flags):
+    """Parse the script's command line for one crate."""
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "run_pipeline_with_llm.py",
+            "--llm-provider", "ollama",
+            "--llm-model", "llama2",
+            "--crates", "serde",
+            *flags,
+        ],
+    )
+    return run_pipeline_with_llm.parse_args()
+
+
+class TestBuildLLMProcessor:
+    """Test that command-line flags reach the processor config."""
+
+    def test_concurrency_flag_reaches_config(self, monkeypatch):
+        """Test that --llm-max-concurrency sizes the provider semaphore."""
+        args = parse(monkeypatch, "--llm-max-concurrency", "9")
+
+        processor = run_pipeline_with_llm.build_llm_processor(args, NO_CACHE)
+
+        assert processor.config.max_concurrent_requests == 9
+        assert processor.config.enrichment_mode == "per_task"
+
+    def test_enrichment_mode_flag_reaches_config(self, monkeypatch):
+        """Test that --llm-enrichment-mode selects structured enrichment."""
+        args = parse(monkeypatch, "--llm-enrichment-mode", "structured")
+
+        processor = run_pipeline_with_llm.build_llm_processor(args, NO_CACHE)
+
+        assert processor.config.enrichment_mode == "structured"
+
+    def test_llm_cache_is_shared(self, monkeypatch, temp_dir):
+        """Test that the processor shares the LLM cache and honours the bypass."""
+        args = parse(monkeypatch, "--llm-cache-bypass")
+        config = PipelineConfig(
+            llm_cache_path=f"{temp_dir}/llm.sqlite",
+            llm_cache_bypass=args.llm_cache_bypass,
+        )
+
+        processor = run_pipeline_with_llm.build_llm_processor(args, config)
+
+        assert processor.cache is get_llm_cache(config)
+        assert processor.cache.bypass
@@ -0,0 +1,148 @@
+"""Tests for API surface summaries from rustdoc output."""
+
+import os
+
+import httpx
+
+from rust_crate_pipeline.rustdoc_index import (
+    load_api_surface,
+    parse_search_index,
+    search_index_url,
+)
+from rust_crate_pipeline.scraping.scrape_cache import ScrapeCache
+from rust_crate_pipeline.scraping.unified_scraper import ScrapingResult, UnifiedScraper
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+class TestSearchIndex:
+    """Test summaries of docs.rs search index files."""
+
+    def test_current_format(self):
+        """Test the Map/JSON format with sparse paths and a type string."""
+        summary = parse_search_index(fixture("search-index.js"), "demo-crate")
+
+        assert summary["source"] == "search_index"
+        assert summary["public_items"] == 6
+        assert summary["items_by_kind"] == {
+            "enum": 1, "function": 1, "macro": 1, "module": 2, "struct": 1,
+        }
+        assert summary["modules"] == [
+            "demo_crate", "demo_crate::codec", "demo_crate::codec::nested",
+        ]
+        assert summary["module_depth"] == 2
+        assert summary["documented_ratio"] == round(4 / 6, 3)
+        # Deprecation is a bitmap in this format and is not decoded
+        assert summary["deprecated_count"] is None
+
+    def test_legacy_format(self):
+        """Test the older object format with repeated paths and a deprecated list."""
+        summary = parse_search_index(fixture("search-index-legacy.js"), "demo_crate")
+
+        assert summary["public_items"] == 6
+        assert summary["deprecated_count"] == 1
+        assert summary["deprecated_items"] == ["demo_crate::old_api"]
+        assert "demo_crate::codec::nested" in summary["modules"]
+
+    def test_unreadable_index(self):
+        """Test that an unknown format yields no summary."""
+        assert parse_search_index("var searchIndex = {};", "demo_crate") is None
+        assert parse_search_index("[]", "demo_crate") is None
+
+
+class TestRustdocJson:
+    """Test summaries of rustdoc JSON output."""
+
+    def test_public_items(self):
+        """Test that only public items reachable from the root are counted."""
+        summary = load_api_surface(os.path.join(FIXTURES, "rustdoc.json"))
+
+        assert summary["source"] == "rustdoc_json"
+        assert summary["crate_version"] == "0.3.1"
+        assert summary["items_by_kind"] == {
+            "enum": 1, "function": 1, "module": 1, "proc_derive": 1, "struct": 1,
+        }
+        assert summary["modules"] == ["demo_crate", "demo_crate::codec"]
+        assert summary["documented_ratio"] == 0.8
+        assert summary["deprecated_items"] == ["demo_crate::old_api"]
+
+    def test_missing_file(self, temp_dir):
+        """Test that an unreadable file yields no summary."""
+        assert load_api_surface(os.path.join(temp_dir, "missing.json")) is None
+
+
+class TestApiSurfaceScraping:
+    """Test locating and fetching the search index of a docs.rs page."""
+
+    def test_search_index_url(self):
+        """Test both ways rustdoc pages reference their search index."""
+        page = "https://docs.rs/demo-crate/0.3.1/demo_crate/"
+        vars_tag = (
+            '<div id="rustdoc-vars" data-root-path="../" '
+            'data-resource-suffix="-20240801-1.82.0"></div>'
+        )
+        legacy_tag = (
+            '<div id="rustdoc-vars" '
+            'data-search-index-js="../search-index-20230101.js"></div>'
+        )
+
+        assert search_index_url(vars_tag, page) == (
+            "https://docs.rs/demo-crate/0.3.1/search-index-20240801-1.82.0.js"
+        )
+        assert search_index_url(legacy_tag, page) == (
+            "https://docs.rs/demo-crate/0.3.1/search-index-20230101.js"
+        )
+        assert search_index_url("<html></html>", page) is None
+
+    def test_search_index_url_from_meta_tag(self):
+        """Test current rustdoc pages, which keep their variables in a <meta>."""
+        page = "https://docs.rs/demo-crate/0.3.1/demo_crate/codec/"
+        meta_tag = (
+            '<meta name="rustdoc-vars" data-root-path="../../" '
+            'data-current-crate="demo_crate" '
+            'data-resource-suffix="-20250901-1.91.0">'
+        )
+        without_root = (
+            '<meta name="rustdoc-vars" data-current-crate="demo_crate" '
+            'data-resource-suffix="-20250901-1.91.0">'
+        )
+
+        assert search_index_url(meta_tag, page) == (
+            "https://docs.rs/demo-crate/0.3.1/search-index-20250901-1.91.0.js"
+        )
+        assert search_index_url(without_root, page) == (
+            "https://docs.rs/demo-crate/0.3.1/search-index-20250901-1.91.0.js"
+        )
+        assert search_index_url('<meta name="rustdoc-vars">', page) is None
+
+    async def test_scrape_api_surface(self):
+        """Test that the summary is fetched once and then served from the cache."""
+        requests = []
+
+        def handler(request):
+            requests.append(str(request.url))
+            return httpx.Response(200, text=fixture("search-index.js"))
+
+        scraper = UnifiedScraper(cache=ScrapeCache(":memory:"))
+        scraper.http_fetcher.transport = httpx.MockTransport(handler)
+        docs_page = ScrapingResult(
+            url="https://docs.rs/demo-crate/0.3.1",
+            title="demo_crate",
+            content="",
+            metadata={
+                "search_index_url": "https://docs.rs/demo-crate/0.3.1/search-index.js"
+            },
+        )
+
+        first = await scraper.scrape_api_surface("demo-crate", docs_page)
+        second = await scraper.scrape_api_surface("demo-crate", docs_page)
+        await scraper.close()
+
+        assert first["public_items"] == 6
+        assert second == first
+        assert requests == ["https://docs.rs/demo-crate/0.3.1/search-index.js"]
@@ -0,0 +1,99 @@
+"""Tests for the persistent scrape cache."""
+
+import os
+import zlib
+from unittest.mock import patch
+
+from rust_crate_pipeline.config import PipelineConfig
+from rust_crate_pipeline.scraping.scrape_cache import (
+    ScrapeCache,
+    get_scrape_cache,
+    normalize_url,
+    url_version,
+)
+
+PAGE = {"title": "serde", "content": "# serde\n" + "Serialization framework. " * 50}
+
+
+class TestUrls:
+    """Test URL normalization and version detection."""
+
+    def test_normalize_url(self):
+        """Test that equivalent URLs normalize to the same key."""
+        assert normalize_url("HTTPS://Docs.RS:443/serde/latest/serde/#modules") == (
+            "https://docs.rs/serde/latest/serde"
+        )
+        assert normalize_url("https://lib.rs/crates/serde?utm_source=x&b=2&a=1") == (
+            "https://lib.rs/crates/serde?a=1&b=2"
+        )
+        assert (
+            normalize_url("https://lib.rs//crates/serde/")
+            == "https://lib.rs/crates/serde"
+        )
+
+    def test_url_version(self):
+        """Test that only docs.rs URLs naming a version are pinned."""
+        assert url_version("https://docs.rs/serde/1.0.210/serde/") == "1.0.210"
+        assert url_version("https://docs.rs/crate/tokio/1.40.0-rc.1") == "1.40.0-rc.1"
+        assert url_version("https://docs.rs/serde/latest/serde/") is None
+        assert url_version("https://lib.rs/crates/serde/1.0.0") is None
+
+
+class TestScrapeCache:
+    """Test storing and expiring scrape results."""
+
+    def test_round_trip_is_compressed(self, temp_dir):
+        """Test that results survive a reopen and are stored compressed."""
+        path = os.path.join(temp_dir, "scrape.sqlite")
+        ScrapeCache(path).set("https://lib.rs/crates/serde", PAGE)
+
+        cache = ScrapeCache(path)
+        assert cache.get("https://lib.rs/crates/serde/") == PAGE
+        stored = cache.store.get(cache.make_key("https://lib.rs/crates/serde"))
+        assert zlib.decompress(stored)
+        assert len(stored) < len(PAGE["content"])
+
+    def test_unversioned_pages_expire(self):
+        """Test that the TTL applies only to pages without a version."""
+        cache = ScrapeCache(":memory:", ttl=10)
+        with patch(
+            "rust_crate_pipeline.utils.disk_cache.time.time", return_value=1000.0
+        ):
+            cache.set("https://lib.rs/crates/serde", PAGE)
+            cache.set("https://docs.rs/serde/1.0.0/serde/", PAGE)
+        with patch(
+            "rust_crate_pipeline.utils.disk_cache.time.time", return_value=10**9
+        ):
+            assert cache.get("https://lib.rs/crates/serde") is None
+            assert cache.get("https://docs.rs/serde/1.0.0/serde/") == PAGE
+        assert cache.stats()["versioned_hits"] == 1
+
+    def test_key_includes_version_and_settings(self):
+        """Test that other versions and extraction settings miss."""
+        cache = ScrapeCache(":memory:")
+        docs = {"doc_type": "docs"}
+        cache.set("https://docs.rs/serde", PAGE, version="1.0.0", extra=docs)
+
+        assert cache.get("https://docs.rs/serde", version="1.0.0", extra=docs) == PAGE
+        assert cache.get("https://docs.rs/serde", version="1.0.1", extra=docs) is None
+        assert cache.get("https://docs.rs/serde", version="1.0.0") is None
+
+    def test_size_bound(self):
+        """Test that the cache evicts pages past its size limit."""
+        cache = ScrapeCache(":memory:", max_bytes=300)
+        for i in range(10):
+            cache.set(
+                f"https://lib.rs/crates/crate-{i}", {"content": os.urandom(100).hex()}
+            )
+
+        stats = cache.stats()
+        assert stats["bytes"] <= 300
+        assert stats["evictions"] > 0
+
+    def test_shared_cache_per_config(self, temp_dir):
+        """Test that a config maps to one shared cache, or none when disabled."""
+        config = PipelineConfig(
+            scrape_cache_path=os.path.join(temp_dir, "scrape.sqlite")
+        )
+        assert get_scrape_cache(config) is get_scrape_cache(config)
+        assert get_scrape_cache(PipelineConfig(scrape_cache_enabled=False)) is None
@@ -0,0 +1,764 @@
+"""Tests for the unified LLM processor."""
+
+import asyncio
+import json
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+pytest.importorskip("litellm")
+
+from rust_crate_pipeline.config import CrateMetadata
+from rust_crate_pipeline.llm_cache import LLMResponseCache
+from rust_crate_pipeline.quality_tiers import QUALITY_TIERS
+from rust_crate_pipeline.unified_llm_processor import (
+    DEFAULT_SYSTEM_MESSAGE,
+    BudgetManager,
+    LLMConfig,
+    UnifiedLLMProcessor,
+    cascade_config,
+)
+
+
+def make_response(content: str, prompt_tokens: int = 10, completion_tokens: int = 5):
+    """Build a minimal LiteLLM-style completion response."""
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(
+            prompt_tokens=prompt_tokens, completion_tokens=completion_tokens
+        ),
+    )
+
+
+@pytest.fixture
+def processor() -> UnifiedLLMProcessor:
+    """Create a processor for a local Ollama endpoint."""
+    config = LLMConfig(provider="ollama", model="llama2", max_retries=1)
+    return UnifiedLLMProcessor(config)
+
+
+@pytest.fixture
+def crate() -> CrateMetadata:
+    """Create sample crate metadata."""
+    return CrateMetadata(
+        name="test-crate",
+        version="1.0.0",
+        description="A test crate for serializing data",
+        repository="https://github.com/test/test-crate",
+        keywords=["serde", "json"],
+        categories=["encoding"],
+        readme="# Test Crate\n\n## Usage\n\nSerialize things quickly.",
+        downloads=1000,
+    )
+
+
+class TestAsyncLLMPath:
+    """Test the async LLM API."""
+
+    async def test_acall_llm_returns_content(self, processor):
+        """Test that acall_llm awaits the async completion."""
+        with patch(
+            "rust_crate_pipeline.unified_llm_processor.acompletion",
+            new=AsyncMock(return_value=make_response("hello")),
+        ) as mock_acompletion:
+            result = await processor.acall_llm("prompt")
+
+        assert result == "hello"
+        assert mock_acompletion.await_count == 1
+
+    async def test_acall_llm_returns_none_on_error(self, processor):
+        """Test that provider errors are logged and swallowed."""
+        with patch(
+            "rust_crate_pipeline.unified_llm_processor.acompletion",
+            new=AsyncMock(side_effect=RuntimeError("boom")),
+        ):
+            assert await processor.acall_llm("prompt") is None
+
+    async def test_in_flight_limit_per_provider(self):
+        """Test that concurrent calls respect max_concurrent_requests."""
+        config = LLMConfig(
+            provider="ollama",
+            model="llama2",
+            ollama_host="http://limit-test:11434",
+            max_concurrent_requests=2,
+        )
+        processor = UnifiedLLMProcessor(config)
+        in_flight = 0
+        peak = 0
+
+        async def fake_acompletion(**kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return make_response("ok")
+
+        with patch(
+            "rust_crate_pipeline.unified_llm_processor.acompletion",
+            new=fake_acompletion,
+        ):
+            results = await asyncio.gather(
+                *(processor.acall_llm(f"prompt {i}") for i in range(6))
+            )
+
+        assert results == ["ok"] * 6
+        assert peak == 2
+
+    def test_batch_process_prompts_runs_concurrently(self, processor):
+        """Test that batched prompts overlap, shortest first, in input order."""
+        started = []
+        in_flight = 0
+        peak = 0
+
+        async def fake_acompletion(**kwargs):
+            nonlocal in_flight, peak
+            started.append(kwargs["messages"][-1]["content"])
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return make_response(kwargs["messages"][-1]["content"].upper())
+
+        prompts = [
+            ("a much longer prompt", 0.2, 50),
+            ("short", 0.2, 50),
+            ("mid one", 0.2, 50),
+        ]
+        with patch(
+            "rust_crate_pipeline.unified_llm_processor.acompletion",
+            new=fake_acompletion,
+        ):
+            results = processor.batch_process_prompts(prompts, batch_size=2)
+
+        assert results == ["A MUCH LONGER PROMPT", "SHORT", "MID ONE"]
+        assert started[0] == "short"
+        assert peak == 2
+
+    async def test_avalidate_and_retry_uses_async_backoff(self, processor):
+        """Test that retries back off with asyncio.sleep instead of time.sleep."""
+        responses = [make_response("nonsense"), make_response("Serialization")]
+        with patch(
+            "rust_crate_pipeline.unified_llm_processor.acompletion",
+            new=AsyncMock(side_effect=responses),
+        ), patch(
+            "rust_crate_pipeline.unified_llm_processor.asyncio.sleep",
+            new=AsyncMock(),
+        ) as mock_sleep, patch(
+            "rust_crate_pipeline.unified_llm_processor.time.sleep"
+        ) as mock_time_sleep:
+            result = await processor.avalidate_and_retry(
+                "prompt", processor.validate_classification
+            )
+
+        assert result == "Serialization"
+        assert mock_sleep.await_count == 1
+        mock_time_sleep.assert_not_called()
+
+    async def test_aenrich_crate(self, processor, crate):
+        """Test the full async enrichment of a crate."""
+
+        async def fake_acompletion(**kwargs):
+            system = kwargs["messages"][0]["content"]
+            if "classifies" in system:
+                return make_response("Serialization")
+            if "counterfactuals" in system:
+                return make_response(
+                    "✅ Factual: It serializes.\n❌ Counterfactual: It compiles Go."
+                )
+            if "rates" in system:
+                return make_response("8.5")
+            return make_response("A fast serialization crate.")
+
+        with patch(
+            "rust_crate_pipeline.unified_llm_processor.acompletion",
+            new=fake_acompletion,
+        ):
+            enriched = await processor.aenrich_crate(crate)
+
+        assert enriched.readme_summary == "A fast serialization crate."
+        assert enriched.use_case == "Serialization"
+        assert enriched.score == 8.5
+        assert "✅ Factual: It serializes." in enriched.factual_counterfactual
+
+
+class TestResponseCache:
+    """Test LLM response caching in the processor."""
+
+    async def test_cached_response_skips_model(self, crate):
+        """Test that a repeated prompt is served from the cache."""
+        cache = LLMResponseCache(":memory:")
+        processor = UnifiedLLMProcessor(
+            LLMConfig(provider="ollama", model="llama2"), cache=cache
+        )
+        with patch(
+            "rust_crate_pipeline.unified_llm_processor.acompletion",
+            new=AsyncMock(return_value=make_response("answer")),
+        ) as mock_acompletion:
+            first = await processor.acall_llm("prompt")
+            second = await processor.acall_llm("prompt")
+
+        assert first == second == "answer"
+        assert mock_acompletion.await_count == 1
+        assert cache.stats()["hits"] == 1
+
+    async def test_retry_ignores_cached_invalid_answer(self):
+        """Test that a cached answer failing validation is not replayed."""
+        cache = LLMResponseCache(":memory:")
+        processor = UnifiedLLMProcessor(
+            LLMConfig(provider="ollama", model="llama2", max_retries=1), cache=cache
+        )
+        responses = [make_response("gibberish"), make_response("Database")]
+        with patch(
+            "rust_crate_pipeline.unified_llm_processor.acompletion",
+            new=AsyncMock(side_effect=responses),
+        ), patch(
+            "rust_crate_pipeline.unified_llm_processor.asyncio.sleep",
+            new=AsyncMock(),
+        ):
+            result = await processor.avalidate_and_retry(
+                "prompt", processor.validate_classification
+            )
+
+        args = processor._build_completion_args(
+            "prompt", None, None, DEFAULT_SYSTEM_MESSAGE
+        )
+        key = processor._cache_key(args, "prompt", DEFAULT_SYSTEM_MESSAGE)
+        assert result == "Database"
+        assert cache.get(key) == "Database"
+
+
+class TestBatchedEnrichment:
+    """Test multi-crate batched prompts."""
+
+    def test_parse_batch_response_tolerates_fences(self, processor):
+        """Test parsing a fenced JSON array keyed by crate name."""
+        response = (
+            "Here you go:\n```json\n"
+            '[{"crate": "serde", "use_case": "Serialization"},'
+            ' {"crate": "tokio", "use_case": "Networking"}]\n```'
+        )
+        entries = processor._parse_batch_response(response)
+
+        assert entries["serde"]["use_case"] == "Serialization"
+        assert entries["tokio"]["use_case"] == "Networking"
+        assert processor._parse_batch_response("not json") == {}
+
+    async def test_failed_entries_are_reissued_individually(self, processor, crate):
+        """Test that only invalid batch entries get an individual call."""
+        crates = [
+            CrateMetadata(**{**crate.__dict__, "name": name})
+            for name in ("alpha", "beta", "gamma")
+        ]
+        calls = []
+
+        async def fake_acompletion(**kwargs):
+            prompt = kwargs["messages"][1]["content"]
+            calls.append(prompt)
+            if "JSON array" in prompt:
+                return make_response(
+                    '[{"crate": "alpha", "use_case": "Database"},'
+                    ' {"crate": "beta", "use_case": "Spaceships"}]'
+                )
+            return make_response("Networking")
+
+        with patch(
+            "rust_crate_pipeline.unified_llm_processor.acompletion",
+            new=fake_acompletion,
+        ):
+            results = await processor.abatch_classify_use_cases(
+                crates, ["summary"] * 3, batch_size=3
+            )
+
+        assert results == {
+            "alpha": "Database",
+            "beta": "Networking",
+            "gamma": "Networking",
+        }
+        # One batched request plus one retry each for "beta" and "gamma"
+        assert len(calls) == 3
+
+    async def test_aenrich_crates_batches_scores(self, processor, crate):
+        """Test end-to-end batched enrichment of several crates."""
+        crates = [
+            CrateMetadata(**{**crate.__dict__, "name": name})
+            for name in ("alpha", "beta")
+        ]
+
+        async def fake_acompletion(**kwargs):
+            prompt = kwargs["messages"][1]["content"]
+            if '"score"' in prompt:
+                return make_response(
+                    '[{"crate": "alpha", "score": 7}, {"crate": "beta", "score": 3.5}]'
+                )
+            if '"use_case"' in prompt:
+                return make_response(
+                    '[{"crate": "alpha", "use_case": "AI"},'
+                    ' {"crate": "beta", "use_case": "ML"}]'
+                )
+            if "counterfactual" in prompt:
+                return make_response("✅ Factual: a\n❌ Counterfactual: b")
+            return make_response("Summary.")
+
+        with patch(
+            "rust_crate_pipeline.unified_llm_processor.acompletion",
+            new=fake_acompletion,
+        ):
+            enriched = await processor.aenrich_crates(crates, batch_size=2)
+
+        assert [e.use_case for e in enriched] == ["AI", "ML"]
+        assert [e.score for e in enriched] == [7.0, 3.5]
+        assert all(e.readme_summary == "Summary." for e in enriched)
+
+
+class TestStructuredEnrichment:
+    """Test single-call structured enrichment."""
+
+    @pytest.fixture
+    def structured_processor(self) -> UnifiedLLMProcessor:
+        """Create a processor in structured enrichment mode."""
+        config = LLMConfig(
+            provider="ollama",
+            model="llama2",
+            max_retries=1,
+            enrichment_mode="structured",
+        )
+        return UnifiedLLMProcessor(config)
+
+    def test_parse_validates_each_field(self, processor):
+        """Test that invalid fields are dropped and valid ones kept."""
+        response = (
+            '```json\n{"readme_summary": "Fast JSON.", "use_case": "spaceships",'
+            ' "factual_pairs": [{"factual": "It parses JSON.",'
+            ' "counterfactual": "It parses YAML only."}],'
+            ' "score": 42}\n```'
+        )
+        fields = processor._parse_structured_enrichment(response)
+
+        assert fields == {
+            "readme_summary": "Fast JSON.",
+            "factual_counterfactual": (
+                "✅ Factual: It parses JSON.\n❌ Counterfactual: It parses YAML only."
+            ),
+        }
+        assert processor._parse_structured_enrichment("no json here") == {}
+
+    async def test_single_call_fills_all_fields(self, structured_processor, crate):
+        """Test that a complete structured response needs no further calls."""
+        response = make_response(
+            '{"readme_summary": "Serializes data.", "use_case": "Serialization",'
+            ' "factual_pairs": [{"factual": "a", "counterfactual": "b"}], "score": 7.5}'
+        )
+        with patch(
+            "rust_crate_pipeline.unified_llm_processor.acompletion",
+            new=AsyncMock(return_value=response),
+        ) as mock_acompletion:
+            enriched = await structured_processor.aenrich_crate(crate)
+
+        assert mock_acompletion.await_count == 1
+        assert "response_format" in mock_acompletion.await_args.kwargs
+        assert enriched.readme_summary == "Serializes data."
+        assert enriched.use_case == "Serialization"
+        assert enriched.score == 7.5
+        assert enriched.factual_counterfactual == "✅ Factual: a\n❌ Counterfactual: b"
+
+    async def test_missing_fields_fall_back_per_field(
+        self, structured_processor, crate
+    ):
+        """Test that only fields missing from the structured answer are re-requested."""
+        calls = []
+
+        async def fake_acompletion(**kwargs):
+            system = kwargs["messages"][0]["content"]
+            calls.append(system)
+            if "JSON" in system:
+                return make_response(
+                    '{"readme_summary": "Serializes data.",'
+                    ' "use_case": "Serialization",'
+                    ' "factual_pairs": [], "score": "high"}'
+                )
+            if "objectively" in system:
+                return make_response("6")
+            return make_response("✅ Factual: a\n❌ Counterfactual: b")
+
+        with patch(
+            "rust_crate_pipeline.unified_llm_processor.acompletion",
+            new=fake_acompletion,
+        ):
+            enriched = await structured_processor.aenrich_crate(crate)
+
+        assert len(calls) == 3
+        assert enriched.use_case == "Serialization"
+        assert enriched.score == 6.0
+        assert enriched.factual_counterfactual.startswith("✅ Factual: a")
+
+
+class TestBudgetManager:
+    """Test reservation-based budget accounting and usage reports."""
+
+    async def test_concurrent_calls_cannot_overshoot(self):
+        """Test that in-flight reservations stop calls beyond the budget."""
+        budget = BudgetManager(
+            budget=BudgetManager.estimate_cost("gpt-4o", 1000, 100) * 2.5
+        )
+        processor = UnifiedLLMProcessor(
+            LLMConfig(
+                provider="openai", model="gpt-4o", api_key="test-key", max_tokens=100
+            ),
+            budget_manager=budget,
+        )
+        sent = 0
+
+        async def fake_acompletion(**kwargs):
+            nonlocal sent
+            sent += 1
+            await asyncio.sleep(0.01)
+            return make_response("ok", prompt_tokens=1000, completion_tokens=100)
+
+        with patch(
+            "rust_crate_pipeline.unified_llm_processor.acompletion",
+            new=fake_acompletion,
+        ), patch.object(processor, "_count_prompt_tokens", return_value=1000):
+            results = await asyncio.gather(
+                *(processor.acall_llm(f"prompt {i}", use_cache=False) for i in range(5))
+            )
+
+        assert sent == 2
+        assert results.count("ok") == 2
+        assert budget.get_total_cost() <= budget.budget
+        assert budget.reserved_cost == 0
+
+    def test_failed_call_releases_reservation(self, processor):
+        """Test that a failed call gives its reservation back."""
+        with patch(
+            "rust_crate_pipeline.unified_llm_processor.completion",
+            side_effect=RuntimeError("boom"),
+        ):
+            assert processor.call_llm("prompt") is None
+
+        assert processor.budget_manager.reserved_cost == 0
+        assert processor.budget_manager.records == []
+
+    async def test_usage_report_by_stage_task_and_crate(
+        self, processor, crate, temp_dir
+    ):
+        """Test that enrichment calls are attributed to stage, task and crate."""
+
+        async def fake_acompletion(**kwargs):
+            system = kwargs["messages"][0]["content"]
+            if "classifies" in system:
+                return make_response("Serialization")
+            if "counterfactuals" in system:
+                return make_response(
+                    "✅ Factual: It serializes.\n❌ Counterfactual: It compiles Go."
+                )
+            return make_response("8.5", completion_tokens=2)
+
+        with patch(
+            "rust_crate_pipeline.unified_llm_processor.acompletion",
+            new=fake_acompletion,
+        ):
+            await processor.aenrich_crate(crate)
+        report = processor.budget_manager.usage_report()
+
+        assert report["calls"] == 4
+        assert set(report["by_stage_task"]) == {
+            "enrichment/readme_summary",
+            "enrichment/use_case",
+            "enrichment/factual_counterfactual",
+            "enrichment/score",
+        }
+        assert report["by_stage_task"]["enrichment/score"]["completion_tokens"] == 2
+        assert report["by_crate"]["test-crate"]["prompt_tokens"] == 40
+
+        path = f"{temp_dir}/usage.json"
+        processor.budget_manager.export_report(path, include_calls=True)
+        with open(path, encoding="utf-8") as f:
+            assert len(json.load(f)["call_records"]) == 4
+
+    def test_threaded_enrichment_keeps_labels(self, processor, crate):
+        """Test that labels reach calls made on the task graph's threads."""
+        with patch(
+            "rust_crate_pipeline.unified_llm_processor.completion",
+            return_value=make_response("Serialization"),
+        ):
+            processor.enrich_crate(crate)
+
+        crates = {record.crate for record in processor.budget_manager.records}
+        stages = {record.stage for record in processor.budget_manager.records}
+        assert crates == {"test-crate"}
+        assert stages == {"enrichment"}
+
+
+def make_chunks(*texts):
+    """Build LiteLLM-style streaming chunks."""
+    return [
+        SimpleNamespace(
+            choices=[SimpleNamespace(delta=SimpleNamespace(content=text))], usage=None
+        )
+        for text in texts
+    ]
+
+
+class TestStreamingShortAnswers:
+    """Test streamed classification and scoring with early termination."""
+
+    def make_processor(self):
+        config = LLMConfig(provider="ollama", model="llama2", stream_short_answers=True)
+        return UnifiedLLMProcessor(config)
+
+    def test_score_stops_reading_at_answer(self, crate):
+        """Test that the stream is abandoned once a complete score arrives."""
+        processor = self.make_processor()
+        consumed = []
+
+        def stream():
+            for chunk in make_chunks(
+                "8", ".5", "\n", "The crate", " is", " well documented"
+            ):
+                consumed.append(chunk)
+                yield chunk
+
+        with patch(
+            "rust_crate_pipeline.unified_llm_processor.completion",
+            return_value=stream(),
+        ) as mock_completion:
+            score = processor.score_crate(crate)
+
+        assert score == 8.5
+        assert len(consumed) == 3
+        assert mock_completion.call_args.kwargs["stream"] is True
+        record = processor.budget_manager.records[0]
+        assert record.task == "score"
+        assert record.completion_tokens > 0
+
+    async def test_async_classification_returns_category(self, crate):
+        """Test that the async path stops at the first complete category."""
+        processor = self.make_processor()
+
+        async def stream():
+            for chunk in make_chunks(
+                "Serial", "ization", ".", " It also", " does networking"
+            ):
+                yield chunk
+
+        async def fake_acompletion(**kwargs):
+            return stream()
+
+        with patch(
+            "rust_crate_pipeline.unified_llm_processor.acompletion",
+            new=fake_acompletion,
+        ):
+            use_case = await processor.aclassify_use_case(crate, "Serializes data")
+
+        assert use_case == "Serialization"
+
+    def test_disabled_by_default(self, processor, crate):
+        """Test that short answers are not streamed unless enabled."""
+        with patch(
+            "rust_crate_pipeline.unified_llm_processor.completion",
+            return_value=make_response("6.0"),
+        ) as mock_completion:
+            assert processor.score_crate(crate) == 6.0
+
+        assert "stream" not in mock_completion.call_args.kwargs
+
+
+class TestCascade:
+    """Test small-model-first enrichment with escalation."""
+
+    def make_processor(self):
+        config = LLMConfig(
+            provider="openai",
+            model="gpt-4o",
+            api_key="test-key",
+            max_retries=0,
+            cascade_model={"provider": "ollama", "model": "tiny"},
+        )
+        return UnifiedLLMProcessor(config)
+
+    def fake_completion(self, calls):
+        def complete(**kwargs):
+            calls.append(kwargs["model"])
+            system = kwargs["messages"][0]["content"]
+            small = kwargs["model"] == "tiny"
+            if "classifies" in system:
+                return make_response(
+                    "Database or Networking" if small else "Networking"
+                )
+            if "objectively" in system:
+                return make_response("7.5")
+            return make_response(
+                "Short." if small else "A networking crate with async sockets."
+            )
+        return complete
+
+    def test_escalates_only_failed_tasks(self, crate):
+        """Test that valid small-model answers are kept and others escalate."""
+        processor = self.make_processor()
+        calls = []
+        with patch(
+            "rust_crate_pipeline.unified_llm_processor.completion",
+            new=self.fake_completion(calls),
+        ):
+            score = processor.score_crate(crate)
+            use_case = processor.classify_use_case(crate, "summary")
+            summary = processor.summarize_features(crate)
+
+        assert score == 7.5
+        assert use_case == "Networking"
+        assert summary == "A networking crate with async sockets."
+        assert calls == ["tiny", "tiny", "gpt-4o", "tiny", "gpt-4o"]
+
+        stats = processor.get_cascade_stats()
+        assert stats["score"] == {"attempts": 1, "escalated": 0, "escalation_rate": 0.0}
+        assert stats["use_case"]["escalated"] == 1
+        assert stats["readme_summary"]["escalation_rate"] == 1.0
+        models = [record.model for record in processor.budget_manager.records]
+        assert models.count("tiny") == 3
+
+    async def test_async_cascade(self, crate):
+        """Test that the async path cascades the same way."""
+        processor = self.make_processor()
+        calls = []
+        complete = self.fake_completion(calls)
+
+        async def fake_acompletion(**kwargs):
+            return complete(**kwargs)
+
+        with patch(
+            "rust_crate_pipeline.unified_llm_processor.acompletion",
+            new=fake_acompletion,
+        ):
+            assert await processor.ascore_crate(crate) == 7.5
+
+        assert calls == ["tiny"]
+
+    def test_cascade_overrides_are_validated(self):
+        """Test that unknown keys are rejected and routing keys are reset."""
+        config = LLMConfig(
+            provider="openai",
+            model="gpt-4o",
+            cascade_model={"model": "tiny", "fallback_endpoints": [{"model": "x"}]},
+        )
+        assert cascade_config(config).fallback_endpoints == []
+        assert cascade_config(config).model == "tiny"
+
+        config.cascade_model = {"modle": "tiny"}
+        with pytest.raises(ValueError, match="modle"):
+            UnifiedLLMProcessor(config)
+
+    def test_disabled_without_cascade_model(self, processor):
+        """Test that no cascade processor exists by default."""
+        assert processor.cascade_processor is None
+        assert processor.get_cascade_stats() is None
+
+
+class TestConstrainedDecoding:
+    """Test grammar-constrained classification and factual pairs."""
+
+    def make_processor(self, **overrides):
+        config = LLMConfig(
+            provider="openai",
+            model="gpt-4o",
+            api_key="test-key",
+            max_retries=0,
+            **overrides,
+        )
+        processor = UnifiedLLMProcessor(config)
+        processor._response_schema_support = True
+        return processor
+
+    def test_factual_pairs_use_schema_and_render_text(self, crate):
+        """Test that a JSON answer is rendered as ✅/❌ pairs on the first try."""
+        processor = self.make_processor()
+        pairs = [
+            {
+                "factual": "It serializes data.",
+                "counterfactual": "It compiles shaders.",
+            },
+            {"factual": "It is a library.", "counterfactual": "It is a kernel."},
+        ]
+        answer = json.dumps({"pairs": pairs})
+        with patch(
+            "rust_crate_pipeline.unified_llm_processor.completion",
+            return_value=make_response(answer),
+        ) as mock_completion:
+            result = processor.generate_factual_pairs(crate)
+
+        assert mock_completion.call_count == 1
+        response_format = mock_completion.call_args.kwargs["response_format"]
+        assert response_format["json_schema"]["name"] == "factual_pairs_2_3"
+        assert result.startswith(
+            "✅ Factual: It serializes data.\n❌ Counterfactual: It compiles shaders."
+        )
+
+    async def test_classification_uses_category_enum(self, crate):
+        """Test that classification is constrained to the category enum."""
+        processor = self.make_processor()
+        with patch(
+            "rust_crate_pipeline.unified_llm_processor.acompletion",
+            new=AsyncMock(return_value=make_response('{"use_case": "Serialization"}')),
+        ) as mock_acompletion:
+            result = await processor.aclassify_use_case(crate, "summary")
+
+        assert result == "Serialization"
+        response_format = mock_acompletion.await_args.kwargs["response_format"]
+        schema = response_format["json_schema"]["schema"]
+        assert "Web Framework" in schema["properties"]["use_case"]["enum"]
+
+    def test_disabled_sends_no_schema(self, crate):
+        """Test that no schema is sent when constrained decoding is off."""
+        processor = self.make_processor(constrained_decoding=False)
+        with patch(
+            "rust_crate_pipeline.unified_llm_processor.completion",
+            return_value=make_response("✅ Factual: A.\n❌ Counterfactual: B."),
+        ) as mock_completion:
+            processor.generate_factual_pairs(crate)
+
+        assert "response_format" not in mock_completion.call_args.kwargs
+
+
+class TestQualityTiers:
+    """Test budget-driven degradation of per-crate enrichment."""
+
+    def make_processor(self, budget):
+        config = LLMConfig(
+            provider="openai", model="gpt-4o", api_key="test-key", max_retries=0
+        )
+        return UnifiedLLMProcessor(config, budget_manager=BudgetManager(budget=budget))
+
+    async def test_tight_budget_runs_fewer_tasks(self, crate):
+        """Test that a crate whose share cannot pay for all tasks gets a lower tier."""
+        processor = self.make_processor(budget=1.0)
+        tiers = {tier.name: tier for tier in QUALITY_TIERS}
+        minimal = processor.estimate_tier_cost(crate, tiers["minimal"])
+        reduced = processor.estimate_tier_cost(crate, tiers["reduced"])
+        full = processor.estimate_tier_cost(crate, tiers["full"])
+        assert 0 < minimal < reduced <= full
+        processor.budget_manager.budget = (minimal + reduced) / 2
+        processor.plan_quality_tiers(1)
+
+        with patch(
+            "rust_crate_pipeline.unified_llm_processor.acompletion",
+            new=AsyncMock(return_value=make_response("Serialization")),
+        ) as mock_acompletion:
+            enriched = await processor.aenrich_crate(crate)
+
+        assert enriched.enrichment_tier == "minimal"
+        assert mock_acompletion.await_count == 2
+        assert enriched.use_case == "Serialization"
+        assert enriched.factual_counterfactual is None
+        assert processor.get_tier_stats() == {"minimal": 1}
+
+    def test_spent_budget_keeps_metadata(self, crate):
+        """Test that a crate past the budget still gets a metadata-only record."""
+        processor = self.make_processor(budget=0.0)
+        with patch(
+            "rust_crate_pipeline.unified_llm_processor.completion"
+        ) as mock_completion:
+            enriched = processor.enrich_crate(crate)
+
+        mock_completion.assert_not_called()
+        assert enriched.enrichment_tier == "metadata"
+        assert enriched.readme_summary == crate.description
@@ -0,0 +1,295 @@
+"""Tests for the unified documentation scraper."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from rust_crate_pipeline.scraping.http_fetcher import HttpFetcher
+from rust_crate_pipeline.scraping.scrape_cache import ScrapeCache
+from rust_crate_pipeline.scraping.unified_scraper import (
+    ScrapingError,
+    ScrapingResult,
+    UnifiedScraper,
+)
+
+
+class FakePages:
+    """Stand-in for scrape_url that records how many pages overlap."""
+
+    def __init__(self, fail=(), content="# page", structured_data=None):
+        self.fail = fail
+        self.content = content
+        self.structured_data = structured_data or {}
+        self.quality = UnifiedScraper()._calculate_quality_score(
+            content, self.structured_data
+        )
+        self.active = 0
+        self.peak = 0
+        self.urls = []
+
+    async def __call__(self, url, doc_type="general", extraction_schema=None):
+        self.urls.append(url)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.02)
+            if any(part in url for part in self.fail):
+                raise ScrapingError(f"Failed to scrape {url}")
+            return ScrapingResult(
+                url=url,
+                title="page",
+                content=self.content,
+                structured_data=self.structured_data,
+                quality_score=self.quality,
+            )
+        finally:
+            self.active -= 1
+
+
+class TestScrapeCrateDocumentation:
+    """Test concurrent scraping of a crate's documentation sources."""
+
+    async def test_sources_are_scraped_concurrently(self):
+        """Test that all sources are in flight together without early exit."""
+        scraper = UnifiedScraper({"early_exit_chars": 0})
+        scraper.scrape_url = FakePages()
+
+        results = await scraper.scrape_crate_documentation("serde")
+
+        assert list(results) == ["docs_rs", "lib_rs"]
+        assert results["docs_rs"].url == "https://docs.rs/serde"
+        assert scraper.scrape_url.peak == 2
+
+    async def test_per_crate_page_limit(self):
+        """Test that max_pages_per_crate bounds one crate's pages."""
+        scraper = UnifiedScraper({"max_pages_per_crate": 1})
+        scraper.scrape_url = FakePages()
+
+        await scraper.scrape_crate_documentation("serde")
+
+        assert scraper.scrape_url.peak == 1
+
+    async def test_failed_source_is_reported(self):
+        """Test that one failing source does not affect the others."""
+        scraper = UnifiedScraper()
+        scraper.scrape_url = FakePages(fail=("lib.rs",))
+
+        results = await scraper.scrape_crate_documentation("serde")
+
+        assert results["lib_rs"].extraction_method == "failed"
+        assert "lib.rs" in results["lib_rs"].error
+        assert results["docs_rs"].error is None
+
+    async def test_good_docs_skip_later_sources(self):
+        """Test that lib.rs is not scraped when docs.rs has enough content."""
+        scraper = UnifiedScraper()
+        scraper.scrape_url = FakePages(
+            content="Serde documentation. " * 100,
+            structured_data={"features": ["derive", "std"]},
+        )
+
+        results = await scraper.scrape_crate_documentation("serde")
+
+        assert list(results) == ["docs_rs"]
+        assert scraper.scrape_url.urls == ["https://docs.rs/serde"]
+        assert scraper.sources_skipped == 1
+
+    async def test_long_low_quality_page_scrapes_later_sources(self):
+        """Test that length alone does not pass the early-exit quality bar."""
+        scraper = UnifiedScraper()
+        scraper.scrape_url = FakePages(content="Serde documentation. " * 100)
+
+        results = await scraper.scrape_crate_documentation("serde")
+
+        assert scraper.scrape_url.quality == 3.0
+        assert list(results) == ["docs_rs", "lib_rs"]
+        assert scraper.sources_skipped == 0
+
+    async def test_thin_docs_scrape_later_sources(self):
+        """Test that lib.rs is scraped after docs.rs when docs.rs is thin."""
+        scraper = UnifiedScraper()
+        scraper.scrape_url = FakePages()
+
+        results = await scraper.scrape_crate_documentation("serde")
+
+        assert list(results) == ["docs_rs", "lib_rs"]
+        assert scraper.scrape_url.peak == 1
+        assert scraper.sources_skipped == 0
+
+    async def test_sources_are_deduplicated(self):
+        """Test that text repeated on lib.rs is kept only in the docs.rs result."""
+        readme = (
+            "Serde is a framework for serializing and deserializing "
+            "Rust data structures."
+        )
+
+        async def pages(url, doc_type="general", extraction_schema=None, version=None):
+            extra = "\n\nUsed by 40,000 crates." if "lib.rs" in url else ""
+            return ScrapingResult(url=url, title="serde", content=f"{readme}{extra}")
+
+        scraper = UnifiedScraper()
+        scraper.scrape_url = pages
+
+        results = await scraper.scrape_crate_documentation("serde")
+
+        lib_rs = results["lib_rs"]
+        assert results["docs_rs"].content == readme
+        assert lib_rs.content == "Used by 40,000 crates."
+        assert lib_rs.metadata["raw_content_length"] > len(lib_rs.content)
+
+
+DOCS_PAGE = """<html><head><title>serde - Rust</title><script>var x = 1;</script></head>
+<body><nav class="sidebar"><a href="/serde">serde</a></nav>
+<main><section id="main-content">
+<h1>Crate <a href="#">serde</a></h1>
+<p>Serde is a framework for <strong>ser</strong>ializing and <em>de</em>serializing
+Rust data structures efficiently and generically.</p>
+<pre class="rust"><code>#[derive(Serialize)]
+struct Point { x: i32 }</code></pre>
+<h2>Modules</h2>
+<ul><li><a href="de/index.html">de</a> Generic deserialization framework.</li>
+<li><a href="ser/index.html">ser</a> Generic serialization framework.</li></ul>
+</section></main><footer>docs.rs footer</footer></body></html>"""
+
+
+def serve(status=200, body=DOCS_PAGE, content_type="text/html"):
+    """httpx transport that answers every request with one response."""
+    def handler(request):
+        return httpx.Response(status, text=body, headers={"content-type": content_type})
+    return httpx.MockTransport(handler)
+
+
+class TestHttpFirstScraping:
+    """Test the HTTP tier in front of the browser."""
+
+    async def test_static_page_is_fetched_without_browser(self):
+        """Test that docs.rs pages are converted from plain HTTP responses."""
+        scraper = UnifiedScraper()
+        scraper.http_fetcher.transport = serve()
+        scraper.pool = None
+
+        result = await scraper.scrape_url(
+            "https://docs.rs/serde/latest/serde/", doc_type="docs"
+        )
+        await scraper.close()
+
+        assert result.extraction_method == "http"
+        assert result.title == "Crate serde"
+        assert "**ser**ializing" in result.content
+        assert (
+            "```rust\n#[derive(Serialize)]\nstruct Point { x: i32 }\n```"
+            in result.content
+        )
+        assert (
+            "- [de](https://docs.rs/serde/latest/serde/de/index.html)" in result.content
+        )
+        assert "footer" not in result.content
+        assert "var x" not in result.content
+
+    async def test_missing_page_raises(self):
+        """Test that a 404 fails without trying the browser."""
+        scraper = UnifiedScraper()
+        scraper.http_fetcher.transport = serve(status=404, body="")
+
+        with pytest.raises(ScrapingError, match="HTTP 404"):
+            await scraper.scrape_url("https://lib.rs/crates/no-such-crate")
+        await scraper.close()
+
+    async def test_script_rendered_page_falls_back(self):
+        """Test that a page without content is left to the browser."""
+        fetcher = HttpFetcher(
+            transport=serve(body="<html><body><div id='app'></div></body></html>")
+        )
+
+        assert await fetcher.fetch("https://docs.rs/serde") is None
+        assert await fetcher.fetch("https://crates.io/crates/serde") is None
+        assert fetcher.stats() == {"fetched": 0, "fallbacks": 1}
+        await fetcher.close()
+
+    async def test_transient_error_falls_back(self):
+        """Test that rate limiting is left to the browser."""
+        fetcher = HttpFetcher(transport=serve(status=429))
+
+        assert await fetcher.fetch("https://lib.rs/crates/serde") is None
+        await fetcher.close()
+
+
+class TestScrapeCaching:
+    """Test that repeat scrapes are served from the scrape cache."""
+
+    async def test_repeat_scrape_hits_cache(self):
+        """Test that a cached page is not fetched again."""
+        requests = []
+
+        def handler(request):
+            requests.append(request.url)
+            return httpx.Response(
+                200, text=DOCS_PAGE, headers={"content-type": "text/html"}
+            )
+
+        scraper = UnifiedScraper(cache=ScrapeCache(":memory:"))
+        scraper.http_fetcher.transport = httpx.MockTransport(handler)
+
+        first = await scraper.scrape_url(
+            "https://docs.rs/serde/1.0.0/serde/", doc_type="docs"
+        )
+        second = await scraper.scrape_url(
+            "https://docs.rs/serde/1.0.0/serde", doc_type="docs"
+        )
+        await scraper.close()
+
+        assert len(requests) == 1
+        assert second.content == first.content
+        assert second.extraction_method == "http"
+        assert second.metadata["from_cache"]
+        assert scraper.cache.stats()["versioned_hits"] == 1
+
+    async def test_version_pins_docs_rs_url(self):
+        """Test that a known version scrapes docs.rs at that version."""
+        scraper = UnifiedScraper()
+        scraper.scrape_url = FakePages()
+
+        results = await scraper.scrape_crate_documentation("serde", "1.0.210")
+
+        assert results["docs_rs"].url == "https://docs.rs/serde/1.0.210"
+        assert results["lib_rs"].url == "https://lib.rs/crates/serde"
+
+
+class TestSelectorExtraction:
+    """Test that known sites are extracted without the LLM."""
+
+    async def test_schema_on_known_site_uses_selectors(self):
+        """Test that an extraction schema for docs.rs is served over HTTP."""
+        scraper = UnifiedScraper()
+        scraper.http_fetcher.transport = serve()
+        scraper.pool = None
+
+        result = await scraper.scrape_url(
+            "https://docs.rs/serde/latest/serde/",
+            doc_type="docs",
+            extraction_schema={
+                "type": "object",
+                "properties": {"title": {}, "examples": {}},
+            },
+        )
+        await scraper.close()
+
+        assert result.structured_data == {
+            "title": "Crate serde",
+            "examples": ["#[derive(Serialize)]\nstruct Point { x: i32 }"],
+        }
+        assert result.metadata["structured_extraction"] == "selectors"
+
+    async def test_selector_miss_falls_back_to_llm(self):
+        """Test that a field the selectors cannot find goes to the browser LLM path."""
+        scraper = UnifiedScraper()
+        scraper.http_fetcher.transport = serve()
+        scraper.pool = None
+
+        with pytest.raises(ScrapingError, match="No crawler backend"):
+            await scraper.scrape_url(
+                "https://docs.rs/serde/latest/serde/",
+                extraction_schema={"properties": {"license": {}}},
+            )
+        await scraper.close()
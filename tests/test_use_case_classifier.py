@@ -0,0 +1,172 @@
+"""Tests for the local use case classifier."""
+
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from rust_crate_pipeline.config import CrateMetadata, PipelineConfig
+from rust_crate_pipeline.use_case_classifier import (
+    ConfidentUseCaseClassifier,
+    UseCaseClassifier,
+    get_use_case_classifier,
+    main,
+    training_examples,
+)
+
+DATABASE = {
+    "categories": ["database"],
+    "keywords": ["sql", "postgres"],
+    "description": "Postgres database driver",
+}
+WEB = {
+    "categories": ["web-programming::http-server"],
+    "keywords": ["http", "web"],
+    "description": "HTTP web server framework",
+}
+CRYPTO = {
+    "categories": ["cryptography"],
+    "keywords": ["aes", "hash"],
+    "description": "Encryption and hashing primitives",
+}
+
+
+def record(name, use_case, template):
+    """Build an enriched-output record."""
+    return {"name": name, "use_case": use_case, **template}
+
+
+def make_crate(name, template):
+    """Build crate metadata from a template."""
+    return CrateMetadata(
+        name=name,
+        version="1.0.0",
+        description=template["description"],
+        repository="",
+        keywords=template["keywords"],
+        categories=template["categories"],
+        readme="",
+        downloads=0,
+    )
+
+
+@pytest.fixture
+def outputs(temp_dir):
+    """Enriched outputs in both of the pipeline's file formats."""
+    records = []
+    for i in range(6):
+        records.append(record(f"db-{i}", "Database", DATABASE))
+        records.append(record(f"web-{i}", "Web Framework", WEB))
+        records.append(record(f"crypto-{i}", "Cryptography", CRYPTO))
+    records.append(record("mystery", "Unknown", {"description": "Something"}))
+
+    with open(os.path.join(temp_dir, "enriched_crate_metadata_1.jsonl"), "w") as f:
+        for item in records[:10]:
+            f.write(json.dumps(item) + "\n")
+    for item in records[10:]:
+        with open(os.path.join(temp_dir, f"{item['name']}_enriched.json"), "w") as f:
+            json.dump(item, f)
+    return temp_dir
+
+
+class TestUseCaseClassifier:
+    """Test training, prediction and persistence."""
+
+    def test_learns_from_enriched_outputs(self, outputs, temp_dir):
+        """Test that labels from previous outputs train a usable model."""
+        examples = training_examples([outputs])
+        model = UseCaseClassifier().fit(examples)
+
+        assert len(examples) == 19
+        assert model.labels == ["Cryptography", "Database", "Web Framework"]
+        label, confidence = model.predict(
+            ["cat:database", "kw:sql", "w:mysql", "w:driver"]
+        )
+        assert label == "Database"
+        assert confidence > 0.75
+
+        path = os.path.join(temp_dir, "model.json")
+        model.save(path)
+        loaded = UseCaseClassifier.load(path)
+        loaded_label, loaded_confidence = loaded.predict(["cat:cryptography"])
+        assert loaded_label == "Cryptography"
+        assert loaded_confidence == pytest.approx(
+            model.predict(["cat:cryptography"])[1], abs=1e-4
+        )
+
+    def test_training_cli(self, outputs, temp_dir):
+        """Test that the training entry point writes a loadable model."""
+        path = os.path.join(temp_dir, "models", "use_case.json")
+        main([outputs, "--model", path])
+
+        config = PipelineConfig(
+            use_case_classifier_path=path, use_case_classifier_audit_rate=0.0
+        )
+        assert get_use_case_classifier(config) is not None
+
+
+class TestConfidentUseCaseClassifier:
+    """Test the local answer / LLM fallback decision."""
+
+    @pytest.fixture
+    def classifier(self, outputs):
+        model = UseCaseClassifier().fit(training_examples([outputs]))
+        return ConfidentUseCaseClassifier(model, threshold=0.75)
+
+    def test_confident_answer_skips_llm(self, classifier):
+        """Test that a confident prediction never calls the LLM."""
+        ask_llm = []
+        answer = classifier.classify(
+            make_crate("sqlx", DATABASE), "", lambda: ask_llm.append(1)
+        )
+
+        assert answer == "Database"
+        assert ask_llm == []
+        assert classifier.stats()["local_answers"] == 1
+
+    def test_uncertain_crate_falls_back_and_records_agreement(self, classifier):
+        """Test that low-confidence crates use the LLM answer."""
+        vague = {"categories": [], "keywords": [], "description": "Misc helpers"}
+        answer = classifier.classify(make_crate("misc", vague), "", lambda: "Utilities")
+
+        stats = classifier.stats()
+        assert answer == "Utilities"
+        assert stats["llm_fallbacks"] == 1
+        assert stats["fallback_agreement"] == 0.0
+
+    def test_audit_keeps_local_answer_when_llm_fails(self, classifier):
+        """Test that audited crates are double-checked by the LLM."""
+        classifier.audit_rate = 1.0
+        answer = classifier.classify(make_crate("ring", CRYPTO), "", lambda: None)
+
+        assert answer == "Cryptography"
+        assert classifier.stats()["audited"] == 1
+
+
+class TestProcessorIntegration:
+    """Test that the unified processor consults the classifier first."""
+
+    def test_classify_use_case_without_llm_call(self, outputs):
+        """Test that a confident crate is classified without a completion."""
+        pytest.importorskip("litellm")
+        from rust_crate_pipeline.unified_llm_processor import (
+            LLMConfig,
+            UnifiedLLMProcessor,
+        )
+
+        model = UseCaseClassifier().fit(training_examples([outputs]))
+        processor = UnifiedLLMProcessor(
+            LLMConfig(provider="ollama", model="llama2"),
+            use_case_classifier=ConfidentUseCaseClassifier(model),
+        )
+        with patch(
+            "rust_crate_pipeline.unified_llm_processor.completion"
+        ) as mock_completion:
+            assert (
+                processor.classify_use_case(make_crate("axum", WEB), "")
+                == "Web Framework"
+            )
+
+        mock_completion.assert_not_called()
+        assert processor.get_classifier_stats()["local_answers"] == 1